@@ -27,6 +27,7 @@ setup(
     entry_points={
         "console_scripts": [
             "smartrenamer=smartrenamer.main:main",
+            "smartrenamer-cache=smartrenamer.api.cache_tool:main",
         ],
     },
 )
@@ -9,6 +9,22 @@ from smartrenamer.api.tmdb_client_enhanced import (
     增强TMDB客户端,
     缓存管理器
 )
+from smartrenamer.api.cache_backends import (
+    磁盘缓存后端,
+    SQLite缓存后端,
+    JSON文件缓存后端,
+)
+from smartrenamer.api.rate_limiter import 速率限制器, RateLimiter
+from smartrenamer.api.http_transport import 原生HTTP传输, NativeHTTPTransport
+from smartrenamer.api.replay_transport import (
+    夹具档案,
+    录制HTTP传输,
+    回放HTTP传输,
+    FixtureArchive,
+    RecordingTransport,
+    ReplayTransport,
+)
+from smartrenamer.api.async_client import 异步TMDB客户端, AsyncTMDBClient
 from smartrenamer.api.factory import (
     TMDBClientFactory,
     get_tmdb_client,
@@ -21,6 +37,21 @@ __all__ = [
     "EnhancedTMDBClient",
     "增强TMDB客户端",
     "缓存管理器",
+    "磁盘缓存后端",
+    "SQLite缓存后端",
+    "JSON文件缓存后端",
+    "速率限制器",
+    "RateLimiter",
+    "原生HTTP传输",
+    "NativeHTTPTransport",
+    "夹具档案",
+    "录制HTTP传输",
+    "回放HTTP传输",
+    "FixtureArchive",
+    "RecordingTransport",
+    "ReplayTransport",
+    "异步TMDB客户端",
+    "AsyncTMDBClient",
     "TMDBClientFactory",
     "get_tmdb_client",
     "clear_tmdb_client",
@@ -0,0 +1,555 @@
+"""
+异步 TMDB 客户端
+
+基于 asyncio 的 TMDB 客户端：重试退避、令牌等待和请求合并在事件循环中进行，
+HTTP 请求由连接池化的 原生HTTP传输 在线程池中执行（代理、重定向、
+超时等行为与同步客户端一致），缓存读写也在线程池中执行，不阻塞事件循环。
+缓存键、负缓存和查询标准化与 增强TMDB客户端 一致，两者可以共用同一个
+缓存管理器 和 速率限制器
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from smartrenamer.api.http_transport import 原生HTTP传输, 精简剧集, 精简搜索结果
+from smartrenamer.api.rate_limiter import 速率限制器, 解析限流异常
+from smartrenamer.api.tmdb_client_enhanced import 增强TMDB客户端, 缓存管理器
+
+logger = logging.getLogger(__name__)
+
+
+class 异步TMDB客户端:
+    """
+    异步 TMDB API 客户端
+    
+    - 请求速率由 速率限制器 的令牌预约控制，可与同步客户端共用一个限制器
+    - 并发请求数受 `最大并发请求数` 和限制器的 AIMD 自适应并发上限共同约束；
+      等待令牌和并发名额都在事件循环中进行，只有正在收发的请求占用请求线程
+    - 重试退避使用 asyncio.sleep，不阻塞其他请求
+    - 同一个缓存键的并发查询只发出一次请求
+    """
+    
+    def __init__(
+        self,
+        api_key: str,
+        language: str = "zh-CN",
+        缓存目录: Optional[Path] = None,
+        启用缓存: bool = True,
+        最大重试次数: int = 3,
+        重试延迟: float = 1.0,
+        缓存过期天数: float = 7,
+        最大缓存条目数: int = 1000,
+        最大并发请求数: int = 100,
+        请求线程数: int = 16,
+        请求超时: float = 30,
+        负缓存有效期秒数: float = 600,
+        每秒请求数: float = 20.0,
+        缓存: Optional[缓存管理器] = None,
+        限制器: Optional[速率限制器] = None,
+        api基础URL: Optional[str] = None
+    ):
+        """
+        初始化异步 TMDB 客户端
+        
+        Args:
+            api_key: TMDB API 密钥
+            language: 语言设置，默认为简体中文
+            缓存目录: 缓存目录路径，默认为 ~/.smartrenamer/cache/tmdb
+            启用缓存: 是否启用缓存
+            最大重试次数: API 请求失败时的最大重试次数
+            重试延迟: 重试之间的延迟时间（秒）
+            缓存过期天数: 缓存过期时间（天）
+            最大缓存条目数: 内存缓存最大条目数
+            最大并发请求数: 同时进行中的请求上限
+            请求线程数: 执行 HTTP 收发的线程数
+            请求超时: 单个请求的超时时间（秒）
+            负缓存有效期秒数: 空结果或失败搜索的缓存有效期（秒）
+            每秒请求数: 速率上限（未传入限制器时使用）
+            缓存: 共用的缓存管理器（如同步客户端的 `缓存`），None 时按缓存目录创建
+            限制器: 共用的速率限制器（如同步客户端的 `限制器`），None 时新建
+            api基础URL: API 地址，None 表示 TMDB 官方地址
+        """
+        self.api_key = api_key
+        self.language = language
+        self.最大重试次数 = 最大重试次数
+        self.重试延迟 = 重试延迟
+        self.最大并发请求数 = 最大并发请求数
+        self.负缓存有效期秒数 = 负缓存有效期秒数
+        
+        self.启用缓存 = 启用缓存
+        # 客户端自行创建的缓存管理器由 `关闭` 负责关闭
+        self._自建缓存 = 启用缓存 and 缓存 is None
+        if self._自建缓存:
+            if 缓存目录 is None:
+                缓存目录 = Path.home() / ".smartrenamer" / "cache" / "tmdb"
+            缓存 = 缓存管理器(
+                缓存目录,
+                过期时间=缓存过期天数,
+                最大内存条目数=最大缓存条目数
+            )
+        self.缓存 = 缓存 if 启用缓存 else None
+        
+        self.限制器 = 限制器 or 速率限制器(
+            每秒请求数=每秒请求数,
+            最大并发数=最大并发请求数,
+            默认等待秒数=重试延迟
+        )
+        self._传输 = 原生HTTP传输(
+            api_key,
+            language,
+            请求超时=请求超时,
+            连接池大小=请求线程数,
+            基础URL=api基础URL
+        )
+        self._请求线程池 = ThreadPoolExecutor(
+            max_workers=max(1, 请求线程数), thread_name_prefix="tmdb-async"
+        )
+        
+        # 在第一次请求时创建，绑定到当时的事件循环
+        self._并发条件: Optional[asyncio.Condition] = None
+        self._进行中请求数 = 0
+        self._进行中请求表: Dict[str, asyncio.Task] = {}
+        self._请求命中次数 = 0
+        self._请求合并次数 = 0
+        self._请求未命中次数 = 0
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *args):
+        await self.关闭()
+    
+    async def _在线程中执行(
+        self,
+        执行器: Optional[ThreadPoolExecutor],
+        函数: Callable[..., Any],
+        *参数: Any,
+        **关键字参数: Any
+    ) -> Any:
+        """在线程池中执行阻塞调用，None 表示事件循环的默认线程池"""
+        return await asyncio.get_running_loop().run_in_executor(
+            执行器, functools.partial(函数, *参数, **关键字参数)
+        )
+    
+    def _获取并发条件(self) -> asyncio.Condition:
+        """获取并发名额的条件变量"""
+        if self._并发条件 is None:
+            self._并发条件 = asyncio.Condition()
+        return self._并发条件
+    
+    def _并发上限(self) -> int:
+        """当前并发上限：最大并发请求数 与限制器自适应上限中较小者"""
+        return max(1, min(self.最大并发请求数, self.限制器.并发上限))
+    
+    async def _发送请求(self, 路径: str, 参数: Dict[str, Any]) -> Dict[str, Any]:
+        """在事件循环中等待并发名额，再交给请求线程收发"""
+        条件 = self._获取并发条件()
+        async with 条件:
+            await 条件.wait_for(lambda: self._进行中请求数 < self._并发上限())
+            self._进行中请求数 += 1
+        try:
+            return await self._在线程中执行(self._请求线程池, self._传输.请求, 路径, **参数)
+        finally:
+            async with 条件:
+                self._进行中请求数 -= 1
+                条件.notify_all()
+    
+    async def _请求(self, 路径: str, **参数: Any) -> Dict[str, Any]:
+        """
+        发送一次 API 请求（带速率限制和重试）
+        
+        Args:
+            路径: API 路径
+            **参数: 查询参数
+        
+        Returns:
+            Dict[str, Any]: 响应 JSON
+        
+        Raises:
+            Exception: 所有重试都失败后抛出最后一个异常
+        """
+        最后异常: Optional[BaseException] = None
+        
+        for 尝试次数 in range(self.最大重试次数):
+            # 等待令牌，以及限流暂停结束
+            等待 = self.限制器.预约令牌()
+            while 等待 > 0:
+                await asyncio.sleep(等待)
+                等待 = self.限制器.暂停剩余秒数()
+            
+            try:
+                数据 = await self._发送请求(路径, 参数)
+                self.限制器.报告成功()
+                return 数据
+            
+            except Exception as e:
+                最后异常 = e
+                
+                重试等待 = 解析限流异常(e, self.重试延迟)
+                if 重试等待 is not None:
+                    self.限制器.报告限流(重试等待)
+                    continue
+                
+                退避时间 = self.重试延迟 * (2 ** 尝试次数)
+                logger.warning(
+                    f"API 请求失败 (尝试 {尝试次数 + 1}/{self.最大重试次数}): {e}, "
+                    f"将在 {退避时间:.1f}秒 后重试"
+                )
+                if 尝试次数 < self.最大重试次数 - 1:
+                    await asyncio.sleep(退避时间)
+        
+        logger.error(f"API 请求失败，已达最大重试次数: {最后异常}")
+        raise 最后异常
+    
+    async def _读取缓存(self, 缓存键: str, 使用缓存: bool) -> Optional[Any]:
+        """在线程池中从缓存读取数据并记录命中次数"""
+        if not (self.启用缓存 and 使用缓存 and self.缓存):
+            return None
+        结果 = await self._在线程中执行(None, self.缓存.获取, 缓存键)
+        if 结果 is not None:
+            self._请求命中次数 += 1
+        return 结果
+    
+    async def _写入缓存(self, 缓存键: str, 数据: Any, 有效期秒数: Optional[float] = None) -> None:
+        """在线程池中写入缓存"""
+        await self._在线程中执行(None, self.缓存.设置, 缓存键, 数据, 有效期秒数=有效期秒数)
+    
+    async def _合并执行(self, 缓存键: str, 加载函数: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        合并同一个缓存键的并发请求
+        
+        加载函数在独立的任务中执行，所有协程（包括发起者）都等待被 shield 的任务，
+        任何一个协程被取消都不会影响加载和其他等待者
+        """
+        进行中 = self._进行中请求表.get(缓存键)
+        if 进行中 is not None:
+            self._请求合并次数 += 1
+            return await asyncio.shield(进行中)
+        
+        self._请求未命中次数 += 1
+        进行中 = asyncio.ensure_future(加载函数())
+        self._进行中请求表[缓存键] = 进行中
+        
+        def 完成(任务: asyncio.Task) -> None:
+            self._进行中请求表.pop(缓存键, None)
+            # 所有等待者都已取消时避免 "exception was never retrieved" 警告
+            if not 任务.cancelled():
+                任务.exception()
+        
+        进行中.add_done_callback(完成)
+        return await asyncio.shield(进行中)
+    
+    async def _获取详情(
+        self,
+        缓存键: str,
+        路径: str,
+        使用缓存: bool,
+        描述: str,
+        转换函数: Callable[[Dict[str, Any]], Dict[str, Any]] = dict,
+        **参数: Any
+    ) -> Optional[Dict[str, Any]]:
+        """获取详情类数据：读缓存、合并请求、写缓存，失败返回 None"""
+        缓存结果 = await self._读取缓存(缓存键, 使用缓存)
+        if 缓存结果 is not None:
+            return 缓存结果
+        
+        async def 加载() -> Optional[Dict[str, Any]]:
+            try:
+                详情字典 = 转换函数(await self._请求(路径, **参数))
+            except Exception as e:
+                logger.error(f"获取{描述}失败: {e}")
+                return None
+            
+            if 详情字典 and self.启用缓存 and self.缓存:
+                await self._写入缓存(缓存键, 详情字典)
+            logger.info(f"获取{描述}: {路径}")
+            return 详情字典
+        
+        return await self._合并执行(缓存键, 加载)
+    
+    async def _搜索(self, 缓存前缀: str, 路径: str, 标题: str, 使用缓存: bool) -> List[Dict[str, Any]]:
+        """执行搜索并按标准化查询缓存原始结果（与同步客户端使用相同的缓存键）"""
+        缓存键 = f"{缓存前缀}:{增强TMDB客户端._标准化查询(标题)}"
+        缓存可用 = self.启用缓存 and self.缓存
+        
+        缓存结果 = await self._读取缓存(缓存键, 使用缓存)
+        if 缓存结果 is not None:
+            return 缓存结果
+        
+        async def 加载() -> List[Dict[str, Any]]:
+            try:
+                数据 = await self._请求(路径, query=标题)
+                结果列表 = [精简搜索结果(r) for r in 数据.get("results", [])]
+            except Exception as e:
+                logger.error(f"搜索 '{标题}' 失败: {e}")
+                if 缓存可用:
+                    await self._写入缓存(缓存键, [], 有效期秒数=self.负缓存有效期秒数)
+                return []
+            
+            if 缓存可用:
+                await self._写入缓存(
+                    缓存键,
+                    结果列表,
+                    有效期秒数=None if 结果列表 else self.负缓存有效期秒数
+                )
+            return 结果列表
+        
+        return await self._合并执行(缓存键, 加载)
+    
+    async def 搜索电影(
+        self,
+        标题: str,
+        年份: Optional[int] = None,
+        使用缓存: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        搜索电影
+        
+        Args:
+            标题: 电影标题
+            年份: 发行年份（可选，本地过滤）
+            使用缓存: 是否使用缓存
+        
+        Returns:
+            List[Dict[str, Any]]: 搜索结果列表
+        """
+        结果列表 = await self._搜索("movie_search", "/search/movie", 标题, 使用缓存)
+        return 增强TMDB客户端._按年份过滤(结果列表, 年份, "release_date")
+    
+    async def 搜索电视剧(
+        self,
+        标题: str,
+        年份: Optional[int] = None,
+        使用缓存: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        搜索电视剧
+        
+        Args:
+            标题: 电视剧标题
+            年份: 首播年份（可选，本地过滤）
+            使用缓存: 是否使用缓存
+        
+        Returns:
+            List[Dict[str, Any]]: 搜索结果列表
+        """
+        结果列表 = await self._搜索("tv_search", "/search/tv", 标题, 使用缓存)
+        return 增强TMDB客户端._按年份过滤(结果列表, 年份, "first_air_date")
+    
+    async def 获取电影详情(self, 电影id: int, 使用缓存: bool = True) -> Optional[Dict[str, Any]]:
+        """获取电影详细信息"""
+        return await self._获取详情(
+            f"movie_details:{电影id}", f"/movie/{电影id}", 使用缓存, "电影详情"
+        )
+    
+    async def 获取电视剧详情(self, 电视剧id: int, 使用缓存: bool = True) -> Optional[Dict[str, Any]]:
+        """获取电视剧详细信息"""
+        return await self._获取详情(
+            f"tv_details:{电视剧id}", f"/tv/{电视剧id}", 使用缓存, "电视剧详情"
+        )
+    
+    async def 获取季详情(
+        self,
+        电视剧id: int,
+        季数: int,
+        使用缓存: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """获取整季详细信息（包含该季全部剧集）"""
+        
+        def 转换(数据: Dict[str, Any]) -> Dict[str, Any]:
+            数据["episodes"] = [精简剧集(e) for e in 数据.get("episodes") or []]
+            return 数据
+        
+        return await self._获取详情(
+            f"season_details:{电视剧id}:{季数}",
+            f"/tv/{电视剧id}/season/{季数}",
+            使用缓存,
+            "季详情",
+            转换
+        )
+    
+    async def 获取剧集详情(
+        self,
+        电视剧id: int,
+        季数: int,
+        集数: int,
+        使用缓存: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """获取剧集详细信息（优先从已缓存的整季数据中查找）"""
+        季详情 = await self._读取缓存(f"season_details:{电视剧id}:{季数}", 使用缓存)
+        if 季详情 is not None:
+            for 剧集 in 季详情.get("episodes", []):
+                if 剧集.get("episode_number") == 集数:
+                    return 剧集
+        
+        return await self._获取详情(
+            f"episode_details:{电视剧id}:{季数}:{集数}",
+            f"/tv/{电视剧id}/season/{季数}/episode/{集数}",
+            使用缓存,
+            "剧集详情",
+            精简剧集
+        )
+    
+    async def _批量执行(self, 标题列表: List[str], 搜索函数, 使用缓存: bool) -> Dict[str, List[Dict[str, Any]]]:
+        """并发执行一批搜索，单个失败不影响其他"""
+        结果列表 = await asyncio.gather(
+            *(搜索函数(标题, None, 使用缓存) for 标题 in 标题列表),
+            return_exceptions=True
+        )
+        结果字典 = {}
+        for 标题, 结果 in zip(标题列表, 结果列表):
+            if isinstance(结果, Exception):
+                logger.error(f"批量搜索 '{标题}' 失败: {结果}")
+                结果 = []
+            结果字典[标题] = 结果
+        return 结果字典
+    
+    async def 批量搜索电影(
+        self,
+        标题列表: List[str],
+        使用缓存: bool = True
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        批量搜索电影（在事件循环中并发执行）
+        
+        Args:
+            标题列表: 电影标题列表
+            使用缓存: 是否使用缓存
+        
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: 标题到搜索结果的映射
+        """
+        结果字典 = await self._批量执行(标题列表, self.搜索电影, 使用缓存)
+        logger.info(f"批量搜索完成: {len(标题列表)} 个电影")
+        return 结果字典
+    
+    async def 批量搜索电视剧(
+        self,
+        标题列表: List[str],
+        使用缓存: bool = True
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        批量搜索电视剧（在事件循环中并发执行）
+        
+        Args:
+            标题列表: 电视剧标题列表
+            使用缓存: 是否使用缓存
+        
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: 标题到搜索结果的映射
+        """
+        结果字典 = await self._批量执行(标题列表, self.搜索电视剧, 使用缓存)
+        logger.info(f"批量搜索完成: {len(标题列表)} 个电视剧")
+        return 结果字典
+    
+    def 获取缓存统计(self) -> dict:
+        """获取缓存统计信息（字段与同步客户端一致）"""
+        stats = self.缓存.获取统计信息() if self.缓存 else {}
+        stats["enabled"] = bool(self.缓存)
+        stats.update({
+            "request_hits": self._请求命中次数,
+            "request_coalesced": self._请求合并次数,
+            "request_misses": self._请求未命中次数,
+        })
+        return stats
+    
+    def 获取限流统计(self) -> dict:
+        """获取速率限制器状态"""
+        return self.限制器.获取统计信息()
+    
+    def 清空缓存(self) -> None:
+        """清空所有缓存"""
+        if self.缓存:
+            self.缓存.清空()
+    
+    async def 关闭(self) -> None:
+        """关闭请求线程池、连接池和客户端自行创建的缓存"""
+        await self._在线程中执行(None, self._请求线程池.shutdown)
+        self._传输.关闭()
+        if self._自建缓存 and self.缓存:
+            await self._在线程中执行(None, self.缓存.关闭)
+
+
+# 英文接口
+class AsyncTMDBClient(异步TMDB客户端):
+    """异步 TMDB 客户端（英文接口）"""
+    
+    async def search_movie(
+        self,
+        title: str,
+        year: Optional[int] = None,
+        use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """搜索电影"""
+        return await self.搜索电影(title, year, use_cache)
+    
+    async def search_tv(
+        self,
+        title: str,
+        year: Optional[int] = None,
+        use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """搜索电视剧"""
+        return await self.搜索电视剧(title, year, use_cache)
+    
+    async def get_movie_details(self, movie_id: int, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """获取电影详情"""
+        return await self.获取电影详情(movie_id, use_cache)
+    
+    async def get_tv_details(self, tv_id: int, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """获取电视剧详情"""
+        return await self.获取电视剧详情(tv_id, use_cache)
+    
+    async def get_season_details(
+        self,
+        tv_id: int,
+        season: int,
+        use_cache: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """获取季详情"""
+        return await self.获取季详情(tv_id, season, use_cache)
+    
+    async def get_episode_details(
+        self,
+        tv_id: int,
+        season: int,
+        episode: int,
+        use_cache: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """获取剧集详情"""
+        return await self.获取剧集详情(tv_id, season, episode, use_cache)
+    
+    async def batch_search_movies(
+        self,
+        titles: List[str],
+        use_cache: bool = True
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """批量搜索电影"""
+        return await self.批量搜索电影(titles, use_cache)
+    
+    async def batch_search_tv(
+        self,
+        titles: List[str],
+        use_cache: bool = True
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """批量搜索电视剧"""
+        return await self.批量搜索电视剧(titles, use_cache)
+    
+    def get_cache_stats(self) -> dict:
+        """获取缓存统计"""
+        return self.获取缓存统计()
+    
+    def get_rate_limit_stats(self) -> dict:
+        """获取速率限制器状态"""
+        return self.获取限流统计()
+    
+    def clear_cache(self) -> None:
+        """清空缓存"""
+        self.清空缓存()
+    
+    async def close(self) -> None:
+        """关闭连接池"""
+        await self.关闭()
@@ -0,0 +1,533 @@
+"""
+TMDB 磁盘缓存后端
+
+为缓存管理器提供可替换的持久化存储：
+- SQLite 后端（默认）：单文件 + WAL，支持按大小淘汰和基于索引的过期清理，
+  可由多个进程同时使用，并提供跨进程的加载租约
+- JSON 文件后端：每个键一个 JSON 文件（旧格式）
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class 磁盘缓存后端:
+    """
+    磁盘缓存后端基类
+    
+    缓存项是包含 创建时间 和 数据 的字典，由缓存管理器负责过期判断；
+    后端额外保存过期时间戳，用于批量清理过期条目
+    """
+    
+    名称 = "base"
+    快速清理 = False  # 清理过期条目是否无需遍历全部数据
+    支持跨进程共享 = False  # 是否可由多个进程同时使用并提供加载租约
+    
+    def 读取(self, 键: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存项
+        
+        Args:
+            键: 标准化后的缓存键
+        
+        Returns:
+            Optional[Dict[str, Any]]: 缓存项，不存在返回 None
+        """
+        raise NotImplementedError
+    
+    def 写入(self, 键: str, 缓存项: Dict[str, Any], 过期时间戳: float) -> None:
+        """
+        写入缓存项
+        
+        Args:
+            键: 标准化后的缓存键
+            缓存项: 缓存项
+            过期时间戳: 过期时间（Unix 时间戳）
+        """
+        raise NotImplementedError
+    
+    def 批量写入(self, 条目列表: List[Tuple[str, Dict[str, Any], float]]) -> None:
+        """
+        批量写入缓存项
+        
+        无法序列化的条目记录日志后跳过，不影响同一批次中的其他条目
+        
+        Args:
+            条目列表: (键, 缓存项, 过期时间戳) 列表
+        """
+        for 键, 缓存项, 过期时间戳 in 条目列表:
+            try:
+                self.写入(键, 缓存项, 过期时间戳)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"缓存项无法序列化，跳过: {键} ({e})")
+    
+    def 删除(self, 键: str) -> None:
+        """删除缓存项"""
+        raise NotImplementedError
+    
+    def 清空(self) -> None:
+        """删除全部缓存项"""
+        raise NotImplementedError
+    
+    def 清理过期(self, 当前时间戳: Optional[float] = None) -> int:
+        """
+        删除已过期的缓存项
+        
+        Args:
+            当前时间戳: 当前时间，默认 time.time()
+        
+        Returns:
+            int: 删除的条目数
+        """
+        raise NotImplementedError
+    
+    def 遍历(self) -> Iterator[Tuple[str, Dict[str, Any], float]]:
+        """
+        遍历全部缓存项（用于导出）
+        
+        Yields:
+            Tuple[str, Dict[str, Any], float]: (键, 缓存项, 过期时间戳)
+        """
+        raise NotImplementedError
+    
+    def 获取租约(self, 键: str, 有效秒数: float) -> bool:
+        """
+        尝试获取键的加载租约（同一时间只有一个持有者请求该键）
+        
+        不支持跨进程共享的后端总是返回 True
+        
+        Args:
+            键: 标准化后的缓存键
+            有效秒数: 租约有效期，持有者异常退出时到期后自动失效
+        
+        Returns:
+            bool: 是否获得租约
+        """
+        return True
+    
+    def 释放租约(self, 键: str) -> None:
+        """释放本实例持有的租约"""
+    
+    def 获取统计信息(self) -> dict:
+        """获取后端统计信息"""
+        return {"disk_backend": self.名称}
+    
+    def 关闭(self) -> None:
+        """释放后端资源"""
+
+
+class JSON文件缓存后端(磁盘缓存后端):
+    """
+    每个键一个 JSON 文件的后端（旧格式）
+    
+    文件名为键的 MD5 哈希，文件中同时保存原始键（用于导出；旧版本写入的文件没有原始键）。
+    写入先写临时文件再替换，并发读取不会读到写了一半的文件。
+    条目较多时单目录文件数过多，清理需要遍历全部文件
+    """
+    
+    名称 = "json"
+    
+    def __init__(self, 缓存目录: Path):
+        """
+        初始化 JSON 文件后端
+        
+        Args:
+            缓存目录: 缓存文件存储目录
+        """
+        self.缓存目录 = Path(缓存目录)
+        self.缓存目录.mkdir(parents=True, exist_ok=True)
+    
+    def _获取缓存路径(self, 键: str) -> Path:
+        """获取缓存文件路径"""
+        # 使用 hash 避免文件名过长或包含非法字符
+        键哈希 = hashlib.md5(键.encode()).hexdigest()
+        return self.缓存目录 / f"{键哈希}.json"
+    
+    def 读取(self, 键: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._获取缓存路径(键), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def 写入(self, 键: str, 缓存项: Dict[str, Any], 过期时间戳: float) -> None:
+        # 先序列化，无法序列化时不留下临时文件
+        内容 = json.dumps(
+            dict(缓存项, 过期时间戳=过期时间戳, 键=键), ensure_ascii=False, separators=(',', ':')
+        )
+        缓存路径 = self._获取缓存路径(键)
+        临时路径 = 缓存路径.with_name(f"{缓存路径.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(临时路径, 'w', encoding='utf-8') as f:
+            f.write(内容)
+        os.replace(临时路径, 缓存路径)
+    
+    def 删除(self, 键: str) -> None:
+        try:
+            self._获取缓存路径(键).unlink()
+        except FileNotFoundError:
+            pass
+    
+    def 清空(self) -> None:
+        for 缓存文件 in self.缓存目录.glob("*.json"):
+            try:
+                缓存文件.unlink()
+            except Exception as e:
+                logger.warning(f"删除缓存文件失败: {e}")
+    
+    def 遍历(self) -> Iterator[Tuple[str, Dict[str, Any], float]]:
+        for 缓存文件 in self.缓存目录.glob("*.json"):
+            try:
+                with open(缓存文件, 'r', encoding='utf-8') as f:
+                    缓存项 = json.load(f)
+            except Exception as e:
+                logger.warning(f"读取缓存文件失败: {e}")
+                continue
+            键 = 缓存项.pop('键', None)
+            if 键 is None:
+                continue
+            yield 键, 缓存项, 缓存项.pop('过期时间戳', float('inf'))
+    
+    def 清理过期(self, 当前时间戳: Optional[float] = None) -> int:
+        当前时间戳 = time.time() if 当前时间戳 is None else 当前时间戳
+        已删除 = 0
+        for 缓存文件 in self.缓存目录.glob("*.json"):
+            try:
+                with open(缓存文件, 'r', encoding='utf-8') as f:
+                    过期时间戳 = json.load(f).get('过期时间戳')
+                if 过期时间戳 is not None and 过期时间戳 < 当前时间戳:
+                    缓存文件.unlink()
+                    已删除 += 1
+            except Exception as e:
+                logger.warning(f"清理缓存文件失败: {e}")
+        return 已删除
+
+
+class SQLite缓存后端(磁盘缓存后端):
+    """
+    SQLite 单文件后端
+    
+    使用 WAL 日志模式，读写互不阻塞；过期时间和最近访问时间带索引，
+    过期清理和按大小淘汰（最久未访问优先）都不需要扫描全表。
+    
+    多个进程可以同时打开同一个数据库：写事务开始时即获取写锁（BEGIN IMMEDIATE），
+    并发写入按超时时间排队；总大小由触发器维护在 cache_meta 表中，各进程看到的是同一个值。
+    cache_lease 表保存加载租约，用于跨进程合并同一个键的请求。
+    
+    读取只在访问时间比 `访问时间刷新秒数` 更旧时才更新（需要写锁），
+    缓存命中通常是无锁的只读查询。
+    指定旧版缓存目录时，打开数据库时把该目录中旧版 JSON 文件后端写入的条目
+    一次性迁移到数据库，并删除全部旧版文件（无法迁移的文件直接删除）
+    """
+    
+    名称 = "sqlite"
+    快速清理 = True
+    支持跨进程共享 = True
+    
+    # 超出容量时淘汰到此比例，避免每次写入都触发淘汰
+    淘汰目标比例 = 0.9
+    
+    # 访问时间的更新粒度：LRU 淘汰只需要大致的先后顺序
+    访问时间刷新秒数 = 600.0
+    
+    # 迁移旧版 JSON 文件时每批写入的条目数
+    迁移批次大小 = 500
+    
+    _建表语句 = """
+        BEGIN IMMEDIATE;
+        CREATE TABLE IF NOT EXISTS cache (
+            key TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            expires REAL NOT NULL,
+            accessed REAL NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (expires);
+        CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed);
+        CREATE TABLE IF NOT EXISTS cache_meta (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            total_bytes INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO cache_meta SELECT 0, COALESCE(SUM(size), 0) FROM cache;
+        CREATE TRIGGER IF NOT EXISTS cache_size_insert AFTER INSERT ON cache BEGIN
+            UPDATE cache_meta SET total_bytes = total_bytes + NEW.size;
+        END;
+        CREATE TRIGGER IF NOT EXISTS cache_size_delete AFTER DELETE ON cache BEGIN
+            UPDATE cache_meta SET total_bytes = total_bytes - OLD.size;
+        END;
+        CREATE TRIGGER IF NOT EXISTS cache_size_update AFTER UPDATE OF size ON cache BEGIN
+            UPDATE cache_meta SET total_bytes = total_bytes + NEW.size - OLD.size;
+        END;
+        CREATE TABLE IF NOT EXISTS cache_lease (
+            key TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires REAL NOT NULL
+        );
+        COMMIT;
+    """
+    
+    _写入语句 = """
+        INSERT INTO cache VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (key) DO UPDATE SET
+            data = excluded.data,
+            expires = excluded.expires,
+            accessed = excluded.accessed,
+            size = excluded.size
+    """
+    
+    def __init__(
+        self,
+        数据库路径: Union[str, Path],
+        最大字节数: Optional[int] = None,
+        旧版缓存目录: Optional[Path] = None
+    ):
+        """
+        初始化 SQLite 后端
+        
+        Args:
+            数据库路径: 数据库文件路径
+            最大字节数: 缓存数据总大小上限（字节），None 表示不限制
+            旧版缓存目录: 旧版 JSON 文件后端的缓存目录，打开时从中迁移全部条目
+        """
+        self.数据库路径 = Path(数据库路径)
+        self.数据库路径.parent.mkdir(parents=True, exist_ok=True)
+        self.最大字节数 = 最大字节数
+        
+        self._锁 = Lock()
+        self._连接 = sqlite3.connect(
+            str(self.数据库路径), check_same_thread=False, timeout=30, isolation_level="IMMEDIATE"
+        )
+        self._连接.execute("PRAGMA journal_mode=WAL")
+        self._连接.execute("PRAGMA synchronous=NORMAL")
+        self._连接.executescript(self._建表语句)
+        
+        # 租约持有者标识（同一进程内的并发由客户端的请求合并处理）
+        self._租约持有者 = f"{os.getpid()}:{id(self)}"
+        self._淘汰次数 = 0
+        self._迁移次数 = 0
+        self._迁移跳过次数 = 0
+        if 旧版缓存目录 is not None:
+            self._迁移旧版缓存(Path(旧版缓存目录))
+    
+    def _读取总字节数(self) -> int:
+        """读取全部进程共享的缓存总大小"""
+        return self._连接.execute("SELECT total_bytes FROM cache_meta").fetchone()[0]
+    
+    def 读取(self, 键: str) -> Optional[Dict[str, Any]]:
+        with self._锁:
+            行 = self._连接.execute(
+                "SELECT data, accessed FROM cache WHERE key = ?", (键,)
+            ).fetchone()
+        if 行 is None:
+            return None
+        
+        现在 = time.time()
+        if 现在 - 行[1] > self.访问时间刷新秒数:
+            with self._锁, self._连接:
+                self._连接.execute(
+                    "UPDATE cache SET accessed = ? WHERE key = ? AND accessed < ?",
+                    (现在, 键, 现在 - self.访问时间刷新秒数)
+                )
+        return json.loads(行[0])
+    
+    def _迁移旧版缓存(self, 旧版缓存目录: Path) -> None:
+        """
+        把旧版 JSON 文件中的条目批量写入数据库，写入后删除全部旧版文件
+        
+        旧键格式的条目也一并迁移，之后由过期清理和大小淘汰处理；
+        无法读取、已过期或不含原始键（更早版本写入）的文件直接删除
+        """
+        现在 = time.time()
+        文件列表 = sorted(旧版缓存目录.glob("*.json"))
+        for 开始 in range(0, len(文件列表), self.迁移批次大小):
+            批次文件 = 文件列表[开始:开始 + self.迁移批次大小]
+            条目列表 = []
+            for 缓存文件 in 批次文件:
+                try:
+                    with open(缓存文件, 'r', encoding='utf-8') as f:
+                        缓存项 = json.load(f)
+                except Exception as e:
+                    logger.warning(f"读取旧版缓存文件失败，跳过: {缓存文件.name} ({e})")
+                    缓存项 = None
+                键 = 缓存项.pop('键', None) if isinstance(缓存项, dict) else None
+                过期时间戳 = 缓存项.pop('过期时间戳', float('inf')) if 键 is not None else 0
+                if 键 is not None and 过期时间戳 >= 现在:
+                    条目列表.append((键, 缓存项, 过期时间戳))
+                else:
+                    self._迁移跳过次数 += 1
+            
+            self.批量写入(条目列表)
+            self._迁移次数 += len(条目列表)
+            for 缓存文件 in 批次文件:
+                try:
+                    缓存文件.unlink()
+                except FileNotFoundError:
+                    pass
+        
+        if 文件列表:
+            logger.info(
+                f"已迁移 {self._迁移次数} 个旧版缓存文件，跳过 {self._迁移跳过次数} 个"
+            )
+    
+    def 写入(self, 键: str, 缓存项: Dict[str, Any], 过期时间戳: float) -> None:
+        self.批量写入([(键, 缓存项, 过期时间戳)])
+    
+    def 批量写入(self, 条目列表: List[Tuple[str, Dict[str, Any], float]]) -> None:
+        """在同一个事务中写入多个缓存项，无法序列化的条目记录日志后跳过"""
+        现在 = time.time()
+        行列表 = []
+        for 键, 缓存项, 过期时间戳 in 条目列表:
+            try:
+                数据 = json.dumps(缓存项, ensure_ascii=False, separators=(',', ':'))
+            except (TypeError, ValueError) as e:
+                logger.warning(f"缓存项无法序列化，跳过: {键} ({e})")
+                continue
+            行列表.append((键, 数据, 过期时间戳, 现在, len(数据.encode('utf-8'))))
+        if not 行列表:
+            return
+        
+        with self._锁, self._连接:
+            self._连接.executemany(self._写入语句, 行列表)
+            if self.最大字节数 is not None and self._读取总字节数() > self.最大字节数:
+                self._按大小淘汰()
+    
+    def _按大小淘汰(self) -> None:
+        """先清理过期条目，仍超出容量时按最近访问时间淘汰（需持有锁并处于写事务中）"""
+        目标字节数 = int(self.最大字节数 * self.淘汰目标比例)
+        self._连接.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+        总字节数 = self._读取总字节数()
+        
+        # 按最近访问时间从旧到新逐行读取，释放足够空间即停止
+        待删除 = []
+        if 总字节数 > 目标字节数:
+            需释放 = 总字节数 - 目标字节数
+            for 键, 大小 in self._连接.execute(
+                "SELECT key, size FROM cache ORDER BY accessed"
+            ):
+                待删除.append((键,))
+                需释放 -= 大小
+                总字节数 -= 大小
+                if 需释放 <= 0:
+                    break
+            self._连接.executemany("DELETE FROM cache WHERE key = ?", 待删除)
+            self._淘汰次数 += len(待删除)
+        
+        logger.debug(f"磁盘缓存淘汰后大小: {总字节数} 字节")
+    
+    def 删除(self, 键: str) -> None:
+        with self._锁, self._连接:
+            self._连接.execute("DELETE FROM cache WHERE key = ?", (键,))
+    
+    def 清空(self) -> None:
+        with self._锁, self._连接:
+            self._连接.execute("DELETE FROM cache")
+    
+    def 清理过期(self, 当前时间戳: Optional[float] = None) -> int:
+        当前时间戳 = time.time() if 当前时间戳 is None else 当前时间戳
+        with self._锁, self._连接:
+            return self._连接.execute(
+                "DELETE FROM cache WHERE expires < ?", (当前时间戳,)
+            ).rowcount
+    
+    def 获取租约(self, 键: str, 有效秒数: float) -> bool:
+        现在 = time.time()
+        with self._锁, self._连接:
+            self._连接.execute(
+                "DELETE FROM cache_lease WHERE key = ? AND expires < ?", (键, 现在)
+            )
+            return self._连接.execute(
+                "INSERT OR IGNORE INTO cache_lease VALUES (?, ?, ?)",
+                (键, self._租约持有者, 现在 + 有效秒数)
+            ).rowcount == 1
+    
+    def 释放租约(self, 键: str) -> None:
+        with self._锁, self._连接:
+            self._连接.execute(
+                "DELETE FROM cache_lease WHERE key = ? AND owner = ?", (键, self._租约持有者)
+            )
+    
+    def 遍历(self) -> Iterator[Tuple[str, Dict[str, Any], float]]:
+        """按键分批读取，每批只短暂持有锁"""
+        上一个键 = ""
+        while True:
+            with self._锁:
+                行列表 = self._连接.execute(
+                    "SELECT key, data, expires FROM cache WHERE key > ? ORDER BY key LIMIT 500",
+                    (上一个键,)
+                ).fetchall()
+            if not 行列表:
+                return
+            for 键, 数据, 过期时间戳 in 行列表:
+                yield 键, json.loads(数据), 过期时间戳
+            上一个键 = 行列表[-1][0]
+    
+    def 获取统计信息(self) -> dict:
+        with self._锁:
+            条目数 = self._连接.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            总字节数 = self._读取总字节数()
+        return {
+            "disk_backend": self.名称,
+            "disk_entries": 条目数,
+            "disk_bytes": 总字节数,
+            "max_disk_bytes": self.最大字节数,
+            "disk_evictions": self._淘汰次数,
+            "legacy_migrated": self._迁移次数,
+            "legacy_skipped": self._迁移跳过次数,
+        }
+    
+    def 关闭(self) -> None:
+        with self._锁:
+            self._连接.close()
+
+
+# 已注册的磁盘缓存后端名称
+磁盘缓存后端表 = (SQLite缓存后端.名称, JSON文件缓存后端.名称)
+
+
+def 创建磁盘缓存后端(
+    后端: Union[str, 磁盘缓存后端],
+    缓存目录: Path,
+    最大字节数: Optional[int] = None
+) -> 磁盘缓存后端:
+    """
+    按名称创建磁盘缓存后端
+    
+    Args:
+        后端: 后端名称（"sqlite" 或 "json"）或后端实例
+        缓存目录: 缓存目录
+        最大字节数: 磁盘缓存大小上限（仅 SQLite 后端支持）
+    
+    创建 SQLite 后端时，缓存目录中如有旧版 JSON 文件后端写入的文件，
+    打开时一次性迁移到数据库
+    
+    Returns:
+        磁盘缓存后端: 后端实例
+    
+    Raises:
+        ValueError: 未知的后端名称
+    """
+    if isinstance(后端, 磁盘缓存后端):
+        return 后端
+    if 后端 == SQLite缓存后端.名称:
+        # 默认后端改为 SQLite 之前的缓存目录中是旧版 JSON 文件，打开时迁移
+        缓存目录 = Path(缓存目录)
+        旧版缓存目录 = 缓存目录 if next(缓存目录.glob("*.json"), None) is not None else None
+        return SQLite缓存后端(缓存目录 / "tmdb_cache.sqlite3", 最大字节数, 旧版缓存目录)
+    if 后端 == JSON文件缓存后端.名称:
+        return JSON文件缓存后端(缓存目录)
+    raise ValueError(f"未知的磁盘缓存后端: {后端}，可选: {', '.join(磁盘缓存后端表)}")
+
+
+# 英文别名
+DiskCacheBackend = 磁盘缓存后端
+JSONFileCacheBackend = JSON文件缓存后端
+SQLiteCacheBackend = SQLite缓存后端
+create_disk_cache_backend = 创建磁盘缓存后端
@@ -0,0 +1,138 @@
+"""
+TMDB 缓存维护命令行工具
+
+用于新节点预热：从已有节点导出压缩去重的缓存包并在新节点导入，
+或按媒体库中已匹配的 tmdb_id 批量预热缓存。
+
+用法:
+    smartrenamer-cache export tmdb_cache.json.gz
+    smartrenamer-cache import tmdb_cache.json.gz [--overwrite]
+    smartrenamer-cache warm [--library media_library.json] [--movie ID ...] [--tv ID[:季,季] ...]
+    smartrenamer-cache stats
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from smartrenamer.api.factory import TMDBClientFactory
+from smartrenamer.core.config import get_config
+from smartrenamer.core.library import MediaLibrary
+from smartrenamer.core.models import MediaFile, MediaType
+
+logger = logging.getLogger(__name__)
+
+
+def 收集媒体库id(媒体文件列表: Iterable[MediaFile]) -> Tuple[List[int], Dict[int, Set[int]]]:
+    """
+    收集媒体文件中已匹配的 TMDB ID
+    
+    Args:
+        媒体文件列表: 媒体文件
+    
+    Returns:
+        Tuple[List[int], Dict[int, Set[int]]]: 电影 ID 列表和电视剧 ID → 季号集合
+    """
+    电影id列表: Dict[int, None] = {}
+    电视剧季表: Dict[int, Set[int]] = {}
+    for 媒体文件 in 媒体文件列表:
+        if not 媒体文件.tmdb_id:
+            continue
+        if 媒体文件.media_type == MediaType.MOVIE:
+            电影id列表[媒体文件.tmdb_id] = None
+        elif 媒体文件.media_type == MediaType.TV_SHOW:
+            季号集合 = 电视剧季表.setdefault(媒体文件.tmdb_id, set())
+            if 媒体文件.season_number is not None:
+                季号集合.add(媒体文件.season_number)
+    return list(电影id列表), 电视剧季表
+
+
+def _解析电视剧参数(值: str) -> Tuple[int, Set[int]]:
+    """解析 --tv 参数，格式为 ID 或 ID:季,季"""
+    电视剧id, _, 季号 = 值.partition(":")
+    try:
+        return int(电视剧id), {int(季) for 季 in 季号.split(",") if 季}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的电视剧参数: {值}（格式为 ID 或 ID:季,季）")
+
+
+def _创建解析器() -> argparse.ArgumentParser:
+    """创建命令行解析器"""
+    解析器 = argparse.ArgumentParser(
+        prog="smartrenamer-cache",
+        description="TMDB 缓存导出、导入和预热"
+    )
+    子命令 = 解析器.add_subparsers(dest="command", required=True)
+    
+    导出 = 子命令.add_parser("export", help="把缓存导出为压缩去重的缓存包")
+    导出.add_argument("bundle", type=Path, help="缓存包路径（gzip JSON）")
+    
+    导入 = 子命令.add_parser("import", help="导入缓存包")
+    导入.add_argument("bundle", type=Path, help="缓存包路径")
+    导入.add_argument("--overwrite", action="store_true", help="覆盖本机较新的条目")
+    
+    预热 = 子命令.add_parser("warm", help="按媒体库中已匹配的 tmdb_id 批量预热缓存")
+    预热.add_argument(
+        "--library", type=Path, default=None,
+        help="媒体库缓存文件，默认 ~/.smartrenamer/cache/media_library.json"
+    )
+    预热.add_argument("--movie", type=int, action="append", default=[], help="额外预热的电影 ID")
+    预热.add_argument(
+        "--tv", type=_解析电视剧参数, action="append", default=[],
+        help="额外预热的电视剧，格式为 ID 或 ID:季,季"
+    )
+    预热.add_argument("--no-library", action="store_true", help="不读取媒体库，只预热命令行指定的 ID")
+    
+    子命令.add_parser("stats", help="显示缓存统计信息")
+    return 解析器
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    命令行入口
+    
+    Args:
+        argv: 命令行参数，None 表示使用 sys.argv
+    
+    Returns:
+        int: 退出码
+    """
+    参数 = _创建解析器().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    config = get_config()
+    if not config.get("tmdb_cache_enabled", True):
+        print("TMDB 缓存未启用（tmdb_cache_enabled=false）", file=sys.stderr)
+        return 1
+    
+    客户端 = TMDBClientFactory.get_client(config)
+    缓存 = 客户端.缓存
+    try:
+        if 参数.command == "export":
+            结果 = 缓存.导出(参数.bundle)
+        elif 参数.command == "import":
+            结果 = 缓存.导入(参数.bundle, 覆盖=参数.overwrite)
+        elif 参数.command == "warm":
+            电影id列表: List[int] = []
+            电视剧季表: Dict[int, Set[int]] = {}
+            if not 参数.no_library:
+                媒体库 = MediaLibrary(config.get_cache_dir())
+                if 媒体库.load_cache(参数.library):
+                    电影id列表, 电视剧季表 = 收集媒体库id(媒体库.media_files)
+            电影id列表 += 参数.movie
+            for 电视剧id, 季号集合 in 参数.tv:
+                电视剧季表.setdefault(电视剧id, set()).update(季号集合)
+            结果 = 客户端.预热缓存(电影id列表, 电视剧季表)
+        else:
+            结果 = 缓存.获取统计信息()
+    finally:
+        缓存.关闭()
+    
+    print(json.dumps(结果, ensure_ascii=False, indent=2))
+    return 1 if 结果.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,19 @@
 """
 TMDB 客户端工厂
 
-提供单例模式的 TMDB 客户端，确保全局共用同一个实例
+提供单例模式的 TMDB 客户端，确保进程内共用同一个实例。
+多个进程可以通过共享缓存（tmdb_cache_shared）使用同一个缓存目录；
+fork 出的子进程不沿用父进程的实例，首次获取时重新创建
 """
 import logging
+import os
 from typing import Optional
 from pathlib import Path
 from threading import Lock
 
 from smartrenamer.api.tmdb_client_enhanced import 增强TMDB客户端, EnhancedTMDBClient
+from smartrenamer.api.http_transport import 原生HTTP传输
+from smartrenamer.api.replay_transport import 夹具档案, 录制HTTP传输, 回放HTTP传输
 from smartrenamer.core.config import Config, get_config
 
 
@@ -19,7 +24,7 @@ class TMDBClientFactory:
     """
     TMDB 客户端工厂
     
-    使用单例模式确保全局只有一个 TMDB 客户端实例
+    使用单例模式确保每个进程只有一个 TMDB 客户端实例
     """
     
     _instance: Optional[增强TMDB客户端] = None
@@ -48,6 +53,7 @@ class TMDBClientFactory:
             # 如果配置改变或强制重建，重新创建客户端
             if force_recreate or cls._instance is None or cls._config_hash != config_hash:
                 logger.info("创建新的 TMDB 客户端实例")
+                cls._close_instance()
                 cls._instance = cls._create_client(config)
                 cls._config_hash = config_hash
             
@@ -70,6 +76,16 @@ class TMDBClientFactory:
         缓存过期天数 = config.get("tmdb_cache_ttl_hours", 168) / 24  # 转换为天数
         最大重试次数 = 3
         重试延迟 = 1.0
+        传输方式 = config.get("tmdb_transport", "tmdbv3api")
+        if 传输方式 in ("record", "replay"):
+            传输方式 = cls._create_fixture_transport(config, 传输方式)
+        
+        # 共享缓存需要支持多进程并发访问的 SQLite 后端
+        共享缓存 = config.get("tmdb_cache_shared", False)
+        磁盘缓存后端 = config.get("tmdb_cache_backend", "sqlite")
+        if 共享缓存 and 磁盘缓存后端 != "sqlite":
+            logger.warning(f"共享缓存不支持 {磁盘缓存后端} 后端，改用 sqlite")
+            磁盘缓存后端 = "sqlite"
         
         # 创建客户端实例
         客户端 = 增强TMDB客户端(
@@ -81,15 +97,60 @@ class TMDBClientFactory:
             重试延迟=重试延迟,
             缓存过期天数=缓存过期天数,
             最大缓存条目数=config.get("tmdb_cache_max_entries", 1000),
+            最大内存缓存字节数=config.get("tmdb_cache_max_memory_mb", 64) * 1024 * 1024 or None,
             最大并发请求数=config.get("max_concurrent_requests", 5),
-            请求超时=config.get("request_timeout", 30)
+            请求超时=config.get("request_timeout", 30),
+            负缓存有效期秒数=config.get("tmdb_negative_cache_ttl_seconds", 600),
+            磁盘缓存后端=磁盘缓存后端,
+            最大磁盘缓存字节数=config.get("tmdb_cache_max_disk_mb", 512) * 1024 * 1024,
+            每秒请求数=config.get("tmdb_requests_per_second", 20.0),
+            传输方式=传输方式,
+            缓存前缀有效期秒数={
+                前缀: 小时 * 3600
+                for 前缀, 小时 in (config.get("tmdb_cache_ttl_hours_by_kind") or {}).items()
+            },
+            过期后台刷新秒数=config.get("tmdb_cache_stale_hours", 24) * 3600,
+            共享缓存=共享缓存
         )
         
-        logger.info(f"TMDB 客户端配置: 缓存={'启用' if 启用缓存 else '禁用'}, "
+        logger.info(f"TMDB 客户端配置: 缓存={'启用' if 启用缓存 else '禁用'}"
+                   f"{'（跨进程共享）' if 共享缓存 else ''}, "
                    f"TTL={缓存过期天数:.1f}天, 并发={config.get('max_concurrent_requests', 5)}")
         
         return 客户端
     
+    @classmethod
+    def _create_fixture_transport(cls, config: Config, 模式: str) -> 原生HTTP传输:
+        """
+        创建夹具录制或回放传输
+        
+        Args:
+            config: 配置对象
+            模式: "record" 或 "replay"
+            
+        Returns:
+            原生HTTP传输: 录制传输或回放传输
+        """
+        档案路径 = config.get("tmdb_fixture_path") or config.get_cache_dir() / "tmdb_fixtures.json.gz"
+        档案 = 夹具档案(档案路径)
+        logger.info(f"TMDB 夹具{'录制' if 模式 == 'record' else '回放'}: {档案路径}")
+        
+        if 模式 == "record":
+            return 录制HTTP传输(
+                config.tmdb_api_key,
+                档案,
+                language=config.tmdb_language,
+                请求超时=config.get("request_timeout", 30),
+                连接池大小=config.get("max_concurrent_requests", 5)
+            )
+        return 回放HTTP传输(
+            档案,
+            language=config.tmdb_language,
+            延迟秒数=config.get("tmdb_replay_latency_ms", 0.0) / 1000,
+            限流概率=config.get("tmdb_replay_throttle_rate", 0.0),
+            错误概率=config.get("tmdb_replay_error_rate", 0.0)
+        )
+    
     @classmethod
     def _compute_config_hash(cls, config: Config) -> str:
         """
@@ -108,20 +169,59 @@ class TMDBClientFactory:
                     f"{config.get('tmdb_cache_enabled')}:" \
                     f"{config.get('tmdb_cache_ttl_hours')}:" \
                     f"{config.get('tmdb_cache_max_entries')}:" \
+                    f"{config.get('tmdb_cache_max_memory_mb')}:" \
                     f"{config.get('max_concurrent_requests')}:" \
-                    f"{config.get('request_timeout')}"
+                    f"{config.get('request_timeout')}:" \
+                    f"{config.get('tmdb_negative_cache_ttl_seconds')}:" \
+                    f"{config.get('tmdb_cache_backend')}:" \
+                    f"{config.get('tmdb_cache_max_disk_mb')}:" \
+                    f"{config.get('tmdb_requests_per_second')}:" \
+                    f"{config.get('tmdb_transport')}:" \
+                    f"{config.get('tmdb_fixture_path')}:" \
+                    f"{config.get('tmdb_replay_latency_ms')}:" \
+                    f"{config.get('tmdb_replay_throttle_rate')}:" \
+                    f"{config.get('tmdb_replay_error_rate')}:" \
+                    f"{sorted((config.get('tmdb_cache_ttl_hours_by_kind') or {}).items())}:" \
+                    f"{config.get('tmdb_cache_stale_hours')}:" \
+                    f"{config.get('tmdb_cache_shared')}"
         
         return hashlib.md5(config_str.encode()).hexdigest()
     
+    @classmethod
+    def _close_instance(cls) -> None:
+        """
+        关闭当前实例的缓存（调用方持有锁）
+        
+        刷新待写数据并停止后台写入线程；仍持有旧实例的调用方之后的缓存写入改为同步执行
+        """
+        if cls._instance is not None and cls._instance.缓存 is not None:
+            try:
+                cls._instance.缓存.关闭()
+            except Exception as e:
+                logger.warning(f"关闭旧 TMDB 客户端缓存失败: {e}")
+    
     @classmethod
     def clear_instance(cls):
         """清除客户端实例（主要用于测试）"""
         with cls._lock:
             if cls._instance:
                 logger.info("清除 TMDB 客户端实例")
+                cls._close_instance()
                 cls._instance = None
                 cls._config_hash = None
     
+    @classmethod
+    def _reset_after_fork(cls) -> None:
+        """
+        fork 后在子进程中丢弃父进程的实例
+        
+        父进程客户端的 SQLite 连接、线程池和后台写入线程不能在子进程中使用，
+        锁也可能在 fork 时被其他线程持有，因此一并重建
+        """
+        cls._lock = Lock()
+        cls._instance = None
+        cls._config_hash = None
+    
     @classmethod
     def get_cache_stats(cls) -> dict:
         """
@@ -144,6 +244,10 @@ class TMDBClientFactory:
             return cls._instance.获取缓存统计()
 
 
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=TMDBClientFactory._reset_after_fork)
+
+
 # 保持向后兼容的英文接口
 def get_tmdb_client(config: Optional[Config] = None, force_recreate: bool = False) -> EnhancedTMDBClient:
     """
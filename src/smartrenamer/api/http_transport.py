@@ -0,0 +1,180 @@
+"""
+TMDB 原生 HTTP 传输层
+
+基于连接池化的 requests.Session 直接调用 TMDB v3 API：
+HTTP keep-alive 复用连接、每个请求带真实超时、gzip 压缩传输，
+响应直接解析为精简的字典，不经过 tmdbv3api 的 AsObj 包装
+"""
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+# 搜索结果保留的字段（匹配、索引和界面展示用到的字段）
+搜索结果字段 = (
+    "id", "title", "original_title", "name", "original_name",
+    "release_date", "first_air_date", "overview", "poster_path", "backdrop_path",
+    "popularity", "vote_average", "vote_count", "genre_ids",
+    "original_language", "origin_country", "adult",
+)
+
+# 季详情中每集丢弃的字段（演职员列表体积大且不会用到）
+剧集丢弃字段 = ("crew", "guest_stars")
+
+
+def 精简搜索结果(结果: Dict[str, Any]) -> Dict[str, Any]:
+    """只保留搜索结果中用到的字段"""
+    return {字段: 结果[字段] for 字段 in 搜索结果字段 if 字段 in 结果}
+
+
+def 精简剧集(剧集: Dict[str, Any]) -> Dict[str, Any]:
+    """去掉剧集中的演职员列表"""
+    return {键: 值 for 键, 值 in 剧集.items() if 键 not in 剧集丢弃字段}
+
+
+class _兼容接口:
+    """
+    以 tmdbv3api 的方法名（search / details）暴露原生传输，
+    客户端无需区分使用的是哪种传输
+    """
+    
+    def __init__(
+        self,
+        search: Optional[Callable[..., Any]] = None,
+        details: Optional[Callable[..., Any]] = None
+    ):
+        self.search = search
+        self.details = details
+
+
+class 原生HTTP传输:
+    """
+    TMDB 原生 HTTP 传输
+    
+    所有请求共用一个 requests.Session，连接池大小与客户端最大并发数一致。
+    HTTP 错误（包括 429）以 requests.HTTPError 抛出，响应对象保留在异常的
+    response 属性中，速率限制器可以从中读取 Retry-After
+    """
+    
+    默认基础URL = "https://api.themoviedb.org/3"
+    
+    def __init__(
+        self,
+        api_key: str,
+        language: str = "zh-CN",
+        请求超时: float = 30,
+        连接池大小: int = 10,
+        基础URL: Optional[str] = None,
+        会话: Optional[requests.Session] = None
+    ):
+        """
+        初始化原生 HTTP 传输
+        
+        Args:
+            api_key: TMDB API 密钥
+            language: 语言设置
+            请求超时: 连接和读取超时（秒）
+            连接池大小: 保持的最大连接数
+            基础URL: API 基础地址，默认为 TMDB 官方地址（测试时可指向本地服务）
+            会话: 自定义 requests.Session，None 时自动创建
+        """
+        self.api_key = api_key
+        self.language = language
+        self.请求超时 = 请求超时
+        self.基础URL = (基础URL or self.默认基础URL).rstrip("/")
+        
+        if 会话 is None:
+            会话 = requests.Session()
+            适配器 = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, 连接池大小))
+            会话.mount("https://", 适配器)
+            会话.mount("http://", 适配器)
+        会话.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+        })
+        self._会话 = 会话
+        
+        # tmdbv3api 兼容接口
+        self.movie = _兼容接口(search=self.搜索电影, details=self.电影详情)
+        self.tv = _兼容接口(search=self.搜索电视剧, details=self.电视剧详情)
+        self.season = _兼容接口(details=self.季详情)
+        self.episode = _兼容接口(details=self.剧集详情)
+    
+    def 请求(self, 路径: str, **参数: Any) -> Dict[str, Any]:
+        """
+        发送 GET 请求并解析 JSON
+        
+        Args:
+            路径: API 路径，如 /search/movie
+            **参数: 查询参数
+        
+        Returns:
+            Dict[str, Any]: 响应 JSON
+        
+        Raises:
+            requests.HTTPError: HTTP 状态码表示错误
+            requests.RequestException: 连接失败或超时
+        """
+        查询参数 = self._查询参数(参数)
+        
+        响应 = self._会话.get(
+            f"{self.基础URL}{路径}", params=查询参数, timeout=self.请求超时
+        )
+        if 响应.status_code >= 400:
+            logger.debug(f"TMDB 请求失败: {路径} HTTP {响应.status_code}")
+            响应.raise_for_status()
+        return 响应.json()
+    
+    def _查询参数(self, 参数: Dict[str, Any]) -> Dict[str, Any]:
+        """请求的完整查询参数（api_key、language 和非 None 的参数）"""
+        查询参数 = {"api_key": self.api_key, "language": self.language}
+        查询参数.update({键: 值 for 键, 值 in 参数.items() if 值 is not None})
+        return 查询参数
+    
+    def 搜索电影(self, 标题: str) -> List[Dict[str, Any]]:
+        """搜索电影，返回精简后的结果列表"""
+        数据 = self.请求("/search/movie", query=标题)
+        return [精简搜索结果(r) for r in 数据.get("results", [])]
+    
+    def 搜索电视剧(self, 标题: str) -> List[Dict[str, Any]]:
+        """搜索电视剧，返回精简后的结果列表"""
+        数据 = self.请求("/search/tv", query=标题)
+        return [精简搜索结果(r) for r in 数据.get("results", [])]
+    
+    def 电影详情(self, 电影id: int, append_to_response: Optional[str] = None) -> Dict[str, Any]:
+        """获取电影详情"""
+        return self.请求(f"/movie/{电影id}", append_to_response=append_to_response or None)
+    
+    def 电视剧详情(self, 电视剧id: int, append_to_response: Optional[str] = None) -> Dict[str, Any]:
+        """获取电视剧详情"""
+        return self.请求(f"/tv/{电视剧id}", append_to_response=append_to_response or None)
+    
+    def 季详情(
+        self,
+        电视剧id: int,
+        季数: int,
+        append_to_response: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """获取整季详情，剧集列表去掉演职员数据"""
+        数据 = self.请求(
+            f"/tv/{电视剧id}/season/{季数}",
+            append_to_response=append_to_response or None
+        )
+        数据["episodes"] = [精简剧集(e) for e in 数据.get("episodes") or []]
+        return 数据
+    
+    def 剧集详情(self, 电视剧id: int, 季数: int, 集数: int) -> Dict[str, Any]:
+        """获取单集详情"""
+        return 精简剧集(self.请求(f"/tv/{电视剧id}/season/{季数}/episode/{集数}"))
+    
+    def 关闭(self) -> None:
+        """关闭会话及其连接池"""
+        self._会话.close()
+
+
+# 英文别名
+NativeHTTPTransport = 原生HTTP传输
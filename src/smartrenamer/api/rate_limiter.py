@@ -0,0 +1,269 @@
+"""
+TMDB 请求速率限制器
+
+令牌桶控制请求速率，AIMD（加性增、乘性减）调整并发上限：
+请求成功时并发上限缓慢增加，遇到限流（HTTP 429 / Retry-After）时减半，
+并在 Retry-After 指定的时间内暂停发出新请求
+"""
+import logging
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from threading import Condition
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# tmdbv3api 在 wait_on_rate_limit=False 时抛出的限流异常信息
+_限流信息 = re.compile(r"rate limit reached.*?(\d+)\s*seconds", re.IGNORECASE)
+# TMDB 限流响应的 status_message
+_超出限额信息 = re.compile(r"over the allowed limit", re.IGNORECASE)
+
+
+def _解析重试等待(值: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数或 HTTP 日期）"""
+    if not 值:
+        return None
+    try:
+        return max(0.0, float(值))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(值).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def 解析限流异常(异常: BaseException, 默认等待秒数: float = 1.0) -> Optional[float]:
+    """
+    判断异常是否为限流错误，并返回需要等待的秒数
+    
+    支持带 response 的 HTTP 异常（状态码 429，读取 Retry-After 头）、
+    带 retry_after 属性的异常，以及 tmdbv3api 的限流异常信息
+    
+    Args:
+        异常: 请求抛出的异常
+        默认等待秒数: 无法得知等待时间时使用的默认值
+    
+    Returns:
+        Optional[float]: 需要等待的秒数，不是限流错误返回 None
+    """
+    重试等待 = getattr(异常, "retry_after", None)
+    if isinstance(重试等待, (int, float)):
+        return max(0.0, float(重试等待))
+    
+    响应 = getattr(异常, "response", None)
+    if 响应 is not None and getattr(响应, "status_code", None) == 429:
+        头 = getattr(响应, "headers", None) or {}
+        等待 = _解析重试等待(头.get("Retry-After"))
+        return 默认等待秒数 if 等待 is None else 等待
+    
+    信息 = str(异常)
+    匹配 = _限流信息.search(信息)
+    if 匹配:
+        return max(0.0, float(匹配.group(1)))
+    if _超出限额信息.search(信息):
+        return 默认等待秒数
+    return None
+
+
+class 速率限制器:
+    """
+    令牌桶 + AIMD 自适应并发的速率限制器
+    
+    同一个客户端的所有请求共用一个限制器。每个请求先等待并发名额，
+    再取得一个令牌；遇到限流时在 Retry-After 时间内暂停所有请求
+    """
+    
+    # 统计观测速率的时间窗口（秒）
+    观测窗口秒数 = 5.0
+    
+    def __init__(
+        self,
+        每秒请求数: float = 20.0,
+        突发容量: Optional[float] = None,
+        最大并发数: int = 5,
+        最小并发数: int = 1,
+        默认等待秒数: float = 1.0
+    ):
+        """
+        初始化速率限制器
+        
+        Args:
+            每秒请求数: 令牌补充速率，<= 0 表示不限制速率
+            突发容量: 令牌桶容量，默认等于每秒请求数
+            最大并发数: 并发上限的最大值
+            最小并发数: 并发上限的最小值
+            默认等待秒数: 限流响应没有 Retry-After 时的暂停时间
+        """
+        self.每秒请求数 = 每秒请求数
+        self.突发容量 = 突发容量 if 突发容量 is not None else max(1.0, 每秒请求数)
+        self.最大并发数 = max(1, 最大并发数)
+        self.最小并发数 = max(1, min(最小并发数, self.最大并发数))
+        self.默认等待秒数 = 默认等待秒数
+        
+        self._条件 = Condition()
+        self._令牌数 = self.突发容量
+        self._上次补充 = time.monotonic()
+        self._并发上限 = float(self.最大并发数)
+        self._进行中 = 0
+        self._等待中 = 0
+        self._暂停至 = 0.0
+        self._最近请求: deque = deque()
+        
+        # 统计信息
+        self._请求次数 = 0
+        self._限流次数 = 0
+    
+    @property
+    def 并发上限(self) -> int:
+        """当前并发上限"""
+        return int(self._并发上限)
+    
+    def _补充令牌(self, 现在: float) -> None:
+        """按流逝时间补充令牌（调用方持有锁）"""
+        self._令牌数 = min(
+            self.突发容量,
+            self._令牌数 + (现在 - self._上次补充) * self.每秒请求数
+        )
+        self._上次补充 = 现在
+    
+    def 获取(self) -> None:
+        """等待并发名额和令牌，之后必须调用 `释放`"""
+        with self._条件:
+            self._等待中 += 1
+            try:
+                while True:
+                    现在 = time.monotonic()
+                    if 现在 < self._暂停至:
+                        self._条件.wait(self._暂停至 - 现在)
+                        continue
+                    if self._进行中 >= self.并发上限:
+                        self._条件.wait()
+                        continue
+                    if self.每秒请求数 > 0:
+                        self._补充令牌(现在)
+                        if self._令牌数 < 1:
+                            self._条件.wait((1 - self._令牌数) / self.每秒请求数)
+                            continue
+                        self._令牌数 -= 1
+                    break
+            finally:
+                self._等待中 -= 1
+            
+            self._进行中 += 1
+            self._请求次数 += 1
+            self._最近请求.append(现在)
+            self._清理观测窗口(现在)
+    
+    def _清理观测窗口(self, 现在: float) -> None:
+        """丢弃观测窗口之外的请求时间（调用方持有锁）"""
+        while self._最近请求 and self._最近请求[0] < 现在 - self.观测窗口秒数:
+            self._最近请求.popleft()
+    
+    def 预约令牌(self) -> float:
+        """
+        非阻塞地预约一个令牌（供 asyncio 客户端使用）
+        
+        令牌可以透支，调用方在返回的秒数之后再发出请求；
+        不占用并发名额，调用方按 `并发上限` 自行控制并发
+        
+        Returns:
+            float: 需要等待的秒数，0 表示可以立即发出
+        """
+        with self._条件:
+            现在 = time.monotonic()
+            等待 = max(0.0, self._暂停至 - 现在)
+            if self.每秒请求数 > 0:
+                self._补充令牌(现在)
+                self._令牌数 -= 1
+                if self._令牌数 < 0:
+                    等待 = max(等待, -self._令牌数 / self.每秒请求数)
+            self._请求次数 += 1
+            self._最近请求.append(现在 + 等待)
+            self._清理观测窗口(现在)
+            return 等待
+    
+    def 暂停剩余秒数(self) -> float:
+        """限流暂停还剩多少秒"""
+        with self._条件:
+            return max(0.0, self._暂停至 - time.monotonic())
+    
+    def 释放(self) -> None:
+        """归还并发名额"""
+        with self._条件:
+            self._进行中 -= 1
+            self._条件.notify_all()
+    
+    @contextmanager
+    def 许可(self) -> Iterator[None]:
+        """
+        在 with 块中持有一个请求许可
+        
+        用法:
+            with 限制器.许可():
+                发出请求()
+        """
+        self.获取()
+        try:
+            yield
+        finally:
+            self.释放()
+    
+    def 报告成功(self) -> None:
+        """请求成功：并发上限加性增加（约每轮请求 +1）"""
+        with self._条件:
+            if self._并发上限 < self.最大并发数:
+                self._并发上限 = min(
+                    float(self.最大并发数), self._并发上限 + 1 / self._并发上限
+                )
+                self._条件.notify_all()
+    
+    def 报告限流(self, 等待秒数: Optional[float] = None) -> None:
+        """
+        请求被限流：并发上限减半，清空令牌（保留预约透支的欠额），并在等待时间内暂停所有请求
+        
+        Args:
+            等待秒数: Retry-After 指定的等待时间，None 使用默认值
+        """
+        if 等待秒数 is None:
+            等待秒数 = self.默认等待秒数
+        with self._条件:
+            self._限流次数 += 1
+            self._并发上限 = max(float(self.最小并发数), self._并发上限 / 2)
+            self._补充令牌(time.monotonic())
+            self._令牌数 = min(self._令牌数, 0.0)
+            self._暂停至 = max(self._暂停至, self._上次补充 + 等待秒数)
+            self._条件.notify_all()
+        logger.warning(
+            f"TMDB 请求被限流，暂停 {等待秒数:.1f} 秒，并发上限降为 {self.并发上限}"
+        )
+    
+    def 获取统计信息(self) -> dict:
+        """
+        获取限制器状态
+        
+        Returns:
+            dict: current_rate 为最近窗口内实际每秒请求数，queue_depth 为等待许可的请求数
+        """
+        with self._条件:
+            现在 = time.monotonic()
+            self._清理观测窗口(现在)
+            return {
+                "rate_limit": self.每秒请求数,
+                "current_rate": len(self._最近请求) / self.观测窗口秒数,
+                "concurrency_limit": self.并发上限,
+                "max_concurrency": self.最大并发数,
+                "in_flight": self._进行中,
+                "queue_depth": self._等待中,
+                "throttled": self._限流次数,
+                "total_requests": self._请求次数,
+                "paused_seconds": max(0.0, self._暂停至 - 现在),
+            }
+
+
+# 英文别名
+RateLimiter = 速率限制器
+parse_rate_limit_error = 解析限流异常
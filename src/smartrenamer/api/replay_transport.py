@@ -0,0 +1,303 @@
+"""
+TMDB 夹具录制与回放传输
+
+录制传输在原生 HTTP 传输的基础上把每个响应写入夹具档案；回放传输只从档案读取响应，
+不访问网络，并可注入固定延迟、随机抖动、限流（429）和服务器错误。
+用于在离线环境中可重复地测量匹配吞吐量、缓存命中率和速率限制器行为
+"""
+import gzip
+import json
+import logging
+import random
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional, Union
+
+import requests
+
+from smartrenamer.api.http_transport import 原生HTTP传输
+
+logger = logging.getLogger(__name__)
+
+
+def _构造HTTP错误(
+    状态码: int,
+    数据: Dict[str, Any],
+    地址: str,
+    头: Optional[Dict[str, str]] = None
+) -> requests.HTTPError:
+    """构造与真实请求相同形式的 HTTPError（response 属性带状态码、响应头和正文）"""
+    响应 = requests.Response()
+    响应.status_code = 状态码
+    响应.url = 地址
+    响应.headers.update(头 or {})
+    响应._content = json.dumps(数据).encode("utf-8")
+    return requests.HTTPError(f"{状态码} Error for url: {地址}", response=响应)
+
+
+class 夹具缺失错误(requests.HTTPError):
+    """回放时档案中没有对应的请求（以 404 响应的形式抛出）"""
+
+
+class 夹具档案:
+    """
+    TMDB 请求到响应的夹具档案
+    
+    键由 API 路径和排序后的查询参数组成（不含 api_key），值为状态码和响应 JSON。
+    档案保存为一个 JSON 文件，文件名以 .gz 结尾时使用 gzip 压缩
+    """
+    
+    版本 = 1
+    
+    def __init__(self, 路径: Optional[Union[str, Path]] = None):
+        """
+        初始化夹具档案
+        
+        Args:
+            路径: 档案文件路径，文件已存在时自动加载；None 表示只在内存中使用
+        """
+        self.路径 = Path(路径) if 路径 else None
+        self._条目: Dict[str, Dict[str, Any]] = {}
+        self._锁 = Lock()
+        if self.路径 is not None and self.路径.exists():
+            self.加载()
+    
+    @staticmethod
+    def 生成键(路径: str, 参数: Dict[str, Any]) -> str:
+        """
+        生成请求的档案键
+        
+        Args:
+            路径: API 路径，如 /search/movie
+            参数: 查询参数（api_key 会被忽略）
+        
+        Returns:
+            str: 档案键，如 /search/movie?language=zh-CN&query=Heat
+        """
+        查询 = "&".join(
+            f"{键}={参数[键]}" for 键 in sorted(参数)
+            if 键 != "api_key" and 参数[键] is not None
+        )
+        return f"{路径}?{查询}" if 查询 else 路径
+    
+    def 记录(self, 键: str, 数据: Any, 状态码: int = 200) -> None:
+        """记录一个响应"""
+        with self._锁:
+            self._条目[键] = {"status": 状态码, "body": 数据}
+    
+    def 获取(self, 键: str) -> Optional[Dict[str, Any]]:
+        """
+        获取记录的响应
+        
+        Returns:
+            Optional[Dict[str, Any]]: {"status": 状态码, "body": 响应 JSON}，没有记录时返回 None
+        """
+        with self._锁:
+            return self._条目.get(键)
+    
+    def __len__(self) -> int:
+        return len(self._条目)
+    
+    def __contains__(self, 键: str) -> bool:
+        return 键 in self._条目
+    
+    @staticmethod
+    def _打开(路径: Path, 模式: str, 压缩: bool):
+        """打开档案文件，压缩时使用 gzip 文本模式"""
+        if 压缩:
+            return gzip.open(路径, 模式 + "t", encoding="utf-8")
+        return open(路径, 模式, encoding="utf-8")
+    
+    def 加载(self) -> None:
+        """从档案文件加载全部条目"""
+        with self._打开(self.路径, "r", self.路径.suffix == ".gz") as 文件:
+            内容 = json.load(文件)
+        with self._锁:
+            self._条目 = dict(内容.get("entries", {}))
+        logger.info(f"已加载 TMDB 夹具档案: {self.路径} ({len(self._条目)} 条)")
+    
+    def 保存(self, 路径: Optional[Union[str, Path]] = None) -> None:
+        """
+        保存档案（先写临时文件再替换，中途失败不会损坏已有档案）
+        
+        Args:
+            路径: 保存位置，None 时使用初始化时的路径
+        """
+        路径 = Path(路径) if 路径 else self.路径
+        if 路径 is None:
+            raise ValueError("未指定夹具档案路径")
+        路径.parent.mkdir(parents=True, exist_ok=True)
+        with self._锁:
+            内容 = {"version": self.版本, "entries": dict(sorted(self._条目.items()))}
+        临时路径 = 路径.with_name(路径.name + ".tmp")
+        with self._打开(临时路径, "w", 路径.suffix == ".gz") as 文件:
+            json.dump(内容, 文件, ensure_ascii=False, indent=1)
+        临时路径.replace(路径)
+        logger.info(f"已保存 TMDB 夹具档案: {路径} ({len(内容['entries'])} 条)")
+
+
+class 录制HTTP传输(原生HTTP传输):
+    """
+    录制传输：正常访问 TMDB，同时把每个响应（包括 404 等错误响应）写入夹具档案
+    
+    限流响应（429）不记录；`关闭` 时保存档案
+    """
+    
+    def __init__(self, api_key: str, 档案: 夹具档案, **参数: Any):
+        """
+        初始化录制传输
+        
+        Args:
+            api_key: TMDB API 密钥
+            档案: 写入的夹具档案
+            **参数: 传给 原生HTTP传输 的其他参数
+        """
+        super().__init__(api_key, **参数)
+        self.档案 = 档案
+    
+    def 请求(self, 路径: str, **参数: Any) -> Dict[str, Any]:
+        """发送请求并记录响应"""
+        键 = 夹具档案.生成键(路径, self._查询参数(参数))
+        try:
+            数据 = super().请求(路径, **参数)
+        except requests.HTTPError as e:
+            响应 = e.response
+            if 响应 is not None and 响应.status_code != 429:
+                try:
+                    正文 = 响应.json()
+                except ValueError:
+                    正文 = None
+                self.档案.记录(键, 正文, 响应.status_code)
+            raise
+        self.档案.记录(键, 数据)
+        return 数据
+    
+    def 关闭(self) -> None:
+        """保存档案并关闭会话"""
+        if self.档案.路径 is not None:
+            self.档案.保存()
+        super().关闭()
+
+
+class 回放HTTP传输(原生HTTP传输):
+    """
+    回放传输：从夹具档案返回响应，不访问网络
+    
+    每个请求先等待 `延迟秒数` 加上 [0, 延迟抖动秒数) 的随机抖动，然后按概率注入错误：
+    `限流概率` 返回带 Retry-After 的 429，`错误概率` 返回 503。
+    给定随机种子时注入的顺序可重复（并发请求之间的先后顺序除外）
+    """
+    
+    def __init__(
+        self,
+        档案: 夹具档案,
+        language: str = "zh-CN",
+        延迟秒数: float = 0.0,
+        延迟抖动秒数: float = 0.0,
+        限流概率: float = 0.0,
+        错误概率: float = 0.0,
+        重试等待秒数: float = 1.0,
+        随机种子: Optional[int] = None
+    ):
+        """
+        初始化回放传输
+        
+        Args:
+            档案: 读取的夹具档案
+            language: 语言设置（参与档案键，需与录制时一致）
+            延迟秒数: 每个请求的固定延迟
+            延迟抖动秒数: 在固定延迟上增加的随机延迟上限
+            限流概率: 返回 429 的概率
+            错误概率: 返回 503 的概率
+            重试等待秒数: 注入的 429 响应中 Retry-After 的值
+            随机种子: 随机数种子，None 表示不固定
+        """
+        super().__init__("replay", language=language, 基础URL="https://replay.invalid/3")
+        self.档案 = 档案
+        self.延迟秒数 = 延迟秒数
+        self.延迟抖动秒数 = 延迟抖动秒数
+        self.限流概率 = 限流概率
+        self.错误概率 = 错误概率
+        self.重试等待秒数 = 重试等待秒数
+        self._随机 = random.Random(随机种子)
+        self._锁 = Lock()
+        
+        # 统计信息
+        self._请求次数 = 0
+        self._回放次数 = 0
+        self._缺失次数 = 0
+        self._注入限流次数 = 0
+        self._注入错误次数 = 0
+        self._模拟延迟秒数 = 0.0
+    
+    def 请求(self, 路径: str, **参数: Any) -> Dict[str, Any]:
+        """
+        回放一个请求
+        
+        Raises:
+            requests.HTTPError: 注入的 429 / 503，或记录的错误响应
+            夹具缺失错误: 档案中没有该请求
+        """
+        键 = 夹具档案.生成键(路径, self._查询参数(参数))
+        地址 = f"{self.基础URL}{键}"
+        with self._锁:
+            self._请求次数 += 1
+            延迟 = self.延迟秒数 + (self._随机.uniform(0, self.延迟抖动秒数) if self.延迟抖动秒数 else 0.0)
+            随机数 = self._随机.random()
+            self._模拟延迟秒数 += 延迟
+        
+        if 延迟 > 0:
+            time.sleep(延迟)
+        
+        if 随机数 < self.限流概率:
+            with self._锁:
+                self._注入限流次数 += 1
+            raise _构造HTTP错误(
+                429,
+                {"status_code": 25, "status_message": "Your request count is over the allowed limit."},
+                地址,
+                {"Retry-After": str(self.重试等待秒数)}
+            )
+        if 随机数 < self.限流概率 + self.错误概率:
+            with self._锁:
+                self._注入错误次数 += 1
+            raise _构造HTTP错误(503, {"status_message": "Service Unavailable (replay)"}, 地址)
+        
+        条目 = self.档案.获取(键)
+        if 条目 is None:
+            with self._锁:
+                self._缺失次数 += 1
+            logger.debug(f"夹具档案中没有该请求: {键}")
+            错误 = _构造HTTP错误(404, {"status_message": "Not in fixture archive"}, 地址)
+            raise 夹具缺失错误(str(错误), response=错误.response)
+        
+        with self._锁:
+            self._回放次数 += 1
+        if 条目["status"] >= 400:
+            raise _构造HTTP错误(条目["status"], 条目["body"] or {}, 地址)
+        # 返回副本，调用方修改结果不影响档案
+        return json.loads(json.dumps(条目["body"]))
+    
+    def 获取统计信息(self) -> dict:
+        """
+        获取回放统计
+        
+        Returns:
+            dict: 请求数、回放数、缺失数、注入的限流和错误次数以及累计模拟延迟
+        """
+        with self._锁:
+            return {
+                "requests": self._请求次数,
+                "replayed": self._回放次数,
+                "missing": self._缺失次数,
+                "injected_throttles": self._注入限流次数,
+                "injected_errors": self._注入错误次数,
+                "simulated_latency_seconds": self._模拟延迟秒数,
+            }
+
+
+# 英文别名
+FixtureArchive = 夹具档案
+RecordingTransport = 录制HTTP传输
+ReplayTransport = 回放HTTP传输
@@ -3,31 +3,171 @@
 
 提供缓存、重试机制和更丰富的 API 功能
 """
-import time
+import gzip
+import hashlib
 import json
+import os
+import sys
+import time
+import atexit
 import logging
-from typing import Optional, List, Dict, Any
+import unicodedata
+import weakref
+from typing import Optional, List, Dict, Any, Iterable, Sequence, Tuple, Union
 from pathlib import Path
 from datetime import datetime, timedelta
 from collections import OrderedDict
-from threading import Lock
+from threading import Lock, Condition, Event, Thread
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tmdbv3api import TMDb, Movie, TV, Season, Episode
 
+from smartrenamer.api.cache_backends import 磁盘缓存后端, 创建磁盘缓存后端
+from smartrenamer.api.rate_limiter import 速率限制器, 解析限流异常
+from smartrenamer.api.http_transport import 原生HTTP传输, 精简剧集
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 所有启用异步写入的缓存管理器，进程退出时统一刷新
+_活动缓存管理器: "weakref.WeakSet[缓存管理器]" = weakref.WeakSet()
+
+
+@atexit.register
+def _退出时刷新缓存() -> None:
+    """进程退出前把所有待写入的缓存持久化"""
+    for 管理器 in list(_活动缓存管理器):
+        try:
+            管理器.关闭()
+        except Exception as e:
+            logger.warning(f"退出时刷新缓存失败: {e}")
+
+
+if hasattr(os, "register_at_fork"):
+    # fork 出的子进程没有父进程的后台写入线程，待写数据由父进程负责落盘
+    os.register_at_fork(after_in_child=_活动缓存管理器.clear)
+
+
+def 估算字节数(对象: Any) -> int:
+    """
+    估算对象（包括嵌套的字典、列表等）占用的内存字节数
+    
+    按 sys.getsizeof 累加对象及其包含的全部对象，同一个对象只计一次，结果为近似值
+    
+    Args:
+        对象: 要估算的对象
+        
+    Returns:
+        int: 估算的字节数
+    """
+    已计入 = set()
+    待处理 = [对象]
+    总字节数 = 0
+    while 待处理:
+        当前 = 待处理.pop()
+        if id(当前) in 已计入:
+            continue
+        已计入.add(id(当前))
+        总字节数 += sys.getsizeof(当前)
+        if isinstance(当前, dict):
+            待处理.extend(当前.keys())
+            待处理.extend(当前.values())
+        elif isinstance(当前, (list, tuple, set, frozenset)):
+            待处理.extend(当前)
+        elif hasattr(当前, "__dict__"):
+            待处理.append(vars(当前))
+    return 总字节数
+
+
+class _内存项:
+    """内存缓存条目：命中时直接比较单调时钟上的时间点，不再解析创建时间字符串"""
+    
+    __slots__ = ("缓存项", "过期于", "丢弃于", "字节数")
+    
+    def __init__(self, 缓存项: Dict[str, Any], 过期于: float, 丢弃于: float, 字节数: int = 0):
+        self.缓存项 = 缓存项
+        self.过期于 = 过期于
+        self.丢弃于 = 丢弃于
+        self.字节数 = 字节数
+
+
+class _内存分片:
+    """内存 LRU 的一个分片，各分片使用独立的锁"""
+    
+    __slots__ = (
+        "锁", "条目", "容量", "字节容量", "字节数",
+        "命中次数", "未命中次数", "过期命中次数", "淘汰次数"
+    )
+    
+    def __init__(self, 容量: int, 字节容量: Optional[int] = None):
+        self.锁 = Lock()
+        self.条目: "OrderedDict[str, _内存项]" = OrderedDict()
+        self.容量 = 容量
+        self.字节容量 = 字节容量
+        self.字节数 = 0
+        self.命中次数 = 0
+        self.未命中次数 = 0
+        self.过期命中次数 = 0
+        self.淘汰次数 = 0
+    
+    def 删除(self, 键: str) -> None:
+        """删除条目并扣除其字节数（调用方持有锁）"""
+        项 = self.条目.pop(键, None)
+        if 项 is not None:
+            self.字节数 -= 项.字节数
+    
+    def 清空(self) -> None:
+        """清空全部条目（调用方持有锁）"""
+        self.条目.clear()
+        self.字节数 = 0
+
 
 class 缓存管理器:
     """
     双层缓存管理器（内存 LRU + 磁盘缓存）
+    
+    磁盘层由可替换的后端实现，默认使用单文件 SQLite（见 cache_backends）。
+    启用异步写入时，磁盘写入进入有界的待写队列，由后台线程批量写入，
+    同一个键的多次写入只保留最新一次；进程退出或调用 `关闭` 时会刷新全部待写数据。
+    
+    有效期按缓存键前缀（如 movie_details、tv_search）单独配置；
+    设置了过期后可用时间时，过期条目在该时间内仍可通过 `获取含过期` 读出，
+    供客户端先返回旧值再在后台刷新（stale-while-revalidate）。
+    
+    内存层按键的哈希分成若干分片，每个分片各自加锁并各自执行 LRU 淘汰，
+    多线程命中时不会争用同一把锁；条目较少时只有一个分片，LRU 顺序是精确的。
+    设置了内存字节上限时，每个条目按估算的字节数计入所在分片的预算，
+    超出预算时从最久未使用的条目开始淘汰，单个超出分片预算的条目只保存在磁盘。
+    
+    磁盘缓存可以 `导出` 为压缩的缓存包并在其他节点 `导入`，用于新节点预热。
+    
+    启用跨进程共享时（需要 SQLite 后端），多个进程使用同一个缓存目录：内存层仍是各进程独立的，
+    内存未命中时读到其他进程写入磁盘的数据；`获取或等待租约` 让同一个键只由一个进程请求。
     """
     
+    # 每个分片至少容纳的条目数和分片数上限
+    分片最小容量 = 64
+    最大分片数 = 16
+    
+    # 缓存包格式版本和导入时每批写入磁盘的条目数
+    缓存包版本 = 1
+    导入批次大小 = 500
+    
+    # 等待其他进程加载时轮询磁盘的间隔（秒）
+    租约轮询秒数 = 0.05
+    
     def __init__(
         self,
         缓存目录: Path,
         过期时间: int = 7,
-        最大内存条目数: int = 1000
+        最大内存条目数: int = 1000,
+        磁盘后端: Union[str, 磁盘缓存后端] = "sqlite",
+        最大磁盘字节数: Optional[int] = None,
+        异步写入: bool = True,
+        最大待写条目数: int = 1000,
+        前缀有效期秒数: Optional[Dict[str, float]] = None,
+        过期后可用秒数: float = 0,
+        最大内存字节数: Optional[int] = None,
+        跨进程共享: bool = False
     ):
         """
         初始化缓存管理器
@@ -36,28 +176,62 @@ class 缓存管理器:
             缓存目录: 缓存文件存储目录
             过期时间: 缓存过期时间（天），默认7天
             最大内存条目数: 内存缓存最大条目数
+            磁盘后端: 磁盘缓存后端名称（"sqlite" 或 "json"）或后端实例
+            最大磁盘字节数: 磁盘缓存大小上限（字节），None 表示不限制
+            异步写入: 是否由后台线程批量写入磁盘
+            最大待写条目数: 待写队列上限，队列满时写入方等待后台线程写完
+            前缀有效期秒数: 缓存键前缀 → 有效期（秒），未列出的前缀使用默认过期时间
+            过期后可用秒数: 过期条目继续保留、可作为旧值返回的时间（秒），0 表示过期即删除
+            最大内存字节数: 内存缓存的估算字节数上限，None 表示只按条目数限制
+            跨进程共享: 是否与其他进程共享磁盘缓存并跨进程合并请求
+            
+        Raises:
+            ValueError: 启用跨进程共享但磁盘后端不支持
         """
         self.缓存目录 = 缓存目录
         self.过期时间 = timedelta(days=过期时间)
+        self.前缀有效期秒数: Dict[str, float] = dict(前缀有效期秒数 or {})
+        self.过期后可用秒数 = max(0.0, 过期后可用秒数)
         self.最大内存条目数 = 最大内存条目数
+        self.最大内存字节数 = 最大内存字节数
         self.缓存目录.mkdir(parents=True, exist_ok=True)
         
-        # 内存缓存 (LRU)
-        self._内存缓存: OrderedDict = OrderedDict()
-        self._锁 = Lock()
+        # 磁盘缓存后端
+        self._磁盘 = 创建磁盘缓存后端(磁盘后端, 缓存目录, 最大磁盘字节数)
+        if 跨进程共享 and not self._磁盘.支持跨进程共享:
+            raise ValueError(f"磁盘缓存后端 {self._磁盘.名称} 不支持跨进程共享，请使用 sqlite")
+        self.跨进程共享 = 跨进程共享
+        if self._磁盘.快速清理:
+            self._磁盘.清理过期()
         
-        # 统计信息
-        self._内存命中次数 = 0
-        self._内存未命中次数 = 0
+        # 内存缓存（分片 LRU）
+        分片数 = max(1, min(self.最大分片数, 最大内存条目数 // self.分片最小容量))
+        self._分片列表 = [
+            _内存分片(
+                最大内存条目数 // 分片数 + (1 if i < 最大内存条目数 % 分片数 else 0),
+                None if 最大内存字节数 is None else 最大内存字节数 // 分片数
+            )
+            for i in range(分片数)
+        ]
+        
+        # 统计信息（内存命中和未命中次数记录在各分片中）
         self._磁盘命中次数 = 0
         self._磁盘未命中次数 = 0
-    
-    def _获取缓存路径(self, 键: str) -> Path:
-        """获取缓存文件路径"""
-        # 使用 hash 避免文件名过长或包含非法字符
-        import hashlib
-        键哈希 = hashlib.md5(键.encode()).hexdigest()
-        return self.缓存目录 / f"{键哈希}.json"
+        self._过期命中次数 = 0
+        self._租约等待次数 = 0
+        
+        # 异步写入：待写队列（键 → (缓存项, 过期时间戳)）和后台写入线程
+        self.异步写入 = 异步写入
+        self.最大待写条目数 = max(1, 最大待写条目数)
+        self._待写入: OrderedDict = OrderedDict()
+        # 后台线程正在写入的批次，写完之前仍需可读
+        self._写入中: OrderedDict = OrderedDict()
+        self._写入条件 = Condition()
+        self._正在写入 = False
+        self._写入线程: Optional[Thread] = None
+        self._已关闭 = False
+        self._写入批次数 = 0
+        self._合并写入次数 = 0
     
     def _标准化键(self, 键: str) -> str:
         """
@@ -72,6 +246,137 @@ class 缓存管理器:
         # 转小写并去除多余空格
         return " ".join(键.lower().split())
     
+    def _有效期秒数(self, 键: str, 有效期秒数: Optional[float] = None) -> float:
+        """
+        确定缓存键的有效期：单条指定 > 键前缀配置 > 默认过期时间
+        
+        Args:
+            键: 标准化后的缓存键
+            有效期秒数: 单条指定的有效期
+            
+        Returns:
+            float: 有效期（秒）
+        """
+        if 有效期秒数 is not None:
+            return 有效期秒数
+        前缀 = 键.split(":", 1)[0]
+        if 前缀 in self.前缀有效期秒数:
+            return self.前缀有效期秒数[前缀]
+        return self.过期时间.total_seconds()
+    
+    def _剩余有效秒数(self, 键: str, 缓存项: Dict[str, Any]) -> float:
+        """
+        计算缓存项的剩余有效时间，已过期时为负数
+        
+        Args:
+            键: 标准化后的缓存键
+            缓存项: 包含创建时间的缓存项（可带有自己的有效期）
+            
+        Returns:
+            float: 剩余有效秒数
+        """
+        创建时间 = datetime.fromisoformat(缓存项['创建时间'])
+        有效期 = self._有效期秒数(键, 缓存项.get('有效期秒数'))
+        return 有效期 - (datetime.now() - 创建时间).total_seconds()
+    
+    def _创建内存项(
+        self,
+        键: str,
+        缓存项: Dict[str, Any],
+        剩余有效秒数: Optional[float] = None
+    ) -> _内存项:
+        """
+        把缓存项的有效期换算为单调时钟上的过期和丢弃时间点
+        
+        Args:
+            键: 标准化后的缓存键
+            缓存项: 包含创建时间的缓存项
+            剩余有效秒数: 已知的剩余有效时间，None 时根据创建时间计算
+            
+        Returns:
+            _内存项: 内存缓存条目
+        """
+        if 剩余有效秒数 is None:
+            剩余有效秒数 = self._剩余有效秒数(键, 缓存项)
+        过期于 = time.monotonic() + 剩余有效秒数
+        # 只有设置了内存字节上限时才需要估算大小（估算需要遍历整个对象）
+        字节数 = 0 if self.最大内存字节数 is None else 估算字节数(缓存项)
+        return _内存项(缓存项, 过期于, 过期于 + self.过期后可用秒数, 字节数)
+    
+    def _分片(self, 键: str) -> _内存分片:
+        """缓存键所在的内存分片"""
+        return self._分片列表[hash(键) % len(self._分片列表)]
+    
+    def _查询内存(self, 键: str) -> Optional[Tuple[Any, bool]]:
+        """
+        在内存缓存中查找，只统计命中（未命中由调用方统计）
+        
+        Args:
+            键: 缓存键
+            
+        Returns:
+            Optional[Tuple[Any, bool]]: (数据, 是否已过期)，不在内存中或已可丢弃时返回 None
+        """
+        分片 = self._分片(键)
+        现在 = time.monotonic()
+        with 分片.锁:
+            项 = 分片.条目.get(键)
+            if 项 is None:
+                return None
+            if 现在 < 项.过期于:
+                # 移到末尾（LRU 更新）
+                分片.条目.move_to_end(键)
+                分片.命中次数 += 1
+                return 项.缓存项['数据'], False
+            if 现在 < 项.丢弃于:
+                分片.过期命中次数 += 1
+                return 项.缓存项['数据'], True
+            分片.删除(键)
+        logger.debug(f"内存缓存已过期: {键}")
+        return None
+    
+    def _写入内存(self, 键: str, 项: _内存项) -> None:
+        """写入内存缓存并按分片的条目数和字节预算执行 LRU 淘汰"""
+        分片 = self._分片(键)
+        with 分片.锁:
+            分片.删除(键)
+            if 分片.字节容量 is not None and 项.字节数 > 分片.字节容量:
+                logger.debug(f"条目超过内存预算，只保存在磁盘: {键} ({项.字节数} 字节)")
+                return
+            
+            分片.条目[键] = 项
+            分片.字节数 += 项.字节数
+            while len(分片.条目) > 分片.容量 or (
+                分片.字节容量 is not None and 分片.字节数 > 分片.字节容量
+            ):
+                淘汰键, 淘汰项 = 分片.条目.popitem(last=False)
+                分片.字节数 -= 淘汰项.字节数
+                分片.淘汰次数 += 1
+                logger.debug(f"LRU 淘汰: {淘汰键}")
+    
+    def _清空内存缓存(self) -> None:
+        """清空内存缓存（磁盘缓存保留）"""
+        for 分片 in self._分片列表:
+            with 分片.锁:
+                分片.清空()
+    
+    def _已过期(self, 缓存项: Dict[str, Any], 键: str = "") -> bool:
+        """
+        检查缓存项是否过期
+        
+        Args:
+            缓存项: 包含创建时间的缓存项
+            键: 标准化后的缓存键（用于按前缀确定有效期）
+            
+        Returns:
+            bool: 是否过期
+        """
+        return self._剩余有效秒数(键, 缓存项) < 0
+    
+    def _可丢弃(self, 键: str, 缓存项: Dict[str, Any]) -> bool:
+        """缓存项已超过过期后可用时间，不能再作为旧值返回"""
+        return self._剩余有效秒数(键, 缓存项) < -self.过期后可用秒数
+    
     def 获取(self, 键: str) -> Optional[Any]:
         """
         从缓存中获取数据（先查内存，再查磁盘）
@@ -82,71 +387,154 @@ class 缓存管理器:
         Returns:
             Optional[Any]: 缓存的数据，如果不存在或过期则返回 None
         """
-        键 = self._标准化键(键)
+        # 快速路径：键已标准化且在内存中未过期（最常见的情况）
+        分片 = self._分片列表[hash(键) % len(self._分片列表)]
+        with 分片.锁:
+            项 = 分片.条目.get(键)
+            if 项 is not None and time.monotonic() < 项.过期于:
+                分片.条目.move_to_end(键)
+                分片.命中次数 += 1
+                return 项.缓存项['数据']
         
-        # 1. 先查内存缓存
-        with self._锁:
-            if 键 in self._内存缓存:
-                缓存项 = self._内存缓存[键]
-                
-                # 检查是否过期
-                创建时间 = datetime.fromisoformat(缓存项['创建时间'])
-                if datetime.now() - 创建时间 > self.过期时间:
-                    logger.debug(f"内存缓存已过期: {键}")
-                    del self._内存缓存[键]
-                else:
-                    # 移到末尾（LRU 更新）
-                    self._内存缓存.move_to_end(键)
-                    self._内存命中次数 += 1
-                    logger.debug(f"内存缓存命中: {键}")
-                    return 缓存项['数据']
-            
-            self._内存未命中次数 += 1
-        
-        # 2. 内存未命中，查磁盘缓存
-        缓存路径 = self._获取缓存路径(键)
-        
-        if not 缓存路径.exists():
-            self._磁盘未命中次数 += 1
-            return None
+        数据, 已过期 = self.获取含过期(键)
+        return None if 已过期 else 数据
+    
+    def 获取含过期(self, 键: str) -> Tuple[Optional[Any], bool]:
+        """
+        获取数据，过期后可用时间内的旧值也会返回
         
+        Args:
+            键: 缓存键
+            
+        Returns:
+            Tuple[Optional[Any], bool]: (缓存的数据, 是否已过期)，不存在时数据为 None
+        """
+        # 1. 先查内存缓存；内存中只存标准化后的键，原样命中说明键已标准化，无需再处理
+        结果 = self._查询内存(键)
+        if 结果 is not None:
+            return 结果
+        标准键 = self._标准化键(键)
+        if 标准键 != 键:
+            键 = 标准键
+            结果 = self._查询内存(键)
+            if 结果 is not None:
+                return 结果
+        
+        分片 = self._分片(键)
+        with 分片.锁:
+            分片.未命中次数 += 1
+        
+        # 2. 内存未命中，查待写队列和正在写入的批次（已被内存 LRU 淘汰但尚未落盘）
+        with self._写入条件:
+            待写项 = self._待写入.get(键) or self._写入中.get(键)
+        if 待写项 is not None and not self._可丢弃(键, 待写项[0]):
+            if self._已过期(待写项[0], 键):
+                self._过期命中次数 += 1
+                return 待写项[0]['数据'], True
+            self._磁盘命中次数 += 1
+            return 待写项[0]['数据'], False
+        
+        # 3. 查磁盘缓存
         try:
-            with open(缓存路径, 'r', encoding='utf-8') as f:
-                缓存数据 = json.load(f)
+            缓存数据 = self._磁盘.读取(键)
+            if 缓存数据 is None:
+                self._磁盘未命中次数 += 1
+                return None, False
             
             # 检查是否过期
-            创建时间 = datetime.fromisoformat(缓存数据['创建时间'])
-            if datetime.now() - 创建时间 > self.过期时间:
+            if self._可丢弃(键, 缓存数据):
                 logger.debug(f"磁盘缓存已过期: {键}")
-                缓存路径.unlink()
+                self._磁盘.删除(键)
                 self._磁盘未命中次数 += 1
-                return None
+                return None, False
+            if self._已过期(缓存数据, 键):
+                self._过期命中次数 += 1
+                return 缓存数据['数据'], True
             
             # 从磁盘加载到内存
-            with self._锁:
-                self._内存缓存[键] = 缓存数据
-                self._内存缓存.move_to_end(键)
-                
-                # LRU 淘汰
-                while len(self._内存缓存) > self.最大内存条目数:
-                    self._内存缓存.popitem(last=False)
+            self._写入内存(键, self._创建内存项(键, 缓存数据))
             
             self._磁盘命中次数 += 1
             logger.debug(f"磁盘缓存命中: {键}")
-            return 缓存数据['数据']
+            return 缓存数据['数据'], False
             
         except Exception as e:
             logger.warning(f"读取磁盘缓存失败: {e}")
             self._磁盘未命中次数 += 1
+            return None, False
+    
+    def _读取磁盘有效项(self, 键: str) -> Optional[Any]:
+        """读取磁盘中未过期的数据（其他进程写入的），命中时放入内存"""
+        try:
+            缓存数据 = self._磁盘.读取(键)
+        except Exception as e:
+            logger.warning(f"读取磁盘缓存失败: {e}")
+            return None
+        if 缓存数据 is None:
             return None
+        剩余 = self._剩余有效秒数(键, 缓存数据)
+        if 剩余 <= 0:
+            return None
+        self._写入内存(键, self._创建内存项(键, 缓存数据, 剩余))
+        self._磁盘命中次数 += 1
+        return 缓存数据['数据']
+    
+    def 获取或等待租约(self, 键: str, 租约秒数: float, 超时秒数: float) -> Tuple[Optional[Any], bool]:
+        """
+        跨进程共享时获取键的加载租约
+        
+        其他进程持有租约时轮询磁盘，直到对方写入数据、释放租约（随后由本进程获取）或等待超时。
+        未启用跨进程共享时直接返回 (None, False)。
+        
+        Args:
+            键: 缓存键
+            租约秒数: 租约有效期，持有租约的进程异常退出时到期后失效
+            超时秒数: 最长等待时间
+            
+        Returns:
+            Tuple[Optional[Any], bool]: (其他进程写入的数据, 是否获得租约)。
+            数据为 None 时由调用方加载，获得租约的调用方加载后需调用 `释放租约`
+        """
+        if not self.跨进程共享:
+            return None, False
+        键 = self._标准化键(键)
+        截止 = time.monotonic() + 超时秒数
+        已等待 = False
+        while True:
+            if self._磁盘.获取租约(键, 租约秒数):
+                # 调用方未命中之后、获得租约之前，其他进程可能刚写入并释放了租约
+                数据 = self._读取磁盘有效项(键)
+                if 数据 is None:
+                    return None, True
+                self._磁盘.释放租约(键)
+                return 数据, False
+            if not 已等待:
+                已等待 = True
+                self._租约等待次数 += 1
+            if time.monotonic() >= 截止:
+                logger.debug(f"等待其他进程加载超时: {键}")
+                return None, False
+            time.sleep(self.租约轮询秒数)
+            数据 = self._读取磁盘有效项(键)
+            if 数据 is not None:
+                return 数据, False
+    
+    def 释放租约(self, 键: str) -> None:
+        """写入的数据落盘后释放租约，等待的进程随后即可读到"""
+        self.刷新()
+        try:
+            self._磁盘.释放租约(self._标准化键(键))
+        except Exception as e:
+            logger.warning(f"释放缓存租约失败: {e}")
     
-    def 设置(self, 键: str, 数据: Any) -> None:
+    def 设置(self, 键: str, 数据: Any, 有效期秒数: Optional[float] = None) -> None:
         """
         保存数据到缓存（同时写入内存和磁盘）
         
         Args:
             键: 缓存键
             数据: 要缓存的数据
+            有效期秒数: 此条目的有效期（秒），None 表示按键前缀或默认过期时间
         """
         键 = self._标准化键(键)
         
@@ -154,80 +542,324 @@ class 缓存管理器:
             '创建时间': datetime.now().isoformat(),
             '数据': 数据
         }
+        if 有效期秒数 is not None:
+            缓存数据['有效期秒数'] = 有效期秒数
+        
+        有效期 = self._有效期秒数(键, 有效期秒数)
         
         # 1. 写入内存缓存
-        with self._锁:
-            self._内存缓存[键] = 缓存数据
-            self._内存缓存.move_to_end(键)
-            
-            # LRU 淘汰
-            while len(self._内存缓存) > self.最大内存条目数:
-                淘汰键, _ = self._内存缓存.popitem(last=False)
-                logger.debug(f"LRU 淘汰: {淘汰键}")
+        self._写入内存(键, self._创建内存项(键, 缓存数据, 有效期))
+        
+        # 2. 写入磁盘缓存（失败不影响内存），磁盘条目保留到过期后可用时间结束
+        过期时间戳 = time.time() + 有效期 + self.过期后可用秒数
         
-        # 2. 写入磁盘缓存（异步，失败不影响内存）
-        缓存路径 = self._获取缓存路径(键)
+        if self.异步写入 and not self._已关闭:
+            self._加入待写队列(键, 缓存数据, 过期时间戳)
+            return
         
         try:
-            with open(缓存路径, 'w', encoding='utf-8') as f:
-                json.dump(缓存数据, f, ensure_ascii=False, indent=2)
-            
+            self._磁盘.写入(键, 缓存数据, 过期时间戳)
             logger.debug(f"保存到缓存: {键}")
             
         except Exception as e:
             logger.warning(f"写入磁盘缓存失败: {e}")
     
+    def _加入待写队列(self, 键: str, 缓存数据: Dict[str, Any], 过期时间戳: float) -> None:
+        """
+        把磁盘写入放入待写队列，同一个键只保留最新的数据
+        
+        队列已满且键不在队列中时等待后台线程写完一批，保证内存占用有界
+        """
+        with self._写入条件:
+            if self._写入线程 is None:
+                self._写入线程 = Thread(target=self._后台写入, name="tmdb-cache-writer", daemon=True)
+                self._写入线程.start()
+                _活动缓存管理器.add(self)
+            
+            if 键 in self._待写入:
+                self._合并写入次数 += 1
+            else:
+                while len(self._待写入) >= self.最大待写条目数 and not self._已关闭:
+                    self._写入条件.wait()
+            
+            self._待写入[键] = (缓存数据, 过期时间戳)
+            self._写入条件.notify_all()
+    
+    def _后台写入(self) -> None:
+        """后台写入线程：每次取出全部待写条目，在一个批次中写入磁盘"""
+        while True:
+            with self._写入条件:
+                while not self._待写入 and not self._已关闭:
+                    self._写入条件.wait()
+                if not self._待写入 and self._已关闭:
+                    return
+                批次, self._待写入 = self._待写入, OrderedDict()
+                self._写入中 = 批次
+                self._正在写入 = True
+                self._写入条件.notify_all()
+            
+            try:
+                self._磁盘.批量写入([
+                    (键, 缓存数据, 过期时间戳) for 键, (缓存数据, 过期时间戳) in 批次.items()
+                ])
+                logger.debug(f"批量写入磁盘缓存: {len(批次)} 条")
+            except Exception as e:
+                logger.warning(f"写入磁盘缓存失败: {e}")
+            
+            with self._写入条件:
+                self._写入中 = OrderedDict()
+                self._正在写入 = False
+                self._写入批次数 += 1
+                self._写入条件.notify_all()
+    
+    def 刷新(self) -> None:
+        """等待所有待写条目写入磁盘"""
+        with self._写入条件:
+            while self._待写入 or self._正在写入:
+                if self._写入线程 is None or not self._写入线程.is_alive():
+                    break
+                self._写入条件.wait()
+    
+    def 关闭(self) -> None:
+        """刷新待写条目并停止后台写入线程，之后的写入改为同步执行"""
+        with self._写入条件:
+            self._已关闭 = True
+            self._写入条件.notify_all()
+        if self._写入线程 is not None:
+            self._写入线程.join()
+            self._写入线程 = None
+        _活动缓存管理器.discard(self)
+    
     def 清空(self) -> None:
         """清空所有缓存"""
+        # 丢弃待写条目并等待正在进行的批次完成
+        with self._写入条件:
+            self._待写入.clear()
+        self.刷新()
+        
         # 清空内存缓存
-        with self._锁:
-            self._内存缓存.clear()
-            self._内存命中次数 = 0
-            self._内存未命中次数 = 0
-            self._磁盘命中次数 = 0
-            self._磁盘未命中次数 = 0
+        for 分片 in self._分片列表:
+            with 分片.锁:
+                分片.清空()
+                分片.命中次数 = 0
+                分片.未命中次数 = 0
+                分片.过期命中次数 = 0
+        self._磁盘命中次数 = 0
+        self._磁盘未命中次数 = 0
+        self._过期命中次数 = 0
         
         # 清空磁盘缓存
-        for 缓存文件 in self.缓存目录.glob("*.json"):
-            try:
-                缓存文件.unlink()
-            except Exception as e:
-                logger.warning(f"删除缓存文件失败: {e}")
+        try:
+            self._磁盘.清空()
+        except Exception as e:
+            logger.warning(f"清空磁盘缓存失败: {e}")
         
         logger.info("已清空所有缓存")
     
+    def 清理过期(self) -> int:
+        """
+        清理内存和磁盘中已过期的缓存
+        
+        Returns:
+            int: 磁盘中删除的条目数
+        """
+        现在 = time.monotonic()
+        for 分片 in self._分片列表:
+            with 分片.锁:
+                for 键 in [键 for 键, 项 in 分片.条目.items() if 项.丢弃于 <= 现在]:
+                    分片.删除(键)
+        
+        self.刷新()
+        已删除 = self._磁盘.清理过期()
+        logger.info(f"已清理 {已删除} 个过期磁盘缓存")
+        return 已删除
+    
+    def 导出(self, 路径: Path) -> dict:
+        """
+        把磁盘缓存中仍可用的条目导出为缓存包（gzip 压缩的 JSON）
+        
+        内容相同的数据只保存一份，条目通过索引引用；先写临时文件再替换。
+        
+        Args:
+            路径: 缓存包路径
+            
+        Returns:
+            dict: 导出的条目数（entries）、去重后的数据数（unique_payloads）和文件大小（bytes）
+        """
+        self.刷新()
+        现在 = time.time()
+        数据列表: List[Any] = []
+        数据索引: Dict[bytes, int] = {}
+        条目列表: List[list] = []
+        
+        for 键, 缓存项, 过期时间戳 in self._磁盘.遍历():
+            if 过期时间戳 <= 现在:
+                continue
+            摘要 = hashlib.sha1(
+                json.dumps(缓存项['数据'], sort_keys=True, ensure_ascii=False).encode('utf-8')
+            ).digest()
+            索引 = 数据索引.get(摘要)
+            if 索引 is None:
+                索引 = 数据索引[摘要] = len(数据列表)
+                数据列表.append(缓存项['数据'])
+            条目列表.append([键, 索引, 缓存项['创建时间'], 缓存项.get('有效期秒数')])
+        
+        路径 = Path(路径)
+        路径.parent.mkdir(parents=True, exist_ok=True)
+        临时路径 = 路径.with_name(路径.name + ".tmp")
+        with gzip.open(临时路径, "wt", encoding="utf-8") as 文件:
+            json.dump(
+                {"version": self.缓存包版本, "payloads": 数据列表, "entries": 条目列表},
+                文件,
+                ensure_ascii=False,
+                separators=(",", ":")
+            )
+        临时路径.replace(路径)
+        
+        logger.info(f"已导出 {len(条目列表)} 个缓存条目（{len(数据列表)} 份数据）到 {路径}")
+        return {
+            "entries": len(条目列表),
+            "unique_payloads": len(数据列表),
+            "bytes": 路径.stat().st_size
+        }
+    
+    def 导入(self, 路径: Path, 覆盖: bool = False) -> dict:
+        """
+        导入 `导出` 生成的缓存包
+        
+        过期时间按本机的有效期配置从条目的创建时间重新计算，超过过期后可用时间的条目跳过；
+        本机已有同一个键且创建时间不早于包内条目时保留本机数据。
+        
+        Args:
+            路径: 缓存包路径
+            覆盖: 是否总是用包内条目覆盖本机已有的条目
+            
+        Returns:
+            dict: 导入数（imported）、过期跳过数（skipped_expired）和已存在跳过数（skipped_existing）
+            
+        Raises:
+            ValueError: 缓存包版本不受支持
+        """
+        with gzip.open(Path(路径), "rt", encoding="utf-8") as 文件:
+            缓存包 = json.load(文件)
+        if 缓存包.get("version") != self.缓存包版本:
+            raise ValueError(f"不支持的缓存包版本: {缓存包.get('version')}")
+        
+        self.刷新()
+        数据列表 = 缓存包["payloads"]
+        统计 = {"imported": 0, "skipped_expired": 0, "skipped_existing": 0}
+        批次: List[Tuple[str, Dict[str, Any], float]] = []
+        
+        for 键, 索引, 创建时间, 有效期秒数 in 缓存包["entries"]:
+            缓存项 = {'创建时间': 创建时间, '数据': 数据列表[索引]}
+            if 有效期秒数 is not None:
+                缓存项['有效期秒数'] = 有效期秒数
+            
+            剩余 = self._剩余有效秒数(键, 缓存项)
+            if 剩余 + self.过期后可用秒数 <= 0:
+                统计["skipped_expired"] += 1
+                continue
+            if not 覆盖:
+                现有 = self._磁盘.读取(键)
+                if 现有 is not None and 现有['创建时间'] >= 创建时间:
+                    统计["skipped_existing"] += 1
+                    continue
+            
+            批次.append((键, 缓存项, time.time() + 剩余 + self.过期后可用秒数))
+            if len(批次) >= self.导入批次大小:
+                self._磁盘.批量写入(批次)
+                统计["imported"] += len(批次)
+                批次 = []
+        
+        if 批次:
+            self._磁盘.批量写入(批次)
+            统计["imported"] += len(批次)
+        
+        # 内存中可能还有被覆盖的旧数据
+        if 统计["imported"]:
+            self._清空内存缓存()
+        
+        logger.info(
+            f"已从 {路径} 导入 {统计['imported']} 个缓存条目，"
+            f"跳过过期 {统计['skipped_expired']} 个、已存在 {统计['skipped_existing']} 个"
+        )
+        return 统计
+    
     def 获取统计信息(self) -> dict:
         """
         获取缓存统计信息
         
         Returns:
-            dict: 统计信息
+            dict: 统计信息，memory_bytes 只在设置了内存字节上限时统计
         """
-        with self._锁:
-            总请求数 = (self._内存命中次数 + self._内存未命中次数 +
-                      self._磁盘命中次数 + self._磁盘未命中次数)
-            总命中数 = self._内存命中次数 + self._磁盘命中次数
-            
-            return {
-                "memory_hits": self._内存命中次数,
-                "memory_misses": self._内存未命中次数,
-                "disk_hits": self._磁盘命中次数,
-                "disk_misses": self._磁盘未命中次数,
-                "total_requests": 总请求数,
-                "total_hits": 总命中数,
-                "hit_rate": 总命中数 / 总请求数 if 总请求数 > 0 else 0.0,
-                "memory_entries": len(self._内存缓存),
-                "max_memory_entries": self.最大内存条目数
-            }
+        内存命中次数 = 内存未命中次数 = 内存过期命中次数 = 内存条目数 = 0
+        内存字节数 = 淘汰次数 = 0
+        for 分片 in self._分片列表:
+            with 分片.锁:
+                内存命中次数 += 分片.命中次数
+                内存未命中次数 += 分片.未命中次数
+                内存过期命中次数 += 分片.过期命中次数
+                内存条目数 += len(分片.条目)
+                内存字节数 += 分片.字节数
+                淘汰次数 += 分片.淘汰次数
+        
+        总请求数 = (内存命中次数 + 内存未命中次数 +
+                  self._磁盘命中次数 + self._磁盘未命中次数)
+        总命中数 = 内存命中次数 + self._磁盘命中次数
+        
+        统计 = {
+            "memory_hits": 内存命中次数,
+            "memory_misses": 内存未命中次数,
+            "disk_hits": self._磁盘命中次数,
+            "disk_misses": self._磁盘未命中次数,
+            "stale_hits": self._过期命中次数 + 内存过期命中次数,
+            "total_requests": 总请求数,
+            "total_hits": 总命中数,
+            "hit_rate": 总命中数 / 总请求数 if 总请求数 > 0 else 0.0,
+            "memory_entries": 内存条目数,
+            "max_memory_entries": self.最大内存条目数,
+            "memory_shards": len(self._分片列表),
+            "memory_bytes": 内存字节数,
+            "max_memory_bytes": self.最大内存字节数,
+            "memory_evictions": 淘汰次数,
+            "shared": self.跨进程共享,
+            "lease_waits": self._租约等待次数
+        }
+        
+        with self._写入条件:
+            统计["pending_writes"] = len(self._待写入)
+            统计["write_batches"] = self._写入批次数
+            统计["coalesced_writes"] = self._合并写入次数
+        
+        统计.update(self._磁盘.获取统计信息())
+        return 统计
+
+
+class _进行中请求:
+    """同一个缓存键正在进行的请求，后到的线程等待并共享其结果"""
+    
+    __slots__ = ("完成", "结果", "异常")
+    
+    def __init__(self):
+        self.完成 = Event()
+        self.结果: Any = None
+        self.异常: Optional[BaseException] = None
 
 
 class 增强TMDB客户端:
     """
     增强版 TMDB API 客户端
     
-    提供缓存、重试机制、并发控制和更丰富的功能
+    提供缓存、重试机制、并发控制和更丰富的功能。
+    并发查询同一个缓存键时只发出一次请求，其余线程等待并共享结果（single-flight）。
+    详情接口支持 append_to_response：一次请求同时取得详情、整季剧集和别名等附加内容，
+    各部分分别写入自己的缓存键。
+    启用共享缓存时，使用同一个缓存目录的多个进程之间也只由一个进程请求同一个键。
     """
     
+    # append_to_response 一次最多附加的内容数（TMDB 限制）
+    附加内容上限 = 20
+    
     def __init__(
         self,
         api_key: str,
@@ -239,7 +871,17 @@ class 增强TMDB客户端:
         缓存过期天数: float = 7,
         最大缓存条目数: int = 1000,
         最大并发请求数: int = 5,
-        请求超时: int = 30
+        请求超时: int = 30,
+        负缓存有效期秒数: float = 600,
+        磁盘缓存后端: str = "sqlite",
+        最大磁盘缓存字节数: Optional[int] = None,
+        每秒请求数: float = 20.0,
+        传输方式: Union[str, 原生HTTP传输] = "tmdbv3api",
+        api基础URL: Optional[str] = None,
+        缓存前缀有效期秒数: Optional[Dict[str, float]] = None,
+        过期后台刷新秒数: float = 0,
+        最大内存缓存字节数: Optional[int] = None,
+        共享缓存: bool = False
     ):
         """
         初始化增强版 TMDB 客户端
@@ -255,16 +897,52 @@ class 增强TMDB客户端:
             最大缓存条目数: 内存缓存最大条目数
             最大并发请求数: 批量请求时的最大并发数
             请求超时: 请求超时时间（秒）
+            负缓存有效期秒数: 空结果或失败搜索的缓存有效期（秒），避免拼写错误的标题反复请求
+            磁盘缓存后端: 磁盘缓存后端，"sqlite"（默认，单文件）或 "json"（每个键一个文件）
+            最大磁盘缓存字节数: 磁盘缓存大小上限（字节），None 表示不限制
+            每秒请求数: 所有请求共用的速率上限，<= 0 表示不限制
+            传输方式: "tmdbv3api"（默认）、"native"（连接池化的原生 HTTP 传输，带真实超时）
+                或传输实例（如夹具录制 / 回放传输）
+            api基础URL: 原生传输使用的 API 地址，None 表示 TMDB 官方地址
+            缓存前缀有效期秒数: 按缓存键前缀（movie_details、tv_search 等）设置的有效期（秒）
+            过期后台刷新秒数: 过期后多长时间内先返回旧值并在后台刷新，0 表示关闭
+            最大内存缓存字节数: 内存缓存的估算字节数上限，None 表示只按条目数限制
+            共享缓存: 是否与使用同一缓存目录的其他进程共享缓存并跨进程合并请求（需要 sqlite 后端）
+        
+        Raises:
+            ValueError: 未知的传输方式，或共享缓存使用了不支持的磁盘后端
         """
         # 初始化 TMDB API
-        self.tmdb = TMDb()
-        self.tmdb.api_key = api_key
-        self.tmdb.language = language
-        
-        self.movie = Movie()
-        self.tv = TV()
-        self.season = Season()
-        self.episode = Episode()
+        self.传输方式 = 传输方式
+        self.传输: Optional[原生HTTP传输] = None
+        if isinstance(传输方式, 原生HTTP传输) or 传输方式 == "native":
+            if isinstance(传输方式, 原生HTTP传输):
+                self.传输 = 传输方式
+            else:
+                self.传输 = 原生HTTP传输(
+                    api_key,
+                    language=language,
+                    请求超时=请求超时,
+                    连接池大小=最大并发请求数,
+                    基础URL=api基础URL
+                )
+            self.movie = self.传输.movie
+            self.tv = self.传输.tv
+            self.season = self.传输.season
+            self.episode = self.传输.episode
+        elif 传输方式 == "tmdbv3api":
+            self.tmdb = TMDb()
+            self.tmdb.api_key = api_key
+            self.tmdb.language = language
+            # 限流时由 tmdbv3api 抛出异常，交给速率限制器统一暂停，而不是在线程内休眠
+            self.tmdb.wait_on_rate_limit = False
+            
+            self.movie = Movie()
+            self.tv = TV()
+            self.season = Season()
+            self.episode = Episode()
+        else:
+            raise ValueError(f"未知的传输方式: {传输方式}，可选: tmdbv3api, native")
         
         # 配置参数
         self.language = language
@@ -272,18 +950,46 @@ class 增强TMDB客户端:
         self.重试延迟 = 重试延迟
         self.最大并发请求数 = 最大并发请求数
         self.请求超时 = 请求超时
+        self.负缓存有效期秒数 = 负缓存有效期秒数
+        
+        # 速率限制器（令牌桶 + 自适应并发，所有请求共用）
+        self.限制器 = 速率限制器(
+            每秒请求数=每秒请求数,
+            最大并发数=最大并发请求数,
+            默认等待秒数=重试延迟
+        )
         
         # 初始化缓存
         self.启用缓存 = 启用缓存
         if 启用缓存:
             if 缓存目录 is None:
                 缓存目录 = Path.home() / ".smartrenamer" / "cache" / "tmdb"
-            self.缓存 = 缓存管理器(缓存目录, 过期时间=缓存过期天数, 最大内存条目数=最大缓存条目数)
+            self.缓存 = 缓存管理器(
+                缓存目录,
+                过期时间=缓存过期天数,
+                最大内存条目数=最大缓存条目数,
+                磁盘后端=磁盘缓存后端,
+                最大磁盘字节数=最大磁盘缓存字节数,
+                前缀有效期秒数=缓存前缀有效期秒数,
+                过期后可用秒数=过期后台刷新秒数,
+                最大内存字节数=最大内存缓存字节数,
+                跨进程共享=共享缓存
+            )
         else:
             self.缓存 = None
         
         # 线程池（用于并发请求）
         self._线程池: Optional[ThreadPoolExecutor] = None
+        
+        # 请求合并：缓存键 → 正在进行的请求
+        self._进行中请求表: Dict[str, _进行中请求] = {}
+        self._请求合并锁 = Lock()
+        self._请求命中次数 = 0
+        self._请求合并次数 = 0
+        self._请求未命中次数 = 0
+        self._跨进程合并次数 = 0
+        self._刷新中键: set = set()
+        self._后台刷新次数 = 0
     
     def _获取线程池(self) -> ThreadPoolExecutor:
         """获取或创建线程池"""
@@ -309,9 +1015,11 @@ class 增强TMDB客户端:
         
         for 尝试次数 in range(self.最大重试次数):
             try:
-                开始时间 = time.time()
-                结果 = 函数(*args, **kwargs)
-                耗时 = time.time() - 开始时间
+                with self.限制器.许可():
+                    开始时间 = time.time()
+                    结果 = 函数(*args, **kwargs)
+                    耗时 = time.time() - 开始时间
+                self.限制器.报告成功()
                 
                 if 耗时 > self.请求超时 * 0.8:
                     logger.warning(f"API 请求耗时较长: {耗时:.2f}秒（接近超时阈值 {self.请求超时}秒）")
@@ -320,6 +1028,13 @@ class 增强TMDB客户端:
                 
             except Exception as e:
                 最后异常 = e
+                
+                # 限流：由限制器暂停所有请求并降低并发，之后直接重试
+                重试等待 = 解析限流异常(e, self.重试延迟)
+                if 重试等待 is not None:
+                    self.限制器.报告限流(重试等待)
+                    continue
+                
                 退避时间 = self.重试延迟 * (2 ** 尝试次数)  # 指数退避：1s, 2s, 4s, 8s...
                 
                 logger.warning(
@@ -333,6 +1048,212 @@ class 增强TMDB客户端:
         logger.error(f"API 请求失败，已达最大重试次数: {最后异常}")
         raise 最后异常
     
+    def _读取缓存(self, 缓存键: str, 使用缓存: bool) -> Optional[Any]:
+        """
+        从缓存读取数据并记录命中次数
+        
+        Args:
+            缓存键: 缓存键
+            使用缓存: 是否使用缓存
+            
+        Returns:
+            Optional[Any]: 缓存的数据，未命中返回 None
+        """
+        if not (self.启用缓存 and 使用缓存 and self.缓存):
+            return None
+        结果 = self.缓存.获取(缓存键)
+        if 结果 is not None:
+            with self._请求合并锁:
+                self._请求命中次数 += 1
+        return 结果
+    
+    def _读取或加载(self, 缓存键: str, 使用缓存: bool, 加载函数) -> Any:
+        """
+        先读缓存，未命中时合并执行加载函数
+        
+        启用过期后台刷新时，过期但仍在可用时间内的旧值会立即返回，
+        同时在线程池中刷新该键，调用方不必等待网络请求
+        
+        Args:
+            缓存键: 缓存键
+            使用缓存: 是否使用缓存
+            加载函数: 接受 `后台刷新` 参数、执行请求并写入缓存的函数
+            
+        Returns:
+            Any: 缓存的数据或加载函数的返回值
+        """
+        if self.启用缓存 and 使用缓存 and self.缓存:
+            数据, 已过期 = self.缓存.获取含过期(缓存键)
+            if 数据 is not None:
+                with self._请求合并锁:
+                    self._请求命中次数 += 1
+                if 已过期:
+                    self._后台刷新(缓存键, 加载函数)
+                return 数据
+            if self.缓存.跨进程共享:
+                return self._合并执行(缓存键, lambda: self._跨进程加载(缓存键, 加载函数))
+        
+        return self._合并执行(缓存键, 加载函数)
+    
+    def _跨进程加载(self, 缓存键: str, 加载函数) -> Any:
+        """
+        共享缓存时跨进程合并请求：其他进程正在请求同一个键时等待其写入缓存并直接使用
+        
+        Args:
+            缓存键: 缓存键
+            加载函数: 执行请求并写入缓存的函数
+            
+        Returns:
+            Any: 其他进程写入的数据或加载函数的返回值
+        """
+        数据, 持有租约 = self.缓存.获取或等待租约(缓存键, self.请求超时, self.请求超时)
+        if 数据 is not None:
+            with self._请求合并锁:
+                self._跨进程合并次数 += 1
+            return 数据
+        try:
+            return 加载函数()
+        finally:
+            if 持有租约:
+                self.缓存.释放租约(缓存键)
+    
+    def _后台刷新(self, 缓存键: str, 加载函数) -> None:
+        """在线程池中刷新过期的缓存键，同一个键同时只刷新一次"""
+        with self._请求合并锁:
+            if 缓存键 in self._刷新中键:
+                return
+            self._刷新中键.add(缓存键)
+            self._后台刷新次数 += 1
+        
+        def 刷新():
+            try:
+                self._合并执行(缓存键, lambda: 加载函数(后台刷新=True))
+            except Exception as e:
+                logger.warning(f"后台刷新缓存失败: {缓存键}: {e}")
+            finally:
+                with self._请求合并锁:
+                    self._刷新中键.discard(缓存键)
+        
+        logger.debug(f"返回过期缓存并在后台刷新: {缓存键}")
+        self._获取线程池().submit(刷新)
+    
+    def _合并执行(self, 缓存键: str, 加载函数) -> Any:
+        """
+        合并同一个缓存键的并发请求
+        
+        第一个到达的线程执行加载函数，期间到达的其他线程等待并得到同一个结果
+        （或同一个异常），不再各自发出请求
+        
+        Args:
+            缓存键: 缓存键（已标准化）
+            加载函数: 执行请求并写入缓存的无参函数
+            
+        Returns:
+            Any: 加载函数的返回值
+        """
+        with self._请求合并锁:
+            请求 = self._进行中请求表.get(缓存键)
+            是发起者 = 请求 is None
+            if 是发起者:
+                请求 = _进行中请求()
+                self._进行中请求表[缓存键] = 请求
+                self._请求未命中次数 += 1
+            else:
+                self._请求合并次数 += 1
+        
+        if not 是发起者:
+            请求.完成.wait()
+            if 请求.异常 is not None:
+                raise 请求.异常
+            return 请求.结果
+        
+        try:
+            请求.结果 = 加载函数()
+            return 请求.结果
+        except BaseException as e:
+            请求.异常 = e
+            raise
+        finally:
+            with self._请求合并锁:
+                self._进行中请求表.pop(缓存键, None)
+            请求.完成.set()
+    
+    @staticmethod
+    def _标准化查询(标题: str) -> str:
+        """
+        标准化搜索查询（全角转半角、转小写、合并空白）
+        
+        TMDB 搜索不区分大小写，标准化后的查询共用同一份原始搜索结果缓存
+        
+        Args:
+            标题: 原始标题
+            
+        Returns:
+            str: 标准化后的查询
+        """
+        return " ".join(unicodedata.normalize("NFKC", 标题).lower().split())
+    
+    @staticmethod
+    def _按年份过滤(
+        结果列表: List[Dict[str, Any]],
+        年份: Optional[int],
+        日期字段: str
+    ) -> List[Dict[str, Any]]:
+        """按年份在本地过滤搜索结果"""
+        if not 年份:
+            return 结果列表
+        return [r for r in 结果列表 if (r.get(日期字段) or "").startswith(str(年份))]
+    
+    def _搜索(
+        self,
+        缓存前缀: str,
+        搜索函数,
+        转字典函数,
+        标题: str,
+        使用缓存: bool
+    ) -> List[Dict[str, Any]]:
+        """
+        执行搜索并按标准化查询缓存原始结果（不含年份过滤）
+        
+        空结果和失败的搜索使用较短的负缓存有效期
+        
+        Args:
+            缓存前缀: 缓存键前缀，如 movie_search
+            搜索函数: tmdbv3api 搜索函数
+            转字典函数: 结果对象转字典函数
+            标题: 搜索标题
+            使用缓存: 是否使用缓存
+            
+        Returns:
+            List[Dict[str, Any]]: 未经年份过滤的搜索结果
+        """
+        查询 = self._标准化查询(标题)
+        缓存键 = f"{缓存前缀}:{查询}"
+        缓存可用 = self.启用缓存 and self.缓存
+        
+        def 加载(后台刷新: bool = False) -> List[Dict[str, Any]]:
+            # 执行搜索
+            try:
+                结果 = self._带重试执行(搜索函数, 标题)
+                结果列表 = [转字典函数(r) for r in 结果] if 结果 else []
+            except Exception as e:
+                logger.error(f"搜索 '{标题}' 失败: {e}")
+                # 后台刷新失败时保留旧值，不写入负缓存
+                if 缓存可用 and not 后台刷新:
+                    self.缓存.设置(缓存键, [], 有效期秒数=self.负缓存有效期秒数)
+                return []
+            
+            # 保存到缓存（空结果使用负缓存有效期）
+            if 缓存可用:
+                self.缓存.设置(
+                    缓存键,
+                    结果列表,
+                    有效期秒数=None if 结果列表 else self.负缓存有效期秒数
+                )
+            return 结果列表
+        
+        return self._读取或加载(缓存键, 使用缓存, 加载)
+    
     def 搜索电影(
         self,
         标题: str,
@@ -342,6 +1263,9 @@ class 增强TMDB客户端:
         """
         搜索电影
         
+        原始搜索结果按标准化标题缓存，年份过滤在本地进行，
+        同一标题带不同年份的搜索只需一次网络请求
+        
         Args:
             标题: 电影标题
             年份: 发行年份（可选）
@@ -350,39 +1274,13 @@ class 增强TMDB客户端:
         Returns:
             List[Dict[str, Any]]: 搜索结果列表
         """
-        # 生成缓存键
-        缓存键 = f"movie_search:{标题}:{年份}"
-        
-        # 尝试从缓存加载
-        if self.启用缓存 and 使用缓存 and self.缓存:
-            缓存结果 = self.缓存.获取(缓存键)
-            if 缓存结果 is not None:
-                return 缓存结果
+        结果列表 = self._搜索(
+            "movie_search", self.movie.search, self._电影对象转字典, 标题, 使用缓存
+        )
+        结果列表 = self._按年份过滤(结果列表, 年份, "release_date")
         
-        # 执行搜索
-        try:
-            结果 = self._带重试执行(self.movie.search, 标题)
-            
-            # 转换为字典列表
-            结果列表 = [self._电影对象转字典(r) for r in 结果] if 结果 else []
-            
-            # 如果指定了年份，过滤结果
-            if 年份 and 结果列表:
-                结果列表 = [
-                    r for r in 结果列表
-                    if r.get("release_date", "").startswith(str(年份))
-                ]
-            
-            # 保存到缓存
-            if self.启用缓存 and self.缓存:
-                self.缓存.设置(缓存键, 结果列表)
-            
-            logger.info(f"搜索电影 '{标题}' 找到 {len(结果列表)} 个结果")
-            return 结果列表
-            
-        except Exception as e:
-            logger.error(f"搜索电影失败: {e}")
-            return []
+        logger.info(f"搜索电影 '{标题}' 找到 {len(结果列表)} 个结果")
+        return 结果列表
     
     def 搜索电视剧(
         self,
@@ -393,6 +1291,8 @@ class 增强TMDB客户端:
         """
         搜索电视剧
         
+        原始搜索结果按标准化标题缓存，年份过滤在本地进行
+        
         Args:
             标题: 电视剧标题
             年份: 首播年份（可选）
@@ -401,44 +1301,19 @@ class 增强TMDB客户端:
         Returns:
             List[Dict[str, Any]]: 搜索结果列表
         """
-        # 生成缓存键
-        缓存键 = f"tv_search:{标题}:{年份}"
-        
-        # 尝试从缓存加载
-        if self.启用缓存 and 使用缓存 and self.缓存:
-            缓存结果 = self.缓存.获取(缓存键)
-            if 缓存结果 is not None:
-                return 缓存结果
+        结果列表 = self._搜索(
+            "tv_search", self.tv.search, self._电视剧对象转字典, 标题, 使用缓存
+        )
+        结果列表 = self._按年份过滤(结果列表, 年份, "first_air_date")
         
-        # 执行搜索
-        try:
-            结果 = self._带重试执行(self.tv.search, 标题)
-            
-            # 转换为字典列表
-            结果列表 = [self._电视剧对象转字典(r) for r in 结果] if 结果 else []
-            
-            # 如果指定了年份，过滤结果
-            if 年份 and 结果列表:
-                结果列表 = [
-                    r for r in 结果列表
-                    if r.get("first_air_date", "").startswith(str(年份))
-                ]
-            
-            # 保存到缓存
-            if self.启用缓存 and self.缓存:
-                self.缓存.设置(缓存键, 结果列表)
-            
-            logger.info(f"搜索电视剧 '{标题}' 找到 {len(结果列表)} 个结果")
-            return 结果列表
-            
-        except Exception as e:
-            logger.error(f"搜索电视剧失败: {e}")
-            return []
+        logger.info(f"搜索电视剧 '{标题}' 找到 {len(结果列表)} 个结果")
+        return 结果列表
     
     def 获取电影详情(
         self,
         电影id: int,
-        使用缓存: bool = True
+        使用缓存: bool = True,
+        附加内容: Optional[Sequence[str]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         获取电影详细信息
@@ -446,39 +1321,42 @@ class 增强TMDB客户端:
         Args:
             电影id: 电影 ID
             使用缓存: 是否使用缓存
+            附加内容: 通过 append_to_response 一并获取的内容（如 alternative_titles），
+                结果中以同名字段返回，详见 `_获取含附加内容的详情`
             
         Returns:
             Optional[Dict[str, Any]]: 电影详细信息
         """
+        if 附加内容:
+            return self._获取含附加内容的详情("movie", 电影id, 附加内容, 使用缓存, self.movie.details)
+        
         # 生成缓存键
         缓存键 = f"movie_details:{电影id}"
         
-        # 尝试从缓存加载
-        if self.启用缓存 and 使用缓存 and self.缓存:
-            缓存结果 = self.缓存.获取(缓存键)
-            if 缓存结果 is not None:
-                return 缓存结果
+        def 加载(后台刷新: bool = False) -> Optional[Dict[str, Any]]:
+            # 获取详情
+            try:
+                详情 = self._带重试执行(self.movie.details, 电影id)
+                详情字典 = self._电影对象转字典(详情) if 详情 else None
+                
+                # 保存到缓存
+                if 详情字典 and self.启用缓存 and self.缓存:
+                    self.缓存.设置(缓存键, 详情字典)
+                
+                logger.info(f"获取电影详情: ID={电影id}")
+                return 详情字典
+                
+            except Exception as e:
+                logger.error(f"获取电影详情失败: {e}")
+                return None
         
-        # 获取详情
-        try:
-            详情 = self._带重试执行(self.movie.details, 电影id)
-            详情字典 = self._电影对象转字典(详情) if 详情 else None
-            
-            # 保存到缓存
-            if 详情字典 and self.启用缓存 and self.缓存:
-                self.缓存.设置(缓存键, 详情字典)
-            
-            logger.info(f"获取电影详情: ID={电影id}")
-            return 详情字典
-            
-        except Exception as e:
-            logger.error(f"获取电影详情失败: {e}")
-            return None
+        return self._读取或加载(缓存键, 使用缓存, 加载)
     
     def 获取电视剧详情(
         self,
         电视剧id: int,
-        使用缓存: bool = True
+        使用缓存: bool = True,
+        附加内容: Optional[Sequence[str]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         获取电视剧详细信息
@@ -486,34 +1364,37 @@ class 增强TMDB客户端:
         Args:
             电视剧id: 电视剧 ID
             使用缓存: 是否使用缓存
+            附加内容: 通过 append_to_response 一并获取的内容，如 ["season/1", "season/2",
+                "alternative_titles"]；整季数据同时写入季详情缓存，之后的
+                `获取季详情` / `获取剧集详情` 不再发出请求
             
         Returns:
             Optional[Dict[str, Any]]: 电视剧详细信息
         """
+        if 附加内容:
+            return self._获取含附加内容的详情("tv", 电视剧id, 附加内容, 使用缓存, self.tv.details)
+        
         # 生成缓存键
         缓存键 = f"tv_details:{电视剧id}"
         
-        # 尝试从缓存加载
-        if self.启用缓存 and 使用缓存 and self.缓存:
-            缓存结果 = self.缓存.获取(缓存键)
-            if 缓存结果 is not None:
-                return 缓存结果
+        def 加载(后台刷新: bool = False) -> Optional[Dict[str, Any]]:
+            # 获取详情
+            try:
+                详情 = self._带重试执行(self.tv.details, 电视剧id)
+                详情字典 = self._电视剧对象转字典(详情) if 详情 else None
+                
+                # 保存到缓存
+                if 详情字典 and self.启用缓存 and self.缓存:
+                    self.缓存.设置(缓存键, 详情字典)
+                
+                logger.info(f"获取电视剧详情: ID={电视剧id}")
+                return 详情字典
+                
+            except Exception as e:
+                logger.error(f"获取电视剧详情失败: {e}")
+                return None
         
-        # 获取详情
-        try:
-            详情 = self._带重试执行(self.tv.details, 电视剧id)
-            详情字典 = self._电视剧对象转字典(详情) if 详情 else None
-            
-            # 保存到缓存
-            if 详情字典 and self.启用缓存 and self.缓存:
-                self.缓存.设置(缓存键, 详情字典)
-            
-            logger.info(f"获取电视剧详情: ID={电视剧id}")
-            return 详情字典
-            
-        except Exception as e:
-            logger.error(f"获取电视剧详情失败: {e}")
-            return None
+        return self._读取或加载(缓存键, 使用缓存, 加载)
     
     def 获取剧集详情(
         self,
@@ -537,50 +1418,195 @@ class 增强TMDB客户端:
         # 生成缓存键
         缓存键 = f"episode_details:{电视剧id}:{季数}:{集数}"
         
-        # 尝试从缓存加载
-        if self.启用缓存 and 使用缓存 and self.缓存:
-            缓存结果 = self.缓存.获取(缓存键)
-            if 缓存结果 is not None:
-                return 缓存结果
+        # 先从已预取的整季缓存中查找
+        季详情 = self._读取缓存(f"season_details:{电视剧id}:{季数}", 使用缓存)
+        if 季详情 is not None:
+            for 剧集 in 季详情.get("episodes", []):
+                if 剧集.get("episode_number") == 集数:
+                    return 剧集
         
-        # 获取详情
-        try:
-            详情 = self._带重试执行(
-                self.episode.details,
-                电视剧id,
-                季数,
-                集数
-            )
-            详情字典 = self._剧集对象转字典(详情) if 详情 else None
+        def 加载(后台刷新: bool = False) -> Optional[Dict[str, Any]]:
+            # 获取详情
+            try:
+                详情 = self._带重试执行(
+                    self.episode.details,
+                    电视剧id,
+                    季数,
+                    集数
+                )
+                详情字典 = self._剧集对象转字典(详情) if 详情 else None
+                
+                # 保存到缓存
+                if 详情字典 and self.启用缓存 and self.缓存:
+                    self.缓存.设置(缓存键, 详情字典)
+                
+                logger.info(f"获取剧集详情: ID={电视剧id}, S{季数}E{集数}")
+                return 详情字典
+                
+            except Exception as e:
+                logger.error(f"获取剧集详情失败: {e}")
+                return None
+        
+        return self._读取或加载(缓存键, 使用缓存, 加载)
+    
+    def 获取季详情(
+        self,
+        电视剧id: int,
+        季数: int,
+        使用缓存: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        获取整季详细信息（包含该季全部剧集）
+        
+        一次请求即可得到整季所有剧集的标题、简介和播出日期，
+        `获取剧集详情` 会优先从已缓存的整季数据中查找剧集。
+        
+        Args:
+            电视剧id: 电视剧 ID
+            季数: 季数
+            使用缓存: 是否使用缓存
             
-            # 保存到缓存
-            if 详情字典 and self.启用缓存 and self.缓存:
-                self.缓存.设置(缓存键, 详情字典)
+        Returns:
+            Optional[Dict[str, Any]]: 季详细信息，episodes 字段为剧集列表
+        """
+        # 生成缓存键
+        缓存键 = f"season_details:{电视剧id}:{季数}"
+        
+        def 加载(后台刷新: bool = False) -> Optional[Dict[str, Any]]:
+            # 获取详情（只需要剧集列表，不附带图片、演职员等数据）
+            try:
+                详情 = self._带重试执行(
+                    self.season.details,
+                    电视剧id,
+                    季数,
+                    append_to_response=""
+                )
+                详情字典 = self._季对象转字典(详情) if 详情 else None
+                
+                # 保存到缓存
+                if 详情字典 and self.启用缓存 and self.缓存:
+                    self.缓存.设置(缓存键, 详情字典)
+                
+                logger.info(f"获取季详情: ID={电视剧id}, S{季数}")
+                return 详情字典
+                
+            except Exception as e:
+                logger.error(f"获取季详情失败: {e}")
+                return None
+        
+        return self._读取或加载(缓存键, 使用缓存, 加载)
+    
+    @staticmethod
+    def _附加内容缓存键(类型: str, 媒体id: int, 内容: str) -> str:
+        """
+        附加内容单独使用的缓存键
+        
+        season/N 写入整季缓存（与 `获取季详情` 共用），其余如 tv_alternative_titles:1399
+        """
+        if 内容.startswith("season/"):
+            return f"season_details:{媒体id}:{内容.split('/', 1)[1]}"
+        return f"{类型}_{内容}:{媒体id}"
+    
+    def _获取含附加内容的详情(
+        self,
+        类型: str,
+        媒体id: int,
+        附加内容: Sequence[str],
+        使用缓存: bool,
+        详情函数
+    ) -> Optional[Dict[str, Any]]:
+        """
+        通过 append_to_response 合并获取详情和附加内容
+        
+        详情和每项附加内容分别缓存；只请求缓存中缺少的附加内容，全部命中时不发出请求。
+        超过 `附加内容上限` 时分多次请求
+        
+        Args:
+            类型: "movie" 或 "tv"
+            媒体id: 电影或电视剧 ID
+            附加内容: 附加内容列表
+            使用缓存: 是否使用缓存
+            详情函数: 传输层的详情方法，接受 append_to_response 参数
             
-            logger.info(f"获取剧集详情: ID={电视剧id}, S{季数}E{集数}")
-            return 详情字典
+        Returns:
+            Optional[Dict[str, Any]]: 详情字典，附加内容以同名字段（如 "season/1"）合并在其中
+        """
+        详情键 = f"{类型}_details:{媒体id}"
+        附加结果: Dict[str, Any] = {}
+        for 内容 in dict.fromkeys(附加内容):
+            附加结果[内容] = self._读取缓存(self._附加内容缓存键(类型, 媒体id, 内容), 使用缓存)
+        缺少 = [内容 for 内容, 值 in 附加结果.items() if 值 is None]
+        详情 = self._读取缓存(详情键, 使用缓存)
+        
+        if 详情 is None or 缺少:
+            def 加载() -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+                详情数据: Dict[str, Any] = {}
+                已获取: Dict[str, Any] = {}
+                for 起点 in range(0, max(1, len(缺少)), self.附加内容上限):
+                    本批 = 缺少[起点:起点 + self.附加内容上限]
+                    对象 = self._带重试执行(详情函数, 媒体id, append_to_response=",".join(本批))
+                    if not 对象:
+                        return None
+                    详情数据 = self._详情对象转字典(对象)
+                    for 内容 in 本批:
+                        值 = 详情数据.pop(内容, None)
+                        if 值 is None:
+                            continue
+                        if 内容.startswith("season/") and isinstance(值, dict):
+                            # 与单独请求的整季数据一致：剧集去掉演职员列表
+                            值 = dict(值, episodes=[精简剧集(e) for e in 值.get("episodes") or []])
+                        已获取[内容] = 值
+                        if self.启用缓存 and self.缓存:
+                            self.缓存.设置(self._附加内容缓存键(类型, 媒体id, 内容), 值)
+                
+                if self.启用缓存 and self.缓存:
+                    self.缓存.设置(详情键, 详情数据)
+                logger.info(f"获取详情: {类型} ID={媒体id}, 附加内容: {','.join(缺少) or '无'}")
+                return 详情数据, 已获取
             
-        except Exception as e:
-            logger.error(f"获取剧集详情失败: {e}")
-            return None
+            try:
+                新数据 = self._合并执行(f"{详情键}?append={','.join(缺少)}", 加载)
+            except Exception as e:
+                logger.error(f"获取详情失败: {e}")
+                return None
+            if 新数据 is None:
+                return None
+            详情, 已获取 = 新数据
+            附加结果.update(已获取)
+        
+        return dict(详情, **{内容: 值 for 内容, 值 in 附加结果.items() if 值 is not None})
+    
+    def _详情对象转字典(self, 详情对象) -> Dict[str, Any]:
+        """将详情对象转换为字典，优先使用原始 JSON（附加内容保持为普通字典和列表）"""
+        原始数据 = getattr(详情对象, '_json', None)
+        if isinstance(原始数据, dict):
+            return dict(原始数据)
+        if hasattr(详情对象, '__dict__'):
+            return dict(详情对象.__dict__)
+        return dict(详情对象)
     
     def _电影对象转字典(self, 电影对象) -> Dict[str, Any]:
-        """将 TMDB 电影对象转换为字典"""
-        if hasattr(电影对象, '__dict__'):
-            return dict(电影对象.__dict__)
-        return dict(电影对象)
+        """将 TMDB 电影对象转换为字典（tmdbv3api 的 AsObj 使用原始 JSON，可直接写入磁盘缓存）"""
+        return self._详情对象转字典(电影对象)
     
     def _电视剧对象转字典(self, 电视剧对象) -> Dict[str, Any]:
-        """将 TMDB 电视剧对象转换为字典"""
-        if hasattr(电视剧对象, '__dict__'):
-            return dict(电视剧对象.__dict__)
-        return dict(电视剧对象)
+        """将 TMDB 电视剧对象转换为字典（tmdbv3api 的 AsObj 使用原始 JSON，可直接写入磁盘缓存）"""
+        return self._详情对象转字典(电视剧对象)
     
     def _剧集对象转字典(self, 剧集对象) -> Dict[str, Any]:
-        """将 TMDB 剧集对象转换为字典"""
-        if hasattr(剧集对象, '__dict__'):
-            return dict(剧集对象.__dict__)
-        return dict(剧集对象)
+        """将 TMDB 剧集对象转换为字典（tmdbv3api 的 AsObj 使用原始 JSON，可直接写入磁盘缓存）"""
+        return self._详情对象转字典(剧集对象)
+    
+    def _季对象转字典(self, 季对象) -> Dict[str, Any]:
+        """将 TMDB 季对象转换为字典（剧集列表同样转换为字典）"""
+        原始数据 = getattr(季对象, '_json', None)
+        if isinstance(原始数据, dict):
+            return dict(原始数据)
+        季字典 = dict(季对象.__dict__) if hasattr(季对象, '__dict__') else dict(季对象)
+        季字典["episodes"] = [
+            self._剧集对象转字典(剧集) for 剧集 in 季字典.get("episodes") or []
+        ]
+        return 季字典
     
     def 清空缓存(self) -> None:
         """清空所有缓存"""
@@ -592,11 +1618,24 @@ class 增强TMDB客户端:
         """
         获取缓存统计信息
         
+        request_hits / request_coalesced / request_misses 分别表示由缓存满足、
+        合并到其他线程正在进行的请求、缓存未命中的查询次数；
+        cross_process_coalesced 是未命中后等到其他进程写入结果、没有发出请求的次数
+        
         Returns:
             dict: 缓存统计信息
         """
+        with self._请求合并锁:
+            请求统计 = {
+                "request_hits": self._请求命中次数,
+                "request_coalesced": self._请求合并次数,
+                "request_misses": self._请求未命中次数,
+                "cross_process_coalesced": self._跨进程合并次数,
+                "background_refreshes": self._后台刷新次数,
+            }
+        
         if not self.启用缓存 or not self.缓存:
-            return {
+            stats = {
                 "enabled": False,
                 "memory_hits": 0,
                 "memory_misses": 0,
@@ -608,11 +1647,23 @@ class 增强TMDB客户端:
                 "memory_entries": 0,
                 "max_memory_entries": 0
             }
+            stats.update(请求统计)
+            return stats
         
         stats = self.缓存.获取统计信息()
         stats["enabled"] = True
+        stats.update(请求统计)
         return stats
     
+    def 获取限流统计(self) -> dict:
+        """
+        获取速率限制器状态
+        
+        Returns:
+            dict: 当前速率（current_rate）、并发上限、进行中和排队（queue_depth）的请求数等
+        """
+        return self.限制器.获取统计信息()
+    
     def 批量搜索电影(
         self,
         标题列表: List[str],
@@ -685,10 +1736,63 @@ class 增强TMDB客户端:
         logger.info(f"批量搜索完成: {len(标题列表)} 个电视剧")
         return 结果字典
     
+    def 预热缓存(
+        self,
+        电影id列表: Iterable[int] = (),
+        电视剧季表: Optional[Dict[int, Iterable[int]]] = None
+    ) -> dict:
+        """
+        按已知的 TMDB ID 批量预热缓存（并发执行）
+        
+        已缓存的内容不会重复请求；电视剧的各季通过 append_to_response 与详情合并请求。
+        所有请求经过共用的速率限制器，并发数不超过最大并发请求数。
+        
+        Args:
+            电影id列表: 电影 ID
+            电视剧季表: 电视剧 ID → 需要预热的季号
+            
+        Returns:
+            dict: 预热的条目数（requested）、成功数（succeeded）、失败数（failed）
+                和实际发出的请求数（api_requests）
+        """
+        线程池 = self._获取线程池()
+        with self._请求合并锁:
+            起始请求数 = self._请求未命中次数
+            起始合并数 = self._跨进程合并次数
+        
+        futures = [
+            线程池.submit(self.获取电影详情, 电影id)
+            for 电影id in dict.fromkeys(电影id列表)
+        ]
+        for 电视剧id, 季号列表 in (电视剧季表 or {}).items():
+            附加内容 = [f"season/{季数}" for 季数 in sorted(set(季号列表))]
+            futures.append(线程池.submit(self.获取电视剧详情, 电视剧id, True, 附加内容 or None))
+        
+        成功数 = 0
+        for future in as_completed(futures):
+            try:
+                if future.result() is not None:
+                    成功数 += 1
+            except Exception as e:
+                logger.error(f"预热缓存失败: {e}")
+        
+        with self._请求合并锁:
+            请求数 = self._请求未命中次数 - 起始请求数 - (self._跨进程合并次数 - 起始合并数)
+        
+        logger.info(f"缓存预热完成: {成功数}/{len(futures)} 个条目，发出 {请求数} 次请求")
+        return {
+            "requested": len(futures),
+            "succeeded": 成功数,
+            "failed": len(futures) - 成功数,
+            "api_requests": 请求数
+        }
+    
     def __del__(self):
-        """析构函数，清理线程池"""
-        if self._线程池 is not None:
+        """析构函数，清理线程池和连接池"""
+        if getattr(self, "_线程池", None) is not None:
             self._线程池.shutdown(wait=False)
+        if getattr(self, "传输", None) is not None:
+            self.传输.关闭()
 
 
 # 保持向后兼容的英文接口
@@ -718,18 +1822,20 @@ class EnhancedTMDBClient(增强TMDB客户端):
     def get_movie_details(
         self,
         movie_id: int,
-        use_cache: bool = True
+        use_cache: bool = True,
+        append_to_response: Optional[Sequence[str]] = None
     ) -> Optional[Dict[str, Any]]:
         """获取电影详情"""
-        return self.获取电影详情(电影id=movie_id, 使用缓存=use_cache)
+        return self.获取电影详情(电影id=movie_id, 使用缓存=use_cache, 附加内容=append_to_response)
     
     def get_tv_details(
         self,
         tv_id: int,
-        use_cache: bool = True
+        use_cache: bool = True,
+        append_to_response: Optional[Sequence[str]] = None
     ) -> Optional[Dict[str, Any]]:
         """获取电视剧详情"""
-        return self.获取电视剧详情(电视剧id=tv_id, 使用缓存=use_cache)
+        return self.获取电视剧详情(电视剧id=tv_id, 使用缓存=use_cache, 附加内容=append_to_response)
     
     def get_episode_details(
         self,
@@ -746,10 +1852,27 @@ class EnhancedTMDBClient(增强TMDB客户端):
             使用缓存=use_cache
         )
     
+    def get_season_details(
+        self,
+        tv_id: int,
+        season_number: int,
+        use_cache: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """获取整季详情"""
+        return self.获取季详情(
+            电视剧id=tv_id,
+            季数=season_number,
+            使用缓存=use_cache
+        )
+    
     def clear_cache(self) -> None:
         """清空缓存"""
         self.清空缓存()
     
+    def get_rate_limit_stats(self) -> dict:
+        """获取速率限制器状态"""
+        return self.获取限流统计()
+    
     def get_cache_stats(self) -> dict:
         """获取缓存统计"""
         return self.获取缓存统计()
@@ -769,3 +1892,11 @@ class EnhancedTMDBClient(增强TMDB客户端):
     ) -> Dict[str, List[Dict[str, Any]]]:
         """批量搜索电视剧"""
         return self.批量搜索电视剧(标题列表=titles, 使用缓存=use_cache)
+    
+    def warm_cache(
+        self,
+        movie_ids: Iterable[int] = (),
+        tv_seasons: Optional[Dict[int, Iterable[int]]] = None
+    ) -> dict:
+        """按 TMDB ID 批量预热缓存"""
+        return self.预热缓存(电影id列表=movie_ids, 电视剧季表=tv_seasons)
@@ -15,6 +15,13 @@ from smartrenamer.core.scanner import FileScanner
 from smartrenamer.core.library import MediaLibrary
 from smartrenamer.core.parser import FileNameParser, 文件名解析器
 from smartrenamer.core.matcher import Matcher, MatchResult, 智能匹配器, 匹配结果
+from smartrenamer.core.similarity import (
+    SimilarityBackend,
+    相似度后端,
+    get_similarity_backend,
+    获取相似度后端,
+)
+from smartrenamer.core.title_index import TitleIndex, 标题索引
 from smartrenamer.core.renamer import (
     Renamer,
     重命名器,
@@ -45,6 +52,12 @@ __all__ = [
     "MatchResult",
     "智能匹配器",
     "匹配结果",
+    "SimilarityBackend",
+    "相似度后端",
+    "get_similarity_backend",
+    "获取相似度后端",
+    "TitleIndex",
+    "标题索引",
     "Renamer",
     "重命名器",
     "RenameRuleManager",
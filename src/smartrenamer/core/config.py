@@ -10,6 +10,11 @@ from typing import Optional, Dict, Any
 from dataclasses import dataclass, asdict
 
 
+# 可选的 TMDB 传输方式和磁盘缓存后端（与 api.factory / api.cache_backends 保持一致）
+SUPPORTED_TMDB_TRANSPORTS = ("tmdbv3api", "native", "record", "replay")
+SUPPORTED_TMDB_CACHE_BACKENDS = ("sqlite", "json")
+
+
 @dataclass
 class Config:
     """
@@ -53,6 +58,20 @@ class Config:
     tmdb_cache_enabled: bool = True
     tmdb_cache_ttl_hours: int = 168  # 7 天
     tmdb_cache_max_entries: int = 1000  # 内存缓存最大条目数
+    tmdb_cache_max_memory_mb: int = 64  # 内存缓存大小上限（MB，按估算字节数），0 表示只按条目数限制
+    tmdb_negative_cache_ttl_seconds: int = 600  # 空结果/失败搜索的缓存时间（10 分钟）
+    tmdb_cache_backend: str = "sqlite"  # 磁盘缓存后端：sqlite（单文件）, json（每个键一个文件）
+    tmdb_cache_max_disk_mb: int = 512  # 磁盘缓存大小上限（MB）
+    tmdb_cache_shared: bool = False  # 多个进程共享同一个缓存目录（使用 sqlite 后端，跨进程合并同一个键的请求）
+    tmdb_requests_per_second: float = 20.0  # TMDB 请求速率上限（令牌桶），0 表示不限制
+    tmdb_transport: str = "tmdbv3api"  # TMDB 传输方式：tmdbv3api, native（连接池化的原生 HTTP）, record（录制夹具）, replay（离线回放夹具）
+    tmdb_fixture_path: str = ""  # record / replay 使用的夹具档案，空表示缓存目录下的 tmdb_fixtures.json.gz
+    tmdb_replay_latency_ms: float = 0.0  # 回放时每个请求的模拟延迟（毫秒）
+    tmdb_replay_throttle_rate: float = 0.0  # 回放时注入 429 限流响应的概率
+    tmdb_replay_error_rate: float = 0.0  # 回放时注入 503 错误的概率
+    tmdb_cache_ttl_hours_by_kind: dict = None  # 按缓存键前缀设置的有效期（小时），未列出的使用 tmdb_cache_ttl_hours
+    tmdb_cache_stale_hours: int = 24  # 过期后仍先返回旧值并在后台刷新的时间（小时），0 表示关闭
+    title_index_enabled: bool = True  # 启用本地标题索引（匹配前先查本地）
     
     # 日志设置
     log_level: str = "INFO"
@@ -82,6 +101,10 @@ class Config:
             cpu_count = os.cpu_count() or 4
             self.rename_worker_count = min(max(cpu_count, 1), 8)
         
+        # 默认不按类型区分，所有条目使用 tmdb_cache_ttl_hours
+        if self.tmdb_cache_ttl_hours_by_kind is None:
+            self.tmdb_cache_ttl_hours_by_kind = {}
+        
         # 初始化存储配置
         if self.storage_configs is None:
             self.storage_configs = {
@@ -233,6 +256,27 @@ class Config:
         if self.request_timeout < 1:
             return False, "请求超时时间必须大于 0"
         
+        if self.tmdb_requests_per_second < 0:
+            return False, "TMDB 请求速率不能为负数"
+        
+        if self.tmdb_cache_max_memory_mb < 0:
+            return False, "TMDB 内存缓存大小不能为负数"
+        
+        if not (0 <= self.tmdb_replay_throttle_rate <= 1 and 0 <= self.tmdb_replay_error_rate <= 1):
+            return False, "TMDB 回放注入概率必须在 0 到 1 之间"
+        
+        if self.tmdb_transport not in SUPPORTED_TMDB_TRANSPORTS:
+            return False, (
+                f"未知的 TMDB 传输方式: {self.tmdb_transport}，"
+                f"可选: {', '.join(SUPPORTED_TMDB_TRANSPORTS)}"
+            )
+        
+        if self.tmdb_cache_backend not in SUPPORTED_TMDB_CACHE_BACKENDS:
+            return False, (
+                f"未知的 TMDB 磁盘缓存后端: {self.tmdb_cache_backend}，"
+                f"可选: {', '.join(SUPPORTED_TMDB_CACHE_BACKENDS)}"
+            )
+        
         return True, None
 
 
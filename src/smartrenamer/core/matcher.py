@@ -3,11 +3,15 @@
 
 将本地媒体文件与 TMDB 数据库进行智能匹配
 """
+import heapq
 import logging
-from typing import Optional, List, Dict, Any, Tuple
-from difflib import SequenceMatcher
+from threading import Event
+from typing import Optional, List, Dict, Any, Tuple, Union, Iterator
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from .models import MediaFile, MediaType
 from .parser import 文件名解析器
+from .similarity import 相似度后端, 获取相似度后端
+from .title_index import 标题索引
 from ..api.tmdb_client_enhanced import 增强TMDB客户端
 from ..api.factory import get_tmdb_client
 from .config import get_config
@@ -51,6 +55,51 @@ class 匹配结果:
             "match_reason": self.匹配原因,
         }
     
+    # 英文只读属性（供 UI 使用）
+    @property
+    def tmdb_id(self) -> Optional[int]:
+        """TMDB ID"""
+        return self.tmdb数据.get('id')
+    
+    @property
+    def title(self) -> str:
+        """标题"""
+        return self.tmdb数据.get('title') or self.tmdb数据.get('name', '')
+    
+    @property
+    def year(self) -> Optional[int]:
+        """年份"""
+        日期 = self.tmdb数据.get('release_date') or self.tmdb数据.get('first_air_date') or ''
+        try:
+            return int(日期[:4])
+        except ValueError:
+            return None
+    
+    @property
+    def is_movie(self) -> bool:
+        """是否为电影"""
+        return self.媒体类型 == MediaType.MOVIE
+    
+    @property
+    def confidence(self) -> float:
+        """匹配相似度"""
+        return self.相似度
+    
+    @property
+    def reason(self) -> str:
+        """匹配原因"""
+        return self.匹配原因
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """TMDB 数据"""
+        return self.tmdb数据
+    
+    @property
+    def auto_confirm(self) -> bool:
+        """相似度是否达到自动确认阈值"""
+        return self.相似度 >= 智能匹配器.高相似度
+    
     def __repr__(self) -> str:
         标题 = self.tmdb数据.get('title') or self.tmdb数据.get('name', 'Unknown')
         return f"匹配结果(标题={标题}, 相似度={self.相似度:.2f}, 原因={self.匹配原因})"
@@ -66,11 +115,14 @@ class 智能匹配器:
     # 相似度阈值
     最小相似度 = 0.6  # 最低匹配相似度
     高相似度 = 0.85  # 高相似度阈值，超过此值可以自动匹配
+    季预取阈值 = 2  # 同一季文件数达到此值时整季预取剧集信息
     
     def __init__(
         self,
         tmdb客户端: Optional[增强TMDB客户端] = None,
-        解析器: Optional[文件名解析器] = None
+        解析器: Optional[文件名解析器] = None,
+        相似度算法: Optional[Union[str, 相似度后端]] = None,
+        本地索引: Optional[标题索引] = None
     ):
         """
         初始化匹配器
@@ -78,15 +130,23 @@ class 智能匹配器:
         Args:
             tmdb客户端: TMDB 客户端实例（可选，如果为 None 则使用工厂创建）
             解析器: 文件名解析器实例（可选）
+            相似度算法: 相似度后端名称或实例（可选，默认 "difflib"，
+                可选 "indel"、"levenshtein"、"jaro_winkler"；阈值按 difflib 校准）
+            本地索引: 本地标题索引（可选）。未传入且使用工厂创建客户端时，
+                根据配置 title_index_enabled 在缓存目录中打开默认索引
         """
         if tmdb客户端 is None:
             config = get_config()
             self.tmdb客户端 = get_tmdb_client(config)
             logger.info("使用工厂模式创建共享 TMDB 客户端")
+            if 本地索引 is None and config.title_index_enabled:
+                本地索引 = 标题索引(config.get_cache_dir() / "title_index.db")
         else:
             self.tmdb客户端 = tmdb客户端
         
         self.解析器 = 解析器 or 文件名解析器()
+        self.相似度后端 = 获取相似度后端(相似度算法)
+        self.本地索引 = 本地索引
     
     def 匹配文件(
         self,
@@ -112,10 +172,7 @@ class 智能匹配器:
         logger.info(f"解析结果: 标题={解析结果['标题']}, 类型={解析结果['媒体类型'].value}")
         
         # 根据媒体类型进行匹配
-        if 解析结果['媒体类型'] == MediaType.TV_SHOW:
-            匹配列表 = self._匹配电视剧(解析结果, 最大结果数)
-        else:
-            匹配列表 = self._匹配电影(解析结果, 最大结果数)
+        匹配列表 = self._按类型匹配(解析结果, 最大结果数, 自动确认)
         
         # 如果启用自动确认且第一个结果相似度很高
         if 自动确认 and 匹配列表 and 匹配列表[0].相似度 >= self.高相似度:
@@ -124,6 +181,208 @@ class 智能匹配器:
         
         return 匹配列表
     
+    def 按目录匹配(
+        self,
+        文件路径列表: List[str],
+        最大结果数: int = 5
+    ) -> Dict[str, List[匹配结果]]:
+        """
+        利用目录上下文批量匹配文件
+        
+        位于同一剧集目录（如 Show Name (2008)/Season 01/）中的文件共享
+        目录解析得到的标题和年份，每个目录只发起一次 TMDB 搜索；
+        无法借助目录上下文的文件逐个匹配。
+        
+        Args:
+            文件路径列表: 文件路径列表
+            最大结果数: 每个文件返回的最大结果数
+            
+        Returns:
+            Dict[str, List[匹配结果]]: 文件路径到匹配结果列表的映射
+        """
+        结果字典: Dict[str, List[匹配结果]] = {}
+        目录分组: Dict[Tuple[str, Optional[int]], List[str]] = {}
+        目录解析结果: Dict[Tuple[str, Optional[int]], Dict[str, Any]] = {}
+        
+        for 文件路径 in 文件路径列表:
+            解析结果 = self.解析器.解析带目录上下文(文件路径)
+            
+            if not 解析结果["目录上下文"]:
+                结果字典[str(文件路径)] = self._按类型匹配(解析结果, 最大结果数)
+                continue
+            
+            分组键 = (解析结果['标题'], 解析结果['年份'])
+            目录分组.setdefault(分组键, []).append(str(文件路径))
+            目录解析结果.setdefault(分组键, 解析结果)
+        
+        for 分组键, 分组文件 in 目录分组.items():
+            logger.info(f"目录上下文匹配: {分组键[0]} ({len(分组文件)} 个文件)")
+            匹配列表 = self._匹配电视剧(目录解析结果[分组键], 最大结果数)
+            for 文件路径 in 分组文件:
+                结果字典[文件路径] = 匹配列表
+        
+        return 结果字典
+    
+    def 批量匹配(
+        self,
+        媒体文件列表: List[MediaFile],
+        最大结果数: int = 5,
+        最大并发数: Optional[int] = None
+    ) -> List[List[匹配结果]]:
+        """
+        批量匹配媒体文件
+        
+        先解析全部文件，按 (媒体类型, 标题, 年份) 对搜索请求去重，
+        以有限并发执行去重后的搜索，最后在本地为每个文件评分。
+        同一季的 24 集只需要一次搜索。
+        
+        Args:
+            媒体文件列表: MediaFile 对象列表
+            最大结果数: 每个文件返回的最大结果数
+            最大并发数: 最大并发搜索数，默认使用客户端的 最大并发请求数
+            
+        Returns:
+            List[List[匹配结果]]: 与输入顺序一致的匹配结果列表
+        """
+        if not 媒体文件列表:
+            return []
+        
+        # 1. 解析全部文件并生成去重后的查询
+        解析结果列表 = []
+        查询表: Dict[Tuple[MediaType, str, Optional[int]], Tuple[str, Optional[int]]] = {}
+        for 媒体文件 in 媒体文件列表:
+            解析结果 = self.解析器.解析带目录上下文(str(媒体文件.path))
+            解析结果列表.append(解析结果)
+            查询表.setdefault(self._查询键(解析结果), (解析结果['标题'], 解析结果['年份']))
+        
+        logger.info(f"批量匹配: {len(媒体文件列表)} 个文件, 去重后 {len(查询表)} 个查询")
+        
+        # 2. 先查本地索引，未命中的查询再以有限并发访问网络
+        索引结果表: Dict[Tuple[MediaType, str, Optional[int]], List[匹配结果]] = {}
+        for 解析结果 in 解析结果列表:
+            查询键 = self._查询键(解析结果)
+            if 查询键 in 索引结果表:
+                continue
+            索引结果表[查询键] = self._索引匹配(解析结果, 最大结果数)
+        待搜索 = [查询键 for 查询键 in 查询表 if not 索引结果表[查询键]]
+        
+        if 最大并发数 is None:
+            最大并发数 = getattr(self.tmdb客户端, '最大并发请求数', 5)
+        最大并发数 = max(1, min(最大并发数, len(待搜索) or 1))
+        
+        def 执行查询(查询键):
+            标题, 年份 = 查询表[查询键]
+            try:
+                if 查询键[0] == MediaType.TV_SHOW:
+                    return 查询键, self.tmdb客户端.搜索电视剧(标题, 年份)
+                return 查询键, self.tmdb客户端.搜索电影(标题, 年份)
+            except Exception as e:
+                logger.error(f"批量匹配搜索 '{标题}' 失败: {e}")
+                return 查询键, []
+        
+        with ThreadPoolExecutor(max_workers=最大并发数) as 线程池:
+            搜索结果表 = dict(线程池.map(执行查询, 待搜索))
+        
+        if self.本地索引 is not None:
+            for 查询键, 搜索结果 in 搜索结果表.items():
+                self._记录到索引(查询键[0], 搜索结果)
+        
+        # 3. 在本地为每个文件评分
+        结果列表 = []
+        for 解析结果 in 解析结果列表:
+            查询键 = self._查询键(解析结果)
+            if 索引结果表[查询键]:
+                结果列表.append(索引结果表[查询键])
+            elif 查询键[0] == MediaType.TV_SHOW:
+                结果列表.append(self._评分电视剧(解析结果, 搜索结果表[查询键], 最大结果数))
+            else:
+                结果列表.append(self._评分电影(解析结果, 搜索结果表[查询键], 最大结果数))
+        
+        return 结果列表
+    
+    def 流式匹配(
+        self,
+        媒体文件列表: List[MediaFile],
+        最大结果数: int = 5,
+        最大并发数: Optional[int] = None,
+        取消事件: Optional[Event] = None
+    ) -> Iterator[Tuple[MediaFile, List[匹配结果]]]:
+        """
+        流水线匹配媒体文件，按完成顺序逐个产出结果
+        
+        与 `批量匹配` 一样按 (媒体类型, 标题, 年份) 合并查询，但始终保持
+        最大并发数个查询在进行中，每个查询完成后立即产出该组全部文件的结果，
+        调用方无需等待整批完成。设置取消事件后不再提交新查询、也不再产出结果，
+        只等待已在进行中的请求结束。
+        
+        Args:
+            媒体文件列表: MediaFile 对象列表
+            最大结果数: 每个文件返回的最大结果数
+            最大并发数: 同时进行的查询数，默认使用客户端的 最大并发请求数
+            取消事件: 用于取消匹配的事件（可选）
+            
+        Yields:
+            Tuple[MediaFile, List[匹配结果]]: (媒体文件, 匹配结果列表)
+        """
+        if not 媒体文件列表:
+            return
+        
+        def 已取消() -> bool:
+            return 取消事件 is not None and 取消事件.is_set()
+        
+        # 按查询键分组，同组文件共享一次查询
+        分组: Dict[Tuple[MediaType, str, Optional[int]], List[MediaFile]] = {}
+        代表解析结果: Dict[Tuple[MediaType, str, Optional[int]], Dict[str, Any]] = {}
+        for 媒体文件 in 媒体文件列表:
+            解析结果 = self.解析器.解析带目录上下文(str(媒体文件.path))
+            查询键 = self._查询键(解析结果)
+            分组.setdefault(查询键, []).append(媒体文件)
+            代表解析结果.setdefault(查询键, 解析结果)
+        
+        if 最大并发数 is None:
+            最大并发数 = getattr(self.tmdb客户端, '最大并发请求数', 5)
+        最大并发数 = max(1, min(最大并发数, len(分组)))
+        
+        logger.info(f"流式匹配: {len(媒体文件列表)} 个文件, {len(分组)} 个查询, 并发 {最大并发数}")
+        
+        def 执行查询(查询键):
+            try:
+                return self._按类型匹配(代表解析结果[查询键], 最大结果数)
+            except Exception as e:
+                logger.error(f"流式匹配 '{查询键[1]}' 失败: {e}")
+                return []
+        
+        待提交 = iter(分组)
+        with ThreadPoolExecutor(max_workers=最大并发数) as 线程池:
+            进行中 = {}
+            
+            def 补充查询():
+                while len(进行中) < 最大并发数 and not 已取消():
+                    查询键 = next(待提交, None)
+                    if 查询键 is None:
+                        return
+                    进行中[线程池.submit(执行查询, 查询键)] = 查询键
+            
+            补充查询()
+            while 进行中:
+                已完成, _ = wait(进行中, return_when=FIRST_COMPLETED)
+                for 任务 in 已完成:
+                    查询键 = 进行中.pop(任务)
+                    if 已取消():
+                        continue
+                    匹配列表 = 任务.result()
+                    for 媒体文件 in 分组[查询键]:
+                        yield 媒体文件, 匹配列表
+                补充查询()
+    
+    @staticmethod
+    def _查询键(解析结果: Dict[str, Any]) -> Tuple[MediaType, str, Optional[int]]:
+        """生成用于搜索去重的查询键"""
+        媒体类型 = (MediaType.TV_SHOW if 解析结果['媒体类型'] == MediaType.TV_SHOW
+                else MediaType.MOVIE)
+        标题 = " ".join(解析结果['标题'].lower().split())
+        return 媒体类型, 标题, 解析结果['年份']
+    
     def 匹配媒体文件(
         self,
         媒体文件: MediaFile,
@@ -141,10 +400,107 @@ class 智能匹配器:
         """
         return self.匹配文件(str(媒体文件.path), 最大结果数)
     
-    def _匹配电影(
+    def _按类型匹配(
+        self,
+        解析结果: Dict[str, Any],
+        最大结果数: int,
+        自动确认: bool = False
+    ) -> List[匹配结果]:
+        """
+        根据解析出的媒体类型选择匹配方式
+        
+        Args:
+            解析结果: 文件名解析结果
+            最大结果数: 最大结果数
+            自动确认: 是否在确定最佳结果达到高相似度后提前结束评分
+            
+        Returns:
+            List[匹配结果]: 匹配结果列表
+        """
+        if 解析结果['媒体类型'] == MediaType.TV_SHOW:
+            return self._匹配电视剧(解析结果, 最大结果数, 自动确认)
+        return self._匹配电影(解析结果, 最大结果数, 自动确认)
+    
+    def _索引匹配(
         self,
         解析结果: Dict[str, Any],
         最大结果数: int
+    ) -> List[匹配结果]:
+        """
+        从本地标题索引匹配
+        
+        已确认的映射直接返回；否则用索引中标题、原始标题或别名相同的记录评分，
+        只有最佳结果达到高相似度时才视为命中，避免本地候选不全导致误匹配。
+        
+        Args:
+            解析结果: 文件名解析结果
+            最大结果数: 最大结果数
+            
+        Returns:
+            List[匹配结果]: 匹配结果列表，未命中返回空列表
+        """
+        if self.本地索引 is None:
+            return []
+        
+        try:
+            return self._查询索引(解析结果, 最大结果数)
+        except Exception as e:
+            logger.warning(f"查询本地标题索引失败: {e}")
+            return []
+    
+    def _查询索引(
+        self,
+        解析结果: Dict[str, Any],
+        最大结果数: int
+    ) -> List[匹配结果]:
+        """从本地标题索引匹配（见 `_索引匹配`）"""
+        媒体类型 = self._查询键(解析结果)[0]
+        标题 = 解析结果['标题']
+        
+        已确认 = self.本地索引.查找已确认(媒体类型, 标题, 解析结果['年份'])
+        if 已确认 is not None:
+            self.本地索引.记录命中(True)
+            logger.info(f"本地索引命中已确认匹配: {标题}")
+            return [匹配结果(已确认, 1.0, 媒体类型, "本地索引: 已确认匹配")]
+        
+        候选 = self.本地索引.查找候选(媒体类型, 标题)
+        if 候选:
+            if 媒体类型 == MediaType.TV_SHOW:
+                匹配列表 = self._评分电视剧(解析结果, 候选, 最大结果数)
+            else:
+                匹配列表 = self._评分电影(解析结果, 候选, 最大结果数)
+            if 匹配列表 and 匹配列表[0].相似度 >= self.高相似度:
+                self.本地索引.记录命中(True)
+                logger.info(f"本地索引命中: {标题}")
+                for 匹配 in 匹配列表:
+                    匹配.匹配原因 += ", 来源: 本地索引"
+                return 匹配列表
+        
+        self.本地索引.记录命中(False)
+        return []
+    
+    def _记录到索引(self, 媒体类型: MediaType, 搜索结果: List[Dict[str, Any]]) -> None:
+        """
+        把 TMDB 搜索结果写入本地索引
+        
+        索引只是加速手段，写入失败只记录日志，不影响匹配
+        
+        Args:
+            媒体类型: 媒体类型
+            搜索结果: TMDB 搜索结果
+        """
+        if self.本地索引 is None or not 搜索结果:
+            return
+        try:
+            self.本地索引.记录搜索结果(媒体类型, 搜索结果)
+        except Exception as e:
+            logger.warning(f"写入本地标题索引失败: {e}")
+    
+    def _匹配电影(
+        self,
+        解析结果: Dict[str, Any],
+        最大结果数: int,
+        自动确认: bool = False
     ) -> List[匹配结果]:
         """
         匹配电影
@@ -152,44 +508,60 @@ class 智能匹配器:
         Args:
             解析结果: 文件名解析结果
             最大结果数: 最大结果数
+            自动确认: 是否在确定最佳结果达到高相似度后提前结束评分
             
         Returns:
             List[匹配结果]: 匹配结果列表
         """
+        索引结果 = self._索引匹配(解析结果, 最大结果数)
+        if 索引结果:
+            return 索引结果
+        
         标题 = 解析结果['标题']
         年份 = 解析结果['年份']
         
         # 搜索电影
         搜索结果 = self.tmdb客户端.搜索电影(标题, 年份)
+        self._记录到索引(MediaType.MOVIE, 搜索结果)
         
+        return self._评分电影(解析结果, 搜索结果, 最大结果数, 自动确认)
+    
+    def _评分电影(
+        self,
+        解析结果: Dict[str, Any],
+        搜索结果: List[Dict[str, Any]],
+        最大结果数: int,
+        自动确认: bool = False
+    ) -> List[匹配结果]:
+        """
+        对电影搜索结果进行本地评分
+        
+        Args:
+            解析结果: 文件名解析结果
+            搜索结果: TMDB 搜索结果
+            最大结果数: 最大结果数
+            自动确认: 是否在确定最佳结果达到高相似度后提前结束评分
+            
+        Returns:
+            List[匹配结果]: 匹配结果列表
+        """
         if not 搜索结果:
-            logger.warning(f"未找到电影: {标题}")
+            logger.warning(f"未找到电影: {解析结果['标题']}")
             return []
         
-        # 计算相似度并排序
-        匹配列表 = []
-        for 结果 in 搜索结果[:最大结果数 * 2]:  # 多获取一些，后面筛选
-            相似度, 原因 = self._计算电影相似度(解析结果, 结果)
-            
-            if 相似度 >= self.最小相似度:
-                匹配 = 匹配结果(
-                    tmdb数据=结果,
-                    相似度=相似度,
-                    媒体类型=MediaType.MOVIE,
-                    匹配原因=原因
-                )
-                匹配列表.append(匹配)
-        
-        # 按相似度降序排序
-        匹配列表.sort(key=lambda x: x.相似度, reverse=True)
+        # 多取一些候选，后面筛选
+        匹配列表 = self._惰性评分(
+            解析结果, 搜索结果[:最大结果数 * 2], MediaType.MOVIE, 最大结果数, 自动确认
+        )
         
         logger.info(f"找到 {len(匹配列表)} 个电影匹配结果")
-        return 匹配列表[:最大结果数]
+        return 匹配列表
     
     def _匹配电视剧(
         self,
         解析结果: Dict[str, Any],
-        最大结果数: int
+        最大结果数: int,
+        自动确认: bool = False
     ) -> List[匹配结果]:
         """
         匹配电视剧
@@ -197,157 +569,224 @@ class 智能匹配器:
         Args:
             解析结果: 文件名解析结果
             最大结果数: 最大结果数
+            自动确认: 是否在确定最佳结果达到高相似度后提前结束评分
             
         Returns:
             List[匹配结果]: 匹配结果列表
         """
+        索引结果 = self._索引匹配(解析结果, 最大结果数)
+        if 索引结果:
+            return 索引结果
+        
         标题 = 解析结果['标题']
         年份 = 解析结果['年份']
         
         # 搜索电视剧
         搜索结果 = self.tmdb客户端.搜索电视剧(标题, 年份)
+        self._记录到索引(MediaType.TV_SHOW, 搜索结果)
         
-        if not 搜索结果:
-            logger.warning(f"未找到电视剧: {标题}")
-            return []
-        
-        # 计算相似度并排序
-        匹配列表 = []
-        for 结果 in 搜索结果[:最大结果数 * 2]:
-            相似度, 原因 = self._计算电视剧相似度(解析结果, 结果)
-            
-            if 相似度 >= self.最小相似度:
-                匹配 = 匹配结果(
-                    tmdb数据=结果,
-                    相似度=相似度,
-                    媒体类型=MediaType.TV_SHOW,
-                    匹配原因=原因
-                )
-                匹配列表.append(匹配)
-        
-        # 按相似度降序排序
-        匹配列表.sort(key=lambda x: x.相似度, reverse=True)
-        
-        logger.info(f"找到 {len(匹配列表)} 个电视剧匹配结果")
-        return 匹配列表[:最大结果数]
+        return self._评分电视剧(解析结果, 搜索结果, 最大结果数, 自动确认)
     
-    def _计算电影相似度(
+    def _评分电视剧(
         self,
         解析结果: Dict[str, Any],
-        tmdb结果: Dict[str, Any]
-    ) -> Tuple[float, str]:
+        搜索结果: List[Dict[str, Any]],
+        最大结果数: int,
+        自动确认: bool = False
+    ) -> List[匹配结果]:
         """
-        计算电影匹配相似度
+        对电视剧搜索结果进行本地评分
         
         Args:
-            解析结果: 解析结果
-            tmdb结果: TMDB 结果
+            解析结果: 文件名解析结果
+            搜索结果: TMDB 搜索结果
+            最大结果数: 最大结果数
+            自动确认: 是否在确定最佳结果达到高相似度后提前结束评分
             
         Returns:
-            Tuple[float, str]: (相似度, 原因)
+            List[匹配结果]: 匹配结果列表
         """
-        本地标题 = 解析结果['标题'].lower()
-        本地年份 = 解析结果['年份']
-        
-        tmdb标题 = tmdb结果.get('title', '').lower()
-        tmdb原始标题 = tmdb结果.get('original_title', '').lower()
-        tmdb年份 = None
-        
-        # 提取 TMDB 年份
-        发行日期 = tmdb结果.get('release_date', '')
-        if 发行日期:
-            try:
-                tmdb年份 = int(发行日期[:4])
-            except (ValueError, IndexError):
-                pass
+        if not 搜索结果:
+            logger.warning(f"未找到电视剧: {解析结果['标题']}")
+            return []
         
-        # 计算标题相似度
-        标题相似度 = max(
-            self._字符串相似度(本地标题, tmdb标题),
-            self._字符串相似度(本地标题, tmdb原始标题)
+        # 多取一些候选，后面筛选
+        匹配列表 = self._惰性评分(
+            解析结果, 搜索结果[:最大结果数 * 2], MediaType.TV_SHOW, 最大结果数, 自动确认
         )
         
-        # 计算年份匹配度
-        年份匹配度 = 0.0
-        if 本地年份 and tmdb年份:
-            if 本地年份 == tmdb年份:
-                年份匹配度 = 1.0
-            elif abs(本地年份 - tmdb年份) == 1:
-                # 允许1年的误差
-                年份匹配度 = 0.8
-        elif not 本地年份:
-            # 如果没有年份信息，给予中等匹配度
-            年份匹配度 = 0.5
-        
-        # 综合相似度：标题占 70%，年份占 30%
-        总相似度 = 标题相似度 * 0.7 + 年份匹配度 * 0.3
-        
-        # 生成匹配原因
-        原因 = f"标题相似度: {标题相似度:.2f}"
-        if 本地年份:
-            原因 += f", 年份: {本地年份} vs {tmdb年份}"
-        
-        return 总相似度, 原因
+        logger.info(f"找到 {len(匹配列表)} 个电视剧匹配结果")
+        return 匹配列表
     
-    def _计算电视剧相似度(
+    def _惰性评分(
         self,
         解析结果: Dict[str, Any],
-        tmdb结果: Dict[str, Any]
-    ) -> Tuple[float, str]:
+        候选列表: List[Dict[str, Any]],
+        媒体类型: MediaType,
+        最大结果数: int,
+        自动确认: bool = False
+    ) -> List[匹配结果]:
         """
-        计算电视剧匹配相似度
+        惰性评分候选并返回前 k 个结果
+        
+        先用代价很低的年份得分算出每个候选的上界（标题相似度按 1 计），
+        按上界降序处理；用小顶堆保存当前前 k 名，当剩余候选的上界已无法
+        超过第 k 名时停止。第 k 名的得分同时作为标题相似度的最低阈值，
+        使相似度后端可以提前退出。启用自动确认时，最佳结果达到高相似度
+        且不可能被超过即返回该结果。只为最终结果创建 匹配结果 对象，
+        结果顺序与按相似度降序稳定排序一致。
         
         Args:
-            解析结果: 解析结果
-            tmdb结果: TMDB 结果
+            解析结果: 文件名解析结果
+            候选列表: TMDB 搜索结果
+            媒体类型: 媒体类型
+            最大结果数: 最大结果数 (k)
+            自动确认: 是否启用提前自动确认
             
         Returns:
-            Tuple[float, str]: (相似度, 原因)
+            List[匹配结果]: 按相似度降序排列的匹配结果
         """
-        本地标题 = 解析结果['标题'].lower()
+        if 媒体类型 == MediaType.TV_SHOW:
+            标题权重, 标题字段, 原始标题字段, 日期字段 = 0.75, 'name', 'original_name', 'first_air_date'
+        else:
+            标题权重, 标题字段, 原始标题字段, 日期字段 = 0.7, 'title', 'original_title', 'release_date'
+        年份权重 = 1 - 标题权重
         本地年份 = 解析结果['年份']
         
-        tmdb标题 = tmdb结果.get('name', '').lower()
-        tmdb原始标题 = tmdb结果.get('original_name', '').lower()
-        tmdb年份 = None
-        
-        # 提取 TMDB 年份
-        首播日期 = tmdb结果.get('first_air_date', '')
-        if 首播日期:
+        # 1. 计算每个候选的得分上界
+        待评分 = []
+        for 序号, 结果 in enumerate(候选列表):
+            tmdb年份 = self._提取年份(结果.get(日期字段, ''))
+            年份匹配度 = self._年份匹配度(本地年份, tmdb年份, 媒体类型)
+            上界 = 1.0 * 标题权重 + 年份匹配度 * 年份权重
+            待评分.append((上界, 序号, 结果, tmdb年份, 年份匹配度))
+        待评分.sort(key=lambda 项: (-项[0], 项[1]))
+        
+        # 2. 按上界降序评分，小顶堆保存前 k 名: (总相似度, -序号, 标题相似度, 结果, tmdb年份)
+        本地标题 = self.相似度后端.预处理(解析结果['标题'])
+        前k名: List[tuple] = []
+        最佳 = None
+        for 上界, 序号, 结果, tmdb年份, 年份匹配度 in 待评分:
+            if 上界 < self.最小相似度:
+                break
+            if len(前k名) == 最大结果数 and (上界, -序号) < 前k名[0][:2]:
+                break
+            if (自动确认 and 最佳 is not None and 最佳[0] >= self.高相似度
+                    and (上界, -序号) < 最佳[:2]):
+                前k名 = [最佳]
+                break
+            
+            门槛 = self.最小相似度
+            if len(前k名) == 最大结果数:
+                门槛 = max(门槛, 前k名[0][0])
+            标题阈值 = (门槛 - 年份匹配度 * 年份权重) / 标题权重 - 1e-9
+            标题相似度 = self._标题相似度(
+                本地标题, 结果.get(标题字段, ''), 结果.get(原始标题字段, ''), 标题阈值
+            )
+            总相似度 = 标题相似度 * 标题权重 + 年份匹配度 * 年份权重
+            if 总相似度 < self.最小相似度:
+                continue
+            
+            项 = (总相似度, -序号, 标题相似度, 结果, tmdb年份)
+            if len(前k名) < 最大结果数:
+                heapq.heappush(前k名, 项)
+            elif 项[:2] > 前k名[0][:2]:
+                heapq.heapreplace(前k名, 项)
+            else:
+                continue
+            if 最佳 is None or 项[:2] > 最佳[:2]:
+                最佳 = 项
+        
+        # 3. 只为最终结果创建匹配结果对象
+        匹配列表 = []
+        for 总相似度, _, 标题相似度, 结果, tmdb年份 in sorted(前k名, key=lambda 项: 项[:2], reverse=True):
+            原因 = f"标题相似度: {标题相似度:.2f}"
+            if 本地年份:
+                原因 += f", 年份: {本地年份} vs {tmdb年份}"
+            匹配列表.append(匹配结果(
+                tmdb数据=结果,
+                相似度=总相似度,
+                媒体类型=媒体类型,
+                匹配原因=原因
+            ))
+        return 匹配列表
+    
+    @staticmethod
+    def _提取年份(日期: Optional[str]) -> Optional[int]:
+        """从 TMDB 日期字符串中提取年份"""
+        if 日期:
             try:
-                tmdb年份 = int(首播日期[:4])
+                return int(日期[:4])
             except (ValueError, IndexError):
                 pass
+        return None
+    
+    @staticmethod
+    def _年份匹配度(
+        本地年份: Optional[int],
+        tmdb年份: Optional[int],
+        媒体类型: MediaType
+    ) -> float:
+        """
+        计算年份匹配度
         
-        # 计算标题相似度
-        标题相似度 = max(
-            self._字符串相似度(本地标题, tmdb标题),
-            self._字符串相似度(本地标题, tmdb原始标题)
-        )
+        Args:
+            本地年份: 本地解析出的年份
+            tmdb年份: TMDB 年份
+            媒体类型: 媒体类型（电视剧可能跨越多年，放宽年份匹配）
+            
+        Returns:
+            float: 年份匹配度 (0-1)
+        """
+        if not 本地年份:
+            # 如果没有年份信息，给予中等匹配度
+            return 0.5
+        if not tmdb年份:
+            return 0.0
         
-        # 计算年份匹配度
-        年份匹配度 = 0.0
-        if 本地年份 and tmdb年份:
-            # 电视剧可能跨越多年，放宽年份匹配
-            年份差 = abs(本地年份 - tmdb年份)
+        年份差 = abs(本地年份 - tmdb年份)
+        if 媒体类型 == MediaType.TV_SHOW:
             if 年份差 == 0:
-                年份匹配度 = 1.0
-            elif 年份差 <= 2:
-                年份匹配度 = 0.8
-            elif 年份差 <= 5:
-                年份匹配度 = 0.5
-        elif not 本地年份:
-            年份匹配度 = 0.5
-        
-        # 综合相似度：标题占 75%，年份占 25%（电视剧年份不如电影重要）
-        总相似度 = 标题相似度 * 0.75 + 年份匹配度 * 0.25
+                return 1.0
+            if 年份差 <= 2:
+                return 0.8
+            if 年份差 <= 5:
+                return 0.5
+            return 0.0
         
-        # 生成匹配原因
-        原因 = f"标题相似度: {标题相似度:.2f}"
-        if 本地年份:
-            原因 += f", 年份: {本地年份} vs {tmdb年份}"
+        if 年份差 == 0:
+            return 1.0
+        if 年份差 == 1:
+            # 允许1年的误差
+            return 0.8
+        return 0.0
+    
+    def _标题相似度(
+        self,
+        本地标题: Any,
+        tmdb标题: str,
+        tmdb原始标题: str,
+        最低阈值: float
+    ) -> float:
+        """
+        计算本地标题与 TMDB 标题、原始标题相似度的较大值
         
-        return 总相似度, 原因
+        Args:
+            本地标题: 预处理过的本地标题
+            tmdb标题: TMDB 标题
+            tmdb原始标题: TMDB 原始标题
+            最低阈值: 低于此值的相似度无需精确计算
+            
+        Returns:
+            float: 相似度 (0-1)
+        """
+        相似度 = self.相似度后端.计算(本地标题, tmdb标题, 最低阈值) if tmdb标题 else 0.0
+        if tmdb原始标题 and tmdb原始标题 != tmdb标题:
+            相似度 = max(
+                相似度,
+                self.相似度后端.计算(本地标题, tmdb原始标题, max(最低阈值, 相似度))
+            )
+        return 相似度
     
     def _字符串相似度(self, 字符串1: str, 字符串2: str) -> float:
         """
@@ -360,11 +799,7 @@ class 智能匹配器:
         Returns:
             float: 相似度 (0-1)
         """
-        if not 字符串1 or not 字符串2:
-            return 0.0
-        
-        # 使用 SequenceMatcher 计算相似度
-        return SequenceMatcher(None, 字符串1, 字符串2).ratio()
+        return self.相似度后端.相似度(字符串1, 字符串2)
     
     def 应用匹配到媒体文件(
         self,
@@ -418,9 +853,83 @@ class 智能匹配器:
         媒体文件.metadata['match_reason'] = 匹配.匹配原因
         媒体文件.metadata['tmdb_data'] = tmdb数据
         
+        # 记录到本地索引，之后同名文件无需访问网络
+        if self.本地索引 is not None:
+            解析结果 = self.解析器.解析带目录上下文(str(媒体文件.path))
+            try:
+                self.本地索引.确认匹配(匹配.媒体类型, 解析结果['标题'], 解析结果['年份'], tmdb数据)
+            except Exception as e:
+                logger.warning(f"写入本地标题索引失败: {e}")
+        
         logger.info(f"已应用匹配: {媒体文件.title} (相似度: {匹配.相似度:.2f})")
         
         return 媒体文件
+    
+    def 填充剧集信息(self, 媒体文件列表: List[MediaFile]) -> int:
+        """
+        为已匹配的剧集文件填充剧集标题
+        
+        按 (tmdb_id, 季数) 分组，同一季文件数达到 季预取阈值 时只请求一次整季详情，
+        从中为该季所有文件填充剧集信息；整季数据由客户端按季缓存，
+        一季 22 集只需一次请求。同一部剧有多季需要预取时，通过电视剧详情的
+        append_to_response 在一次请求中取得这些季。
+        
+        Args:
+            媒体文件列表: MediaFile 对象列表（需已应用电视剧匹配，含季数和集数）
+            
+        Returns:
+            int: 成功填充剧集标题的文件数
+        """
+        季分组: Dict[Tuple[int, int], List[MediaFile]] = {}
+        for 媒体文件 in 媒体文件列表:
+            if (媒体文件.media_type == MediaType.TV_SHOW and 媒体文件.tmdb_id
+                    and 媒体文件.season_number is not None
+                    and 媒体文件.episode_number is not None):
+                季分组.setdefault((媒体文件.tmdb_id, 媒体文件.season_number), []).append(媒体文件)
+        
+        预取季: Dict[int, List[int]] = {}
+        for (电视剧id, 季数), 分组文件 in 季分组.items():
+            if len(分组文件) >= self.季预取阈值:
+                预取季.setdefault(电视剧id, []).append(季数)
+        
+        # 多季合并为一次电视剧详情请求
+        合并季详情: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        for 电视剧id, 季数列表 in 预取季.items():
+            if len(季数列表) < 2:
+                continue
+            详情 = self.tmdb客户端.获取电视剧详情(
+                电视剧id, 附加内容=[f"season/{季数}" for 季数 in 季数列表]
+            )
+            if isinstance(详情, dict):
+                for 季数 in 季数列表:
+                    if 详情.get(f"season/{季数}"):
+                        合并季详情[(电视剧id, 季数)] = 详情[f"season/{季数}"]
+        
+        已填充 = 0
+        for (电视剧id, 季数), 分组文件 in 季分组.items():
+            剧集表: Dict[int, Dict[str, Any]] = {}
+            if len(分组文件) >= self.季预取阈值:
+                季详情 = (合并季详情.get((电视剧id, 季数))
+                         or self.tmdb客户端.获取季详情(电视剧id, 季数))
+                if 季详情:
+                    剧集表 = {
+                        剧集.get('episode_number'): 剧集
+                        for 剧集 in 季详情.get('episodes', [])
+                    }
+                    logger.info(f"整季预取: ID={电视剧id}, S{季数}, {len(剧集表)} 集")
+            
+            for 媒体文件 in 分组文件:
+                剧集 = 剧集表.get(媒体文件.episode_number)
+                if 剧集 is None:
+                    剧集 = self.tmdb客户端.获取剧集详情(
+                        电视剧id, 季数, 媒体文件.episode_number
+                    )
+                if 剧集 and 剧集.get('name'):
+                    媒体文件.episode_title = 剧集['name']
+                    媒体文件.metadata['episode_data'] = 剧集
+                    已填充 += 1
+        
+        return 已填充
 
 
 # 保持向后兼容的英文接口
@@ -442,6 +951,42 @@ class Matcher(智能匹配器):
             自动确认=auto_confirm
         )
     
+    def match_by_directory(
+        self,
+        file_paths: List[str],
+        max_results: int = 5
+    ) -> Dict[str, List[匹配结果]]:
+        """利用目录上下文批量匹配文件"""
+        return self.按目录匹配(文件路径列表=file_paths, 最大结果数=max_results)
+    
+    def batch_match(
+        self,
+        media_files: List[MediaFile],
+        max_results: int = 5,
+        max_workers: Optional[int] = None
+    ) -> List[List[匹配结果]]:
+        """批量匹配媒体文件"""
+        return self.批量匹配(
+            媒体文件列表=media_files,
+            最大结果数=max_results,
+            最大并发数=max_workers
+        )
+    
+    def match_stream(
+        self,
+        media_files: List[MediaFile],
+        max_results: int = 5,
+        max_workers: Optional[int] = None,
+        cancel_event: Optional[Event] = None
+    ) -> Iterator[Tuple[MediaFile, List[匹配结果]]]:
+        """流水线匹配媒体文件"""
+        return self.流式匹配(
+            媒体文件列表=media_files,
+            最大结果数=max_results,
+            最大并发数=max_workers,
+            取消事件=cancel_event
+        )
+    
     def match_media_file(
         self,
         media_file: MediaFile,
@@ -457,6 +1002,10 @@ class Matcher(智能匹配器):
     ) -> MediaFile:
         """应用匹配"""
         return self.应用匹配到媒体文件(媒体文件=media_file, 匹配=match)
+    
+    def fill_episode_titles(self, media_files: List[MediaFile]) -> int:
+        """填充剧集标题（同季文件整季预取）"""
+        return self.填充剧集信息(媒体文件列表=media_files)
 
 
 # 导出别名
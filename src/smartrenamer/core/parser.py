@@ -4,6 +4,8 @@
 智能解析各种命名格式的媒体文件名，提取标题、年份、分辨率等信息
 """
 import re
+import threading
+from collections import OrderedDict
 from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 from .models import MediaType
@@ -36,7 +38,7 @@ class 文件名解析器:
         r'XviD', r'DivX'
     ]
     
-    # 季集格式模式
+    # 旧版逐个搜索的季集模式（兼容保留，解析使用下方的 `_季集词法规则`）
     季集模式列表 = [
         r'[Ss](\d{1,2})[Ee](\d{1,3})',  # S01E01
         r'[Ss](\d{1,2})\s*[Ee][Pp]?(\d{1,3})',  # S01 EP01 或 S01 E01
@@ -44,6 +46,62 @@ class 文件名解析器:
         r'第\s*(\d{1,3})\s*季\s*第\s*(\d{1,3})\s*集',  # 第1季第1集
     ]
     
+    # 季集词法规则（按优先级排列，数值越小优先级越高）
+    # 所有规则合并为一个预编译的正则，单次扫描即可完成识别，
+    # 每个分支都以固定字符开头且不含嵌套的可变量词，匹配为线性时间
+    _季集词法规则 = [
+        # S01E01 / S01 EP01 / S01E01E02 / S01E01-E03 / S01E01-03
+        ('季集', 0,
+         r'[Ss](?P<季集_季>\d{1,2})\s*[Ee][Pp]?(?P<季集_集>\d{1,3})'
+         r'(?P<季集_续>(?:[-+~]?[Ee][Pp]?\d{1,3}|-\d{1,3}(?![\dpPkK]))*)'),
+        # 1x01 / 1x01-02 / 1x01-1x03
+        ('数字季集', 1,
+         r'(?<!\d)(?P<数字季集_季>\d{1,2})[Xx](?P<数字季集_集>\d{1,3})(?!\d)'
+         r'(?P<数字季集_续>-(?:\d{1,2}[Xx])?\d{1,3}(?![\dpPkK]))?'),
+        # 第1季第1集 / 第1季第1-3集
+        ('中文季集', 2,
+         r'第\s*(?P<中文季集_季>\d{1,3})\s*季\s*第\s*(?P<中文季集_集>\d{1,3})'
+         r'(?P<中文季集_续>\s*[-~至]\s*\d{1,3})?\s*[集话話]'),
+        # 第12集 / 第12话
+        ('中文绝对集', 3,
+         r'第\s*(?P<中文绝对集_集>\d{1,4})(?P<中文绝对集_续>\s*[-~至]\s*\d{1,4})?\s*[集话話]'),
+        # [Group][Title][12][1080p] / [12v2] / [01-03]
+        # 最多三位数字且不是常见分辨率，避免 [1080]、[2160]、[720] 和年份被识别为集数
+        ('方括号绝对集', 4,
+         r'\[(?!(?:360|480|540|576|720)\])(?P<方括号绝对集_集>\d{1,3})(?:[vV]\d)?'
+         r'(?P<方括号绝对集_续>\s*-\s*\d{1,3})?(?:\s*[Ee][Nn][Dd])?\]'),
+        # [Group] Title - 123 [1080p] / [Group] Title - 01v2 / [Group] Title - 01-03
+        # 只在字幕组格式中生效（见 `_字幕组格式`），避免 Rocky - 4 之类的电影名被识别为剧集
+        ('连字符绝对集', 5,
+         r'(?<!\S)-\s+(?!(?:19|20)\d{2}(?!\d))(?P<连字符绝对集_集>\d{1,4})(?:[vV]\d)?'
+         r'(?P<连字符绝对集_续>\s*-\s*\d{1,4})?(?=[\s\[\(._]|$)'),
+    ]
+    
+    _季集正则 = re.compile(
+        '|'.join(f'(?P<{名称}>{模式})' for 名称, _, 模式 in _季集词法规则)
+    )
+    _季集优先级 = {名称: 优先级 for 名称, 优先级, _ in _季集词法规则}
+    _数字正则 = re.compile(r'\d+')
+    
+    # 字幕组发布的文件名以 [字幕组] 开头
+    _字幕组前缀正则 = re.compile(r'^\s*\[[^\]]+\]')
+    
+    # 季目录名称模式（Season 01 / S01 / 第1季 / Specials）
+    _季目录正则 = re.compile(
+        r'^\s*(?:(?:Season|Series|S)[\s._-]*(?P<季>\d{1,3})|第\s*(?P<中文季>\d{1,3})\s*季'
+        r'|(?P<特别篇>Specials?|SP|特别篇))\s*$',
+        re.IGNORECASE
+    )
+    
+    # 季包目录中的季标识（Show.Name.S01.1080p.WEB-DL）
+    _季包正则 = re.compile(r'(?<![A-Za-z0-9])[Ss](?P<季>\d{1,2})(?![\dEe])')
+    
+    # 目录上下文下文件名仅含集数的情况（01 / E05 / EP05 / Episode 5）
+    _单独集数正则 = re.compile(
+        r'(?:^|[\s._\-\[])(?:E|EP|Episode[\s._]*)?(?P<集>\d{1,3})(?=$|[\s._\-\]])',
+        re.IGNORECASE
+    )
+    
     # 需要清理的标识（常见的发布组、标签等）
     清理标识 = [
         r'\[.*?\]',  # [发布组]
@@ -53,15 +111,22 @@ class 文件名解析器:
         r'[@#]\w+',  # @发布者 #标签
     ]
     
-    def __init__(self, 自定义规则: Optional[List[str]] = None):
+    def __init__(self, 自定义规则: Optional[List[str]] = None, 最大目录缓存数: int = 1024):
         """
         初始化解析器
         
         Args:
             自定义规则: 自定义的正则表达式规则列表
+            最大目录缓存数: 目录上下文缓存的最大条目数（LRU 淘汰）
         """
         self.自定义规则 = 自定义规则 or []
         
+        # 目录上下文缓存（目录路径 -> 上下文），同一目录只解析一次；
+        # 扫描按目录顺序进行，有界的 LRU 足以覆盖正在处理的目录
+        self.最大目录缓存数 = max(1, 最大目录缓存数)
+        self._目录缓存: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._目录缓存锁 = threading.Lock()
+        
     def 解析(self, 文件名: str) -> Dict[str, Any]:
         """
         解析文件名，提取所有可能的信息
@@ -76,6 +141,8 @@ class 文件名解析器:
                 - 年份: Optional[int]
                 - 季数: Optional[int]
                 - 集数: Optional[int]
+                - 结束集数: Optional[int]，多集文件（S01E01-E03）的最后一集
+                - 绝对集数: Optional[int]，动画绝对集数（Title - 123）
                 - 分辨率: Optional[str]
                 - 来源: Optional[str]
                 - 编码: Optional[str]
@@ -87,7 +154,19 @@ class 文件名解析器:
             文件名 = 文件名.stem
         else:
             文件名 = Path(文件名).stem
+        
+        return self._解析名称(文件名)
+    
+    def _解析名称(self, 文件名: str) -> Dict[str, Any]:
+        """
+        解析不含路径和扩展名的名称（文件名或目录名）
+        
+        Args:
+            文件名: 名称
             
+        Returns:
+            Dict[str, Any]: 解析结果字典，键同 `解析`
+        """
         原始名称 = 文件名
         
         # 初始化结果
@@ -97,6 +176,8 @@ class 文件名解析器:
             "年份": None,
             "季数": None,
             "集数": None,
+            "结束集数": None,
+            "绝对集数": None,
             "分辨率": None,
             "来源": None,
             "编码": None,
@@ -105,12 +186,14 @@ class 文件名解析器:
         }
         
         # 提取季集信息，同时获取匹配位置
-        季数, 集数, 季集位置 = self._提取季集带位置(文件名)
-        if 季数 is not None and 集数 is not None:
-            结果["季数"] = 季数
-            结果["集数"] = 集数
+        季集信息 = self._识别季集(文件名)
+        if 季集信息 is not None:
+            结果["季数"] = 季集信息["季数"]
+            结果["集数"] = 季集信息["集数"]
+            结果["结束集数"] = 季集信息["结束集数"]
+            结果["绝对集数"] = 季集信息["绝对集数"]
             结果["媒体类型"] = MediaType.TV_SHOW
-            结果["_季集位置"] = 季集位置  # 内部使用
+            结果["_季集位置"] = 季集信息["位置"]  # 内部使用
         
         # 提取年份
         结果["年份"] = self._提取年份(文件名)
@@ -134,6 +217,121 @@ class 文件名解析器:
             
         return 结果
     
+    def 解析目录(self, 目录: Path) -> Optional[Dict[str, Any]]:
+        """
+        解析目录上下文（结果按目录缓存）
+        
+        识别以下两种目录结构：
+            - Show Name (2008)/Season 01/  季目录，标题和年份取自上级目录
+            - Show.Name.S01.1080p.WEB-DL/  季包目录，标题和季数取自目录本身
+        
+        Args:
+            目录: 文件所在目录
+            
+        Returns:
+            Optional[Dict[str, Any]]: 目录上下文，包含 标题、年份、季数；
+            目录不像剧集目录时返回 None
+        """
+        目录 = Path(目录)
+        键 = str(目录)
+        with self._目录缓存锁:
+            if 键 in self._目录缓存:
+                self._目录缓存.move_to_end(键)
+                return self._目录缓存[键]
+        
+        上下文 = None
+        季目录匹配 = self._季目录正则.match(目录.name)
+        
+        if 季目录匹配 and 目录.parent.name:
+            if 季目录匹配.group("特别篇"):
+                季数 = 0
+            else:
+                季数 = int(季目录匹配.group("季") or 季目录匹配.group("中文季"))
+            剧集目录 = self._解析名称(目录.parent.name)
+            if 剧集目录["标题"] != "Unknown":
+                上下文 = {
+                    "标题": 剧集目录["标题"],
+                    "年份": 剧集目录["年份"],
+                    "季数": 季数,
+                }
+        else:
+            季包匹配 = self._季包正则.search(目录.name)
+            if 季包匹配:
+                标题部分 = 目录.name[:季包匹配.start()]
+                for 模式 in self.清理标识:
+                    标题部分 = re.sub(模式, ' ', 标题部分)
+                标题部分 = re.sub(r'[._\-]+', ' ', 标题部分).strip()
+                if 标题部分:
+                    上下文 = {
+                        "标题": 标题部分,
+                        "年份": self._提取年份(目录.name),
+                        "季数": int(季包匹配.group("季")),
+                    }
+        
+        with self._目录缓存锁:
+            self._目录缓存[键] = 上下文
+            self._目录缓存.move_to_end(键)
+            while len(self._目录缓存) > self.最大目录缓存数:
+                self._目录缓存.popitem(last=False)
+        return 上下文
+    
+    def 解析带目录上下文(self, 文件路径: str) -> Dict[str, Any]:
+        """
+        结合目录上下文解析文件
+        
+        文件位于剧集目录中时，标题、年份和季数直接取自目录上下文，
+        文件名只用于识别集数；否则退回到完整的 `解析`。
+        
+        Args:
+            文件路径: 文件路径
+            
+        Returns:
+            Dict[str, Any]: 解析结果字典，键同 `解析`，额外包含
+            目录上下文: bool，是否使用了目录上下文
+        """
+        路径 = Path(文件路径)
+        上下文 = self.解析目录(路径.parent) if 路径.parent.name else None
+        
+        if 上下文 is None:
+            结果 = self.解析(路径)
+            结果["目录上下文"] = False
+            return 结果
+        
+        文件名 = 路径.stem
+        季集信息 = self._识别季集(文件名)
+        if 季集信息 is None:
+            单独集数 = self._单独集数正则.search(文件名)
+            if 单独集数 is None:
+                # 文件名中没有集数，无法借助目录上下文
+                结果 = self.解析(路径)
+                结果["目录上下文"] = False
+                return 结果
+            集数 = int(单独集数.group("集"))
+            季集信息 = {"季数": None, "集数": 集数, "结束集数": None, "绝对集数": None}
+        
+        季数 = 季集信息["季数"] if 季集信息["季数"] is not None else 上下文["季数"]
+        
+        return {
+            "媒体类型": MediaType.TV_SHOW,
+            "标题": 上下文["标题"],
+            "年份": 上下文["年份"],
+            "季数": 季数,
+            "集数": 季集信息["集数"],
+            "结束集数": 季集信息["结束集数"],
+            "绝对集数": 季集信息["绝对集数"],
+            "分辨率": self._提取分辨率(文件名),
+            "来源": self._提取来源(文件名),
+            "编码": self._提取编码(文件名),
+            "原始名称": 文件名,
+            "清理后名称": 上下文["标题"],
+            "目录上下文": True,
+        }
+    
+    def 清空目录缓存(self) -> None:
+        """清空目录上下文缓存"""
+        with self._目录缓存锁:
+            self._目录缓存.clear()
+    
     def _提取季集(self, 文本: str) -> Tuple[Optional[int], Optional[int]]:
         """
         提取季数和集数
@@ -157,18 +355,73 @@ class 文件名解析器:
         Returns:
             Tuple[Optional[int], Optional[int], Optional[int]]: (季数, 集数, 匹配位置)
         """
-        for 模式 in self.季集模式列表:
-            匹配 = re.search(模式, 文本, re.IGNORECASE)
-            if 匹配:
-                try:
-                    季数 = int(匹配.group(1))
-                    集数 = int(匹配.group(2))
-                    位置 = 匹配.start()
-                    return 季数, 集数, 位置
-                except (ValueError, IndexError):
+        季集信息 = self._识别季集(文本)
+        if 季集信息 is None or 季集信息["季数"] is None:
+            return None, None, None
+        return 季集信息["季数"], 季集信息["集数"], 季集信息["位置"]
+    
+    def _识别季集(self, 文本: str) -> Optional[Dict[str, Any]]:
+        """
+        单次扫描识别季集信息（支持多集范围和动画绝对集数）
+        
+        同一文本中出现多种格式时，按 `_季集词法规则` 的优先级选取。
+        连字符绝对集（Title - 123）只在字幕组格式的文件名中识别。
+        
+        Args:
+            文本: 要解析的文本
+            
+        Returns:
+            Optional[Dict[str, Any]]: 识别结果，包含 季数、集数、结束集数、
+            绝对集数 和 位置；未识别到返回 None
+        """
+        最佳匹配 = None
+        最佳优先级 = len(self._季集词法规则)
+        
+        for 匹配 in self._季集正则.finditer(文本):
+            优先级 = self._季集优先级[匹配.lastgroup]
+            if 优先级 < 最佳优先级:
+                if 匹配.lastgroup == '连字符绝对集' and not self._字幕组格式(文本):
                     continue
+                最佳匹配, 最佳优先级 = 匹配, 优先级
+                if 优先级 == 0:
+                    break
+        
+        if 最佳匹配 is None:
+            return None
+        
+        名称 = 最佳匹配.lastgroup
+        分组 = 最佳匹配.groupdict()
+        季文本 = 分组.get(f"{名称}_季")
+        季数 = int(季文本) if 季文本 is not None else None
+        集数 = int(分组[f"{名称}_集"])
+        
+        # 多集范围：取续接部分中的最后一个数字作为结束集数
+        结束集数 = None
+        续接 = 分组.get(f"{名称}_续")
+        if 续接:
+            结束集数 = int(self._数字正则.findall(续接)[-1])
+            if 结束集数 <= 集数:
+                结束集数 = None
         
-        return None, None, None
+        return {
+            "季数": 季数,
+            "集数": 集数,
+            "结束集数": 结束集数,
+            "绝对集数": 集数 if 季数 is None else None,
+            "位置": 最佳匹配.start(),
+        }
+    
+    def _字幕组格式(self, 文本: str) -> bool:
+        """
+        判断文本是否为字幕组发布格式：以 [字幕组] 开头且不含年份
+        
+        Args:
+            文本: 要判断的文本
+            
+        Returns:
+            bool: 是否为字幕组格式
+        """
+        return bool(self._字幕组前缀正则.match(文本)) and self._提取年份(文本) is None
     
     def _提取年份(self, 文本: str) -> Optional[int]:
         """
@@ -279,9 +532,12 @@ class 文件名解析器:
             for 模式 in 模式列表:
                 清理后 = re.sub(模式, ' ', 清理后, flags=re.IGNORECASE)
         
-        # 移除季集信息
-        for 模式 in self.季集模式列表:
-            清理后 = re.sub(模式, ' ', 清理后, flags=re.IGNORECASE)
+        # 移除季集信息（非字幕组格式中的 Title - N 属于标题）
+        字幕组格式 = self._字幕组格式(文本)
+        清理后 = self._季集正则.sub(
+            lambda 匹配: 匹配.group() if 匹配.lastgroup == '连字符绝对集' and not 字幕组格式 else ' ',
+            清理后
+        )
         
         # 移除年份（会在标题提取时单独处理）
         # 清理后 = re.sub(r'\b(19|20)\d{2}\b', ' ', 清理后)
@@ -312,7 +568,16 @@ class 文件名解析器:
         if 解析结果.get("_季集位置") is not None:
             季集位置 = 解析结果["_季集位置"]
             # 从原始文本中截取季集之前的部分
-            标题部分 = 原始文本[:季集位置]
+            前缀 = 原始文本[:季集位置]
+            # 移除发布组等标签
+            标题部分 = 前缀
+            for 模式 in self.清理标识:
+                标题部分 = re.sub(模式, ' ', 标题部分)
+            # [Group][Title][01] 形式：标题本身就在方括号中
+            if not 标题部分.strip(' ._-'):
+                方括号内容 = re.findall(r'\[([^\]]*)\]', 前缀)
+                if 方括号内容:
+                    标题部分 = 方括号内容[-1]
             # 清理标题部分
             标题部分 = re.sub(r'[._\-]+', ' ', 标题部分)
             标题部分 = 标题部分.strip()
@@ -347,8 +612,8 @@ class FileNameParser(文件名解析器):
     提供与中文接口相同的功能
     """
     
-    def __init__(self, custom_rules: Optional[List[str]] = None):
-        super().__init__(自定义规则=custom_rules)
+    def __init__(self, custom_rules: Optional[List[str]] = None, max_directory_cache: int = 1024):
+        super().__init__(自定义规则=custom_rules, 最大目录缓存数=max_directory_cache)
     
     def parse(self, filename: str) -> Dict[str, Any]:
         """
@@ -364,21 +629,61 @@ class FileNameParser(文件名解析器):
                 - year
                 - season
                 - episode
+                - episode_end
+                - absolute_episode
                 - resolution
                 - source
                 - codec
                 - original_name
                 - cleaned_name
         """
-        结果 = self.解析(filename)
+        return self._转换为英文键名(self.解析(filename))
+    
+    def parse_with_context(self, file_path: str) -> Dict[str, Any]:
+        """
+        结合目录上下文解析文件
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            Dict[str, Any]: 解析结果（英文键名），额外包含 from_directory
+        """
+        结果 = self.解析带目录上下文(file_path)
+        英文结果 = self._转换为英文键名(结果)
+        英文结果["from_directory"] = 结果["目录上下文"]
+        return 英文结果
+    
+    def parse_directory(self, directory: Path) -> Optional[Dict[str, Any]]:
+        """
+        解析目录上下文
         
-        # 转换为英文键名
+        Args:
+            directory: 目录路径
+            
+        Returns:
+            Optional[Dict[str, Any]]: 包含 title、year、season 的字典
+        """
+        上下文 = self.解析目录(directory)
+        if 上下文 is None:
+            return None
+        return {
+            "title": 上下文["标题"],
+            "year": 上下文["年份"],
+            "season": 上下文["季数"],
+        }
+    
+    @staticmethod
+    def _转换为英文键名(结果: Dict[str, Any]) -> Dict[str, Any]:
+        """将中文键名的解析结果转换为英文键名"""
         return {
             "media_type": 结果["媒体类型"],
             "title": 结果["标题"],
             "year": 结果["年份"],
             "season": 结果["季数"],
             "episode": 结果["集数"],
+            "episode_end": 结果["结束集数"],
+            "absolute_episode": 结果["绝对集数"],
             "resolution": 结果["分辨率"],
             "source": 结果["来源"],
             "codec": 结果["编码"],
@@ -5,12 +5,13 @@
 """
 import re
 import json
+import functools
 import threading
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from datetime import datetime
 from dataclasses import dataclass, field
-from jinja2 import Environment, Template, TemplateSyntaxError, UndefinedError
+from jinja2 import Environment, Template, TemplateSyntaxError, UndefinedError, nodes
 from jinja2.filters import FILTERS
 
 from .models import MediaFile, MediaType, RenameRule
@@ -150,6 +151,237 @@ lower = 全小写
 default = 默认值
 
 
+def 创建_jinja_环境() -> Environment:
+    """创建注册了自定义过滤器的 Jinja2 环境"""
+    env = Environment(autoescape=False)
+    
+    # 注册自定义过滤器
+    env.filters['填充'] = 填充
+    env.filters['pad'] = pad
+    env.filters['清理文件名'] = 清理文件名
+    env.filters['clean'] = clean
+    env.filters['截断'] = 截断
+    env.filters['truncate'] = truncate
+    env.filters['大写首字母'] = 大写首字母
+    env.filters['capitalize'] = capitalize
+    env.filters['全大写'] = 全大写
+    env.filters['upper'] = upper
+    env.filters['全小写'] = 全小写
+    env.filters['lower'] = lower
+    env.filters['默认值'] = 默认值
+    env.filters['default'] = default
+    
+    return env
+
+
+# 进程内共享的 Jinja2 环境：创建后只读，编译好的模板可被多个线程同时渲染
+_共享_jinja_环境 = 创建_jinja_环境()
+
+
+@functools.lru_cache(maxsize=256)
+def 编译模板(模板: str) -> Template:
+    """
+    编译模板并按模板文本缓存
+    
+    同一个模板文本在进程内只解析和编译一次；语法错误抛出 TemplateSyntaxError（不缓存）
+    
+    Args:
+        模板: Jinja2 模板字符串
+    
+    Returns:
+        Template: 编译好的模板
+    """
+    return _共享_jinja_环境.from_string(模板)
+
+
+# 模板快速路径
+#
+# 只由字段、常量、过滤器链和 {% if %} 组成的模板（包括全部预定义模板）直接编译为
+# Python 闭包，渲染时不经过 Jinja2 运行时；其他语法回退到 Jinja2
+
+渲染函数 = Callable[[Dict[str, Any]], Any]
+
+
+class _不支持的语法(Exception):
+    """模板包含快速路径不支持的语法"""
+
+
+class _变量未定义(Exception):
+    """上下文中没有模板引用的变量（交给 Jinja2 按 Undefined 语义渲染）"""
+
+
+def _替换(value: Any, old: Any, new: Any, count: Optional[int] = None) -> str:
+    """与 Jinja2 内置的 replace 过滤器相同（不自动转义时）"""
+    return str(value).replace(str(old), str(new), -1 if count is None else count)
+
+
+# 快速路径支持的过滤器：均为纯函数，与共享环境中同名过滤器的行为一致
+_快速过滤器 = {
+    '填充': 填充,
+    'pad': 填充,
+    '清理文件名': 清理文件名,
+    'clean': 清理文件名,
+    '截断': 截断,
+    'truncate': 截断,
+    '大写首字母': 大写首字母,
+    'capitalize': 大写首字母,
+    '全大写': 全大写,
+    'upper': 全大写,
+    '全小写': 全小写,
+    'lower': 全小写,
+    '默认值': 默认值,
+    'default': 默认值,
+    'replace': _替换,
+}
+
+
+def _编译表达式(节点: nodes.Node) -> 渲染函数:
+    """把表达式节点编译为闭包，返回值与 Jinja2 求值结果相同"""
+    if isinstance(节点, nodes.Name) and 节点.ctx == 'load':
+        名称 = 节点.name
+        
+        def 取值(上下文):
+            try:
+                return 上下文[名称]
+            except KeyError:
+                raise _变量未定义(名称) from None
+        return 取值
+    
+    if isinstance(节点, nodes.Const):
+        常量 = 节点.value
+        return lambda 上下文: 常量
+    
+    if isinstance(节点, nodes.Filter):
+        函数 = _快速过滤器.get(节点.name)
+        if (
+            函数 is None
+            or 节点.node is None
+            or 节点.kwargs
+            or 节点.dyn_args is not None
+            or 节点.dyn_kwargs is not None
+            or not all(isinstance(参数, nodes.Const) for 参数 in 节点.args)
+        ):
+            raise _不支持的语法(f"过滤器 {节点.name}")
+        参数 = tuple(参数.value for 参数 in 节点.args)
+        内层 = _编译表达式(节点.node)
+        return lambda 上下文: 函数(内层(上下文), *参数)
+    
+    if isinstance(节点, nodes.Not):
+        内层 = _编译表达式(节点.node)
+        return lambda 上下文: not 内层(上下文)
+    
+    if isinstance(节点, nodes.And):
+        左, 右 = _编译表达式(节点.left), _编译表达式(节点.right)
+        return lambda 上下文: 左(上下文) and 右(上下文)
+    
+    if isinstance(节点, nodes.Or):
+        左, 右 = _编译表达式(节点.left), _编译表达式(节点.right)
+        return lambda 上下文: 左(上下文) or 右(上下文)
+    
+    raise _不支持的语法(type(节点).__name__)
+
+
+def _编译语句(节点列表: List[nodes.Node]) -> 渲染函数:
+    """把语句节点列表编译为返回字符串的闭包"""
+    部件: List[Any] = []  # 字符串（模板文本）或返回字符串的闭包
+    for 节点 in 节点列表:
+        if isinstance(节点, nodes.Output):
+            for 子节点 in 节点.nodes:
+                if isinstance(子节点, nodes.TemplateData):
+                    部件.append(子节点.data)
+                else:
+                    表达式 = _编译表达式(子节点)
+                    部件.append(lambda 上下文, 表达式=表达式: str(表达式(上下文)))
+        elif isinstance(节点, nodes.If):
+            分支 = [(_编译表达式(节点.test), _编译语句(节点.body))]
+            分支 += [(_编译表达式(子句.test), _编译语句(子句.body)) for 子句 in 节点.elif_]
+            否则 = _编译语句(节点.else_)
+            
+            def 条件(上下文, 分支=分支, 否则=否则):
+                for 测试, 主体 in 分支:
+                    if 测试(上下文):
+                        return 主体(上下文)
+                return 否则(上下文)
+            部件.append(条件)
+        else:
+            raise _不支持的语法(type(节点).__name__)
+    
+    # 合并相邻的模板文本
+    合并: List[Any] = []
+    for 部件项 in 部件:
+        if isinstance(部件项, str) and 合并 and isinstance(合并[-1], str):
+            合并[-1] += 部件项
+        else:
+            合并.append(部件项)
+    
+    if not 合并:
+        return lambda 上下文: ''
+    if len(合并) == 1:
+        唯一 = 合并[0]
+        return (lambda 上下文: 唯一) if isinstance(唯一, str) else 唯一
+    
+    部件元组 = tuple(
+        (lambda 上下文, 文本=部件项: 文本) if isinstance(部件项, str) else 部件项
+        for 部件项 in 合并
+    )
+    return lambda 上下文: ''.join([部件项(上下文) for 部件项 in 部件元组])
+
+
+def 编译快速模板(模板: str) -> Optional[Callable[[Dict[str, Any]], str]]:
+    """
+    把简单模板编译为 Python 闭包
+    
+    支持模板文本、变量、常量、参数为常量的过滤器链（填充、清理文件名、默认值、截断、
+    大小写和 replace）以及 {% if %} / {% elif %} / {% else %}，条件可使用 not / and / or。
+    渲染结果与 Jinja2 相同；上下文缺少模板引用的变量时闭包抛出异常，
+    由 `获取渲染函数` 交给 Jinja2 处理
+    
+    Args:
+        模板: Jinja2 模板字符串
+    
+    Returns:
+        Optional[Callable[[Dict[str, Any]], str]]: 渲染函数，模板包含不支持的语法时返回 None
+    
+    Raises:
+        TemplateSyntaxError: 模板语法错误
+    """
+    try:
+        return _编译语句(_共享_jinja_环境.parse(模板).body)
+    except _不支持的语法:
+        return None
+
+
+@functools.lru_cache(maxsize=256)
+def 获取渲染函数(模板: str) -> Callable[[Dict[str, Any]], str]:
+    """
+    获取模板的渲染函数并按模板文本缓存
+    
+    优先使用 `编译快速模板` 的闭包；模板包含不支持的语法，或上下文缺少模板引用的变量时
+    使用 Jinja2 渲染。语法错误抛出 TemplateSyntaxError（不缓存）
+    
+    Args:
+        模板: Jinja2 模板字符串
+    
+    Returns:
+        Callable[[Dict[str, Any]], str]: 接受上下文字典、返回渲染结果的函数
+    """
+    快速渲染 = 编译快速模板(模板)
+    if 快速渲染 is None:
+        return 编译模板(模板).render
+    
+    def 渲染(上下文: Dict[str, Any]) -> str:
+        try:
+            return 快速渲染(上下文)
+        except _变量未定义:
+            return 编译模板(模板).render(上下文)
+    return 渲染
+
+
+# 生成文件名后的清理规则
+_多个点 = re.compile(r'\.+')
+_多个空白 = re.compile(r'\s+')
+
+
 # 预定义的重命名模板
 预定义模板 = {
     "电影-简洁": {
@@ -255,26 +487,8 @@ class 重命名规则管理器:
         self._jinja_环境 = self._创建_jinja_环境()
     
     def _创建_jinja_环境(self) -> Environment:
-        """创建 Jinja2 环境"""
-        env = Environment(autoescape=False)
-        
-        # 注册自定义过滤器
-        env.filters['填充'] = 填充
-        env.filters['pad'] = pad
-        env.filters['清理文件名'] = 清理文件名
-        env.filters['clean'] = clean
-        env.filters['截断'] = 截断
-        env.filters['truncate'] = truncate
-        env.filters['大写首字母'] = 大写首字母
-        env.filters['capitalize'] = capitalize
-        env.filters['全大写'] = 全大写
-        env.filters['upper'] = upper
-        env.filters['全小写'] = 全小写
-        env.filters['lower'] = lower
-        env.filters['默认值'] = 默认值
-        env.filters['default'] = default
-        
-        return env
+        """获取 Jinja2 环境（进程内共享）"""
+        return _共享_jinja_环境
     
     def 验证模板(self, 模板: str) -> Tuple[bool, Optional[str]]:
         """
@@ -287,7 +501,7 @@ class 重命名规则管理器:
             Tuple[bool, Optional[str]]: (是否有效, 错误信息)
         """
         try:
-            self._jinja_环境.from_string(模板)
+            编译模板(模板)
             return True, None
         except TemplateSyntaxError as e:
             return False, f"模板语法错误: {e}"
@@ -444,7 +658,8 @@ class 重命名器:
     """
     重命名执行引擎
     
-    负责执行文件重命名操作，支持预览、批量处理、撤销等功能
+    负责执行文件重命名操作，支持预览、批量处理、撤销等功能。
+    模板的渲染函数按文本缓存（见 `获取渲染函数`），同一个实例可以被多个线程同时使用
     """
     
     def __init__(self, 预览模式: bool = True, 创建备份: bool = True):
@@ -463,26 +678,8 @@ class 重命名器:
         self._目录锁 = threading.Lock()  # 保护目录创建的线程锁
     
     def _创建_jinja_环境(self) -> Environment:
-        """创建 Jinja2 环境"""
-        env = Environment(autoescape=False)
-        
-        # 注册自定义过滤器
-        env.filters['填充'] = 填充
-        env.filters['pad'] = pad
-        env.filters['清理文件名'] = 清理文件名
-        env.filters['clean'] = clean
-        env.filters['截断'] = 截断
-        env.filters['truncate'] = truncate
-        env.filters['大写首字母'] = 大写首字母
-        env.filters['capitalize'] = capitalize
-        env.filters['全大写'] = 全大写
-        env.filters['upper'] = upper
-        env.filters['全小写'] = 全小写
-        env.filters['lower'] = lower
-        env.filters['默认值'] = 默认值
-        env.filters['default'] = default
-        
-        return env
+        """获取 Jinja2 环境（进程内共享）"""
+        return _共享_jinja_环境
     
     def 生成新文件名(self, 媒体文件: MediaFile, 规则: RenameRule) -> Tuple[bool, str, Optional[str]]:
         """
@@ -510,13 +707,12 @@ class 重命名器:
                 "separator": 规则.separator,
             }
             
-            # 渲染模板
-            模板 = self._jinja_环境.from_string(规则.template)
-            新文件名 = 模板.render(**上下文)
+            # 渲染模板（渲染函数按模板文本缓存，简单模板不经过 Jinja2）
+            新文件名 = 获取渲染函数(规则.template)(上下文)
             
             # 清理文件名（移除多余的分隔符和空格）
-            新文件名 = re.sub(r'\.+', '.', 新文件名)  # 多个点替换为单个点
-            新文件名 = re.sub(r'\s+', ' ', 新文件名)  # 多个空格替换为单个空格
+            新文件名 = _多个点.sub('.', 新文件名)  # 多个点替换为单个点
+            新文件名 = _多个空白.sub(' ', 新文件名)  # 多个空格替换为单个空格
             新文件名 = 新文件名.strip('. ')  # 移除首尾的点和空格
             
             # 添加扩展名
@@ -817,6 +1013,10 @@ class 重命名器:
 
 # 英文别名
 Renamer = 重命名器
+create_jinja_environment = 创建_jinja_环境
+compile_template = 编译模板
+compile_fast_template = 编译快速模板
+get_renderer = 获取渲染函数
 
 
 def 创建预定义规则(模板名称: str) -> Optional[RenameRule]:
@@ -0,0 +1,284 @@
+"""
+字符串相似度后端
+
+为匹配器提供可替换的标题相似度算法。本地标题只预处理一次，
+之后可与任意多个候选标题比较；传入最低阈值时，能够证明结果低于阈值的比较会提前返回 0
+"""
+from difflib import SequenceMatcher
+from typing import Any, Dict, Optional, Type, Union
+
+
+def _位掩码表(文本: str) -> Dict[str, int]:
+    """生成字符到出现位置位掩码的映射（位并行算法使用）"""
+    掩码表: Dict[str, int] = {}
+    for 位置, 字符 in enumerate(文本):
+        掩码表[字符] = 掩码表.get(字符, 0) | (1 << 位置)
+    return 掩码表
+
+
+def _置位数(值: int) -> int:
+    """统计整数中为 1 的位数"""
+    return bin(值).count("1")
+
+
+class 相似度后端:
+    """
+    相似度后端基类
+    
+    子类实现 `预处理` 和 `计算`，返回 0-1 之间的相似度
+    """
+    
+    名称 = "base"
+    
+    def 预处理(self, 文本: str) -> Any:
+        """
+        预处理本地标题（转小写并生成算法所需的中间数据）
+        
+        Args:
+            文本: 本地标题
+        
+        Returns:
+            Any: 预处理结果，传给 `计算` 使用
+        """
+        return 文本.lower()
+    
+    def 计算(self, 预处理结果: Any, 候选: str, 最低阈值: float = 0.0) -> float:
+        """
+        计算预处理后的本地标题与候选标题的相似度
+        
+        Args:
+            预处理结果: `预处理` 的返回值
+            候选: 候选标题
+            最低阈值: 低于此值的结果不需要精确计算，可直接返回 0
+        
+        Returns:
+            float: 相似度 (0-1)
+        """
+        raise NotImplementedError
+    
+    def 相似度(self, 字符串1: str, 字符串2: str, 最低阈值: float = 0.0) -> float:
+        """
+        直接计算两个字符串的相似度
+        
+        Args:
+            字符串1: 第一个字符串
+            字符串2: 第二个字符串
+            最低阈值: 最低阈值
+        
+        Returns:
+            float: 相似度 (0-1)
+        """
+        if not 字符串1 or not 字符串2:
+            return 0.0
+        return self.计算(self.预处理(字符串1), 字符串2, 最低阈值)
+
+
+class Difflib相似度(相似度后端):
+    """
+    基于 difflib.SequenceMatcher 的相似度（原实现）
+    
+    本地标题作为 seq2 只分析一次，并用 quick_ratio 上界提前排除候选
+    """
+    
+    名称 = "difflib"
+    
+    def 预处理(self, 文本: str) -> SequenceMatcher:
+        匹配器 = SequenceMatcher(None)
+        匹配器.set_seq2(文本.lower())
+        return 匹配器
+    
+    def 计算(self, 预处理结果: SequenceMatcher, 候选: str, 最低阈值: float = 0.0) -> float:
+        if not 预处理结果.b or not 候选:
+            return 0.0
+        预处理结果.set_seq1(候选.lower())
+        if 最低阈值 > 0 and (预处理结果.real_quick_ratio() < 最低阈值
+                          or 预处理结果.quick_ratio() < 最低阈值):
+            return 0.0
+        return 预处理结果.ratio()
+
+
+class 公共子序列相似度(相似度后端):
+    """
+    基于最长公共子序列的相似度：2 * LCS / (len1 + len2)
+    
+    公式与 difflib 的 ratio 相同，但使用精确的 LCS（difflib 用匹配块近似，结果不高于本后端），
+    因此分数通常更高，沿用 difflib 的阈值会放宽匹配；
+    使用位并行算法，每个候选字符只需常数次整数运算
+    """
+    
+    名称 = "indel"
+    
+    def 预处理(self, 文本: str) -> tuple:
+        文本 = 文本.lower()
+        return 文本, _位掩码表(文本), (1 << len(文本)) - 1
+    
+    def 计算(self, 预处理结果: tuple, 候选: str, 最低阈值: float = 0.0) -> float:
+        文本, 掩码表, 全掩码 = 预处理结果
+        候选 = 候选.lower()
+        长度1, 长度2 = len(文本), len(候选)
+        if not 长度1 or not 长度2:
+            return 0.0
+        if 文本 == 候选:
+            return 1.0
+        
+        总长度 = 长度1 + 长度2
+        if 2 * min(长度1, 长度2) / 总长度 < 最低阈值:
+            return 0.0
+        
+        # Hyyrö 位并行 LCS：V 中为 0 的位数即 LCS 长度
+        V = 全掩码
+        for 字符 in 候选:
+            U = V & 掩码表.get(字符, 0)
+            V = ((V + U) | (V - U)) & 全掩码
+        公共长度 = 长度1 - _置位数(V)
+        
+        return 2 * 公共长度 / 总长度
+
+
+class 编辑距离相似度(相似度后端):
+    """
+    归一化 Levenshtein 相似度：1 - 距离 / max(len1, len2)
+    
+    使用 Myers/Hyyrö 位并行编辑距离，并在剩余字符不足以把距离降到阈值内时提前退出
+    """
+    
+    名称 = "levenshtein"
+    
+    def 预处理(self, 文本: str) -> tuple:
+        文本 = 文本.lower()
+        return 文本, _位掩码表(文本), (1 << len(文本)) - 1
+    
+    def 计算(self, 预处理结果: tuple, 候选: str, 最低阈值: float = 0.0) -> float:
+        文本, 掩码表, 全掩码 = 预处理结果
+        候选 = 候选.lower()
+        长度1, 长度2 = len(文本), len(候选)
+        if not 长度1 or not 长度2:
+            return 0.0
+        if 文本 == 候选:
+            return 1.0
+        
+        最大长度 = max(长度1, 长度2)
+        允许距离 = int((1 - 最低阈值) * 最大长度 + 1e-9)
+        if abs(长度1 - 长度2) > 允许距离:
+            return 0.0
+        
+        最高位 = 1 << (长度1 - 1)
+        Pv, Mv, 距离 = 全掩码, 0, 长度1
+        for 已处理, 字符 in enumerate(候选, 1):
+            Eq = 掩码表.get(字符, 0)
+            Xv = Eq | Mv
+            Xh = (((Eq & Pv) + Pv) ^ Pv) | Eq
+            Ph = Mv | (~(Xh | Pv) & 全掩码)
+            Mh = Pv & Xh
+            if Ph & 最高位:
+                距离 += 1
+            elif Mh & 最高位:
+                距离 -= 1
+            # 剩余每个字符最多让距离减 1
+            if 距离 - (长度2 - 已处理) > 允许距离:
+                return 0.0
+            Ph = ((Ph << 1) | 1) & 全掩码
+            Mh = (Mh << 1) & 全掩码
+            Pv = Mh | (~(Xv | Ph) & 全掩码)
+            Mv = Ph & Xv
+        
+        return 1 - 距离 / 最大长度
+
+
+class JaroWinkler相似度(相似度后端):
+    """
+    Jaro-Winkler 相似度
+    
+    对共同前缀给予额外加分，适合处理标题尾部附加信息（副标题、版本）的情况
+    """
+    
+    名称 = "jaro_winkler"
+    
+    前缀权重 = 0.1
+    最大前缀长度 = 4
+    
+    def 计算(self, 预处理结果: str, 候选: str, 最低阈值: float = 0.0) -> float:
+        文本 = 预处理结果
+        候选 = 候选.lower()
+        长度1, 长度2 = len(文本), len(候选)
+        if not 长度1 or not 长度2:
+            return 0.0
+        if 文本 == 候选:
+            return 1.0
+        
+        # 上界：全部较短串字符都匹配且无换位，前缀加分取最大
+        较短, 较长 = min(长度1, 长度2), max(长度1, 长度2)
+        jaro上界 = (1 + 较短 / 较长 + 1) / 3
+        if jaro上界 + self.最大前缀长度 * self.前缀权重 * (1 - jaro上界) < 最低阈值:
+            return 0.0
+        
+        窗口 = max(较长 // 2 - 1, 0)
+        已匹配2 = [False] * 长度2
+        匹配字符1 = []
+        for i, 字符 in enumerate(文本):
+            起点, 终点 = max(0, i - 窗口), min(长度2, i + 窗口 + 1)
+            for j in range(起点, 终点):
+                if not 已匹配2[j] and 候选[j] == 字符:
+                    已匹配2[j] = True
+                    匹配字符1.append(字符)
+                    break
+        
+        匹配数 = len(匹配字符1)
+        if 匹配数 == 0:
+            return 0.0
+        
+        匹配字符2 = [候选[j] for j in range(长度2) if 已匹配2[j]]
+        换位数 = sum(1 for a, b in zip(匹配字符1, 匹配字符2) if a != b) // 2
+        jaro = (匹配数 / 长度1 + 匹配数 / 长度2 + (匹配数 - 换位数) / 匹配数) / 3
+        
+        前缀长度 = 0
+        for a, b in zip(文本[:self.最大前缀长度], 候选[:self.最大前缀长度]):
+            if a != b:
+                break
+            前缀长度 += 1
+        
+        return jaro + 前缀长度 * self.前缀权重 * (1 - jaro)
+
+
+# 已注册的相似度后端
+相似度后端表: Dict[str, Type[相似度后端]] = {
+    Difflib相似度.名称: Difflib相似度,
+    公共子序列相似度.名称: 公共子序列相似度,
+    编辑距离相似度.名称: 编辑距离相似度,
+    JaroWinkler相似度.名称: JaroWinkler相似度,
+}
+
+# 默认后端：匹配器的阈值按 difflib 的 ratio 校准。其他后端的分数分布不同
+# （indel 不低于 difflib，常常明显更高），改用时需要重新校准 最小相似度 等阈值
+默认相似度后端 = Difflib相似度.名称
+
+
+def 获取相似度后端(后端: Optional[Union[str, 相似度后端]] = None) -> 相似度后端:
+    """
+    获取相似度后端实例
+    
+    Args:
+        后端: 后端名称或实例，None 表示默认后端
+    
+    Returns:
+        相似度后端: 后端实例
+    
+    Raises:
+        ValueError: 未知的后端名称
+    """
+    if isinstance(后端, 相似度后端):
+        return 后端
+    名称 = 后端 or 默认相似度后端
+    if 名称 not in 相似度后端表:
+        raise ValueError(f"未知的相似度后端: {名称}，可选: {', '.join(相似度后端表)}")
+    return 相似度后端表[名称]()
+
+
+# 英文别名
+SimilarityBackend = 相似度后端
+DifflibSimilarity = Difflib相似度
+IndelSimilarity = 公共子序列相似度
+LevenshteinSimilarity = 编辑距离相似度
+JaroWinklerSimilarity = JaroWinkler相似度
+SIMILARITY_BACKENDS = 相似度后端表
+get_similarity_backend = 获取相似度后端
@@ -0,0 +1,374 @@
+"""
+本地标题索引
+
+在本地 SQLite 数据库中保存已确认的 (标准化标题, 年份) → tmdb_id 映射，
+以及匹配过程中见过的 TMDB 记录（含标题、原始标题和别名），
+使匹配器在查询 TMDB 之前先从本地找出候选
+"""
+import json
+import logging
+import re
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .models import MediaType
+
+logger = logging.getLogger(__name__)
+
+
+def _转为普通数据(值: Any) -> Any:
+    """
+    把 TMDB 结果转换为可 JSON 序列化的普通字典和列表
+    
+    tmdbv3api 返回的 AsObj 对象（以及由其 __dict__ 复制出的字典）保存了原始 JSON，优先使用；
+    其他字典和列表逐层转换，忽略以下划线开头的内部字段
+    """
+    原始数据 = getattr(值, '_json', None)
+    if isinstance(值, dict) and '_json' in 值:
+        原始数据 = 值['_json']
+    if isinstance(原始数据, (dict, list)):
+        return 原始数据
+    if isinstance(值, dict):
+        return {
+            键: _转为普通数据(子值) for 键, 子值 in 值.items()
+            if not (isinstance(键, str) and 键.startswith('_'))
+        }
+    if isinstance(值, (list, tuple)):
+        return [_转为普通数据(子值) for 子值 in 值]
+    if hasattr(值, '__dict__') and not isinstance(值, type):
+        return _转为普通数据(dict(vars(值)))
+    return 值
+
+
+class 标题索引:
+    """
+    本地离线标题索引
+    
+    数据表:
+        records: 见过的 TMDB 记录 (媒体类型, tmdb_id) → JSON 数据
+        titles: 标准化标题 → tmdb_id，类型为 title / original / alias
+        confirmed: 已确认的 (标准化标题, 年份) → tmdb_id
+    """
+    
+    _建表语句 = """
+        CREATE TABLE IF NOT EXISTS records (
+            media_type TEXT NOT NULL,
+            tmdb_id INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            updated REAL NOT NULL,
+            PRIMARY KEY (media_type, tmdb_id)
+        );
+        CREATE TABLE IF NOT EXISTS titles (
+            media_type TEXT NOT NULL,
+            title_key TEXT NOT NULL,
+            tmdb_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            PRIMARY KEY (media_type, title_key, tmdb_id)
+        );
+        CREATE TABLE IF NOT EXISTS confirmed (
+            media_type TEXT NOT NULL,
+            title_key TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            tmdb_id INTEGER NOT NULL,
+            updated REAL NOT NULL,
+            PRIMARY KEY (media_type, title_key, year)
+        );
+    """
+    
+    _非单词字符 = re.compile(r"[^\w]+")
+    
+    def __init__(self, 数据库路径: Optional[Union[str, Path]] = None):
+        """
+        初始化标题索引
+        
+        Args:
+            数据库路径: SQLite 数据库文件路径，None 表示仅使用内存数据库
+        """
+        if 数据库路径 is None:
+            self.数据库路径 = ":memory:"
+        else:
+            self.数据库路径 = str(数据库路径)
+            Path(数据库路径).parent.mkdir(parents=True, exist_ok=True)
+        
+        self._锁 = Lock()
+        self._连接 = sqlite3.connect(self.数据库路径, check_same_thread=False)
+        self._连接.executescript(self._建表语句)
+        self._连接.commit()
+        
+        # 统计信息
+        self.命中次数 = 0
+        self.未命中次数 = 0
+        
+        logger.debug(f"标题索引已打开: {self.数据库路径}")
+    
+    @classmethod
+    def 标准化标题(cls, 标题: str) -> str:
+        """
+        标准化标题：转小写，标点视为空格，合并空白
+        
+        Args:
+            标题: 原始标题
+        
+        Returns:
+            str: 标准化后的标题
+        """
+        return " ".join(cls._非单词字符.sub(" ", 标题.lower()).split())
+    
+    @staticmethod
+    def _类型值(媒体类型: MediaType) -> str:
+        """索引只区分电影和电视剧"""
+        return "tv" if 媒体类型 == MediaType.TV_SHOW else "movie"
+    
+    @staticmethod
+    def _标题字段(媒体类型: MediaType) -> tuple:
+        """返回 TMDB 记录中的 (标题字段, 原始标题字段)"""
+        if 媒体类型 == MediaType.TV_SHOW:
+            return "name", "original_name"
+        return "title", "original_title"
+    
+    def 记录搜索结果(self, 媒体类型: MediaType, 搜索结果: Iterable[Dict[str, Any]]) -> None:
+        """
+        保存 TMDB 搜索结果及其标题、原始标题
+        
+        Args:
+            媒体类型: 媒体类型
+            搜索结果: TMDB 搜索结果列表（字典或 tmdbv3api 的 AsObj 对象）
+        """
+        类型值 = self._类型值(媒体类型)
+        标题字段, 原始标题字段 = self._标题字段(媒体类型)
+        现在 = time.time()
+        记录行, 标题行 = [], []
+        
+        for 结果 in 搜索结果:
+            结果 = _转为普通数据(结果)
+            if not isinstance(结果, dict):
+                continue
+            tmdb_id = 结果.get("id")
+            if tmdb_id is None:
+                continue
+            记录行.append((类型值, tmdb_id, json.dumps(结果, ensure_ascii=False), 现在))
+            for 字段, 种类 in ((标题字段, "title"), (原始标题字段, "original")):
+                标题键 = self.标准化标题(结果.get(字段) or "")
+                if 标题键:
+                    标题行.append((类型值, 标题键, tmdb_id, 种类))
+        
+        if not 记录行:
+            return
+        
+        with self._锁, self._连接:
+            self._连接.executemany(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)", 记录行
+            )
+            self._连接.executemany(
+                "INSERT OR IGNORE INTO titles VALUES (?, ?, ?, ?)", 标题行
+            )
+    
+    def 添加别名(self, 媒体类型: MediaType, tmdb_id: int, 别名: str) -> None:
+        """
+        为已知记录添加别名
+        
+        Args:
+            媒体类型: 媒体类型
+            tmdb_id: TMDB ID
+            别名: 别名（如中文译名、缩写）
+        """
+        标题键 = self.标准化标题(别名)
+        if not 标题键:
+            return
+        with self._锁, self._连接:
+            self._连接.execute(
+                "INSERT OR REPLACE INTO titles VALUES (?, ?, ?, 'alias')",
+                (self._类型值(媒体类型), 标题键, tmdb_id)
+            )
+    
+    def 确认匹配(
+        self,
+        媒体类型: MediaType,
+        标题: str,
+        年份: Optional[int],
+        tmdb数据: Dict[str, Any]
+    ) -> None:
+        """
+        记录一次已确认的匹配
+        
+        本地标题同时作为该记录的别名保存，之后的同名查询可直接命中。
+        
+        Args:
+            媒体类型: 媒体类型
+            标题: 本地解析出的标题
+            年份: 本地解析出的年份
+            tmdb数据: 确认的 TMDB 记录
+        """
+        tmdb_id = tmdb数据.get("id")
+        标题键 = self.标准化标题(标题)
+        if tmdb_id is None or not 标题键:
+            return
+        
+        self.记录搜索结果(媒体类型, [tmdb数据])
+        self.添加别名(媒体类型, tmdb_id, 标题)
+        with self._锁, self._连接:
+            self._连接.execute(
+                "INSERT OR REPLACE INTO confirmed VALUES (?, ?, ?, ?, ?)",
+                (self._类型值(媒体类型), 标题键, 年份 or 0, tmdb_id, time.time())
+            )
+    
+    def 查找已确认(
+        self,
+        媒体类型: MediaType,
+        标题: str,
+        年份: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        查找已确认的匹配
+        
+        查询带年份时只匹配年份相同的确认（没有年份的确认不会命中带年份的查询）；
+        查询没有年份时匹配任意年份，没有年份的确认优先，其次是最近确认的。
+        
+        Args:
+            媒体类型: 媒体类型
+            标题: 本地标题
+            年份: 本地年份
+        
+        Returns:
+            Optional[Dict[str, Any]]: TMDB 记录，未找到返回 None
+        """
+        年份值 = 年份 or 0
+        with self._锁:
+            行 = self._连接.execute(
+                """
+                SELECT r.data FROM confirmed c
+                JOIN records r ON r.media_type = c.media_type AND r.tmdb_id = c.tmdb_id
+                WHERE c.media_type = ? AND c.title_key = ?
+                  AND (c.year = ? OR ? = 0)
+                ORDER BY c.year = ? DESC, c.updated DESC
+                LIMIT 1
+                """,
+                (self._类型值(媒体类型), self.标准化标题(标题), 年份值, 年份值, 年份值)
+            ).fetchone()
+        return json.loads(行[0]) if 行 else None
+    
+    def 查找候选(self, 媒体类型: MediaType, 标题: str) -> List[Dict[str, Any]]:
+        """
+        按标题、原始标题或别名查找见过的 TMDB 记录
+        
+        Args:
+            媒体类型: 媒体类型
+            标题: 本地标题
+        
+        Returns:
+            List[Dict[str, Any]]: TMDB 记录列表
+        """
+        with self._锁:
+            行列表 = self._连接.execute(
+                """
+                SELECT r.data FROM titles t
+                JOIN records r ON r.media_type = t.media_type AND r.tmdb_id = t.tmdb_id
+                WHERE t.media_type = ? AND t.title_key = ?
+                GROUP BY r.tmdb_id
+                ORDER BY r.updated DESC
+                """,
+                (self._类型值(媒体类型), self.标准化标题(标题))
+            ).fetchall()
+        return [json.loads(行[0]) for 行 in 行列表]
+    
+    def 记录命中(self, 命中: bool) -> None:
+        """
+        更新命中统计（批量匹配时会被多个线程调用）
+        
+        Args:
+            命中: 本次查询是否由本地索引满足
+        """
+        with self._锁:
+            if 命中:
+                self.命中次数 += 1
+            else:
+                self.未命中次数 += 1
+    
+    def 清空(self) -> None:
+        """清空索引"""
+        with self._锁, self._连接:
+            for 表名 in ("records", "titles", "confirmed"):
+                self._连接.execute(f"DELETE FROM {表名}")
+            self.命中次数 = 0
+            self.未命中次数 = 0
+        logger.info("标题索引已清空")
+    
+    def 获取统计信息(self) -> dict:
+        """
+        获取索引统计信息
+        
+        Returns:
+            dict: 统计信息
+        """
+        with self._锁:
+            记录数, 标题数, 确认数 = (
+                self._连接.execute(f"SELECT COUNT(*) FROM {表名}").fetchone()[0]
+                for 表名 in ("records", "titles", "confirmed")
+            )
+            命中次数, 未命中次数 = self.命中次数, self.未命中次数
+        总次数 = 命中次数 + 未命中次数
+        return {
+            "路径": self.数据库路径,
+            "记录数": 记录数,
+            "标题数": 标题数,
+            "确认数": 确认数,
+            "命中次数": 命中次数,
+            "未命中次数": 未命中次数,
+            "命中率": 命中次数 / 总次数 if 总次数 else 0.0,
+        }
+    
+    def 关闭(self) -> None:
+        """关闭数据库连接"""
+        with self._锁:
+            self._连接.close()
+
+
+# 英文别名
+class TitleIndex(标题索引):
+    """本地标题索引（英文接口）"""
+    
+    def record_results(self, media_type: MediaType, results: Iterable[Dict[str, Any]]) -> None:
+        """保存搜索结果"""
+        self.记录搜索结果(媒体类型=media_type, 搜索结果=results)
+    
+    def add_alias(self, media_type: MediaType, tmdb_id: int, alias: str) -> None:
+        """添加别名"""
+        self.添加别名(媒体类型=media_type, tmdb_id=tmdb_id, 别名=alias)
+    
+    def confirm(
+        self,
+        media_type: MediaType,
+        title: str,
+        year: Optional[int],
+        tmdb_data: Dict[str, Any]
+    ) -> None:
+        """记录已确认的匹配"""
+        self.确认匹配(媒体类型=media_type, 标题=title, 年份=year, tmdb数据=tmdb_data)
+    
+    def lookup_confirmed(
+        self,
+        media_type: MediaType,
+        title: str,
+        year: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """查找已确认的匹配"""
+        return self.查找已确认(媒体类型=media_type, 标题=title, 年份=year)
+    
+    def lookup(self, media_type: MediaType, title: str) -> List[Dict[str, Any]]:
+        """查找候选记录"""
+        return self.查找候选(媒体类型=media_type, 标题=title)
+    
+    def clear(self) -> None:
+        """清空索引"""
+        self.清空()
+    
+    def get_stats(self) -> dict:
+        """获取统计信息"""
+        return self.获取统计信息()
+    
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self.关闭()
@@ -4,6 +4,8 @@
 显示 TMDB 匹配结果并允许用户选择
 """
 import logging
+import threading
+import time
 from typing import Optional, List
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListWidget,
@@ -21,29 +23,60 @@ logger = logging.getLogger(__name__)
 
 
 class MatchWorker(QThread):
-    """匹配工作线程"""
+    """
+    匹配工作线程
+    
+    通过 Matcher.match_stream 保持多个 TMDB 请求同时进行，
+    按完成顺序把结果发回面板
+    """
     
     progress = Signal(int, int, str)  # current, total, message
     match_found = Signal(object, list)  # media_file, match_results
+    throughput = Signal(float)  # 文件/秒
     error = Signal(str)
     finished = Signal()
     
-    def __init__(self, files: List[MediaFile], matcher: Matcher):
+    def __init__(
+        self,
+        files: List[MediaFile],
+        matcher: Matcher,
+        max_workers: Optional[int] = None
+    ):
         super().__init__()
         self.files = files
         self.matcher = matcher
+        self.max_workers = max_workers or get_config().max_concurrent_requests
+        self._cancel_event = threading.Event()
+        
+    def cancel(self):
+        """取消匹配（已发出的请求完成后停止）"""
+        self._cancel_event.set()
+        
+    def is_cancelled(self) -> bool:
+        """是否已取消"""
+        return self._cancel_event.is_set()
         
     def run(self):
         """运行匹配"""
         try:
             total = len(self.files)
-            for i, file in enumerate(self.files):
-                self.progress.emit(i + 1, total, f"匹配 {file.original_name}...")
-                
-                # 执行匹配
-                results = self.matcher.match(file)
+            start = time.perf_counter()
+            
+            stream = self.matcher.match_stream(
+                self.files,
+                max_workers=self.max_workers,
+                cancel_event=self._cancel_event
+            )
+            for done, (file, results) in enumerate(stream, 1):
+                rate = done / max(time.perf_counter() - start, 1e-6)
+                self.progress.emit(
+                    done, total, f"已匹配 {file.original_name} ({rate:.1f} 文件/秒)"
+                )
+                self.throughput.emit(rate)
                 self.match_found.emit(file, results)
                 
+            if self.is_cancelled():
+                logger.info("匹配已取消")
             self.finished.emit()
         except Exception as e:
             logger.error(f"匹配失败: {e}")
@@ -115,6 +148,11 @@ class MatchPanel(QWidget):
         self.cache_status_label.setStyleSheet("QLabel { color: gray; font-size: 9px; }")
         toolbar.addWidget(self.cache_status_label)
         
+        # 匹配吞吐量标签
+        self.throughput_label = QLabel("速度: -")
+        self.throughput_label.setStyleSheet("QLabel { color: gray; font-size: 9px; }")
+        toolbar.addWidget(self.throughput_label)
+        
         self.auto_match_btn = QPushButton("自动匹配")
         self.auto_match_btn.clicked.connect(self._on_auto_match)
         self.auto_match_btn.setEnabled(False)
@@ -226,6 +264,9 @@ class MatchPanel(QWidget):
             lambda cur, tot, msg: progress.setValue(cur) or progress.setLabelText(msg)
         )
         self.match_worker.match_found.connect(self._on_match_result)
+        self.match_worker.throughput.connect(
+            lambda rate: self.throughput_label.setText(f"速度: {rate:.1f} 文件/秒")
+        )
         self.match_worker.error.connect(
             lambda err: QMessageBox.critical(self, "错误", f"匹配失败:\n{err}")
         )
@@ -234,8 +275,8 @@ class MatchPanel(QWidget):
             lambda: logger.info("批量匹配完成")
         )
         
-        # 连接取消按钮
-        progress.canceled.connect(self.match_worker.terminate)
+        # 连接取消按钮（协作式取消，不强制终止线程）
+        progress.canceled.connect(self.match_worker.cancel)
         
         self.match_worker.start()
         
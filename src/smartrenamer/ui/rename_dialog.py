@@ -43,6 +43,10 @@ class RenameWorker(QThread):
         self.worker_count = config.get("rename_worker_count", 4)
         self.enable_batch = config.get("rename_io_batch", True)
         
+        # 所有 worker 线程共用一个 Renamer：编译好的模板按模板文本缓存、可并发渲染，
+        # 目录创建和历史记录由 Renamer 内部的锁保护
+        self.renamer = Renamer(预览模式=preview_mode, 创建备份=True)
+        
     def cancel(self):
         """取消任务（软取消：等待正在运行的任务完成）"""
         self._cancel_event.set()
@@ -65,9 +69,6 @@ class RenameWorker(QThread):
         Returns:
             Tuple[MediaFile, bool, str]: (文件, 是否成功, 消息)
         """
-        # 每个 worker 线程持有独立的 Renamer 实例，避免 Jinja 环境共享
-        renamer = Renamer(预览模式=self.preview_mode, 创建备份=True)
-        
         try:
             # 检查是否暂停
             self._pause_event.wait()
@@ -77,7 +78,7 @@ class RenameWorker(QThread):
                 return file, False, "已取消"
             
             # 执行重命名
-            success, error = renamer.重命名文件(file, self.rule)
+            success, error = self.renamer.重命名文件(file, self.rule)
             
             if success:
                 new_name = file.new_name or file.path.name
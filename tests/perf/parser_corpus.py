@@ -0,0 +1,114 @@
+"""
+解析器性能测试语料生成
+
+按固定随机种子生成逼真的发布文件名（电影、电视剧、动画、中日韩标题、噪声标签），
+同时给出每个文件名的真实信息，用于吞吐量基准和解析准确率回归
+"""
+import random
+from typing import Iterator, Dict, Any
+
+
+英文标题 = [
+    "The Matrix", "Inception", "Breaking Bad", "Game of Thrones", "The Wire",
+    "Interstellar", "The Dark Knight", "Better Call Saul", "Stranger Things",
+    "The Office", "Blade Runner", "Mad Max Fury Road", "True Detective",
+    "The Expanse", "Arrival", "Dune", "Fargo", "Chernobyl", "Sherlock", "Westworld",
+]
+
+中日韩标题 = [
+    "让子弹飞", "流浪地球", "权力的游戏", "甄嬛传", "琅琊榜", "隐秘的角落",
+    "千と千尋の神隠し", "君の名は", "기생충", "오징어 게임", "三体", "漫长的季节",
+]
+
+动画标题 = [
+    "One Piece", "Naruto Shippuden", "Attack on Titan", "Jujutsu Kaisen",
+    "进击的巨人", "鬼灭之刃", "Spy x Family", "Frieren",
+]
+
+发布组 = ["SPARKS", "RARBG", "CHD", "FRDS", "HDS", "SubsPlease", "Erai-raws", "字幕组", "Nekomoe"]
+分辨率列表 = ["2160p", "1080p", "720p", "480p", "4K"]
+来源列表 = ["BluRay", "WEB-DL", "WEBRip", "HDTV", "BDRip", "DVDRip"]
+编码列表 = ["x264", "x265", "H.264", "H265", "HEVC", "AVC"]
+噪声标签 = ["HDR", "DTS", "AAC", "5.1", "EXTENDED", "REMASTERED", "PROPER", "REPACK", "10bit"]
+扩展名列表 = [".mkv", ".mp4", ".avi", ".ts"]
+
+
+def _质量标签(随机: random.Random, 分隔符: str) -> str:
+    """生成分辨率、来源、编码等质量标签"""
+    标签 = [随机.choice(分辨率列表)]
+    if 随机.random() < 0.8:
+        标签.append(随机.choice(来源列表))
+    if 随机.random() < 0.7:
+        标签.append(随机.choice(编码列表))
+    if 随机.random() < 0.3:
+        标签.append(随机.choice(噪声标签))
+    return 分隔符.join(标签)
+
+
+def _电影(随机: random.Random) -> Dict[str, Any]:
+    """生成电影文件名"""
+    标题 = 随机.choice(英文标题 + 中日韩标题)
+    年份 = 随机.randint(1950, 2024)
+    分隔符 = 随机.choice([".", " ", "_"])
+    名称 = f"{标题.replace(' ', 分隔符)}{分隔符}{年份}{分隔符}{_质量标签(随机, 分隔符)}"
+    if 随机.random() < 0.3:
+        名称 = f"[{随机.choice(发布组)}]{名称}"
+    elif 随机.random() < 0.3:
+        名称 = f"{名称}-{随机.choice(发布组)}"
+    return {"名称": 名称, "类型": "movie", "季数": None, "集数": None}
+
+
+def _电视剧(随机: random.Random) -> Dict[str, Any]:
+    """生成电视剧文件名（含多集文件）"""
+    标题 = 随机.choice(英文标题 + 中日韩标题)
+    季数 = 随机.randint(1, 12)
+    集数 = 随机.randint(1, 24)
+    分隔符 = 随机.choice([".", " "])
+    格式 = 随机.random()
+    if 格式 < 0.6:
+        季集 = f"S{季数:02d}E{集数:02d}"
+    elif 格式 < 0.75:
+        季集 = f"{季数}x{集数:02d}"
+    elif 格式 < 0.9:
+        季集 = f"第{季数}季第{集数}集"
+    else:
+        季集 = f"S{季数:02d}E{集数:02d}-E{集数 + 1:02d}"
+    名称 = f"{标题.replace(' ', 分隔符)}{分隔符}{季集}{分隔符}{_质量标签(随机, 分隔符)}"
+    return {"名称": 名称, "类型": "tv_show", "季数": 季数, "集数": 集数}
+
+
+def _动画(随机: random.Random) -> Dict[str, Any]:
+    """生成字幕组动画文件名（绝对集数）"""
+    标题 = 随机.choice(动画标题)
+    集数 = 随机.randint(1, 1100)
+    组 = 随机.choice(发布组)
+    分辨率 = 随机.choice(["1080p", "720p"])
+    if 随机.random() < 0.6:
+        名称 = f"[{组}] {标题} - {集数:02d} [{分辨率}]"
+    else:
+        名称 = f"[{组}][{标题}][{集数:02d}][{分辨率}][CHS]"
+    return {"名称": 名称, "类型": "tv_show", "季数": None, "集数": 集数}
+
+
+def 生成语料(数量: int, 种子: int = 20240601) -> Iterator[Dict[str, Any]]:
+    """
+    生成文件名语料
+    
+    Args:
+        数量: 生成的文件名数量
+        种子: 随机种子，相同种子生成相同语料
+        
+    Yields:
+        Dict[str, Any]: 包含 名称（含扩展名）、类型、季数、集数 的字典
+    """
+    随机 = random.Random(种子)
+    for _ in range(数量):
+        概率 = 随机.random()
+        if 概率 < 0.45:
+            条目 = _电影(随机)
+        elif 概率 < 0.85:
+            条目 = _电视剧(随机)
+        else:
+            条目 = _动画(随机)
+        条目["名称"] += 随机.choice(扩展名列表)
+        yield 条目
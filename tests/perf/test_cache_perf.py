@@ -0,0 +1,110 @@
+"""
+缓存管理器内存命中性能测试
+
+8 个线程并发读取热点键，对比原实现（全局锁内解析 ISO 创建时间、
+每次重新标准化键）与分片锁 + 单调时钟过期时间点的当前实现
+"""
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Barrier, Lock
+from typing import Any, Callable, List
+
+import pytest
+
+from smartrenamer.api.tmdb_client_enhanced import 缓存管理器
+
+
+# 性能测试标记
+pytestmark = pytest.mark.performance
+
+THREADS = 8
+
+
+class _ReferenceCache:
+    """原实现的内存命中路径（单个全局锁，命中时解析创建时间）"""
+    
+    def __init__(self):
+        self.expiry = timedelta(days=7)
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+    
+    def set(self, key: str, data: Any) -> None:
+        key = " ".join(key.lower().split())
+        with self.lock:
+            self.entries[key] = {"创建时间": datetime.now().isoformat(), "数据": data}
+    
+    def get(self, key: str) -> Any:
+        key = " ".join(key.lower().split())
+        with self.lock:
+            item = self.entries.get(key)
+            if item is not None:
+                created = datetime.fromisoformat(item["创建时间"])
+                if datetime.now() - created <= self.expiry:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return item["数据"]
+        return None
+
+
+def _measure(get: Callable[[str], Any], keys: List[str], rounds: int) -> float:
+    """8 个线程同时读取，返回每次命中的平均耗时（微秒，按总墙钟时间计）"""
+    barrier = Barrier(THREADS + 1)
+    
+    def worker(offset: int) -> None:
+        ordered = keys[offset:] + keys[:offset]
+        barrier.wait()
+        for _ in range(rounds):
+            for key in ordered:
+                get(key)
+    
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        futures = [pool.submit(worker, i * 7) for i in range(THREADS)]
+        barrier.wait()
+        start = time.perf_counter()
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+    return elapsed / (THREADS * rounds * len(keys)) * 1e6
+
+
+class TestCacheHitPerformance:
+    """内存命中延迟"""
+    
+    @pytest.fixture
+    def keys(self):
+        """客户端风格的缓存键（已标准化）"""
+        if os.getenv("SKIP_PERF_TESTS", "false").lower() == "true":
+            pytest.skip("跳过性能测试")
+        return [f"movie_search:title {i}:{1990 + i % 30}" for i in range(500)]
+    
+    def test_并发命中延迟(self, keys, tmp_path):
+        """8 线程并发命中时的平均延迟"""
+        rounds = int(os.getenv("PERF_CACHE_ROUNDS", "20"))
+        
+        reference = _ReferenceCache()
+        cache = 缓存管理器(tmp_path, 最大内存条目数=1000, 异步写入=True)
+        for key in keys:
+            reference.set(key, {"id": key})
+            cache.设置(key, {"id": key})
+        cache.刷新()
+        
+        reference_us = _measure(reference.get, keys, rounds)
+        current_us = _measure(cache.获取, keys, rounds)
+        stats = cache.获取统计信息()
+        cache.关闭()
+        
+        print(f"\n{THREADS} 线程内存命中平均耗时:")
+        print(f"  原实现（全局锁 + fromisoformat）: {reference_us:.2f} µs")
+        print(f"  分片锁 + 单调时钟 ({stats['memory_shards']} 分片): {current_us:.2f} µs"
+              f"  ({reference_us / current_us:.1f}x)")
+        
+        assert stats["memory_hits"] == THREADS * rounds * len(keys)
+        assert current_us < reference_us
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
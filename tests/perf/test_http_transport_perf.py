@@ -0,0 +1,84 @@
+"""
+TMDB 传输层性能测试
+
+在本地桩服务器上对比 tmdbv3api 与原生 HTTP 传输的延迟和吞吐量。
+tmdbv3api 默认对每个不同的 URL 新建连接，原生传输复用 keep-alive 连接池
+"""
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import pytest
+from tmdbv3api import Search
+
+from smartrenamer.api.http_transport import 原生HTTP传输
+from tests.tmdb_stub import TMDB桩服务器
+
+
+# 性能测试标记
+pytestmark = pytest.mark.performance
+
+
+def _measure_latency(search: Callable[[str], object], queries: List[str]) -> List[float]:
+    """顺序执行搜索，返回每次请求的延迟（毫秒）"""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _measure_throughput(search: Callable[[str], object], queries: List[str], workers: int) -> float:
+    """并发执行搜索，返回每秒请求数"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(search, queries))
+    return len(queries) / (time.perf_counter() - start)
+
+
+class TestTransportPerformance:
+    """传输层性能对比"""
+    
+    @pytest.fixture
+    def server(self):
+        """本地桩服务器"""
+        if os.getenv("SKIP_PERF_TESTS", "false").lower() == "true":
+            pytest.skip("跳过性能测试")
+        with TMDB桩服务器(结果数=20) as instance:
+            yield instance
+    
+    def test_传输对比(self, server):
+        """对比两种传输的延迟和吞吐量"""
+        count = int(os.getenv("PERF_TRANSPORT_REQUESTS", "200"))
+        workers = 5
+        
+        # Movie.search 内部委托给 Search().movies，这里直接使用 Search 以便指向桩服务器
+        search = Search()
+        search.api_key = server.api_key
+        search._base = server.基础URL
+        native = 原生HTTP传输(server.api_key, 基础URL=server.基础URL, 连接池大小=workers)
+        
+        results = {}
+        for name, run in (("tmdbv3api", search.movies), ("native", native.搜索电影)):
+            # 每个查询都不同，避免命中 tmdbv3api 内部的 URL 缓存
+            latencies = _measure_latency(run, [f"{name} latency {i}" for i in range(count)])
+            throughput = _measure_throughput(
+                run, [f"{name} throughput {i}" for i in range(count)], workers
+            )
+            results[name] = (statistics.median(latencies), throughput)
+        native.关闭()
+        
+        print("\nTMDB 传输层对比（本地桩服务器）:")
+        for name, (median, throughput) in results.items():
+            print(f"  {name:<10} 延迟中位数={median:6.2f}ms  吞吐量={throughput:8.1f} 请求/秒")
+        
+        # 复用连接的原生传输不应比每次新建连接的 tmdbv3api 更慢
+        assert results["native"][0] <= results["tmdbv3api"][0] * 1.2
+        assert results["native"][1] >= results["tmdbv3api"][1] * 0.8
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
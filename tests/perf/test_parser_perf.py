@@ -0,0 +1,198 @@
+"""
+解析器性能测试
+
+使用生成的发布文件名语料测量解析吞吐量（文件名/秒）和内存分配，
+与 JSON 基准对比，性能退化超过阈值时测试失败
+"""
+import os
+import json
+import time
+import tracemalloc
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+import pytest
+
+from smartrenamer.core.parser import FileNameParser, 文件名解析器
+from smartrenamer.utils.file_utils import extract_info_from_filename
+from tests.perf.parser_corpus import 生成语料
+
+
+# 性能测试标记
+pytestmark = pytest.mark.performance
+
+# 基准文件
+BASELINE_FILE = Path(__file__).parent / "baselines" / "parser_baseline.json"
+
+# 完整语料约 100 万个文件名；默认只取前 2 万个以控制测试时间
+FULL_CORPUS_SIZE = 1_000_000
+DEFAULT_CORPUS_SIZE = 20_000
+
+# 内存分配测量使用的样本数（tracemalloc 会显著拖慢执行）
+ALLOC_SAMPLE_SIZE = 2_000
+
+
+def _corpus_size() -> int:
+    """获取语料大小（PERF_PARSER_FULL=true 时使用完整语料）"""
+    if os.getenv("PERF_PARSER_FULL", "false").lower() == "true":
+        return FULL_CORPUS_SIZE
+    return int(os.getenv("PERF_PARSER_CORPUS_SIZE", DEFAULT_CORPUS_SIZE))
+
+
+def _load_baseline() -> Dict[str, Any]:
+    """加载基准数据"""
+    if not BASELINE_FILE.exists():
+        return {}
+    with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_baseline(data: Dict[str, Any]) -> None:
+    """保存基准数据"""
+    BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _check_against_baseline(name: str, result: Dict[str, float]) -> None:
+    """
+    与基准对比，必要时更新基准
+    
+    Args:
+        name: 基准名称
+        result: 本次测量结果（names_per_sec、alloc_bytes_per_name 等）
+    """
+    baseline = _load_baseline()
+    threshold = float(os.getenv("PERF_REGRESSION_THRESHOLD", "0.3"))
+    
+    if os.getenv("PERF_UPDATE_BASELINE", "false").lower() == "true" or name not in baseline:
+        baseline[name] = result
+        _save_baseline(baseline)
+        print(f"\n已记录基准 {name}: {result}")
+        return
+    
+    expected = baseline[name]
+    print(f"\n{name}: 当前 {result}, 基准 {expected}")
+    
+    if result["names_per_sec"] < expected["names_per_sec"] * (1 - threshold):
+        pytest.fail(
+            f"{name} 吞吐量退化: {result['names_per_sec']:.0f} 文件名/秒 "
+            f"(基准 {expected['names_per_sec']:.0f}, 阈值 {threshold:.0%})"
+        )
+    
+    if result["alloc_bytes_per_name"] > expected["alloc_bytes_per_name"] * (1 + threshold):
+        pytest.fail(
+            f"{name} 内存分配退化: {result['alloc_bytes_per_name']:.0f} 字节/文件名 "
+            f"(基准 {expected['alloc_bytes_per_name']:.0f}, 阈值 {threshold:.0%})"
+        )
+    
+    if "accuracy" in expected and result.get("accuracy", 1.0) < expected["accuracy"] - 0.01:
+        pytest.fail(
+            f"{name} 解析准确率下降: {result['accuracy']:.3f} (基准 {expected['accuracy']:.3f})"
+        )
+
+
+def _measure(func: Callable[[str], Any], names: List[str]) -> Dict[str, float]:
+    """
+    测量吞吐量和内存分配
+    
+    Args:
+        func: 解析函数
+        names: 文件名列表
+        
+    Returns:
+        Dict[str, float]: names_per_sec 和 alloc_bytes_per_name
+    """
+    # 预热（编译正则、填充内部缓存）
+    for name in names[:100]:
+        func(name)
+    
+    start = time.perf_counter()
+    for name in names:
+        func(name)
+    elapsed = time.perf_counter() - start
+    
+    # 每次解析的峰值分配（相对调用前的已分配内存），取平均
+    sample = names[:ALLOC_SAMPLE_SIZE]
+    total_alloc = 0
+    tracemalloc.start()
+    for name in sample:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func(name)
+        _, peak = tracemalloc.get_traced_memory()
+        total_alloc += peak - before
+    tracemalloc.stop()
+    
+    return {
+        "names_per_sec": round(len(names) / elapsed, 1),
+        "alloc_bytes_per_name": round(total_alloc / len(sample), 1),
+    }
+
+
+@pytest.fixture(scope="module")
+def corpus() -> List[Dict[str, Any]]:
+    """生成语料"""
+    if os.getenv("SKIP_PERF_TESTS", "false").lower() == "true":
+        pytest.skip("跳过性能测试")
+    return list(生成语料(_corpus_size()))
+
+
+@pytest.fixture(scope="module")
+def names(corpus) -> List[str]:
+    """语料中的文件名"""
+    return [entry["名称"] for entry in corpus]
+
+
+class TestParserPerformance:
+    """解析器吞吐量基准"""
+    
+    def test_中文接口吞吐量(self, corpus, names):
+        """测量 文件名解析器.解析 的吞吐量、内存分配和准确率"""
+        parser = 文件名解析器()
+        result = _measure(parser.解析, names)
+        
+        # 准确率：媒体类型和集数与语料真实信息一致的比例
+        correct = 0
+        for entry in islice(corpus, ALLOC_SAMPLE_SIZE):
+            parsed = parser.解析(entry["名称"])
+            if (parsed["媒体类型"].value == entry["类型"]
+                    and parsed["季数"] == entry["季数"]
+                    and parsed["集数"] == entry["集数"]):
+                correct += 1
+        result["accuracy"] = round(correct / min(len(corpus), ALLOC_SAMPLE_SIZE), 4)
+        
+        print(f"\n文件名解析器.解析: {result['names_per_sec']:.0f} 文件名/秒, "
+              f"{result['alloc_bytes_per_name']:.0f} 字节/文件名, 准确率 {result['accuracy']:.2%}")
+        _check_against_baseline("parser.解析", result)
+    
+    def test_英文接口吞吐量(self, names):
+        """测量 FileNameParser.parse 的吞吐量和内存分配"""
+        parser = FileNameParser()
+        result = _measure(parser.parse, names)
+        
+        print(f"\nFileNameParser.parse: {result['names_per_sec']:.0f} 文件名/秒, "
+              f"{result['alloc_bytes_per_name']:.0f} 字节/文件名")
+        _check_against_baseline("parser.parse", result)
+    
+    def test_扫描器快速提取吞吐量(self, names):
+        """测量 extract_info_from_filename 的吞吐量和内存分配"""
+        result = _measure(extract_info_from_filename, names)
+        
+        print(f"\nextract_info_from_filename: {result['names_per_sec']:.0f} 文件名/秒, "
+              f"{result['alloc_bytes_per_name']:.0f} 字节/文件名")
+        _check_against_baseline("file_utils.extract_info_from_filename", result)
+
+
+def test_语料可复现():
+    """相同种子生成相同语料"""
+    first = [entry["名称"] for entry in 生成语料(100)]
+    second = [entry["名称"] for entry in 生成语料(100)]
+    
+    assert first == second
+    assert len(set(first)) > 90
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,120 @@
+"""
+重命名预览性能测试
+
+对比旧的逐文件路径（每个文件新建 Jinja2 环境并重新解析编译模板，
+与原 RenameWorker 的做法相同）、缓存编译的 Jinja2 模板和快速路径闭包的预览吞吐量
+"""
+import os
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from smartrenamer.core.models import MediaFile, MediaType
+from smartrenamer.core.renamer import 重命名器, 创建预定义规则, 创建_jinja_环境, 编译模板, 获取渲染函数
+
+
+# 性能测试标记
+pytestmark = pytest.mark.performance
+
+
+def _build_files(count: int) -> List[MediaFile]:
+    """构造电视剧媒体文件"""
+    return [
+        MediaFile(
+            path=Path(f"/media/show.{i}.mkv"),
+            original_name=f"show.{i}.mkv",
+            extension=".mkv",
+            media_type=MediaType.TV_SHOW,
+            title=f"Show: Title {i % 500}",
+            season_number=i % 20 + 1,
+            episode_number=i % 30 + 1,
+            episode_title=f"Episode {i}" if i % 3 else None,
+            resolution="1080p" if i % 2 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def _context(media_file: MediaFile) -> dict:
+    """模板上下文"""
+    return {
+        "title": media_file.title,
+        "season": media_file.season_number,
+        "episode": media_file.episode_number,
+        "episode_title": media_file.episode_title or "",
+        "resolution": media_file.resolution or "",
+    }
+
+
+def _reference_preview(files: List[MediaFile], template: str) -> List[str]:
+    """旧路径：每个文件新建环境并编译模板"""
+    return [创建_jinja_环境().from_string(template).render(_context(f)) for f in files]
+
+
+def _measure_render(render, contexts: List[dict]) -> float:
+    """测量每秒渲染次数"""
+    start = time.perf_counter()
+    for context in contexts:
+        render(context)
+    return len(contexts) / (time.perf_counter() - start)
+
+
+class TestRenamerPerformance:
+    """重命名预览吞吐量"""
+    
+    @pytest.fixture
+    def files(self):
+        """媒体文件"""
+        if os.getenv("SKIP_PERF_TESTS", "false").lower() == "true":
+            pytest.skip("跳过性能测试")
+        return _build_files(int(os.getenv("PERF_RENAME_FILES", "100000")))
+    
+    def test_预览吞吐量(self, files):
+        """对比逐文件编译与缓存编译的预览吞吐量"""
+        rule = 创建预定义规则("电视剧-完整")
+        subset = files[:2000]
+        
+        start = time.perf_counter()
+        _reference_preview(subset, rule.template)
+        reference = len(subset) / (time.perf_counter() - start)
+        
+        获取渲染函数.cache_clear()
+        renamer = 重命名器(预览模式=True)
+        start = time.perf_counter()
+        for media_file in files:
+            success, _ = renamer.重命名文件(media_file, rule)
+            assert success
+        elapsed = time.perf_counter() - start
+        cached = len(files) / elapsed
+        
+        print(f"\n重命名预览 {len(files)} 个文件（模板: {rule.name}）:")
+        print(f"  逐文件编译: {reference:.0f} 文件/秒（{len(subset)} 个文件）")
+        print(f"  缓存编译:   {cached:.0f} 文件/秒，共 {elapsed:.2f} 秒")
+        print(f"  加速比:     {cached / reference:.1f}x")
+        
+        assert 获取渲染函数.cache_info().misses == 1
+        assert files[1].new_name == "Show Title 1 S02E02 Episode 1 1080p.mkv"
+        assert cached >= reference * 10
+    
+    def test_快速路径渲染(self, files):
+        """对比缓存编译的 Jinja2 模板与快速路径闭包的渲染吞吐量"""
+        template = 创建预定义规则("电视剧-完整").template
+        contexts = [_context(f) for f in files]
+        jinja_render = 编译模板(template).render
+        fast_render = 获取渲染函数(template)
+        
+        jinja = _measure_render(jinja_render, contexts)
+        fast = _measure_render(fast_render, contexts)
+        
+        print(f"\n渲染 {len(contexts)} 次（模板: 电视剧-完整）:")
+        print(f"  Jinja2:   {jinja:.0f} 次/秒")
+        print(f"  快速路径: {fast:.0f} 次/秒（{fast / jinja:.1f}x）")
+        
+        assert all(fast_render(c) == jinja_render(c) for c in contexts[:1000])
+        assert fast > jinja
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,113 @@
+"""
+离线端到端匹配性能测试
+
+先对本地桩服务器运行一遍匹配并录制夹具档案，再用回放传输（模拟延迟、限流和服务器错误）
+在不访问网络的情况下测量匹配吞吐量、缓存命中率和速率限制器行为。
+设置 TMDB_FIXTURE_ARCHIVE 时直接回放该档案（如从真实 TMDB 录制的档案）
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pytest
+
+from smartrenamer.api.replay_transport import 夹具档案, 录制HTTP传输, 回放HTTP传输
+from smartrenamer.api.tmdb_client_enhanced import 增强TMDB客户端
+from smartrenamer.core.matcher import 智能匹配器
+from tests.perf.parser_corpus import 生成语料
+from tests.tmdb_stub import TMDB桩服务器
+
+
+# 性能测试标记
+pytestmark = pytest.mark.performance
+
+
+def _match_all(matcher: 智能匹配器, names: List[str], workers: int) -> int:
+    """并发匹配全部文件，返回有匹配结果的文件数"""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda name: matcher.匹配文件(f"/media/{name}"), names))
+    return sum(1 for r in results if r)
+
+
+class TestReplayPerformance:
+    """回放夹具的端到端匹配"""
+    
+    @pytest.fixture
+    def names(self):
+        """文件名语料"""
+        if os.getenv("SKIP_PERF_TESTS", "false").lower() == "true":
+            pytest.skip("跳过性能测试")
+        count = int(os.getenv("PERF_REPLAY_FILES", "400"))
+        return [item["名称"] for item in 生成语料(count)]
+    
+    @pytest.fixture
+    def archive(self, names, tmp_path) -> Tuple[夹具档案, Optional[int]]:
+        """
+        夹具档案和录制时有匹配结果的文件数
+        
+        优先使用 TMDB_FIXTURE_ARCHIVE（文件数未知），否则从桩服务器录制
+        """
+        path = os.getenv("TMDB_FIXTURE_ARCHIVE")
+        if path:
+            return 夹具档案(Path(path)), None
+        
+        path = tmp_path / "fixtures.json.gz"
+        with TMDB桩服务器() as server:
+            transport = 录制HTTP传输("test_key", 夹具档案(path), 基础URL=server.基础URL)
+            client = 增强TMDB客户端(
+                "test_key", 缓存目录=tmp_path / "record_cache", 传输方式=transport, 每秒请求数=0
+            )
+            recorded = _match_all(智能匹配器(client), names, workers=8)
+            client.缓存.关闭()
+            transport.关闭()
+        return 夹具档案(path), recorded
+    
+    def test_回放匹配吞吐量(self, names, archive, tmp_path):
+        """模拟 5ms±2ms 延迟、2% 限流和 2% 服务器错误时的匹配吞吐量"""
+        archive, recorded = archive
+        transport = 回放HTTP传输(
+            archive,
+            延迟秒数=0.005,
+            延迟抖动秒数=0.002,
+            限流概率=0.02,
+            错误概率=0.02,
+            重试等待秒数=0.05,
+            随机种子=42
+        )
+        client = 增强TMDB客户端(
+            "test_key",
+            缓存目录=tmp_path / "replay_cache",
+            传输方式=transport,
+            最大并发请求数=8,
+            重试延迟=0.01,
+            每秒请求数=200
+        )
+        matcher = 智能匹配器(client)
+        
+        start = time.perf_counter()
+        matched = _match_all(matcher, names, workers=8)
+        elapsed = time.perf_counter() - start
+        
+        replay = transport.获取统计信息()
+        cache = client.获取缓存统计()
+        limiter = client.获取限流统计()
+        client.缓存.关闭()
+        
+        print(f"\n回放 {len(archive)} 条夹具，匹配 {len(names)} 个文件:")
+        print(f"  吞吐量: {len(names) / elapsed:.0f} 文件/秒，有结果 {matched} 个")
+        print(f"  请求: {replay['requests']} 次，注入限流 {replay['injected_throttles']} 次、"
+              f"错误 {replay['injected_errors']} 次，缺失 {replay['missing']} 次")
+        print(f"  缓存命中率: {cache['hit_rate']:.1%}，请求合并 {cache['request_coalesced']} 次")
+        print(f"  速率限制器: 限流 {limiter['throttled']} 次，并发上限 {limiter['concurrency_limit']}")
+        
+        assert replay["missing"] == 0
+        assert limiter["throttled"] == replay["injected_throttles"]
+        # 注入的错误由重试消化，匹配结果与录制时基本一致
+        if recorded is not None:
+            assert matched >= recorded * 0.95
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
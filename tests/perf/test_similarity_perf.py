@@ -0,0 +1,72 @@
+"""
+相似度后端性能测试
+
+对比 difflib.SequenceMatcher 与位并行 LCS / Levenshtein / Jaro-Winkler 后端，
+模拟匹配器的使用方式：本地标题预处理一次，与多个候选标题比较
+"""
+import os
+import time
+from typing import List, Tuple
+import pytest
+
+from smartrenamer.core.similarity import 获取相似度后端, 相似度后端表
+from tests.perf.parser_corpus import 英文标题, 中日韩标题, 动画标题
+
+
+# 性能测试标记
+pytestmark = pytest.mark.performance
+
+
+def _build_cases() -> List[Tuple[str, List[str]]]:
+    """构造 (本地标题, 候选标题列表)，包含较长的中日韩标题"""
+    titles = 英文标题 + 中日韩标题 + 动画标题
+    long_titles = [f"{t} 导演剪辑版 特别收藏版 {t}" for t in 中日韩标题]
+    candidates = titles + long_titles
+    return [(local, candidates) for local in titles + long_titles]
+
+
+def _measure(backend_name: str, cases, threshold: float, rounds: int) -> float:
+    """测量每秒比较次数"""
+    backend = 获取相似度后端(backend_name)
+    comparisons = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for local, candidates in cases:
+            prepared = backend.预处理(local)
+            for candidate in candidates:
+                backend.计算(prepared, candidate, threshold)
+            comparisons += len(candidates)
+    return comparisons / (time.perf_counter() - start)
+
+
+class TestSimilarityPerformance:
+    """相似度后端性能对比"""
+    
+    @pytest.fixture
+    def cases(self):
+        """测试用例"""
+        if os.getenv("SKIP_PERF_TESTS", "false").lower() == "true":
+            pytest.skip("跳过性能测试")
+        return _build_cases()
+    
+    def test_后端对比(self, cases):
+        """对比各后端在有无阈值时的吞吐量"""
+        rounds = int(os.getenv("PERF_SIMILARITY_ROUNDS", "5"))
+        results = {}
+        
+        for name in 相似度后端表:
+            results[(name, 0.0)] = _measure(name, cases, 0.0, rounds)
+            results[(name, 0.6)] = _measure(name, cases, 0.6, rounds)
+        
+        print("\n相似度后端吞吐量（比较次数/秒）:")
+        for (name, threshold), rate in results.items():
+            speedup = rate / results[("difflib", 0.0)]
+            print(f"  {name:<14} 阈值={threshold:.1f}: {rate:>10.0f}  ({speedup:.1f}x difflib)")
+        
+        # 位并行后端应明显快于逐个候选新建 SequenceMatcher 的原实现
+        assert results[("indel", 0.6)] > results[("difflib", 0.0)]
+        assert results[("levenshtein", 0.6)] > results[("difflib", 0.0)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,238 @@
+"""
+异步 TMDB 客户端测试（使用本地桩服务器）
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from smartrenamer.api.async_client import AsyncTMDBClient, 异步TMDB客户端
+from smartrenamer.api.rate_limiter import 速率限制器
+from smartrenamer.api.tmdb_client_enhanced import 增强TMDB客户端, 缓存管理器
+from tests.tmdb_stub import TMDB桩服务器
+
+
+@pytest.fixture
+def 服务器():
+    """本地 TMDB 桩服务器"""
+    with TMDB桩服务器() as 实例:
+        yield 实例
+
+
+@pytest.fixture
+def 缓存(tmp_path):
+    """缓存管理器"""
+    实例 = 缓存管理器(tmp_path / "cache")
+    yield 实例
+    实例.关闭()
+
+
+def _创建客户端(服务器, 缓存, **参数) -> 异步TMDB客户端:
+    参数.setdefault("每秒请求数", 0)
+    return AsyncTMDBClient(
+        "test_key", 缓存=缓存, api基础URL=服务器.基础URL, 重试延迟=0.01, **参数
+    )
+
+
+class Test异步TMDB客户端:
+    """异步客户端"""
+    
+    def test_搜索和详情(self, 服务器, 缓存):
+        """测试各异步方法返回精简字典并写入缓存"""
+        async def 执行():
+            async with _创建客户端(服务器, 缓存) as 客户端:
+                电影 = await 客户端.search_movie("Inception")
+                详情 = await 客户端.get_movie_details(7)
+                季 = await 客户端.get_season_details(1396, 1)
+                剧集 = await 客户端.get_episode_details(1396, 1, 4)
+                电视剧 = await 客户端.search_tv("Breaking Bad", year=1991)
+                return 电影, 详情, 季, 剧集, 电视剧
+        
+        电影, 详情, 季, 剧集, 电视剧 = asyncio.run(执行())
+        
+        assert 电影[0]["title"] == "Inception"
+        assert "video" not in 电影[0]
+        assert 详情["runtime"] == 120
+        assert "crew" not in 季["episodes"][0]
+        assert 剧集["name"] == "Episode 4"
+        assert [r["id"] for r in 电视剧] == [1]
+        # 单集由已缓存的整季数据满足
+        assert len([p for p, _ in 服务器.请求记录 if "/episode/" in p]) == 0
+    
+    def test_与同步客户端共用缓存键(self, 服务器, 缓存):
+        """测试异步客户端写入的缓存可被同步客户端读取"""
+        async def 执行():
+            async with _创建客户端(服务器, 缓存) as 客户端:
+                await 客户端.搜索电影("The Matrix")
+        
+        asyncio.run(执行())
+        缓存键 = f"movie_search:{增强TMDB客户端._标准化查询('THE  MATRIX')}"
+        assert 缓存.获取(缓存键)[0]["title"] == "The Matrix"
+    
+    def test_大量并发(self, 服务器, 缓存):
+        """测试数百个查询同时进行"""
+        服务器.延迟秒数 = 0.05
+        标题列表 = [f"title {i}" for i in range(200)]
+        
+        async def 执行():
+            async with _创建客户端(服务器, 缓存, 最大并发请求数=200) as 客户端:
+                开始 = time.monotonic()
+                结果 = await 客户端.batch_search_movies(标题列表)
+                return 结果, time.monotonic() - 开始, 客户端.get_cache_stats()
+        
+        结果, 耗时, 统计 = asyncio.run(执行())
+        
+        assert len(结果) == 200
+        assert all(结果[t][0]["title"] == t for t in 标题列表)
+        # 串行需要 10 秒
+        assert 耗时 < 5
+        assert 统计["request_misses"] == 200
+    
+    def test_合并相同查询(self, 服务器, 缓存):
+        """测试并发查询同一个标题只发出一次请求"""
+        async def 执行():
+            async with _创建客户端(服务器, 缓存) as 客户端:
+                await asyncio.gather(*(客户端.搜索电影("Heat") for _ in range(10)))
+                return 客户端.获取缓存统计()
+        
+        统计 = asyncio.run(执行())
+        
+        assert len(服务器.请求记录) == 1
+        assert 统计["request_coalesced"] == 9
+    
+    def test_共用速率限制(self, 服务器, 缓存):
+        """测试异步请求遵守共用限制器的速率"""
+        限制器 = 速率限制器(每秒请求数=50, 突发容量=1)
+        
+        async def 执行():
+            async with _创建客户端(服务器, 缓存, 限制器=限制器) as 客户端:
+                开始 = time.monotonic()
+                await 客户端.批量搜索电影([f"rate {i}" for i in range(11)])
+                return time.monotonic() - 开始
+        
+        assert asyncio.run(执行()) >= 0.18
+        assert 限制器.获取统计信息()["total_requests"] == 11
+    
+    def test_遵守限制器并发上限(self, 服务器, 缓存):
+        """测试并发请求数不超过限制器的并发上限"""
+        服务器.延迟秒数 = 0.05
+        限制器 = 速率限制器(每秒请求数=0, 最大并发数=1)
+        
+        async def 执行():
+            async with _创建客户端(服务器, 缓存, 限制器=限制器) as 客户端:
+                开始 = time.monotonic()
+                await 客户端.批量搜索电影([f"cap {i}" for i in range(5)])
+                return time.monotonic() - 开始
+        
+        assert asyncio.run(执行()) >= 0.25
+    
+    def test_等待中的请求不占用线程(self, 服务器, 缓存):
+        """测试排队等待并发名额的请求不占用请求线程"""
+        服务器.延迟秒数 = 0.02
+        
+        async def 执行():
+            async with _创建客户端(服务器, 缓存, 最大并发请求数=200, 请求线程数=4) as 客户端:
+                任务 = asyncio.ensure_future(
+                    客户端.批量搜索电影([f"thread {i}" for i in range(100)])
+                )
+                await asyncio.sleep(0.1)
+                线程数 = len([t for t in threading.enumerate() if t.name.startswith("tmdb-async")])
+                return 线程数, await 任务
+        
+        线程数, 结果 = asyncio.run(执行())
+        assert 线程数 <= 4
+        assert len(结果) == 100
+    
+    def test_取消发起者不影响合并的等待者(self, 服务器, 缓存):
+        """测试第一个查询被取消时，合并等待的查询仍得到结果"""
+        服务器.延迟秒数 = 0.1
+        
+        async def 执行():
+            async with _创建客户端(服务器, 缓存) as 客户端:
+                发起者 = asyncio.ensure_future(客户端.搜索电影("Heat"))
+                await asyncio.sleep(0.02)
+                等待者 = asyncio.ensure_future(客户端.搜索电影("Heat"))
+                await asyncio.sleep(0.02)
+                发起者.cancel()
+                return await 等待者, 发起者.cancelled()
+        
+        结果, 已取消 = asyncio.run(执行())
+        assert 已取消
+        assert 结果[0]["title"] == "Heat"
+        assert len(服务器.请求记录) == 1
+    
+    def test_关闭自建缓存(self, 服务器, tmp_path):
+        """测试关闭时关闭客户端自行创建的缓存管理器，传入的缓存保持可用"""
+        async def 执行(缓存):
+            客户端 = AsyncTMDBClient(
+                "test_key", 缓存目录=tmp_path / "own", 缓存=缓存,
+                api基础URL=服务器.基础URL, 每秒请求数=0
+            )
+            await 客户端.搜索电影("Heat")
+            await 客户端.关闭()
+            return 客户端.缓存
+        
+        assert asyncio.run(执行(None))._已关闭
+        
+        共用缓存 = 缓存管理器(tmp_path / "shared")
+        assert not asyncio.run(执行(共用缓存))._已关闭
+        共用缓存.关闭()
+    
+    def test_缓存读写不在事件循环线程(self, 服务器, 缓存, monkeypatch):
+        """测试缓存读写在线程池中执行"""
+        线程记录 = []
+        原获取, 原设置 = 缓存.获取, 缓存.设置
+        
+        def 获取(*参数, **关键字参数):
+            线程记录.append(threading.get_ident())
+            return 原获取(*参数, **关键字参数)
+        
+        def 设置(*参数, **关键字参数):
+            线程记录.append(threading.get_ident())
+            return 原设置(*参数, **关键字参数)
+        
+        monkeypatch.setattr(缓存, "获取", 获取)
+        monkeypatch.setattr(缓存, "设置", 设置)
+        
+        async def 执行():
+            async with _创建客户端(服务器, 缓存) as 客户端:
+                await 客户端.搜索电影("Heat")
+                await 客户端.搜索电影("Heat")
+                return threading.get_ident()
+        
+        事件循环线程 = asyncio.run(执行())
+        assert len(线程记录) == 3
+        assert 事件循环线程 not in 线程记录
+    
+    def test_限流重试(self, 服务器, 缓存):
+        """测试 429 响应后按 Retry-After 暂停并重试"""
+        服务器.剩余限流次数 = 1
+        服务器.重试等待秒数 = 0.1
+        
+        async def 执行():
+            async with _创建客户端(服务器, 缓存) as 客户端:
+                return await 客户端.搜索电影("Alien"), 客户端.获取限流统计()
+        
+        结果, 统计 = asyncio.run(执行())
+        assert 结果[0]["title"] == "Alien"
+        assert 统计["throttled"] == 1
+    
+    def test_失败返回空并负缓存(self, 服务器, 缓存):
+        """测试请求失败时返回空结果并写入负缓存"""
+        async def 执行():
+            async with AsyncTMDBClient(
+                "wrong_key", 缓存=缓存, api基础URL=服务器.基础URL,
+                重试延迟=0.01, 最大重试次数=2, 每秒请求数=0
+            ) as 客户端:
+                return await 客户端.搜索电影("Nothing"), await 客户端.获取电影详情(1)
+        
+        搜索结果, 详情 = asyncio.run(执行())
+        
+        assert 搜索结果 == []
+        assert 详情 is None
+        assert 缓存.获取("movie_search:nothing") == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
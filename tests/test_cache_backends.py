@@ -0,0 +1,548 @@
+"""
+TMDB 磁盘缓存后端测试
+"""
+import threading
+import time
+from datetime import datetime
+import pytest
+from unittest.mock import patch
+from smartrenamer.api.cache_backends import (
+    JSON文件缓存后端,
+    SQLite缓存后端,
+    创建磁盘缓存后端,
+    磁盘缓存后端,
+)
+from smartrenamer.api.tmdb_client_enhanced import 估算字节数, 缓存管理器
+
+
+def _缓存项(数据):
+    """构造缓存项"""
+    return {"创建时间": "2024-01-01T00:00:00", "数据": 数据}
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def 后端(request, tmp_path):
+    """两种磁盘后端"""
+    实例 = 创建磁盘缓存后端(request.param, tmp_path)
+    yield 实例
+    实例.关闭()
+
+
+class Test磁盘缓存后端:
+    """磁盘缓存后端通用行为"""
+    
+    def test_读写删除(self, 后端):
+        """测试读取、写入和删除"""
+        后端.写入("movie_search:dune", _缓存项([{"id": 1}]), time.time() + 60)
+        
+        assert 后端.读取("movie_search:dune")["数据"] == [{"id": 1}]
+        assert 后端.读取("missing") is None
+        
+        后端.删除("movie_search:dune")
+        assert 后端.读取("movie_search:dune") is None
+    
+    def test_清理过期(self, 后端):
+        """测试按过期时间戳批量清理"""
+        现在 = time.time()
+        后端.写入("expired", _缓存项(1), 现在 - 1)
+        后端.写入("fresh", _缓存项(2), 现在 + 60)
+        
+        assert 后端.清理过期(现在) == 1
+        assert 后端.读取("expired") is None
+        assert 后端.读取("fresh")["数据"] == 2
+    
+    def test_清空(self, 后端):
+        """测试清空"""
+        for i in range(5):
+            后端.写入(f"key_{i}", _缓存项(i), time.time() + 60)
+        
+        后端.清空()
+        
+        assert all(后端.读取(f"key_{i}") is None for i in range(5))
+    
+    def test_批量写入跳过无法序列化的条目(self, 后端, tmp_path):
+        """测试同一批次中无法序列化的条目被跳过，其他条目正常写入"""
+        过期时间戳 = time.time() + 60
+        后端.批量写入([
+            ("movie_search:ok", _缓存项([]), 过期时间戳),
+            ("movie_details:bad", _缓存项({"obj": object()}), 过期时间戳),
+            ("movie_details:603", _缓存项({"id": 603}), 过期时间戳),
+        ])
+        
+        assert 后端.读取("movie_search:ok")["数据"] == []
+        assert 后端.读取("movie_details:603")["数据"] == {"id": 603}
+        assert 后端.读取("movie_details:bad") is None
+        assert not list(tmp_path.glob("*.tmp"))
+    
+    def test_遍历(self, 后端):
+        """测试遍历返回键、缓存项和过期时间戳"""
+        过期时间戳 = time.time() + 60
+        for i in range(3):
+            后端.写入(f"key_{i}", _缓存项(i), 过期时间戳)
+        
+        条目 = sorted(后端.遍历(), key=lambda 项: 项[0])
+        
+        assert [(键, 项["数据"]) for 键, 项, _ in 条目] == [("key_0", 0), ("key_1", 1), ("key_2", 2)]
+        assert all(abs(时间戳 - 过期时间戳) < 1e-3 for _, _, 时间戳 in 条目)
+
+
+class TestSQLite缓存后端:
+    """SQLite 后端测试"""
+    
+    def test_单文件存储(self, tmp_path):
+        """测试所有条目保存在同一个数据库文件中"""
+        后端 = SQLite缓存后端(tmp_path / "cache.sqlite3")
+        for i in range(200):
+            后端.写入(f"key_{i}", _缓存项({"i": i}), time.time() + 60)
+        
+        assert 后端.获取统计信息()["disk_entries"] == 200
+        assert not list(tmp_path.glob("*.json"))
+        后端.关闭()
+    
+    def test_按大小淘汰最久未访问(self, tmp_path):
+        """测试超出容量时淘汰最久未访问的条目"""
+        后端 = SQLite缓存后端(tmp_path / "cache.sqlite3", 最大字节数=20_000)
+        后端.访问时间刷新秒数 = 0  # 每次读取都更新访问时间
+        后端.写入("keep", _缓存项("x" * 500), time.time() + 60)
+        for i in range(100):
+            后端.写入(f"key_{i}", _缓存项("x" * 500), time.time() + 60)
+            后端.读取("keep")
+        
+        统计 = 后端.获取统计信息()
+        assert 统计["disk_bytes"] <= 20_000
+        assert 统计["disk_evictions"] > 0
+        assert 后端.读取("keep") is not None
+        assert 后端.读取("key_0") is None
+        assert 后端.读取("key_99") is not None
+        后端.关闭()
+    
+    def test_读取不等待写锁(self, tmp_path):
+        """测试访问时间较新时读取只执行查询，另一个连接持有写锁时也不阻塞"""
+        甲 = SQLite缓存后端(tmp_path / "cache.sqlite3")
+        甲.写入("key", _缓存项("value"), time.time() + 60)
+        乙 = SQLite缓存后端(tmp_path / "cache.sqlite3")
+        甲._连接.execute("PRAGMA busy_timeout = 100")
+        
+        乙._连接.execute("BEGIN IMMEDIATE")
+        try:
+            assert 甲.读取("key")["数据"] == "value"
+        finally:
+            乙._连接.rollback()
+        
+        # 访问时间超过刷新间隔后读取会更新它
+        甲._连接.execute("UPDATE cache SET accessed = 0")
+        甲._连接.commit()
+        甲.读取("key")
+        assert 甲._连接.execute("SELECT accessed FROM cache").fetchone()[0] > 0
+        甲.关闭()
+        乙.关闭()
+    
+    def test_迁移旧版JSON缓存(self, tmp_path):
+        """测试默认改为 SQLite 后，打开时把旧版 JSON 文件一次性迁移到数据库"""
+        旧版 = JSON文件缓存后端(tmp_path)
+        旧版.写入("movie_details:603", _缓存项({"id": 603}), time.time() + 60)
+        # 旧键格式的搜索条目不会再被读取，但仍需迁移以便过期清理和导出
+        旧版.写入("movie_search:dune:1984", _缓存项([{"id": 841}]), time.time() + 60)
+        旧版.写入("movie_details:1", _缓存项({"id": 1}), time.time() - 60)
+        # 更早版本写入的文件不含原始键和过期时间戳，无法迁移
+        旧版缓存路径 = 旧版._获取缓存路径("tv_details:1396")
+        旧版缓存路径.write_text('{"创建时间": "2024-01-01T00:00:00", "数据": {"id": 1396}}', encoding="utf-8")
+        (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+        
+        后端 = 创建磁盘缓存后端("sqlite", tmp_path)
+        
+        assert not list(tmp_path.glob("*.json"))
+        统计 = 后端.获取统计信息()
+        assert 统计["legacy_migrated"] == 2
+        assert 统计["legacy_skipped"] == 3
+        assert 统计["disk_entries"] == 2
+        assert 后端.读取("movie_details:603") == _缓存项({"id": 603})
+        assert sorted(键 for 键, _, _ in 后端.遍历()) == ["movie_details:603", "movie_search:dune:1984"]
+        assert 后端.读取("tv_details:1396") is None
+        后端.关闭()
+    
+    def test_重新打开后数据仍在(self, tmp_path):
+        """测试持久化"""
+        后端 = SQLite缓存后端(tmp_path / "cache.sqlite3")
+        后端.写入("key", _缓存项("value"), time.time() + 60)
+        后端.关闭()
+        
+        后端 = SQLite缓存后端(tmp_path / "cache.sqlite3")
+        assert 后端.读取("key")["数据"] == "value"
+        assert 后端.获取统计信息()["disk_bytes"] > 0
+        后端.关闭()
+
+
+    def test_多个连接共享总大小和租约(self, tmp_path):
+        """测试同一个数据库的多个实例（如多个进程）看到一致的总大小，租约互斥"""
+        甲 = SQLite缓存后端(tmp_path / "cache.sqlite3")
+        乙 = SQLite缓存后端(tmp_path / "cache.sqlite3")
+        甲.写入("a", _缓存项("x" * 100), time.time() + 60)
+        乙.写入("a", _缓存项("y" * 300), time.time() + 60)
+        乙.写入("b", _缓存项("z" * 100), time.time() + 60)
+        甲.删除("b")
+        
+        实际大小 = 甲._连接.execute("SELECT SUM(size) FROM cache").fetchone()[0]
+        assert 甲.获取统计信息()["disk_bytes"] == 乙.获取统计信息()["disk_bytes"] == 实际大小
+        
+        assert 甲.获取租约("movie_search:heat", 60)
+        assert not 乙.获取租约("movie_search:heat", 60)
+        乙.释放租约("movie_search:heat")  # 不是持有者，不影响租约
+        assert not 乙.获取租约("movie_search:heat", 60)
+        甲.释放租约("movie_search:heat")
+        assert 乙.获取租约("movie_search:heat", 60)
+        # 过期的租约可被接管
+        assert 甲.获取租约("tv_search:lost", -1)
+        assert 乙.获取租约("tv_search:lost", 60)
+        甲.关闭()
+        乙.关闭()
+
+
+class Test缓存管理器磁盘后端:
+    """缓存管理器与后端集成"""
+    
+    @pytest.mark.parametrize("后端名称", ["sqlite", "json"])
+    def test_磁盘命中(self, tmp_path, 后端名称):
+        """测试内存淘汰后从磁盘后端读取"""
+        缓存 = 缓存管理器(tmp_path, 磁盘后端=后端名称)
+        缓存.设置("The Matrix", {"id": 603})
+        缓存._清空内存缓存()
+        
+        assert 缓存.获取("the matrix") == {"id": 603}
+        assert 缓存.获取统计信息()["disk_backend"] == 后端名称
+    
+    def test_单条目有效期与清理(self, tmp_path):
+        """测试短有效期条目过期后被清理"""
+        缓存 = 缓存管理器(tmp_path)
+        缓存.设置("negative", [], 有效期秒数=0.01)
+        缓存.设置("positive", [{"id": 1}])
+        time.sleep(0.05)
+        
+        assert 缓存.清理过期() == 1
+        assert 缓存.获取("negative") is None
+        assert 缓存.获取("positive") == [{"id": 1}]
+    
+    def test_按前缀有效期(self, tmp_path):
+        """测试不同键前缀使用各自的有效期"""
+        缓存 = 缓存管理器(
+            tmp_path,
+            前缀有效期秒数={"movie_search": 0.01, "movie_details": 3600}
+        )
+        缓存.设置("movie_search:heat", [{"id": 949}])
+        缓存.设置("movie_details:949", {"id": 949})
+        缓存.设置("other:1", 1)
+        time.sleep(0.05)
+        
+        assert 缓存.获取("movie_search:heat") is None
+        assert 缓存.获取("movie_details:949") == {"id": 949}
+        assert 缓存.获取("other:1") == 1
+        缓存.关闭()
+    
+    def test_过期后可用(self, tmp_path):
+        """测试过期条目在可用时间内作为旧值返回，超过后删除"""
+        缓存 = 缓存管理器(tmp_path, 前缀有效期秒数={"tv_search": 0.05}, 过期后可用秒数=0.3)
+        缓存.设置("tv_search:lost", [{"id": 4607}])
+        assert 缓存.获取含过期("tv_search:lost") == ([{"id": 4607}], False)
+        
+        time.sleep(0.1)
+        assert 缓存.获取("tv_search:lost") is None
+        assert 缓存.获取含过期("tv_search:lost") == ([{"id": 4607}], True)
+        # 内存淘汰后磁盘中的旧值同样可用
+        缓存.刷新()
+        缓存._清空内存缓存()
+        assert 缓存.获取含过期("tv_search:lost") == ([{"id": 4607}], True)
+        assert 缓存.获取统计信息()["stale_hits"] == 3
+        
+        time.sleep(0.35)
+        assert 缓存.获取含过期("tv_search:lost") == (None, False)
+        缓存.关闭()
+    
+    def test_内存分片(self, tmp_path):
+        """测试内存缓存分片：条目少时单分片精确 LRU，条目多时分片容量之和等于上限"""
+        小缓存 = 缓存管理器(tmp_path / "small", 最大内存条目数=3)
+        assert len(小缓存._分片列表) == 1
+        for i in range(4):
+            小缓存.设置(f"k{i}", i)
+        小缓存._分片列表[0].条目.pop("k1")
+        assert list(小缓存._分片列表[0].条目) == ["k2", "k3"]
+        小缓存.关闭()
+        
+        大缓存 = 缓存管理器(tmp_path / "large", 最大内存条目数=1000)
+        assert len(大缓存._分片列表) > 1
+        assert sum(分片.容量 for 分片 in 大缓存._分片列表) == 1000
+        for i in range(1500):
+            大缓存.设置(f"movie_details:{i}", i)
+        统计 = 大缓存.获取统计信息()
+        assert 统计["memory_entries"] == 1000
+        assert 统计["memory_shards"] == len(大缓存._分片列表)
+        大缓存.关闭()
+    
+    def test_内存命中使用单调时钟(self, tmp_path):
+        """测试内存命中不再解析创建时间，未标准化的键仍能命中"""
+        缓存 = 缓存管理器(tmp_path)
+        缓存.设置("Movie_Search:The  Matrix", [{"id": 603}])
+        
+        with patch("smartrenamer.api.tmdb_client_enhanced.datetime") as 模拟时间:
+            assert 缓存.获取("movie_search:the matrix") == [{"id": 603}]
+            assert 缓存.获取("Movie_Search:The  Matrix") == [{"id": 603}]
+            模拟时间.fromisoformat.assert_not_called()
+        
+        统计 = 缓存.获取统计信息()
+        assert 统计["memory_hits"] == 2
+        缓存.关闭()
+    
+    def test_内存字节预算(self, tmp_path):
+        """测试按估算字节数淘汰，大条目只保存在磁盘"""
+        小条目 = {"id": 1, "title": "x"}
+        单条字节数 = 估算字节数({"创建时间": datetime.now().isoformat(), "数据": 小条目})
+        缓存 = 缓存管理器(tmp_path, 最大内存条目数=50, 最大内存字节数=单条字节数 * 5)
+        
+        for i in range(10):
+            缓存.设置(f"movie_search:{i}", 小条目)
+        统计 = 缓存.获取统计信息()
+        assert 统计["memory_entries"] <= 5
+        assert 0 < 统计["memory_bytes"] <= 统计["max_memory_bytes"]
+        assert 统计["memory_evictions"] >= 5
+        
+        # 超过整个预算的条目不进入内存，仍可从磁盘读取
+        大条目 = {"id": 2, "cast": [{"name": f"Actor {i}"} for i in range(100)]}
+        缓存.设置("movie_details:2", 大条目)
+        assert 缓存.获取统计信息()["memory_entries"] <= 5
+        assert 缓存.获取("movie_details:2") == 大条目
+        assert 缓存.获取统计信息()["memory_bytes"] <= 单条字节数 * 5
+        
+        缓存.清空()
+        assert 缓存.获取统计信息()["memory_bytes"] == 0
+        缓存.关闭()
+    
+    def test_无字节上限时不估算大小(self, tmp_path):
+        """测试未设置内存字节上限时写入和磁盘命中都不估算字节数"""
+        缓存 = 缓存管理器(tmp_path, 最大内存条目数=1)
+        with patch("smartrenamer.api.tmdb_client_enhanced.估算字节数") as 估算:
+            缓存.设置("movie_details:1", {"id": 1})
+            缓存.设置("movie_details:2", {"id": 2})
+            缓存.刷新()
+            assert 缓存.获取("movie_details:1") == {"id": 1}
+        assert 估算.call_count == 0
+        缓存.关闭()
+    
+    def test_估算字节数(self):
+        """测试嵌套对象的字节数估算"""
+        共享 = "shared " * 100
+        assert 估算字节数({"a": [共享, 共享]}) < 估算字节数({"a": [共享, 共享 + "!"]})
+        assert 估算字节数({"cast": list(range(1000))}) > 估算字节数({"cast": []}) + 8000
+    
+    @pytest.mark.parametrize("后端名称", ["sqlite", "json"])
+    def test_导出导入(self, tmp_path, 后端名称):
+        """测试缓存包去重相同数据，导入后在新节点命中，过期条目不导出"""
+        源 = 缓存管理器(tmp_path / "source", 磁盘后端=后端名称, 前缀有效期秒数={"tv_search": 0.05})
+        for i in range(10):
+            源.设置(f"movie_details:{i}", {"id": 603, "title": "The Matrix"})
+        源.设置("tv_details:1396", {"id": 1396})
+        源.设置("tv_search:lost", [{"id": 4607}])
+        time.sleep(0.1)
+        
+        结果 = 源.导出(tmp_path / "bundle.json.gz")
+        源.关闭()
+        
+        assert 结果["entries"] == 11
+        assert 结果["unique_payloads"] == 2
+        
+        目标 = 缓存管理器(tmp_path / "target", 磁盘后端=后端名称)
+        assert 目标.导入(tmp_path / "bundle.json.gz")["imported"] == 11
+        assert 目标.获取("movie_details:7") == {"id": 603, "title": "The Matrix"}
+        assert 目标.获取统计信息()["disk_hits"] == 1
+        assert 目标.获取("tv_search:lost") is None
+        目标.关闭()
+    
+    def test_导入保留较新条目(self, tmp_path):
+        """测试本机已有较新条目时不覆盖，按本机有效期跳过过期条目"""
+        源 = 缓存管理器(tmp_path / "source")
+        源.设置("movie_details:1", {"version": "old"})
+        源.设置("movie_search:heat", [{"id": 949}])
+        源.导出(tmp_path / "bundle.json.gz")
+        源.关闭()
+        
+        目标 = 缓存管理器(tmp_path / "target", 前缀有效期秒数={"movie_search": 0.05})
+        目标.设置("movie_details:1", {"version": "new"}, 有效期秒数=60)
+        目标.刷新()
+        time.sleep(0.1)
+        
+        结果 = 目标.导入(tmp_path / "bundle.json.gz")
+        
+        assert 结果 == {"imported": 0, "skipped_expired": 1, "skipped_existing": 1}
+        assert 目标.获取("movie_details:1") == {"version": "new"}
+        assert 目标.导入(tmp_path / "bundle.json.gz", 覆盖=True)["imported"] == 1
+        assert 目标.获取("movie_details:1") == {"version": "old"}
+        目标.关闭()
+    
+    def test_跨进程等待租约(self, tmp_path):
+        """测试其他实例持有租约时等待其写入后直接返回数据"""
+        甲 = 缓存管理器(tmp_path, 跨进程共享=True)
+        乙 = 缓存管理器(tmp_path, 跨进程共享=True)
+        assert 甲.获取或等待租约("movie_details:603", 60, 5) == (None, True)
+        
+        def 写入后释放():
+            time.sleep(0.1)
+            甲.设置("movie_details:603", {"id": 603})
+            甲.释放租约("movie_details:603")
+        
+        线程 = threading.Thread(target=写入后释放)
+        线程.start()
+        assert 乙.获取或等待租约("movie_details:603", 60, 5) == ({"id": 603}, False)
+        线程.join()
+        
+        assert 乙.获取统计信息()["lease_waits"] == 1
+        # 超时后由调用方自行加载
+        assert 甲.获取或等待租约("movie_details:604", 60, 5) == (None, True)
+        assert 乙.获取或等待租约("movie_details:604", 60, 0.1) == (None, False)
+        甲.关闭()
+        乙.关闭()
+    
+    def test_跨进程共享需要SQLite(self, tmp_path):
+        """测试 JSON 后端不支持跨进程共享"""
+        with pytest.raises(ValueError):
+            缓存管理器(tmp_path, 磁盘后端="json", 跨进程共享=True)
+    
+    def test_未知后端(self, tmp_path):
+        """测试未知后端名称"""
+        with pytest.raises(ValueError):
+            缓存管理器(tmp_path, 磁盘后端="lmdb")
+
+
+class _阻塞后端(磁盘缓存后端):
+    """记录批次的内存后端，放行事件未设置时写入会阻塞"""
+    
+    名称 = "blocking"
+    
+    def __init__(self):
+        self.数据 = {}
+        self.批次 = []
+        self.放行 = threading.Event()
+        self.放行.set()
+    
+    def 读取(self, 键):
+        return self.数据.get(键)
+    
+    def 写入(self, 键, 缓存项, 过期时间戳):
+        self.批量写入([(键, 缓存项, 过期时间戳)])
+    
+    def 批量写入(self, 条目列表):
+        self.放行.wait(5)
+        self.批次.append([键 for 键, _, _ in 条目列表])
+        for 键, 缓存项, _ in 条目列表:
+            self.数据[键] = 缓存项
+    
+    def 删除(self, 键):
+        self.数据.pop(键, None)
+    
+    def 清空(self):
+        self.数据.clear()
+
+
+class Test异步写入:
+    """缓存管理器的后台批量写入"""
+    
+    def test_合并重复键(self, tmp_path):
+        """测试同一个键的多次写入只落盘最新值"""
+        后端实例 = _阻塞后端()
+        后端实例.放行.clear()
+        缓存 = 缓存管理器(tmp_path, 磁盘后端=后端实例)
+        
+        缓存.设置("first", 0)
+        # 等后台线程取走第一批并阻塞在写入中，之后的写入留在队列里合并
+        while not 后端实例.放行.is_set() and not 缓存._正在写入:
+            time.sleep(0.001)
+        for 值 in range(1, 6):
+            缓存.设置("key", 值)
+        后端实例.放行.set()
+        缓存.刷新()
+        
+        assert 后端实例.批次 == [["first"], ["key"]]
+        assert 后端实例.数据["key"]["数据"] == 5
+        统计 = 缓存.获取统计信息()
+        assert 统计["coalesced_writes"] == 4
+        assert 统计["pending_writes"] == 0
+        缓存.关闭()
+    
+    def test_待写数据可读(self, tmp_path):
+        """测试尚未落盘（排队中或正在写入）的条目在内存淘汰后仍可读取"""
+        后端实例 = _阻塞后端()
+        后端实例.放行.clear()
+        缓存 = 缓存管理器(tmp_path, 磁盘后端=后端实例)
+        
+        缓存.设置("a", {"id": 1})
+        # 等后台线程取走 "a" 所在的批次（阻塞在写入中）
+        with 缓存._写入条件:
+            缓存._写入条件.wait_for(lambda: 缓存._正在写入, timeout=5)
+        缓存.设置("b", {"id": 2})
+        缓存._清空内存缓存()
+        
+        assert 缓存.获取("a") == {"id": 1}
+        assert 缓存.获取("b") == {"id": 2}
+        后端实例.放行.set()
+        缓存.关闭()
+    
+    def test_队列有界(self, tmp_path):
+        """测试队列满时写入方等待后台线程"""
+        后端实例 = _阻塞后端()
+        后端实例.放行.clear()
+        缓存 = 缓存管理器(tmp_path, 磁盘后端=后端实例, 最大待写条目数=2)
+        
+        完成 = threading.Event()
+        
+        def 写入():
+            for i in range(6):
+                缓存.设置(f"key{i}", i)
+            完成.set()
+        
+        线程 = threading.Thread(target=写入)
+        线程.start()
+        assert not 完成.wait(0.2)
+        assert 缓存.获取统计信息()["pending_writes"] <= 2
+        
+        后端实例.放行.set()
+        线程.join(5)
+        缓存.刷新()
+        assert 完成.is_set()
+        assert len(后端实例.数据) == 6
+        缓存.关闭()
+    
+    def test_关闭时持久化(self, tmp_path):
+        """测试关闭后重新打开可以读到全部数据"""
+        缓存 = 缓存管理器(tmp_path)
+        for i in range(50):
+            缓存.设置(f"movie {i}", {"id": i})
+        缓存.关闭()
+        
+        新缓存 = 缓存管理器(tmp_path)
+        assert 新缓存.获取("movie 49") == {"id": 49}
+        assert 新缓存.获取统计信息()["disk_entries"] == 50
+        新缓存.关闭()
+    
+    def test_后台批次中的坏条目不影响其他条目(self, tmp_path):
+        """测试后台写入的批次中有无法序列化的条目时，其他条目仍然落盘"""
+        缓存 = 缓存管理器(tmp_path)
+        缓存.设置("movie_search:heat", [], 有效期秒数=600)
+        缓存.设置("movie_details:bad", {"obj": object()})
+        缓存.设置("movie_details:603", {"id": 603})
+        缓存.刷新()
+        缓存._清空内存缓存()
+        
+        assert 缓存.获取("movie_search:heat") == []
+        assert 缓存.获取("movie_details:603") == {"id": 603}
+        assert 缓存.获取("movie_details:bad") is None
+        缓存.关闭()
+    
+    def test_同步写入(self, tmp_path):
+        """测试关闭异步写入时直接写磁盘"""
+        后端实例 = _阻塞后端()
+        缓存 = 缓存管理器(tmp_path, 磁盘后端=后端实例, 异步写入=False)
+        缓存.设置("key", 1)
+        
+        assert 后端实例.数据["key"]["数据"] == 1
+        assert 缓存._写入线程 is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,106 @@
+"""
+TMDB 缓存维护命令行工具测试
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from smartrenamer.api import cache_tool
+from smartrenamer.api.factory import TMDBClientFactory, clear_tmdb_client
+from smartrenamer.api.tmdb_client_enhanced import 增强TMDB客户端
+from smartrenamer.core.config import Config
+from smartrenamer.core.library import MediaLibrary
+from smartrenamer.core.models import MediaFile, MediaType
+from tests.tmdb_stub import TMDB桩服务器
+
+
+def _媒体文件(名称, 类型, tmdb_id, 季数=None):
+    """构造已匹配的媒体文件"""
+    return MediaFile(
+        path=Path(f"/media/{名称}"),
+        original_name=名称,
+        extension=".mkv",
+        media_type=类型,
+        tmdb_id=tmdb_id,
+        season_number=季数
+    )
+
+
+@pytest.fixture
+def 配置(monkeypatch, tmp_path):
+    """缓存目录位于临时主目录下的配置"""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    config = Config()
+    config.tmdb_api_key = "test_key"
+    monkeypatch.setattr(cache_tool, "get_config", lambda: config)
+    yield config
+    clear_tmdb_client()
+
+
+class Test收集媒体库id:
+    """从媒体库收集 TMDB ID"""
+    
+    def test_按类型和季号收集(self):
+        """测试电影去重，电视剧按季号合并，未匹配的文件跳过"""
+        文件列表 = [
+            _媒体文件("a.mkv", MediaType.MOVIE, 603),
+            _媒体文件("b.mkv", MediaType.MOVIE, 603),
+            _媒体文件("c.mkv", MediaType.TV_SHOW, 1396, 1),
+            _媒体文件("d.mkv", MediaType.TV_SHOW, 1396, 2),
+            _媒体文件("e.mkv", MediaType.MOVIE, None),
+        ]
+        
+        assert cache_tool.收集媒体库id(文件列表) == ([603], {1396: {1, 2}})
+
+
+class Test缓存命令:
+    """export / import / warm 子命令"""
+    
+    def test_导出后在新节点导入(self, 配置, monkeypatch, tmp_path, capsys):
+        """测试导出的缓存包在另一个主目录导入后命中"""
+        缓存包 = tmp_path / "bundle.json.gz"
+        TMDBClientFactory.get_client(配置).缓存.设置("movie_details:603", {"id": 603})
+        
+        assert cache_tool.main(["export", str(缓存包)]) == 0
+        assert json.loads(capsys.readouterr().out)["entries"] == 1
+        
+        clear_tmdb_client()
+        monkeypatch.setenv("HOME", str(tmp_path / "new_node"))
+        assert cache_tool.main(["import", str(缓存包)]) == 0
+        assert json.loads(capsys.readouterr().out)["imported"] == 1
+        assert TMDBClientFactory.get_client(配置).缓存.获取("movie_details:603") == {"id": 603}
+    
+    def test_按媒体库预热(self, 配置, monkeypatch, tmp_path, capsys):
+        """测试读取媒体库中的 ID，电视剧各季与详情合并为一次请求"""
+        媒体库 = MediaLibrary(tmp_path / "library")
+        媒体库.media_files = [
+            _媒体文件("matrix.mkv", MediaType.MOVIE, 603),
+            _媒体文件("bb.s01e01.mkv", MediaType.TV_SHOW, 1396, 1),
+            _媒体文件("bb.s02e01.mkv", MediaType.TV_SHOW, 1396, 2),
+        ]
+        媒体库.save_cache(tmp_path / "library.json")
+        
+        with TMDB桩服务器() as 服务器:
+            客户端 = 增强TMDB客户端(
+                "test_key",
+                缓存目录=tmp_path / "cache",
+                传输方式="native",
+                api基础URL=服务器.基础URL
+            )
+            monkeypatch.setattr(TMDBClientFactory, "get_client", lambda config: 客户端)
+            退出码 = cache_tool.main(
+                ["warm", "--library", str(tmp_path / "library.json"), "--movie", "550"]
+            )
+        
+        assert 退出码 == 0
+        assert json.loads(capsys.readouterr().out)["succeeded"] == 3
+        请求 = {路径: 参数.get("append_to_response") for 路径, 参数 in 服务器.请求记录}
+        assert set(请求) == {"/3/movie/603", "/3/movie/550", "/3/tv/1396"}
+        assert 请求["/3/tv/1396"] == "season/1,season/2"
+        assert 客户端.获取季详情(1396, 2, 使用缓存=True)["season_number"] == 2
+        assert len(服务器.请求记录) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -3,7 +3,7 @@
 """
 import pytest
 from pathlib import Path
-from smartrenamer.core.config import Config
+from smartrenamer.core.config import Config, SUPPORTED_TMDB_CACHE_BACKENDS
 
 
 class TestConfig:
@@ -34,6 +34,31 @@ class TestConfig:
         assert is_valid
         assert error_msg is None
     
+    @pytest.mark.parametrize("field, value", [
+        ("tmdb_transport", "nativ"),
+        ("tmdb_cache_backend", "sqlite3"),
+    ])
+    def test_config_validation_rejects_unknown_choice(self, field, value):
+        """测试未知的传输方式和缓存后端在验证时报错"""
+        config = Config(tmdb_api_key="test_api_key_12345", **{field: value})
+        is_valid, error_msg = config.validate()
+        
+        assert not is_valid
+        assert value in error_msg
+    
+    @pytest.mark.parametrize("transport", ["tmdbv3api", "native", "record", "replay"])
+    def test_config_validation_accepts_transports(self, transport):
+        """测试支持的传输方式通过验证"""
+        config = Config(tmdb_api_key="test_api_key_12345", tmdb_transport=transport)
+        
+        assert config.validate() == (True, None)
+    
+    def test_supported_cache_backends_match_registry(self):
+        """测试配置可选的缓存后端与已注册的后端一致"""
+        from smartrenamer.api.cache_backends import 磁盘缓存后端表
+        
+        assert SUPPORTED_TMDB_CACHE_BACKENDS == 磁盘缓存后端表
+    
     def test_config_update(self):
         """测试配置更新"""
         config = Config()
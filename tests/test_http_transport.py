@@ -0,0 +1,148 @@
+"""
+TMDB 原生 HTTP 传输测试（使用本地桩服务器）
+"""
+import shutil
+import time
+
+import pytest
+import requests
+
+from smartrenamer.api.http_transport import 原生HTTP传输
+from smartrenamer.api.tmdb_client_enhanced import 增强TMDB客户端
+from tests.tmdb_stub import TMDB桩服务器
+
+
+@pytest.fixture
+def 服务器():
+    """本地 TMDB 桩服务器"""
+    with TMDB桩服务器() as 实例:
+        yield 实例
+
+
+@pytest.fixture
+def 传输(服务器):
+    """指向桩服务器的原生传输"""
+    实例 = 原生HTTP传输("test_key", 基础URL=服务器.基础URL, 请求超时=5)
+    yield 实例
+    实例.关闭()
+
+
+class Test原生HTTP传输:
+    """原生传输的请求和解析"""
+    
+    def test_搜索电影精简结果(self, 传输, 服务器):
+        """测试搜索结果解析为只含所需字段的字典"""
+        结果 = 传输.搜索电影("The Matrix")
+        
+        assert len(结果) == 5
+        assert 结果[0]["id"] == 1
+        assert 结果[0]["title"] == "The Matrix"
+        assert "video" not in 结果[0]
+        路径, 参数 = 服务器.请求记录[0]
+        assert 路径 == "/3/search/movie"
+        assert 参数["query"] == "The Matrix"
+        assert 参数["language"] == "zh-CN"
+    
+    def test_搜索电视剧(self, 传输):
+        """测试电视剧搜索字段"""
+        结果 = 传输.搜索电视剧("Breaking Bad")
+        assert 结果[0]["name"] == "Breaking Bad"
+        assert 结果[0]["first_air_date"]
+    
+    def test_季详情去掉演职员(self, 传输):
+        """测试季详情中的剧集不含演职员列表"""
+        季 = 传输.季详情(1396, 1, append_to_response="")
+        
+        assert len(季["episodes"]) == 10
+        assert 季["episodes"][0]["name"] == "Episode 1"
+        assert "crew" not in 季["episodes"][0]
+        assert "guest_stars" not in 季["episodes"][0]
+    
+    def test_连接复用(self, 传输, 服务器):
+        """测试多次请求复用同一个 keep-alive 连接"""
+        for i in range(20):
+            传输.电影详情(i + 1)
+        assert 服务器.连接数 == 1
+    
+    def test_HTTP错误(self, 传输):
+        """测试 HTTP 错误以 HTTPError 抛出"""
+        with pytest.raises(requests.HTTPError) as 异常信息:
+            传输.电影详情(404)
+        assert 异常信息.value.response.status_code == 404
+    
+    def test_真实超时(self, 服务器):
+        """测试请求超时生效"""
+        服务器.延迟秒数 = 0.5
+        传输 = 原生HTTP传输("test_key", 基础URL=服务器.基础URL, 请求超时=0.1)
+        with pytest.raises(requests.Timeout):
+            传输.搜索电影("slow")
+        传输.关闭()
+
+
+class Test客户端原生传输:
+    """增强客户端使用原生传输"""
+    
+    @pytest.fixture
+    def 客户端(self, 服务器, tmp_path):
+        实例 = 增强TMDB客户端(
+            "test_key",
+            缓存目录=tmp_path / "cache",
+            传输方式="native",
+            api基础URL=服务器.基础URL,
+            重试延迟=0.01
+        )
+        yield 实例
+        实例.缓存.关闭()
+    
+    def test_搜索和详情(self, 客户端):
+        """测试客户端各方法经原生传输返回字典"""
+        assert 客户端.搜索电影("Inception", 年份=1991)[0]["id"] == 1
+        assert 客户端.获取电影详情(7)["runtime"] == 120
+        assert 客户端.获取季详情(1396, 2)["episodes"][1]["episode_number"] == 2
+        # 单集从已缓存的整季数据中取得
+        assert 客户端.获取剧集详情(1396, 2, 3)["name"] == "Episode 3"
+    
+    def test_附加内容合并请求(self, 客户端, 服务器):
+        """测试一次请求取得详情、多季剧集和别名，并分别写入缓存"""
+        详情 = 客户端.获取电视剧详情(1396, 附加内容=["season/1", "season/2", "alternative_titles"])
+        
+        assert len(服务器.请求记录) == 1
+        路径, 参数 = 服务器.请求记录[0]
+        assert 路径 == "/3/tv/1396"
+        assert 参数["append_to_response"] == "season/1,season/2,alternative_titles"
+        assert 详情["id"] == 1396
+        assert 详情["season/2"]["episodes"][0]["season_number"] == 2
+        assert "crew" not in 详情["season/2"]["episodes"][0]
+        assert 详情["alternative_titles"]["results"][0]["title"] == "标题 1396"
+        
+        # 各部分已分别缓存，不再发出请求
+        assert 客户端.获取季详情(1396, 1)["season_number"] == 1
+        assert 客户端.获取剧集详情(1396, 2, 5)["name"] == "Episode 5"
+        assert "season/1" not in 客户端.获取电视剧详情(1396)
+        assert 客户端.获取电视剧详情(1396, 附加内容=["season/2", "alternative_titles"])["season/2"]
+        assert len(服务器.请求记录) == 1
+        
+        # 只请求缺少的附加内容
+        客户端.获取电视剧详情(1396, 附加内容=["season/1", "season/3"])
+        assert 服务器.请求记录[1][1]["append_to_response"] == "season/3"
+    
+    def test_限流重试(self, 客户端, 服务器):
+        """测试 429 响应的 Retry-After 交给速率限制器处理"""
+        服务器.剩余限流次数 = 1
+        服务器.重试等待秒数 = 0.1
+        
+        开始 = time.monotonic()
+        结果 = 客户端.搜索电影("Heat", 使用缓存=False)
+        
+        assert 结果[0]["title"] == "Heat"
+        assert time.monotonic() - 开始 >= 0.08
+        assert 客户端.获取限流统计()["throttled"] == 1
+    
+    def test_未知传输方式(self):
+        """测试未知的传输方式"""
+        with pytest.raises(ValueError):
+            增强TMDB客户端("test_key", 启用缓存=False, 传输方式="curl")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,12 +1,15 @@
 """
 智能匹配器测试
 """
+import threading
+import time
 import pytest
 from unittest.mock import Mock, MagicMock
 from pathlib import Path
 from smartrenamer.core.matcher import Matcher, 智能匹配器, MatchResult, 匹配结果
 from smartrenamer.core.models import MediaFile, MediaType
 from smartrenamer.core.parser import FileNameParser
+from smartrenamer.core.title_index import 标题索引
 from smartrenamer.api.tmdb_client_enhanced import EnhancedTMDBClient
 
 
@@ -286,6 +289,367 @@ class TestMatcher:
         # 低相似度的结果应该被过滤
         if len(matches) > 0:
             assert matches[0].相似度 >= self.matcher.最小相似度
+    
+    def test_按目录匹配_每个目录一次搜索(self):
+        """测试同一季目录中的文件只搜索一次"""
+        mock_results = [
+            {
+                "id": 1396,
+                "name": "Breaking Bad",
+                "original_name": "Breaking Bad",
+                "first_air_date": "2008-01-20",
+            }
+        ]
+        self.mock_client.搜索电视剧 = Mock(return_value=mock_results)
+        
+        文件列表 = [
+            f"/media/Breaking Bad (2008)/Season 01/Breaking.Bad.S01E{i:02d}.720p.mkv"
+            for i in range(1, 8)
+        ]
+        结果 = self.matcher.match_by_directory(文件列表)
+        
+        assert self.mock_client.搜索电视剧.call_count == 1
+        self.mock_client.搜索电视剧.assert_called_with("Breaking Bad", 2008)
+        assert set(结果.keys()) == set(文件列表)
+        assert all(r[0].tmdb数据["id"] == 1396 for r in 结果.values())
+    
+    def test_按目录匹配_无目录上下文(self):
+        """测试无法借助目录上下文的文件逐个匹配"""
+        self.mock_client.搜索电影 = Mock(return_value=[
+            {"id": 603, "title": "The Matrix", "release_date": "1999-03-31"}
+        ])
+        
+        结果 = self.matcher.match_by_directory(["/media/movies/The.Matrix.1999.mkv"])
+        
+        assert self.mock_client.搜索电影.call_count == 1
+        assert 结果["/media/movies/The.Matrix.1999.mkv"][0].tmdb数据["id"] == 603
+    
+    def test_批量匹配_标题去重(self):
+        """测试同一剧集的多个文件只搜索一次"""
+        self.mock_client.搜索电视剧 = Mock(return_value=[
+            {
+                "id": 1396,
+                "name": "Breaking Bad",
+                "original_name": "Breaking Bad",
+                "first_air_date": "2008-01-20",
+            }
+        ])
+        self.mock_client.搜索电影 = Mock(return_value=[
+            {"id": 603, "title": "The Matrix", "release_date": "1999-03-31"}
+        ])
+        
+        文件列表 = [
+            MediaFile(
+                path=Path(f"/downloads/Breaking.Bad.S01E{i:02d}.720p.mkv"),
+                original_name=f"Breaking.Bad.S01E{i:02d}.720p.mkv",
+                extension=".mkv",
+            )
+            for i in range(1, 25)
+        ]
+        文件列表.append(MediaFile(
+            path=Path("/downloads/The.Matrix.1999.mkv"),
+            original_name="The.Matrix.1999.mkv",
+            extension=".mkv",
+        ))
+        
+        结果列表 = self.matcher.batch_match(文件列表, max_workers=4)
+        
+        assert self.mock_client.搜索电视剧.call_count == 1
+        assert self.mock_client.搜索电影.call_count == 1
+        assert len(结果列表) == 25
+        assert all(r[0].tmdb数据["id"] == 1396 for r in 结果列表[:24])
+        assert 结果列表[24][0].tmdb数据["id"] == 603
+    
+    def test_批量匹配_搜索失败(self):
+        """测试单个查询失败不影响其他文件"""
+        self.mock_client.搜索电影 = Mock(side_effect=RuntimeError("network"))
+        
+        文件 = MediaFile(
+            path=Path("/downloads/Inception.2010.mkv"),
+            original_name="Inception.2010.mkv",
+            extension=".mkv",
+        )
+        
+        assert self.matcher.批量匹配([文件]) == [[]]
+        assert self.matcher.批量匹配([]) == []
+
+    def test_本地索引_重复匹配不访问网络(self):
+        """测试索引中已有的标题直接从本地返回"""
+        self.mock_client.搜索电影 = Mock(return_value=[
+            {"id": 603, "title": "The Matrix", "release_date": "1999-03-31"}
+        ])
+        matcher = Matcher(self.mock_client, self.parser, 本地索引=标题索引())
+        
+        第一次 = matcher.match_file("The.Matrix.1999.1080p.mkv")
+        第二次 = matcher.match_file("The Matrix (1999).mkv")
+        
+        assert self.mock_client.搜索电影.call_count == 1
+        assert 第二次[0].tmdb数据["id"] == 第一次[0].tmdb数据["id"] == 603
+        assert "本地索引" in 第二次[0].匹配原因
+    
+    @pytest.mark.parametrize("转换", [lambda 对象: 对象, lambda 对象: dict(对象.__dict__)])
+    def test_本地索引_tmdbv3api结果(self, 转换):
+        """测试 tmdbv3api 的 AsObj 结果（原样或经 __dict__ 复制）可以写入索引并命中"""
+        AsObj = pytest.importorskip("tmdbv3api.as_obj").AsObj
+        self.mock_client.搜索电影 = Mock(return_value=[转换(AsObj({
+            "id": 603, "title": "The Matrix", "release_date": "1999-03-31", "genre_ids": [28, 878]
+        }))])
+        索引 = 标题索引()
+        matcher = Matcher(self.mock_client, self.parser, 本地索引=索引)
+        
+        第一次 = matcher.match_file("The.Matrix.1999.1080p.mkv")
+        matcher.批量匹配([MediaFile(
+            path=Path("/media/The.Matrix.1999.mkv"), original_name="The.Matrix.1999.mkv", extension=".mkv"
+        )])
+        第二次 = matcher.match_file("The Matrix (1999).mkv")
+        
+        assert 第一次[0].tmdb数据.get("id") == 603
+        assert "本地索引" in 第二次[0].匹配原因
+        assert 索引.查找候选(MediaType.MOVIE, "the matrix")[0]["genre_ids"] == [28, 878]
+    
+    def test_本地索引_写入失败不影响匹配(self):
+        """测试本地索引出错时仍返回网络搜索的结果"""
+        self.mock_client.搜索电影 = Mock(return_value=[
+            {"id": 603, "title": "The Matrix", "release_date": "1999-03-31"}
+        ])
+        索引 = Mock(spec=标题索引)
+        索引.查找已确认.side_effect = RuntimeError("database is locked")
+        索引.记录搜索结果.side_effect = TypeError("not JSON serializable")
+        matcher = Matcher(self.mock_client, self.parser, 本地索引=索引)
+        
+        结果 = matcher.match_file("The.Matrix.1999.1080p.mkv")
+        
+        assert 结果[0].tmdb数据["id"] == 603
+        assert 索引.记录搜索结果.called
+    
+    def test_本地索引_已确认别名(self):
+        """测试确认过的别名在新索引实例中仍可命中"""
+        self.mock_client.搜索电影 = Mock(return_value=[
+            {"id": 37165, "title": "Let the Bullets Fly",
+             "original_title": "让子弹飞", "release_date": "2010-12-16"}
+        ])
+        索引 = 标题索引()
+        matcher = Matcher(self.mock_client, self.parser, 本地索引=索引)
+        
+        文件 = MediaFile(
+            path=Path("/movies/Rang.Zi.Dan.Fei.2010.mkv"),
+            original_name="Rang.Zi.Dan.Fei.2010.mkv",
+            extension=".mkv",
+        )
+        matcher.apply_match_to_media_file(文件, MatchResult(
+            self.mock_client.搜索电影.return_value[0], 0.7, MediaType.MOVIE
+        ))
+        
+        结果 = matcher.batch_match([文件])
+        
+        self.mock_client.搜索电影.assert_not_called()
+        assert 结果[0][0].tmdb数据["id"] == 37165
+        assert 结果[0][0].相似度 == 1.0
+        assert 索引.获取统计信息()["命中次数"] == 1
+    
+    def test_本地索引_低相似度回退网络(self):
+        """测试索引候选不够相似时仍然访问网络"""
+        self.mock_client.搜索电视剧 = Mock(return_value=[
+            {"id": 2316, "name": "The Office", "first_air_date": "2005-03-24"}
+        ])
+        索引 = 标题索引()
+        索引.记录搜索结果(MediaType.TV_SHOW, [
+            {"id": 2996, "name": "The Office", "first_air_date": "2001-07-09"}
+        ])
+        matcher = Matcher(self.mock_client, self.parser, 本地索引=索引)
+        
+        结果 = matcher.match_file("The.Office.2005.S01E01.mkv")
+        
+        assert self.mock_client.搜索电视剧.call_count == 1
+        assert 结果[0].tmdb数据["id"] == 2316
+    
+    def _电影文件列表(self, 数量: int):
+        """生成不同标题的电影文件"""
+        return [
+            MediaFile(
+                path=Path(f"/movies/Movie.Number.{i:03d}.2020.mkv"),
+                original_name=f"Movie.Number.{i:03d}.2020.mkv",
+                extension=".mkv",
+            )
+            for i in range(数量)
+        ]
+    
+    def test_流式匹配_并发与完成顺序(self):
+        """测试流式匹配保持多个请求同时进行"""
+        锁 = threading.Lock()
+        状态 = {"进行中": 0, "峰值": 0}
+        
+        def 慢速搜索(标题, 年份):
+            with 锁:
+                状态["进行中"] += 1
+                状态["峰值"] = max(状态["峰值"], 状态["进行中"])
+            time.sleep(0.05)
+            with 锁:
+                状态["进行中"] -= 1
+            return [{"id": 1, "title": 标题, "release_date": "2020-01-01"}]
+        
+        self.mock_client.搜索电影 = Mock(side_effect=慢速搜索)
+        文件列表 = self._电影文件列表(40)
+        
+        开始 = time.perf_counter()
+        结果 = list(self.matcher.match_stream(文件列表, max_workers=10))
+        耗时 = time.perf_counter() - 开始
+        
+        assert len(结果) == 40
+        assert {f.original_name for f, _ in 结果} == {f.original_name for f in 文件列表}
+        assert all(r[0].title.startswith("Movie Number") for _, r in 结果)
+        assert 状态["峰值"] == 10
+        assert 耗时 < 40 * 0.05 / 2
+    
+    def test_流式匹配_同剧集合并查询(self):
+        """测试同一剧集的文件共享一次查询"""
+        self.mock_client.搜索电视剧 = Mock(return_value=[
+            {"id": 1396, "name": "Breaking Bad", "first_air_date": "2008-01-20"}
+        ])
+        文件列表 = [
+            MediaFile(
+                path=Path(f"/tv/Breaking.Bad.S01E{i:02d}.mkv"),
+                original_name=f"Breaking.Bad.S01E{i:02d}.mkv",
+                extension=".mkv",
+            )
+            for i in range(1, 11)
+        ]
+        
+        结果 = list(self.matcher.流式匹配(文件列表))
+        
+        assert self.mock_client.搜索电视剧.call_count == 1
+        assert len(结果) == 10
+        assert 结果[0][1][0].tmdb_id == 1396
+        assert 结果[0][1][0].is_movie is False
+    
+    def test_流式匹配_取消(self):
+        """测试取消后不再提交新查询"""
+        self.mock_client.搜索电影 = Mock(return_value=[])
+        取消事件 = threading.Event()
+        
+        结果 = []
+        for 文件, 匹配列表 in self.matcher.流式匹配(
+            self._电影文件列表(50), 最大并发数=2, 取消事件=取消事件
+        ):
+            结果.append(文件)
+            取消事件.set()
+        
+        assert len(结果) == 1
+        assert self.mock_client.搜索电影.call_count <= 3
+    
+    def test_惰性评分_前k名顺序(self):
+        """测试惰性评分结果与按相似度降序排序一致"""
+        候选 = [
+            {"id": 1, "title": "The Matrix Reloaded", "release_date": "2003-05-15"},
+            {"id": 2, "title": "The Matrix", "release_date": "1999-03-31"},
+            {"id": 3, "title": "The Matrix", "release_date": "2000-01-01"},
+            {"id": 4, "title": "Inception", "release_date": "1999-07-16"},
+            {"id": 5, "title": "The Matrix", "release_date": "1999-01-01"},
+        ]
+        解析结果 = {"标题": "The Matrix", "年份": 1999}
+        
+        结果 = self.matcher._惰性评分(解析结果, 候选, MediaType.MOVIE, 3)
+        
+        assert [r.tmdb_id for r in 结果] == [2, 5, 3]
+        assert 结果[0].相似度 == pytest.approx(1.0)
+        assert 结果[2].相似度 == pytest.approx(0.7 + 0.8 * 0.3)
+    
+    def test_惰性评分_自动确认提前结束(self):
+        """测试最佳结果不可能被超过时不再计算其余候选的标题相似度"""
+        候选 = [{"id": 603, "title": "The Matrix", "release_date": "1999-03-31"}]
+        候选 += [
+            {"id": 1000 + i, "title": f"The Matrix Part {i}", "release_date": "1999-01-01"}
+            for i in range(9)
+        ]
+        self.mock_client.搜索电影 = Mock(return_value=候选)
+        后端 = self.matcher.相似度后端
+        后端.计算 = Mock(wraps=后端.计算)
+        
+        结果 = self.matcher.match_file("The.Matrix.1999.mkv", auto_confirm=True)
+        
+        assert [r.tmdb_id for r in 结果] == [603]
+        assert 后端.计算.call_count == 1
+    
+    def test_填充剧集信息_整季预取(self):
+        """测试同一季的多个文件只请求一次整季详情"""
+        self.mock_client.获取季详情 = Mock(return_value={
+            "season_number": 1,
+            "episodes": [
+                {"episode_number": i, "name": f"Episode {i}"} for i in range(1, 23)
+            ],
+        })
+        self.mock_client.获取剧集详情 = Mock(return_value={"name": "Pilot"})
+        
+        文件列表 = [
+            MediaFile(
+                path=Path(f"/tv/Show.S01E{i:02d}.mkv"),
+                original_name=f"Show.S01E{i:02d}.mkv",
+                extension=".mkv",
+                media_type=MediaType.TV_SHOW,
+                tmdb_id=1396,
+                season_number=1,
+                episode_number=i,
+            )
+            for i in range(1, 23)
+        ]
+        # 另一季只有一个文件，逐集获取
+        文件列表.append(MediaFile(
+            path=Path("/tv/Show.S02E01.mkv"),
+            original_name="Show.S02E01.mkv",
+            extension=".mkv",
+            media_type=MediaType.TV_SHOW,
+            tmdb_id=1396,
+            season_number=2,
+            episode_number=1,
+        ))
+        
+        已填充 = self.matcher.fill_episode_titles(文件列表)
+        
+        assert 已填充 == 23
+        self.mock_client.获取季详情.assert_called_once_with(1396, 1)
+        self.mock_client.获取剧集详情.assert_called_once_with(1396, 2, 1)
+        assert 文件列表[4].episode_title == "Episode 5"
+        assert 文件列表[-1].episode_title == "Pilot"
+
+    
+    def test_填充剧集信息_多季合并请求(self):
+        """测试同一部剧的多季通过一次电视剧详情请求预取"""
+        self.mock_client.获取电视剧详情 = Mock(return_value={
+            "id": 1396,
+            **{
+                f"season/{季数}": {
+                    "season_number": 季数,
+                    "episodes": [
+                        {"episode_number": i, "name": f"S{季数}E{i}"} for i in range(1, 4)
+                    ],
+                }
+                for 季数 in (1, 2)
+            },
+        })
+        self.mock_client.获取季详情 = Mock()
+        
+        文件列表 = [
+            MediaFile(
+                path=Path(f"/tv/Show.S{季数:02d}E{i:02d}.mkv"),
+                original_name=f"Show.S{季数:02d}E{i:02d}.mkv",
+                extension=".mkv",
+                media_type=MediaType.TV_SHOW,
+                tmdb_id=1396,
+                season_number=季数,
+                episode_number=i,
+            )
+            for 季数 in (1, 2)
+            for i in range(1, 4)
+        ]
+        
+        已填充 = self.matcher.fill_episode_titles(文件列表)
+        
+        assert 已填充 == 6
+        self.mock_client.获取电视剧详情.assert_called_once_with(
+            1396, 附加内容=["season/1", "season/2"]
+        )
+        self.mock_client.获取季详情.assert_not_called()
+        assert 文件列表[4].episode_title == "S2E2"
 
 
 class Test智能匹配器:
@@ -95,6 +95,141 @@ class TestFileNameParser:
         assert result["season"] == 10
         assert result["episode"] == 15
     
+    def test_解析电视剧_多集范围(self):
+        """测试解析多集文件（S01E01-E03 / S01E01E02）"""
+        result = self.parser.parse("Friends.S01E01-E03.1080p.WEB-DL.mkv")
+        
+        assert result["media_type"] == MediaType.TV_SHOW
+        assert result["title"] == "Friends"
+        assert result["season"] == 1
+        assert result["episode"] == 1
+        assert result["episode_end"] == 3
+        
+        result = self.parser.parse("Friends.S02E05E06.720p.mkv")
+        assert result["episode"] == 5
+        assert result["episode_end"] == 6
+    
+    def test_解析电视剧_分辨率不误判为集数范围(self):
+        """测试 S01E05-720p 不会把分辨率当作结束集数"""
+        result = self.parser.parse("Show.S01E05-720p.mkv")
+        
+        assert result["episode"] == 5
+        assert result["episode_end"] is None
+        assert result["resolution"] == "720P"
+    
+    def test_解析动画_绝对集数(self):
+        """测试解析字幕组动画的绝对集数格式"""
+        result = self.parser.parse("[Group] One Piece - 1000 [1080p].mkv")
+        
+        assert result["media_type"] == MediaType.TV_SHOW
+        assert result["title"] == "One Piece"
+        assert result["season"] is None
+        assert result["episode"] == 1000
+        assert result["absolute_episode"] == 1000
+    
+    def test_解析动画_方括号集数(self):
+        """测试解析 [Group][Title][01][1080p] 格式"""
+        result = self.parser.parse("[字幕组][进击的巨人][01v2][1080p].mkv")
+        
+        assert result["media_type"] == MediaType.TV_SHOW
+        assert result["title"] == "进击的巨人"
+        assert result["absolute_episode"] == 1
+    
+    @pytest.mark.parametrize("文件名", [
+        "[Group][Movie][1080].mkv",
+        "[Group] Movie [2160][HDR].mkv",
+        "[Group][Movie][720].mkv",
+        "[Group][Movie][2019].mkv",
+    ])
+    def test_解析_方括号分辨率不误判为集数(self, 文件名):
+        """测试方括号中的分辨率和四位数字不被识别为集数"""
+        result = self.parser.parse(文件名)
+        
+        assert result["media_type"] == MediaType.MOVIE
+        assert result["absolute_episode"] is None
+    
+    def test_季集模式列表兼容保留(self):
+        """测试旧的 季集模式列表 属性仍可导入使用"""
+        assert 文件名解析器.季集模式列表[0] == r'[Ss](\d{1,2})[Ee](\d{1,3})'
+        assert FileNameParser.季集模式列表 is 文件名解析器.季集模式列表
+    
+    def test_解析_连字符年份不误判为集数(self):
+        """测试 Title - 2010 仍按电影年份处理"""
+        result = self.parser.parse("Inception - 2010 [1080p].mkv")
+        
+        assert result["media_type"] == MediaType.MOVIE
+        assert result["year"] == 2010
+        assert result["absolute_episode"] is None
+    
+    @pytest.mark.parametrize("文件名, 标题", [
+        ("Rocky - 4 [1080p].mkv", "Rocky 4"),
+        ("Ocean's Eleven - 11 (2001).mkv", "Ocean's Eleven 11"),
+        ("Movie - 300 [1080p].mkv", "Movie 300"),
+        ("[Group] Movie - 300 (2006) [1080p].mkv", "Movie 300"),
+    ])
+    def test_解析_非字幕组连字符数字不误判为集数(self, 文件名, 标题):
+        """测试没有字幕组前缀或带年份的 Title - N 仍按电影处理，数字保留在标题中"""
+        result = self.parser.parse(文件名)
+        
+        assert result["media_type"] == MediaType.MOVIE
+        assert result["title"] == 标题
+        assert result["episode"] is None
+        assert result["absolute_episode"] is None
+    
+    def test_解析目录上下文_季目录(self):
+        """测试从 Show (Year)/Season 01/ 目录继承标题、年份和季数"""
+        result = self.parser.parse_with_context(
+            "/media/Breaking Bad (2008)/Season 02/02 - Grilled.mkv"
+        )
+        
+        assert result["from_directory"] is True
+        assert result["media_type"] == MediaType.TV_SHOW
+        assert result["title"] == "Breaking Bad"
+        assert result["year"] == 2008
+        assert result["season"] == 2
+        assert result["episode"] == 2
+    
+    def test_解析目录上下文_季包目录(self):
+        """测试从季包目录名继承标题和季数"""
+        result = self.parser.parse_with_context(
+            "/downloads/The.Wire.S03.1080p.BluRay.x264/The.Wire.S03E05.mkv"
+        )
+        
+        assert result["from_directory"] is True
+        assert result["title"] == "The Wire"
+        assert result["season"] == 3
+        assert result["episode"] == 5
+    
+    def test_解析目录上下文_普通目录(self):
+        """测试普通目录退回完整解析"""
+        result = self.parser.parse_with_context("/media/movies/Inception.2010.1080p.mkv")
+        
+        assert result["from_directory"] is False
+        assert result["title"] == "Inception"
+        assert result["media_type"] == MediaType.MOVIE
+    
+    def test_解析目录上下文_缓存(self):
+        """测试同一目录只解析一次"""
+        目录 = Path("/media/Show (2010)/Season 1")
+        上下文1 = self.parser.解析目录(目录)
+        上下文2 = self.parser.解析目录(目录)
+        
+        assert 上下文1 is 上下文2
+        assert 上下文1 == {"标题": "Show", "年份": 2010, "季数": 1}
+    
+    def test_解析目录上下文_缓存有上限(self):
+        """测试目录缓存按 LRU 淘汰，条目数不超过上限"""
+        解析器 = 文件名解析器(最大目录缓存数=2)
+        第一季 = Path("/media/Show (2010)/Season 1")
+        上下文1 = 解析器.解析目录(第一季)
+        解析器.解析目录(Path("/media/Show (2010)/Season 2"))
+        assert 解析器.解析目录(第一季) is 上下文1
+        解析器.解析目录(Path("/media/Show (2010)/Season 3"))
+        
+        assert len(解析器._目录缓存) == 2
+        assert str(第一季) in 解析器._目录缓存
+        assert str(Path("/media/Show (2010)/Season 2")) not in 解析器._目录缓存
+    
     def test_解析_带方括号标签(self):
         """测试解析带方括号标签的文件名"""
         result = self.parser.parse("[发布组]The.Matrix.1999.1080p.BluRay.mkv")
@@ -168,6 +303,18 @@ class Test文件名解析器:
         assert 结果["媒体类型"] == MediaType.TV_SHOW
         assert 结果["季数"] == 1
         assert 结果["集数"] == 1
+    
+    def test_中文接口_解析中文集数(self):
+        """测试中文绝对集数和多集范围"""
+        结果 = self.解析器.解析("海贼王 第1000话 1080p.mkv")
+        assert 结果["媒体类型"] == MediaType.TV_SHOW
+        assert 结果["标题"] == "海贼王"
+        assert 结果["绝对集数"] == 1000
+        
+        结果 = self.解析器.解析("权力的游戏.第1季第1-3集.mkv")
+        assert 结果["季数"] == 1
+        assert 结果["集数"] == 1
+        assert 结果["结束集数"] == 3
 
 
 if __name__ == "__main__":
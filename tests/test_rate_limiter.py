@@ -0,0 +1,127 @@
+"""
+TMDB 速率限制器测试
+"""
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from smartrenamer.api.rate_limiter import 速率限制器, 解析限流异常
+
+
+class Test速率限制器:
+    """令牌桶和 AIMD 并发控制"""
+    
+    def test_令牌桶限制速率(self):
+        """测试令牌用完后按速率补充"""
+        限制器 = 速率限制器(每秒请求数=50, 突发容量=1, 最大并发数=5)
+        开始 = time.monotonic()
+        for _ in range(11):
+            with 限制器.许可():
+                pass
+        耗时 = time.monotonic() - 开始
+        
+        # 第一个请求消耗桶内令牌，其余 10 个按 50/s 补充
+        assert 耗时 >= 0.18
+        assert 限制器.获取统计信息()["total_requests"] == 11
+    
+    def test_不限制速率(self):
+        """测试速率为 0 时只受并发限制"""
+        限制器 = 速率限制器(每秒请求数=0)
+        开始 = time.monotonic()
+        for _ in range(100):
+            with 限制器.许可():
+                pass
+        assert time.monotonic() - 开始 < 0.5
+    
+    def test_AIMD并发上限(self):
+        """测试限流时并发减半、成功时逐步恢复"""
+        限制器 = 速率限制器(每秒请求数=0, 最大并发数=8, 默认等待秒数=0)
+        限制器.报告限流()
+        assert 限制器.并发上限 == 4
+        限制器.报告限流()
+        限制器.报告限流()
+        限制器.报告限流()
+        assert 限制器.并发上限 == 1
+        
+        for _ in range(200):
+            限制器.报告成功()
+        assert 限制器.并发上限 == 8
+        assert 限制器.获取统计信息()["throttled"] == 4
+    
+    def test_并发上限与排队深度(self):
+        """测试超过并发上限的请求排队等待"""
+        限制器 = 速率限制器(每秒请求数=0, 最大并发数=2)
+        限制器.获取()
+        限制器.获取()
+        
+        已获取 = threading.Event()
+        
+        def 等待许可():
+            with 限制器.许可():
+                已获取.set()
+        
+        线程 = threading.Thread(target=等待许可)
+        线程.start()
+        assert not 已获取.wait(0.1)
+        统计 = 限制器.获取统计信息()
+        assert 统计["in_flight"] == 2
+        assert 统计["queue_depth"] == 1
+        
+        限制器.释放()
+        assert 已获取.wait(2)
+        线程.join(2)
+        assert 限制器.获取统计信息()["queue_depth"] == 0
+    
+    def test_限流暂停(self):
+        """测试 Retry-After 时间内暂停所有请求"""
+        限制器 = 速率限制器(每秒请求数=0)
+        限制器.报告限流(0.2)
+        assert 限制器.获取统计信息()["paused_seconds"] > 0
+        
+        开始 = time.monotonic()
+        with 限制器.许可():
+            pass
+        assert time.monotonic() - 开始 >= 0.15
+    
+    def test_限流保留预约欠额(self):
+        """测试限流不会抹掉异步预约透支的令牌"""
+        限制器 = 速率限制器(每秒请求数=10, 突发容量=1, 默认等待秒数=0)
+        for _ in range(5):
+            限制器.预约令牌()
+        限制器.报告限流()
+        assert 限制器.预约令牌() >= 0.4
+
+
+class Test解析限流异常:
+    """限流错误识别"""
+    
+    def test_HTTP429(self):
+        """测试读取 Retry-After 头"""
+        异常 = Exception("429")
+        异常.response = Mock(status_code=429, headers={"Retry-After": "3"})
+        assert 解析限流异常(异常) == 3.0
+    
+    def test_HTTP429无RetryAfter(self):
+        """测试缺少 Retry-After 时使用默认等待时间"""
+        异常 = Exception("429")
+        异常.response = Mock(status_code=429, headers={})
+        assert 解析限流异常(异常, 默认等待秒数=2.5) == 2.5
+    
+    def test_tmdbv3api限流信息(self):
+        """测试识别 tmdbv3api 的限流异常"""
+        assert 解析限流异常(Exception("Rate limit reached. Try again in 7 seconds.")) == 7.0
+        assert 解析限流异常(
+            Exception("Your request count (41) is over the allowed limit of (40)."),
+            默认等待秒数=1.0
+        ) == 1.0
+    
+    @pytest.mark.parametrize("异常", [Exception("Connection reset"), ValueError("bad")])
+    def test_普通错误(self, 异常):
+        """测试普通错误不视为限流"""
+        assert 解析限流异常(异常) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
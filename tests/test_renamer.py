@@ -3,8 +3,10 @@
 """
 import pytest
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import shutil
 from pathlib import Path
+from jinja2 import TemplateSyntaxError
 from smartrenamer.core.models import MediaFile, MediaType, RenameRule
 from smartrenamer.core.renamer import (
     Renamer,
@@ -21,6 +23,10 @@ from smartrenamer.core.renamer import (
     清理文件名,
     截断,
     大写首字母,
+    编译模板,
+    编译快速模板,
+    获取渲染函数,
+    预定义模板,
 )
 
 
@@ -665,6 +671,153 @@ class Test带目录重命名:
         assert "S01E01" in 新文件.name
 
 
+class Test模板编译缓存:
+    """测试模板编译结果的缓存"""
+    
+    def _剧集文件(self, 集数):
+        """构造电视剧媒体文件"""
+        return MediaFile(
+            path=Path(f"/test/show.e{集数}.mkv"),
+            original_name=f"show.e{集数}.mkv",
+            extension=".mkv",
+            media_type=MediaType.TV_SHOW,
+            title="绝命毒师",
+            season_number=1,
+            episode_number=集数,
+            episode_title=f"第{集数}集" if 集数 % 2 else None,
+            resolution="1080p",
+        )
+    
+    def test_同一模板只编译一次(self):
+        """测试多个重命名器实例、多个文件共用同一个模板的编译结果"""
+        获取渲染函数.cache_clear()
+        规则 = 创建预定义规则("电视剧-完整")
+        
+        for 重命名器实例 in (重命名器(), 重命名器()):
+            for 集数 in range(1, 6):
+                assert 重命名器实例.生成新文件名(self._剧集文件(集数), 规则)[0]
+        
+        信息 = 获取渲染函数.cache_info()
+        assert 信息.misses == 1
+        assert 信息.hits == 9
+    
+    def test_多线程共用实例(self):
+        """测试多个线程同时使用同一个重命名器，结果与顺序执行一致"""
+        重命名器实例 = 重命名器()
+        规则 = 创建预定义规则("电视剧-带剧集名")
+        文件列表 = [self._剧集文件(i) for i in range(1, 201)]
+        
+        顺序结果 = [重命名器实例.生成新文件名(f, 规则) for f in 文件列表]
+        with ThreadPoolExecutor(max_workers=8) as 线程池:
+            并发结果 = list(线程池.map(lambda f: 重命名器实例.生成新文件名(f, 规则), 文件列表))
+        
+        assert 并发结果 == 顺序结果
+        assert 顺序结果[0][1] == "绝命毒师 S01E01 第1集.mkv"
+        assert 顺序结果[1][1] == "绝命毒师 S01E02.mkv"
+    
+    def test_语法错误不缓存(self):
+        """测试语法错误的模板返回错误信息且不进入缓存"""
+        编译模板.cache_clear()
+        获取渲染函数.cache_clear()
+        规则 = RenameRule(
+            name="错误模板",
+            description="测试",
+            template="{{ title }",
+            media_type=MediaType.MOVIE,
+        )
+        
+        成功, _, 错误 = 重命名器().生成新文件名(self._剧集文件(1), 规则)
+        
+        assert not 成功
+        assert "生成文件名失败" in 错误
+        assert 编译模板.cache_info().currsize == 0
+        assert 获取渲染函数.cache_info().currsize == 0
+
+
+# 快速路径与 Jinja2 等价性测试使用的上下文
+快速模板上下文列表 = [
+    {
+        "title": "黑客帝国", "original_title": "The Matrix", "year": 1999,
+        "season": 1, "episode": 5, "episode_title": "试播集",
+        "resolution": "1080p", "source": "BluRay", "codec": "H264", "separator": ".",
+    },
+    {
+        "title": "The Matrix: Reloaded", "original_title": "Unknown", "year": None,
+        "season": None, "episode": None, "episode_title": "",
+        "resolution": "", "source": "", "codec": "", "separator": " ",
+    },
+    {
+        "title": '  Who/What?  "Is"  <Here>  ', "original_title": "x", "year": 2024,
+        "season": 12, "episode": 123, "episode_title": "Part 1 | Part 2",
+        "resolution": "2160p", "source": "", "codec": "x265", "separator": "_",
+    },
+    {
+        "title": "", "original_title": "", "year": "", "season": "3", "episode": 0,
+        "episode_title": "  ", "resolution": None, "source": None, "codec": None, "separator": "",
+    },
+]
+
+
+class Test快速模板:
+    """测试快速路径编译的模板与 Jinja2 渲染结果一致"""
+    
+    @pytest.mark.parametrize("名称", list(预定义模板))
+    def test_预定义模板等价(self, 名称):
+        """测试每个预定义模板都走快速路径，且结果与 Jinja2 相同"""
+        模板 = 预定义模板[名称]["模板"]
+        快速渲染 = 编译快速模板(模板)
+        
+        assert 快速渲染 is not None
+        for 上下文 in 快速模板上下文列表:
+            assert 快速渲染(上下文) == 编译模板(模板).render(上下文)
+    
+    @pytest.mark.parametrize("模板", [
+        "",
+        "纯文本",
+        "{{ title }}{{ year }}",
+        "{{ 'S' }}{{ season|pad(3, '*') }}",
+        "{{ title|截断(6)|全大写 }}-{{ title|truncate(8, '~')|lower }}",
+        "{{ title|大写首字母|replace(' ', '_', 1) }}",
+        "{{ codec|default('none') }}|{{ year|默认值 }}",
+        "{% if not codec %}无{% elif source and year %}{{ source }}{% else %}{{ year or 'x' }}{% endif %}",
+        "{%- if episode_title -%} [{{ episode_title|clean }}] {%- endif %}",
+    ])
+    def test_其他支持的语法等价(self, 模板):
+        """测试过滤器参数、elif / else、not / and / or 和空白控制"""
+        快速渲染 = 编译快速模板(模板)
+        
+        assert 快速渲染 is not None
+        for 上下文 in 快速模板上下文列表:
+            assert 快速渲染(上下文) == 编译模板(模板).render(上下文)
+    
+    @pytest.mark.parametrize("模板", [
+        "{{ title[:3] }}",
+        "{{ title ~ year }}",
+        "{% for c in title %}{{ c }}{% endfor %}",
+        "{{ title|replace(separator, '.') }}",
+        "{{ title|trim }}",
+        "{% if season > 1 %}x{% endif %}",
+    ])
+    def test_不支持的语法回退到Jinja(self, 模板):
+        """测试不支持的语法不编译为闭包，渲染函数使用 Jinja2"""
+        上下文 = 快速模板上下文列表[0]
+        
+        assert 编译快速模板(模板) is None
+        assert 获取渲染函数(模板)(上下文) == 编译模板(模板).render(上下文)
+    
+    def test_缺少变量时回退到Jinja(self):
+        """测试上下文缺少变量时按 Jinja2 的 Undefined 语义渲染"""
+        模板 = "{{ title }}[{{ missing }}]{% if missing %}有{% else %}无{% endif %}"
+        
+        assert 编译快速模板(模板) is not None
+        assert 获取渲染函数(模板)({"title": "A"}) == "A[]无"
+    
+    def test_语法错误(self):
+        """测试语法错误与 Jinja2 一样抛出 TemplateSyntaxError"""
+        with pytest.raises(TemplateSyntaxError):
+            编译快速模板("{% if title %}")
+
+
 class Test并行重命名:
     """测试并行重命名功能"""
     
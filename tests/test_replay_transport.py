@@ -0,0 +1,145 @@
+"""
+TMDB 夹具录制与回放传输测试
+"""
+import time
+
+import pytest
+import requests
+
+from smartrenamer.api.factory import TMDBClientFactory, clear_tmdb_client
+from smartrenamer.api.replay_transport import 夹具档案, 夹具缺失错误, 录制HTTP传输, 回放HTTP传输
+from smartrenamer.api.tmdb_client_enhanced import 增强TMDB客户端
+from smartrenamer.core.config import Config
+from tests.tmdb_stub import TMDB桩服务器
+
+
+@pytest.fixture
+def 已录制档案(tmp_path):
+    """从本地桩服务器录制的夹具档案（已保存并重新加载）"""
+    路径 = tmp_path / "fixtures.json.gz"
+    with TMDB桩服务器() as 服务器:
+        录制 = 录制HTTP传输("test_key", 夹具档案(路径), 基础URL=服务器.基础URL)
+        录制.搜索电影("The Matrix")
+        录制.季详情(1396, 1, append_to_response="")
+        with pytest.raises(requests.HTTPError):
+            录制.电影详情(404)
+        录制.关闭()
+    return 夹具档案(路径)
+
+
+class Test夹具档案:
+    """档案的键和持久化"""
+    
+    def test_生成键忽略api_key(self):
+        """测试档案键按参数名排序且不含 api_key"""
+        键 = 夹具档案.生成键("/search/movie", {"query": "Heat", "api_key": "x", "language": "zh-CN"})
+        assert 键 == "/search/movie?language=zh-CN&query=Heat"
+    
+    def test_录制后加载(self, 已录制档案):
+        """测试录制的响应（包括 404）保存到压缩档案并可重新加载"""
+        assert len(已录制档案) == 3
+        assert 已录制档案.获取("/search/movie?language=zh-CN&query=The Matrix")["status"] == 200
+        assert 已录制档案.获取("/movie/404?language=zh-CN")["status"] == 404
+
+
+class Test回放HTTP传输:
+    """离线回放"""
+    
+    def test_回放结果与录制一致(self, 已录制档案):
+        """测试回放不访问网络，结果经过相同的精简处理"""
+        回放 = 回放HTTP传输(已录制档案)
+        
+        结果 = 回放.搜索电影("The Matrix")
+        季 = 回放.季详情(1396, 1, append_to_response="")
+        
+        assert 结果[0]["title"] == "The Matrix"
+        assert "video" not in 结果[0]
+        assert "crew" not in 季["episodes"][0]
+        assert 回放.获取统计信息()["replayed"] == 2
+    
+    def test_记录的错误和缺失(self, 已录制档案):
+        """测试记录的 404 原样抛出，档案中没有的请求抛出夹具缺失错误"""
+        回放 = 回放HTTP传输(已录制档案)
+        
+        with pytest.raises(requests.HTTPError) as 错误:
+            回放.电影详情(404)
+        assert 错误.value.response.status_code == 404
+        with pytest.raises(夹具缺失错误):
+            回放.搜索电影("Heat")
+        assert 回放.获取统计信息()["missing"] == 1
+    
+    def test_模拟延迟(self, 已录制档案):
+        """测试固定延迟和抖动"""
+        回放 = 回放HTTP传输(已录制档案, 延迟秒数=0.02, 延迟抖动秒数=0.01, 随机种子=1)
+        
+        开始 = time.monotonic()
+        回放.搜索电影("The Matrix")
+        
+        assert time.monotonic() - 开始 >= 0.02
+        assert 0.02 <= 回放.获取统计信息()["simulated_latency_seconds"] < 0.03
+    
+    def test_注入限流由客户端重试(self, 已录制档案, tmp_path):
+        """测试注入的 429 带 Retry-After，客户端经速率限制器暂停后重试成功"""
+        回放 = 回放HTTP传输(已录制档案, 限流概率=1.0, 重试等待秒数=0.05)
+        原请求 = 回放.请求
+        
+        def 只限流一次(*args, **kwargs):
+            try:
+                return 原请求(*args, **kwargs)
+            finally:
+                回放.限流概率 = 0.0
+        
+        回放.请求 = 只限流一次
+        客户端 = 增强TMDB客户端(
+            "test_key", 缓存目录=tmp_path / "cache", 传输方式=回放, 重试延迟=0.01
+        )
+        
+        开始 = time.monotonic()
+        assert 客户端.搜索电影("The Matrix")[0]["title"] == "The Matrix"
+        
+        assert time.monotonic() - 开始 >= 0.04
+        assert 回放.获取统计信息()["injected_throttles"] == 1
+        assert 客户端.获取限流统计()["throttled"] == 1
+        客户端.缓存.关闭()
+    
+    def test_随机种子可重复(self, 已录制档案):
+        """测试相同种子注入的错误序列相同"""
+        def 错误序列(种子):
+            回放 = 回放HTTP传输(已录制档案, 限流概率=0.2, 错误概率=0.2, 随机种子=种子)
+            序列 = []
+            for _ in range(30):
+                try:
+                    回放.搜索电影("The Matrix")
+                    序列.append(200)
+                except requests.HTTPError as e:
+                    序列.append(e.response.status_code)
+            return 序列
+        
+        assert 错误序列(7) == 错误序列(7)
+        assert {429, 503, 200} <= set(错误序列(7))
+
+
+class Test工厂回放配置:
+    """通过配置启用回放"""
+    
+    def teardown_method(self):
+        clear_tmdb_client()
+    
+    def test_配置回放传输(self, 已录制档案, tmp_path):
+        """测试 tmdb_transport=replay 时客户端使用回放传输"""
+        config = Config()
+        config.tmdb_api_key = "test_key"
+        config.tmdb_transport = "replay"
+        config.tmdb_fixture_path = str(已录制档案.路径)
+        config.tmdb_replay_latency_ms = 1
+        config.tmdb_cache_enabled = False
+        
+        客户端 = TMDBClientFactory.get_client(config, force_recreate=True)
+        
+        assert isinstance(客户端.传输, 回放HTTP传输)
+        assert 客户端.传输.延迟秒数 == 0.001
+        assert 客户端.搜索电影("The Matrix")[0]["id"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,175 @@
+"""
+多进程共享 TMDB 缓存测试
+
+子进程使用 spawn 方式启动，与多个独立的工作进程使用同一个缓存目录的情形一致
+"""
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from smartrenamer.api.cache_backends import JSON文件缓存后端, SQLite缓存后端
+from smartrenamer.api.factory import TMDBClientFactory, clear_tmdb_client
+from smartrenamer.api.tmdb_client_enhanced import 增强TMDB客户端
+from smartrenamer.core.config import Config
+from tests.tmdb_stub import TMDB桩服务器
+
+
+def _并发写入(数据库路径, 编号, 条目数):
+    """子进程：写入、覆盖和删除条目"""
+    后端 = SQLite缓存后端(数据库路径, 最大字节数=200_000)
+    for i in range(条目数):
+        缓存项 = {"创建时间": "2024-01-01T00:00:00", "数据": "x" * (100 + 编号 * 10 + i)}
+        后端.写入(f"key_{i % 50}", 缓存项, time.time() + 60)
+        if i % 7 == 0:
+            后端.删除(f"key_{(i + 25) % 50}")
+    后端.关闭()
+
+
+def _共享搜索(缓存目录, 基础URL, 标题列表, 结果队列):
+    """子进程：使用共享缓存搜索同一组标题"""
+    客户端 = 增强TMDB客户端(
+        "test_key",
+        缓存目录=缓存目录,
+        传输方式="native",
+        api基础URL=基础URL,
+        共享缓存=True
+    )
+    结果 = [客户端.搜索电影(标题)[0]["title"] for 标题 in 标题列表]
+    统计 = 客户端.获取缓存统计()
+    客户端.缓存.关闭()
+    结果队列.put((结果, 统计["cross_process_coalesced"]))
+
+
+def _报告工厂实例(结果队列):
+    """fork 出的子进程：报告工厂是否已丢弃父进程的实例"""
+    结果队列.put(TMDBClientFactory._instance is None)
+
+
+@pytest.fixture
+def 上下文():
+    """spawn 方式的多进程上下文"""
+    return multiprocessing.get_context("spawn")
+
+
+class Test多进程SQLite:
+    """多个进程同时写入同一个数据库"""
+    
+    def test_并发写入后大小一致(self, 上下文, tmp_path):
+        """测试多个进程并发写入、删除和按大小淘汰后，共享的总大小与实际数据一致"""
+        数据库路径 = tmp_path / "cache.sqlite3"
+        进程列表 = [上下文.Process(target=_并发写入, args=(数据库路径, i, 200)) for i in range(4)]
+        for 进程 in 进程列表:
+            进程.start()
+        for 进程 in 进程列表:
+            进程.join(60)
+            assert 进程.exitcode == 0
+        
+        后端 = SQLite缓存后端(数据库路径)
+        实际大小 = 后端._连接.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        assert 后端.获取统计信息()["disk_bytes"] == 实际大小
+        assert 0 < 实际大小 <= 200_000
+        后端.关闭()
+
+
+class TestJSON文件并发:
+    """JSON 文件后端的原子写入"""
+    
+    def test_并发读写不读到半个文件(self, tmp_path):
+        """测试并发覆盖同一个键时读取方总能读到完整的 JSON"""
+        后端 = JSON文件缓存后端(tmp_path)
+        停止 = threading.Event()
+        错误 = []
+        
+        def 写入():
+            i = 0
+            while not 停止.is_set():
+                后端.写入("movie_search:heat", {"创建时间": "2024-01-01T00:00:00", "数据": "x" * (i % 5000)}, 0)
+                i += 1
+        
+        def 读取():
+            while not 停止.is_set():
+                try:
+                    后端.读取("movie_search:heat")
+                except json.JSONDecodeError as e:
+                    错误.append(e)
+        
+        线程列表 = [threading.Thread(target=写入) for _ in range(2)] + [threading.Thread(target=读取)]
+        for 线程 in 线程列表:
+            线程.start()
+        time.sleep(0.5)
+        停止.set()
+        for 线程 in 线程列表:
+            线程.join()
+        
+        assert not 错误
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+class Test跨进程合并请求:
+    """多个进程搜索同一组标题"""
+    
+    def test_同一个键只请求一次(self, 上下文, tmp_path):
+        """测试多个进程同时未命中时，每个标题只由一个进程请求，其他进程读取共享结果"""
+        标题列表 = [f"Title {i}" for i in range(5)]
+        结果队列 = 上下文.Queue()
+        
+        with TMDB桩服务器(延迟秒数=0.3) as 服务器:
+            进程列表 = [
+                上下文.Process(target=_共享搜索, args=(tmp_path / "cache", 服务器.基础URL, 标题列表, 结果队列))
+                for _ in range(3)
+            ]
+            for 进程 in 进程列表:
+                进程.start()
+            结果列表 = [结果队列.get(timeout=60) for _ in 进程列表]
+            for 进程 in 进程列表:
+                进程.join(60)
+        
+        assert all(结果 == 标题列表 for 结果, _ in 结果列表)
+        assert len(服务器.请求记录) == len(标题列表)
+
+
+class Test工厂共享缓存:
+    """工厂的共享缓存配置"""
+    
+    def teardown_method(self):
+        clear_tmdb_client()
+    
+    def test_共享缓存使用SQLite(self, tmp_path, monkeypatch):
+        """测试共享缓存时即使配置了 json 后端也使用 sqlite"""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        config = Config()
+        config.tmdb_api_key = "test_key"
+        config.tmdb_cache_backend = "json"
+        config.tmdb_cache_shared = True
+        
+        客户端 = TMDBClientFactory.get_client(config, force_recreate=True)
+        
+        统计 = 客户端.获取缓存统计()
+        assert 统计["disk_backend"] == "sqlite"
+        assert 统计["shared"] is True
+        客户端.缓存.关闭()
+    
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="需要 fork")
+    def test_fork后重新创建实例(self, tmp_path, monkeypatch):
+        """测试 fork 出的子进程不沿用父进程的客户端实例"""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        config = Config()
+        config.tmdb_api_key = "test_key"
+        TMDBClientFactory.get_client(config, force_recreate=True)
+        
+        上下文 = multiprocessing.get_context("fork")
+        结果队列 = 上下文.Queue()
+        进程 = 上下文.Process(target=_报告工厂实例, args=(结果队列,))
+        进程.start()
+        
+        assert 结果队列.get(timeout=30) is True
+        进程.join(30)
+        assert TMDBClientFactory._instance is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
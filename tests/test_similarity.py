@@ -0,0 +1,131 @@
+"""
+相似度后端测试
+"""
+import random
+import pytest
+from difflib import SequenceMatcher
+from smartrenamer.core.similarity import (
+    获取相似度后端,
+    相似度后端表,
+    Difflib相似度,
+    公共子序列相似度,
+    编辑距离相似度,
+    JaroWinkler相似度,
+)
+
+
+def _编辑距离(a: str, b: str) -> int:
+    """朴素动态规划编辑距离（参考实现）"""
+    上一行 = list(range(len(b) + 1))
+    for i, 字符a in enumerate(a, 1):
+        当前行 = [i]
+        for j, 字符b in enumerate(b, 1):
+            当前行.append(min(上一行[j] + 1, 当前行[j - 1] + 1, 上一行[j - 1] + (字符a != 字符b)))
+        上一行 = 当前行
+    return 上一行[-1]
+
+
+def _公共子序列长度(a: str, b: str) -> int:
+    """朴素动态规划 LCS（参考实现）"""
+    上一行 = [0] * (len(b) + 1)
+    for 字符a in a:
+        当前行 = [0]
+        for j, 字符b in enumerate(b, 1):
+            当前行.append(上一行[j - 1] + 1 if 字符a == 字符b else max(上一行[j], 当前行[j - 1]))
+        上一行 = 当前行
+    return 上一行[-1]
+
+
+def _随机字符串对(数量: int):
+    """生成包含中英文字符的随机字符串对"""
+    随机 = random.Random(42)
+    字符集 = "abcde 让子弹飞"
+    for _ in range(数量):
+        yield (
+            "".join(随机.choice(字符集) for _ in range(随机.randint(1, 40))),
+            "".join(随机.choice(字符集) for _ in range(随机.randint(1, 40))),
+        )
+
+
+class Test相似度后端:
+    """相似度后端测试类"""
+    
+    @pytest.mark.parametrize("名称", list(相似度后端表))
+    def test_基本性质(self, 名称):
+        """测试各后端的基本性质"""
+        后端 = 获取相似度后端(名称)
+        
+        assert 后端.相似度("The Matrix", "the matrix") == 1.0
+        assert 后端.相似度("", "test") == 0.0
+        assert 后端.相似度("test", "") == 0.0
+        assert 0.0 <= 后端.相似度("the matrix", "inception") < 0.6
+        assert 后端.相似度("the matrix", "the matrix reloaded") > 后端.相似度("the matrix", "inception")
+    
+    def test_编辑距离与参考实现一致(self):
+        """测试位并行编辑距离与动态规划结果一致"""
+        后端 = 编辑距离相似度()
+        for a, b in _随机字符串对(500):
+            期望 = 1 - _编辑距离(a, b) / max(len(a), len(b))
+            assert 后端.相似度(a, b) == pytest.approx(期望)
+    
+    def test_公共子序列与参考实现一致(self):
+        """测试位并行 LCS 与动态规划结果一致"""
+        后端 = 公共子序列相似度()
+        for a, b in _随机字符串对(500):
+            期望 = 2 * _公共子序列长度(a, b) / (len(a) + len(b))
+            assert 后端.相似度(a, b) == pytest.approx(期望)
+    
+    def test_公共子序列不低于difflib(self):
+        """LCS 相似度是 difflib ratio 的上界（difflib 用匹配块近似 LCS）"""
+        后端 = 公共子序列相似度()
+        for a, b in _随机字符串对(200):
+            assert 后端.相似度(a, b) >= SequenceMatcher(None, a, b).ratio() - 1e-9
+    
+    def test_公共子序列分数高于difflib(self):
+        """测试 indel 分数可能明显高于 difflib，因此不作为默认后端（阈值按 difflib 校准）"""
+        a, b = "star wars", "wars of the stars"
+        assert 获取相似度后端("indel").相似度(a, b) == pytest.approx(0.462, abs=1e-3)
+        assert 获取相似度后端().相似度(a, b) == pytest.approx(0.308, abs=1e-3)
+    
+    @pytest.mark.parametrize("名称", list(相似度后端表))
+    def test_阈值提前退出(self, 名称):
+        """测试低于阈值时返回 0，高于阈值时返回精确值"""
+        后端 = 获取相似度后端(名称)
+        for a, b in _随机字符串对(300):
+            精确值 = 后端.相似度(a, b)
+            for 阈值 in (0.3, 0.6, 0.85):
+                结果 = 后端.相似度(a, b, 阈值)
+                if 精确值 >= 阈值:
+                    assert 结果 == pytest.approx(精确值)
+                else:
+                    assert 结果 in (0.0, pytest.approx(精确值))
+    
+    def test_预处理复用(self):
+        """测试预处理结果可与多个候选比较"""
+        后端 = 公共子序列相似度()
+        本地标题 = 后端.预处理("让子弹飞")
+        
+        assert 后端.计算(本地标题, "让子弹飞") == 1.0
+        assert 后端.计算(本地标题, "让子弹再飞一会") > 0.5
+        assert 后端.计算(本地标题, "流浪地球") == 0.0
+    
+    def test_JaroWinkler经典示例(self):
+        """测试 Jaro-Winkler 经典示例"""
+        后端 = JaroWinkler相似度()
+        assert 后端.相似度("martha", "marhta") == pytest.approx(0.9611, abs=1e-4)
+        assert 后端.相似度("dwayne", "duane") == pytest.approx(0.84, abs=1e-4)
+    
+    def test_获取后端(self):
+        """测试按名称或实例获取后端"""
+        assert isinstance(获取相似度后端(), Difflib相似度)
+        assert isinstance(获取相似度后端("indel"), 公共子序列相似度)
+        
+        实例 = 编辑距离相似度()
+        assert 获取相似度后端(实例) is 实例
+        
+        with pytest.raises(ValueError):
+            获取相似度后端("unknown")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
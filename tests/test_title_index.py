@@ -0,0 +1,98 @@
+"""
+本地标题索引测试
+"""
+import threading
+
+import pytest
+from smartrenamer.core.models import MediaType
+from smartrenamer.core.title_index import TitleIndex, 标题索引
+
+
+class Test标题索引:
+    """标题索引测试类"""
+    
+    def test_标准化标题(self):
+        """测试标点和大小写不影响查找"""
+        assert 标题索引.标准化标题("Spider-Man: No Way Home") == "spider man no way home"
+        assert 标题索引.标准化标题("  让子弹飞 ") == "让子弹飞"
+    
+    def test_按标题和原始标题查找(self):
+        """测试标题与原始标题均可查到记录"""
+        索引 = 标题索引()
+        索引.记录搜索结果(MediaType.MOVIE, [
+            {"id": 37165, "title": "Let the Bullets Fly", "original_title": "让子弹飞"},
+            {"id": 1, "title": "Other"},
+            {"title": "无 ID 的记录"},
+        ])
+        
+        assert [r["id"] for r in 索引.查找候选(MediaType.MOVIE, "let the bullets fly")] == [37165]
+        assert [r["id"] for r in 索引.查找候选(MediaType.MOVIE, "让子弹飞")] == [37165]
+        assert 索引.查找候选(MediaType.TV_SHOW, "让子弹飞") == []
+        assert 索引.获取统计信息()["记录数"] == 2
+    
+    def test_别名(self):
+        """测试别名查找"""
+        索引 = 标题索引()
+        索引.记录搜索结果(MediaType.TV_SHOW, [{"id": 1396, "name": "Breaking Bad"}])
+        索引.添加别名(MediaType.TV_SHOW, 1396, "绝命毒师")
+        
+        assert 索引.查找候选(MediaType.TV_SHOW, "绝命毒师")[0]["name"] == "Breaking Bad"
+    
+    def test_确认匹配_年份(self):
+        """测试已确认映射的年份规则"""
+        索引 = 标题索引()
+        索引.确认匹配(MediaType.MOVIE, "Dune", 1984, {"id": 841, "title": "Dune"})
+        索引.确认匹配(MediaType.MOVIE, "Dune", 2021, {"id": 438631, "title": "Dune"})
+        
+        assert 索引.查找已确认(MediaType.MOVIE, "Dune", 1984)["id"] == 841
+        assert 索引.查找已确认(MediaType.MOVIE, "dune", 2021)["id"] == 438631
+        assert 索引.查找已确认(MediaType.MOVIE, "Dune", 2000) is None
+        assert 索引.查找已确认(MediaType.MOVIE, "Dune") is not None
+    
+    def test_确认匹配_无年份确认不命中带年份查询(self):
+        """测试没有年份的确认只命中同样没有年份的查询"""
+        索引 = 标题索引()
+        索引.确认匹配(MediaType.MOVIE, "Dune", None, {"id": 438631, "title": "Dune"})
+        
+        assert 索引.查找已确认(MediaType.MOVIE, "Dune")["id"] == 438631
+        assert 索引.查找已确认(MediaType.MOVIE, "Dune", 1984) is None
+        
+        索引.确认匹配(MediaType.MOVIE, "Dune", 1984, {"id": 841, "title": "Dune"})
+        assert 索引.查找已确认(MediaType.MOVIE, "Dune", 1984)["id"] == 841
+        assert 索引.查找已确认(MediaType.MOVIE, "Dune")["id"] == 438631
+    
+    def test_命中统计线程安全(self):
+        """测试多个线程同时记录命中时计数不丢失"""
+        索引 = 标题索引()
+        
+        def 记录():
+            for i in range(2000):
+                索引.记录命中(i % 2 == 0)
+        
+        线程列表 = [threading.Thread(target=记录) for _ in range(8)]
+        for 线程 in 线程列表:
+            线程.start()
+        for 线程 in 线程列表:
+            线程.join()
+        
+        统计 = 索引.获取统计信息()
+        assert 统计["命中次数"] == 8000
+        assert 统计["未命中次数"] == 8000
+    
+    def test_持久化(self, tmp_path):
+        """测试重新打开数据库后数据仍在"""
+        路径 = tmp_path / "index" / "title_index.db"
+        索引 = TitleIndex(路径)
+        索引.confirm(MediaType.MOVIE, "The Matrix", 1999, {"id": 603, "title": "The Matrix"})
+        索引.close()
+        
+        索引 = TitleIndex(路径)
+        assert 索引.lookup_confirmed(MediaType.MOVIE, "The Matrix", 1999)["id"] == 603
+        assert 索引.lookup(MediaType.MOVIE, "the matrix")[0]["id"] == 603
+        
+        索引.clear()
+        assert 索引.get_stats()["记录数"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -72,7 +72,7 @@ class TestCacheManager:
         self.cache.设置("test_movie", 测试数据)
         
         # 清空内存缓存但保留磁盘缓存
-        self.cache._内存缓存.clear()
+        self.cache._清空内存缓存()
         
         # 从磁盘重新加载
         结果 = self.cache.获取("test_movie")
@@ -155,6 +155,19 @@ class TestEnhancedTMDBClient:
         assert len(results) > 0
         assert self.client.movie.search.called
     
+    def test_tmdbv3api结果转为普通字典(self):
+        """测试 AsObj 搜索结果转换为原始 JSON 字典，可以写入磁盘缓存"""
+        AsObj = pytest.importorskip("tmdbv3api.as_obj").AsObj
+        原始 = {"id": 603, "title": "The Matrix", "genre_ids": [28, 878]}
+        self.client.movie.search = Mock(return_value=[AsObj(原始)])
+        
+        results = self.client.search_movie("The Matrix")
+        self.client.缓存.刷新()
+        self.client.缓存._清空内存缓存()
+        
+        assert results == [原始]
+        assert self.client.缓存.获取("movie_search:the matrix") == [原始]
+    
     def test_搜索电影_使用缓存(self):
         """测试搜索电影（使用缓存）"""
         # 第一次搜索
@@ -252,6 +265,24 @@ class TestEnhancedTMDBClient:
         results = self.client.search_movie("The Matrix")
         assert results == []
     
+    def test_限流后重试(self):
+        """测试限流错误交给速率限制器暂停并降低并发，而不是指数退避"""
+        mock_result = Mock()
+        mock_result.__dict__ = {"id": 603, "title": "The Matrix"}
+        限流异常 = Exception("429 Too Many Requests")
+        限流异常.response = Mock(status_code=429, headers={"Retry-After": "0.1"})
+        self.client.movie.search = Mock(side_effect=[限流异常, [mock_result]])
+        
+        开始 = time.monotonic()
+        results = self.client.search_movie("The Matrix", use_cache=False)
+        
+        assert results[0]["id"] == 603
+        assert time.monotonic() - 开始 < self.client.重试延迟
+        统计 = self.client.get_rate_limit_stats()
+        assert 统计["throttled"] == 1
+        assert 统计["concurrency_limit"] < self.client.最大并发请求数
+        assert 统计["total_requests"] == 2
+    
     def test_年份过滤_电影(self):
         """测试电影年份过滤"""
         mock_result1 = Mock()
@@ -285,6 +316,120 @@ class TestEnhancedTMDBClient:
         # 再次搜索应该调用 API
         self.client.search_movie("The Matrix")
         assert self.client.movie.search.call_count == 2
+    
+    def test_获取季详情_剧集复用缓存(self):
+        """测试整季详情缓存后，单集查询不再请求 API"""
+        mock_season = Mock()
+        mock_season._json = {
+            "season_number": 1,
+            "episodes": [
+                {"episode_number": i, "name": f"Episode {i}"} for i in range(1, 8)
+            ],
+        }
+        self.client.season.details = Mock(return_value=mock_season)
+        self.client.episode.details = Mock()
+        
+        season = self.client.get_season_details(1396, 1)
+        season_again = self.client.get_season_details(1396, 1)
+        episode = self.client.get_episode_details(1396, 1, 3)
+        
+        assert len(season["episodes"]) == 7
+        assert season_again == season
+        assert episode["name"] == "Episode 3"
+        assert self.client.season.details.call_count == 1
+        self.client.episode.details.assert_not_called()
+    
+    def test_附加内容超过上限分批请求(self):
+        """测试超过 append_to_response 上限的附加内容分批请求，各季分别缓存"""
+        def mock_details(tv_id, append_to_response):
+            详情 = Mock()
+            详情._json = {"id": tv_id, "name": "Show"}
+            for 内容 in append_to_response.split(","):
+                季数 = int(内容.split("/")[1])
+                详情._json[内容] = {
+                    "season_number": 季数,
+                    "episodes": [{"episode_number": 1, "name": f"S{季数}E1", "crew": [1]}],
+                }
+            return 详情
+        
+        self.client.tv.details = Mock(side_effect=mock_details)
+        self.client.season.details = Mock()
+        附加内容 = [f"season/{i}" for i in range(1, 26)]
+        
+        详情 = self.client.get_tv_details(1396, append_to_response=附加内容)
+        
+        assert self.client.tv.details.call_count == 2
+        assert len(self.client.tv.details.call_args_list[0][1]["append_to_response"].split(",")) == 20
+        assert 详情["name"] == "Show"
+        assert 详情["season/25"]["episodes"][0]["name"] == "S25E1"
+        assert "crew" not in 详情["season/25"]["episodes"][0]
+        assert self.client.get_episode_details(1396, 7, 1)["name"] == "S7E1"
+        self.client.season.details.assert_not_called()
+    
+    def test_附加内容请求失败(self):
+        """测试合并请求失败时返回 None"""
+        self.client.movie.details = Mock(side_effect=Exception("boom"))
+        self.client.最大重试次数 = 1
+        self.client.重试延迟 = 0
+        
+        assert self.client.get_movie_details(603, append_to_response=["alternative_titles"]) is None
+    
+    def test_预热缓存(self):
+        """测试按 ID 批量预热，已缓存的内容不再请求，各季与详情合并请求"""
+        def mock_details(媒体id, append_to_response=None):
+            详情 = Mock()
+            详情._json = {"id": 媒体id, "name": f"Title {媒体id}"}
+            for 内容 in filter(None, (append_to_response or "").split(",")):
+                详情._json[内容] = {"season_number": int(内容.split("/")[1]), "episodes": []}
+            return 详情
+        
+        self.client.movie.details = Mock(side_effect=mock_details)
+        self.client.tv.details = Mock(side_effect=mock_details)
+        self.client.season.details = Mock()
+        
+        结果 = self.client.warm_cache([603, 604, 603], {1396: [2, 1]})
+        
+        assert 结果 == {"requested": 3, "succeeded": 3, "failed": 0, "api_requests": 3}
+        assert self.client.tv.details.call_args[1]["append_to_response"] == "season/1,season/2"
+        assert self.client.warm_cache([603], {1396: [1]})["api_requests"] == 0
+        assert self.client.get_season_details(1396, 2)["season_number"] == 2
+        assert self.client.movie.details.call_count == 2
+        self.client.season.details.assert_not_called()
+    
+    def test_搜索原始结果按标准化查询缓存(self):
+        """测试不同年份、大小写的同一标题只请求一次，年份在本地过滤"""
+        mock_result1 = Mock()
+        mock_result1.__dict__ = {"id": 1, "title": "Dune", "release_date": "1984-12-14"}
+        mock_result2 = Mock()
+        mock_result2.__dict__ = {"id": 2, "title": "Dune", "release_date": "2021-09-15"}
+        self.client.movie.search = Mock(return_value=[mock_result1, mock_result2])
+        
+        全部 = self.client.search_movie("Dune")
+        旧版 = self.client.search_movie("dune", year=1984)
+        新版 = self.client.search_movie("  DUNE ", year=2021)
+        
+        assert self.client.movie.search.call_count == 1
+        assert len(全部) == 2
+        assert [r["id"] for r in 旧版] == [1]
+        assert [r["id"] for r in 新版] == [2]
+    
+    def test_负缓存短有效期(self):
+        """测试空结果和失败搜索使用较短的负缓存有效期"""
+        self.client.负缓存有效期秒数 = 0.05
+        self.client.tv.search = Mock(return_value=[])
+        self.client.movie.search = Mock(side_effect=Exception("Persistent error"))
+        self.client.重试延迟 = 0
+        
+        assert self.client.search_tv("Breking Bad") == []
+        assert self.client.search_tv("Breking Bad") == []
+        assert self.client.search_movie("Matirx") == []
+        assert self.client.search_movie("Matirx") == []
+        assert self.client.tv.search.call_count == 1
+        assert self.client.movie.search.call_count == 3  # 只有第一次（含重试）访问网络
+        
+        time.sleep(0.1)
+        self.client.search_tv("Breking Bad")
+        assert self.client.tv.search.call_count == 2
 
 
 class Test增强TMDB客户端:
@@ -405,6 +550,48 @@ class TestCacheStats:
         # 第二次查询应该重新请求
         short_ttl_client.search_movie("The Matrix")
         assert short_ttl_client.movie.search.call_count == 2
+    
+    def test_过期后台刷新(self):
+        """测试过期条目先返回旧值，并在后台刷新"""
+        import threading
+        
+        client = EnhancedTMDBClient(
+            self.api_key,
+            缓存目录=self.cache_dir / "swr",
+            启用缓存=True,
+            缓存前缀有效期秒数={"movie_details": 0.05},
+            过期后台刷新秒数=60
+        )
+        放行 = threading.Event()
+        版本 = iter(range(1, 10))
+        
+        def mock_details(movie_id):
+            if movie_id == 603 and client.movie.details.call_count > 1:
+                放行.wait(2)
+            detail = Mock()
+            detail.__dict__ = {"id": movie_id, "version": next(版本)}
+            return detail
+        
+        client.movie.details = Mock(side_effect=mock_details)
+        assert client.获取电影详情(603)["version"] == 1
+        time.sleep(0.1)
+        
+        # 已过期：不等待网络请求，立即返回旧值
+        开始 = time.monotonic()
+        assert client.获取电影详情(603)["version"] == 1
+        assert client.获取电影详情(603)["version"] == 1
+        assert time.monotonic() - 开始 < 0.5
+        
+        放行.set()
+        for _ in range(100):
+            if client._刷新中键 == set() and client.movie.details.call_count == 2:
+                break
+            time.sleep(0.01)
+        assert client.获取电影详情(603)["version"] == 2
+        统计 = client.获取缓存统计()
+        assert 统计["background_refreshes"] == 1
+        assert 统计["stale_hits"] == 2
+        client.缓存.关闭()
 
 
 class TestConcurrency:
@@ -461,6 +648,73 @@ class TestConcurrency:
         assert "The Matrix" in results
         assert "Inception" in results
         assert "Interstellar" in results
+    
+    def test_并发相同查询合并请求(self):
+        """测试并发查询同一个标题只发出一次请求"""
+        import threading
+        
+        开始 = threading.Event()
+        调用次数 = []
+        
+        def mock_search(title):
+            调用次数.append(title)
+            开始.wait(2)
+            mock_result = Mock()
+            mock_result.__dict__ = {"id": 603, "title": "The Matrix"}
+            return [mock_result]
+        
+        self.client.movie.search = Mock(side_effect=mock_search)
+        self.client.清空缓存()
+        
+        # 大小写和空白不同的标题标准化后是同一个缓存键
+        titles = ["The Matrix", "the matrix", "THE  MATRIX"]
+        线程列表 = [
+            threading.Thread(target=self.client.搜索电影, args=(title,))
+            for title in titles
+        ]
+        for 线程 in 线程列表:
+            线程.start()
+        while self.client.获取缓存统计()["request_coalesced"] < 2:
+            time.sleep(0.01)
+        开始.set()
+        for 线程 in 线程列表:
+            线程.join(5)
+        
+        assert len(调用次数) == 1
+        assert self.client.搜索电影("The Matrix")[0]["id"] == 603
+        统计 = self.client.获取缓存统计()
+        assert 统计["request_misses"] == 1
+        assert 统计["request_coalesced"] == 2
+        assert 统计["request_hits"] == 1
+    
+    def test_合并请求共享异常(self):
+        """测试发起请求的线程失败时等待的线程得到同一个异常"""
+        import threading
+        
+        开始 = threading.Event()
+        结果 = []
+        
+        def 加载():
+            开始.wait(2)
+            raise RuntimeError("boom")
+        
+        def 执行():
+            try:
+                self.client._合并执行("key", 加载)
+            except RuntimeError as e:
+                结果.append(str(e))
+        
+        线程列表 = [threading.Thread(target=执行) for _ in range(3)]
+        for 线程 in 线程列表:
+            线程.start()
+        while self.client.获取缓存统计()["request_coalesced"] < 2:
+            time.sleep(0.01)
+        开始.set()
+        for 线程 in 线程列表:
+            线程.join(5)
+        
+        assert 结果 == ["boom"] * 3
+        assert self.client._进行中请求表 == {}
 
 
 class TestFactoryPattern:
@@ -507,6 +761,29 @@ class TestFactoryPattern:
         
         # 配置改变，应该是不同的实例
         assert client1 is not client2
+    
+    def test_配置改变时关闭旧客户端缓存(self, tmp_path, monkeypatch):
+        """测试重建客户端时关闭旧实例的缓存（后台写入线程随之停止）"""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        client1 = get_tmdb_client(Config(tmdb_api_key="test_key_1"))
+        client1.缓存.设置("movie_details:1", {"id": 1})
+        
+        client2 = get_tmdb_client(Config(tmdb_api_key="test_key_2"))
+        
+        assert client1.缓存._已关闭
+        assert client1.缓存._写入线程 is None
+        assert not client2.缓存._已关闭
+        assert client2.缓存.获取("movie_details:1") == {"id": 1}
+    
+    def test_默认有效期沿用tmdb_cache_ttl_hours(self):
+        """测试未配置按类型有效期时所有条目使用 tmdb_cache_ttl_hours"""
+        config = Config(tmdb_api_key="test_key", tmdb_cache_ttl_hours=2)
+        
+        缓存 = get_tmdb_client(config).缓存
+        
+        for 键 in ("movie_details:1", "tv_search:heat", "season_details:1:1"):
+            assert 缓存._有效期秒数(键) == 2 * 3600
+        assert 缓存.过期后可用秒数 == config.tmdb_cache_stale_hours * 3600
 
 
 if __name__ == "__main__":
@@ -0,0 +1,192 @@
+"""
+本地 TMDB 桩服务器
+
+在 127.0.0.1 的随机端口上模拟 TMDB v3 API 的搜索和详情接口，
+支持 HTTP/1.1 keep-alive、gzip 响应、注入 429 限流和固定延迟，
+用于测试和基准测试原生 HTTP 传输
+"""
+import gzip
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+def 构造电影(编号: int, 标题: str) -> Dict[str, Any]:
+    """构造一条带冗余字段的电影搜索结果"""
+    return {
+        "id": 编号,
+        "title": 标题,
+        "original_title": 标题,
+        "release_date": f"{1990 + 编号 % 30}-01-01",
+        "overview": "An overview. " * 20,
+        "poster_path": f"/poster{编号}.jpg",
+        "backdrop_path": f"/backdrop{编号}.jpg",
+        "popularity": 10.0 + 编号,
+        "vote_average": 7.5,
+        "vote_count": 1000,
+        "genre_ids": [28, 878],
+        "original_language": "en",
+        "adult": False,
+        "video": False,
+    }
+
+
+def 构造剧集(季数: int, 集数: int) -> Dict[str, Any]:
+    """构造一集带演职员列表的剧集数据"""
+    return {
+        "episode_number": 集数,
+        "season_number": 季数,
+        "name": f"Episode {集数}",
+        "overview": "Episode overview.",
+        "air_date": "2008-01-20",
+        "crew": [{"id": i, "name": f"Crew {i}", "job": "Director"} for i in range(10)],
+        "guest_stars": [{"id": i, "name": f"Guest {i}"} for i in range(10)],
+    }
+
+
+def 构造季(服务器: "TMDB桩服务器", 季数: int) -> Dict[str, Any]:
+    """构造整季详情"""
+    return {
+        "id": 1000 + 季数,
+        "season_number": 季数,
+        "name": f"Season {季数}",
+        "episodes": [构造剧集(季数, e) for e in range(1, 服务器.每季集数 + 1)],
+    }
+
+
+class _处理器(BaseHTTPRequestHandler):
+    """桩服务器请求处理"""
+    
+    protocol_version = "HTTP/1.1"
+    # 响应头和正文分两次写出，keep-alive 连接上需要关闭 Nagle 算法以免触发延迟确认
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format, *args):  # noqa: A002 - 覆盖基类方法
+        pass
+    
+    def setup(self):
+        super().setup()
+        with self.server.锁:
+            self.server.连接数 += 1
+    
+    def _发送(self, 状态码: int, 数据: Any, 头: Optional[Dict[str, str]] = None) -> None:
+        正文 = json.dumps(数据).encode("utf-8")
+        self.send_response(状态码)
+        self.send_header("Content-Type", "application/json;charset=utf-8")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            正文 = gzip.compress(正文)
+            self.send_header("Content-Encoding", "gzip")
+        for 键, 值 in (头 or {}).items():
+            self.send_header(键, 值)
+        self.send_header("Content-Length", str(len(正文)))
+        self.end_headers()
+        self.wfile.write(正文)
+    
+    def do_GET(self):
+        服务器 = self.server
+        地址 = urlparse(self.path)
+        参数 = {键: 值[0] for 键, 值 in parse_qs(地址.query).items()}
+        with 服务器.锁:
+            服务器.请求记录.append((地址.path, 参数))
+            限流 = 服务器.剩余限流次数 > 0
+            if 限流:
+                服务器.剩余限流次数 -= 1
+        
+        if 服务器.延迟秒数:
+            time.sleep(服务器.延迟秒数)
+        if 限流:
+            self._发送(
+                429,
+                {"status_code": 25, "status_message": "Your request count (41) is over the allowed limit of (40)."},
+                {"Retry-After": str(服务器.重试等待秒数)}
+            )
+            return
+        if 参数.get("api_key") != 服务器.api_key:
+            self._发送(401, {"status_code": 7, "status_message": "Invalid API key"})
+            return
+        
+        路径 = 地址.path[len(服务器.前缀):]
+        if 路径 in ("/search/movie", "/search/tv"):
+            查询 = 参数.get("query", "")
+            字段 = "title" if 路径 == "/search/movie" else "name"
+            结果 = [dict(构造电影(i + 1, f"{查询} {i}" if i else 查询)) for i in range(服务器.结果数)]
+            if 字段 == "name":
+                for r in 结果:
+                    r["name"] = r.pop("title")
+                    r["original_name"] = r.pop("original_title")
+                    r["first_air_date"] = r.pop("release_date")
+            self._发送(200, {"page": 1, "results": 结果, "total_pages": 1, "total_results": len(结果)})
+            return
+        
+        匹配 = re.fullmatch(r"/tv/(\d+)/season/(\d+)/episode/(\d+)", 路径)
+        if 匹配:
+            self._发送(200, 构造剧集(int(匹配.group(2)), int(匹配.group(3))))
+            return
+        匹配 = re.fullmatch(r"/tv/(\d+)/season/(\d+)", 路径)
+        if 匹配:
+            self._发送(200, 构造季(服务器, int(匹配.group(2))))
+            return
+        匹配 = re.fullmatch(r"/(movie|tv)/(\d+)", 路径)
+        if 匹配:
+            编号 = int(匹配.group(2))
+            if 编号 == 404:
+                self._发送(404, {"status_code": 34, "status_message": "Not found"})
+                return
+            数据 = 构造电影(编号, f"Title {编号}")
+            数据["runtime"] = 120
+            # append_to_response：附加整季数据（仅电视剧）和别名
+            for 内容 in filter(None, 参数.get("append_to_response", "").split(",")):
+                if 内容.startswith("season/") and 匹配.group(1) == "tv":
+                    数据[内容] = 构造季(服务器, int(内容.split("/", 1)[1]))
+                elif 内容 == "alternative_titles":
+                    字段 = "titles" if 匹配.group(1) == "movie" else "results"
+                    数据[内容] = {"id": 编号, 字段: [{"iso_3166_1": "CN", "title": f"标题 {编号}"}]}
+            self._发送(200, 数据)
+            return
+        
+        self._发送(404, {"status_code": 34, "status_message": "Not found"})
+
+
+class TMDB桩服务器(ThreadingHTTPServer):
+    """
+    本地 TMDB 桩服务器
+    
+    用法:
+        with TMDB桩服务器() as 服务器:
+            客户端 = 原生HTTP传输("key", 基础URL=服务器.基础URL)
+    """
+    
+    daemon_threads = True
+    # 默认监听队列只有 5，并发建立大量连接时会丢弃 SYN
+    request_queue_size = 256
+    
+    def __init__(self, api_key: str = "test_key", 延迟秒数: float = 0.0, 结果数: int = 5):
+        super().__init__(("127.0.0.1", 0), _处理器)
+        self.api_key = api_key
+        self.前缀 = "/3"
+        self.延迟秒数 = 延迟秒数
+        self.结果数 = 结果数
+        self.每季集数 = 10
+        self.剩余限流次数 = 0
+        self.重试等待秒数 = 0.1
+        self.锁 = threading.Lock()
+        self.连接数 = 0
+        self.请求记录: List[tuple] = []
+        self._线程 = threading.Thread(target=self.serve_forever, daemon=True)
+    
+    @property
+    def 基础URL(self) -> str:
+        """API 基础地址"""
+        return f"http://127.0.0.1:{self.server_address[1]}{self.前缀}"
+    
+    def __enter__(self):
+        self._线程.start()
+        return self
+    
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()